@@ -0,0 +1,63 @@
+import argparse
+import os
+import time
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from gptcache.manager.scalar_data.base import CacheData, Question, QuestionDep
+from gptcache.manager.scalar_data.sql_storage import SQLStorage
+from gptcache.utils import import_sql_client
+
+
+def mock_data(count, dim):
+    return [
+        CacheData(
+            question=Question(
+                f"question_{i}", [QuestionDep("text", f"dep_{i}", 0)]
+            ),
+            answers=[f"answer_{i}", f"other_answer_{i}"],
+            embedding_data=np.random.rand(dim).astype("float32"),
+            session_id=f"session_{i % 10}",
+        )
+        for i in range(count)
+    ]
+
+
+def bench(db_type, bulk, count, batch_size, dim):
+    with TemporaryDirectory() as root:
+        url = f"{db_type}:///" + os.path.join(root, f"{db_type}.db")
+        # the orm path runs on the sqlite defaults, as it did before the bulk insert
+        storage = SQLStorage(
+            db_type=db_type, url=url, sqlite_pragmas=None if bulk else {}
+        )
+        storage._bulk_insert = bulk  # pylint: disable=protected-access
+        data = mock_data(count, dim)
+        start_time = time.time()
+        for i in range(0, count, batch_size):
+            storage.batch_insert(data[i: i + batch_size])
+        cost = time.time() - start_time
+        assert storage.count(is_all=True) == count
+        storage._engine.dispose()  # pylint: disable=protected-access
+        return count / cost
+
+
+def run():
+    parser = argparse.ArgumentParser(description="benchmark of SQLStorage.batch_insert")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--batch_size", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--db", nargs="+", default=["sqlite", "duckdb"])
+    args = parser.parse_args()
+
+    for db_type in args.db:
+        import_sql_client(db_type)
+        orm = bench(db_type, False, args.count, args.batch_size, args.dim)
+        bulk = bench(db_type, True, args.count, args.batch_size, args.dim)
+        print(
+            f"{db_type}: orm {orm:.0f} rows/s, bulk {bulk:.0f} rows/s, speedup {bulk / orm:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    run()
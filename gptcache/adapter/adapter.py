@@ -4,9 +4,13 @@ import numpy as np
 
 from gptcache import cache
 from gptcache.processor.post import temperature_softmax
-from gptcache.utils.error import NotInitError
+from gptcache.profiler import profile_request
+from gptcache.report import Report
+from gptcache.utils.error import NotInitError, ParamError
 from gptcache.utils.log import gptcache_log
-from gptcache.utils.time import time_cal
+from gptcache.utils.time import time_cal, atime_cal
+from gptcache.utils.token import estimate_token_count
+from gptcache.utils.tracing import set_span_attributes, start_span
 
 
 def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwargs):
@@ -19,6 +23,12 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
     :param kwargs: llm kwargs
     :return: llm result
     """
+    chat_cache = kwargs.get("cache_obj", cache)
+    with start_span(chat_cache, "gptcache.adapt"), profile_request(chat_cache):
+        return _adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwargs)
+
+
+def _adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwargs):
     start_time = time.time()
     search_only_flag = kwargs.pop("search_only", False)
     user_temperature = "temperature" in kwargs
@@ -34,28 +44,13 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
     cache_enable = chat_cache.cache_enable_func(*args, **kwargs)
     context = kwargs.pop("cache_context", {})
     embedding_data = None
-    # you want to retry to send the request to chatgpt when the cache is negative
-
-    if 0 < temperature < 2:
-        cache_skip_options = [True, False]
-        prob_cache_skip = [0, 1]
-        cache_skip = kwargs.pop(
-            "cache_skip",
-            temperature_softmax(
-                messages=cache_skip_options,
-                scores=prob_cache_skip,
-                temperature=temperature,
-            ),
-        )
-    elif temperature >= 2:
-        cache_skip = kwargs.pop("cache_skip", True)
-    else:  # temperature <= 0
-        cache_skip = kwargs.pop("cache_skip", False)
+    cache_skip = _pop_cache_skip(kwargs, temperature)
     cache_factor = kwargs.pop("cache_factor", 1.0)
     pre_embedding_res = time_cal(
         chat_cache.pre_embedding_func,
         func_name="pre_process",
         report_func=chat_cache.report.pre,
+        cache_obj=chat_cache,
     )(
         kwargs,
         extra_param=context.get("pre_embedding_func", None),
@@ -79,18 +74,23 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
             chat_cache.embedding_func,
             func_name="embedding",
             report_func=chat_cache.report.embedding,
+            cache_obj=chat_cache,
         )(pre_embedding_data, extra_param=context.get("embedding_func", None))
     if cache_enable and not cache_skip:
+        top_k = (
+            kwargs.pop("top_k", 5)
+            if (user_temperature and not user_top_k)
+            else kwargs.pop("top_k", -1)
+        )
         search_data_list = time_cal(
             chat_cache.data_manager.search,
             func_name="search",
             report_func=chat_cache.report.search,
+            cache_obj=chat_cache,
         )(
             embedding_data,
             extra_param=context.get("search_func", None),
-            top_k=kwargs.pop("top_k", 5)
-            if (user_temperature and not user_top_k)
-            else kwargs.pop("top_k", -1),
+            top_k=top_k,
         )
         if search_data_list is None:
             search_data_list = []
@@ -105,17 +105,21 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
             if rank_threshold < min_rank
             else rank_threshold
         )
+        best_rank, session_filtered = None, False
         for search_data in search_data_list:
             cache_data = time_cal(
                 chat_cache.data_manager.get_scalar_data,
                 func_name="get_data",
                 report_func=chat_cache.report.data,
+                cache_obj=chat_cache,
             )(
                 search_data,
                 extra_param=context.get("get_scalar_data", None),
                 session=session,
             )
             if cache_data is None:
+                # the data manager returns None for the data rejected by the session
+                session_filtered = session_filtered or session is not None
                 continue
 
             # cache consistency check
@@ -159,11 +163,13 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
                 chat_cache.similarity_evaluation.evaluation,
                 func_name="evaluation",
                 report_func=chat_cache.report.evaluation,
+                cache_obj=chat_cache,
             )(
                 eval_query_data,
                 eval_cache_data,
                 extra_param=context.get("evaluation_func", None),
             )
+            best_rank = rank if best_rank is None else max(best_rank, rank)
             gptcache_log.debug(
                 "similarity: [user question] %s, [cache question] %s, [value] %f",
                 pre_store_data,
@@ -177,6 +183,14 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
                 chat_cache.data_manager.hit_cache_callback(search_data)
         cache_answers = sorted(cache_answers, key=lambda x: x[0], reverse=True)
         answers_dict = dict((d[1], d) for d in cache_answers)
+        set_span_attributes(
+            chat_cache,
+            {
+                "gptcache.top_k": top_k,
+                "gptcache.candidate_count": len(search_data_list),
+                "gptcache.best_score": None if best_rank is None else float(best_rank),
+            },
+        )
         if len(cache_answers) != 0:
             hit_callback = kwargs.pop("hit_callback", None)
             if hit_callback and callable(hit_callback):
@@ -199,8 +213,12 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
                 post_process,
                 func_name="post_process",
                 report_func=chat_cache.report.post,
+                cache_obj=chat_cache,
             )()
             chat_cache.report.hint_cache()
+            set_span_attributes(chat_cache, {"gptcache.hit": True})
+            if isinstance(return_message, str):
+                chat_cache.report.save_tokens(estimate_token_count(return_message))
             cache_whole_data = answers_dict.get(str(return_message))
             if session and cache_whole_data:
                 chat_cache.data_manager.add_session(
@@ -223,6 +241,9 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
                     round(time.time() - start_time, 6),
                 )
             return cache_data_convert(return_message)
+        _miss_cache(chat_cache, _miss_reason(best_rank is not None, session_filtered))
+    else:
+        _miss_cache(chat_cache, Report.MISS_CACHE_SKIP)
 
     next_cache = chat_cache.next_cache
     if next_cache:
@@ -239,7 +260,10 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
             # cache miss
             return None
         llm_data = time_cal(
-            llm_handler, func_name="llm_request", report_func=chat_cache.report.llm
+            llm_handler,
+            func_name="llm_request",
+            report_func=chat_cache.report.llm,
+            cache_obj=chat_cache,
         )(*args, **kwargs)
 
     if not llm_data:
@@ -261,6 +285,7 @@ def adapt(llm_handler, cache_data_convert, update_cache_callback, *args, **kwarg
                     chat_cache.data_manager.save,
                     func_name="save",
                     report_func=chat_cache.report.save,
+                    cache_obj=chat_cache,
                 )(
                     question,
                     handled_llm_data,
@@ -295,6 +320,16 @@ async def aadapt(
     :param kwargs: llm kwargs
     :return: llm result
     """
+    chat_cache = kwargs.get("cache_obj", cache)
+    with start_span(chat_cache, "gptcache.aadapt"), profile_request(chat_cache):
+        return await _aadapt(
+            llm_handler, cache_data_convert, update_cache_callback, *args, **kwargs
+        )
+
+
+async def _aadapt(
+    llm_handler, cache_data_convert, update_cache_callback, *args, **kwargs
+):
     start_time = time.time()
     user_temperature = "temperature" in kwargs
     user_top_k = "top_k" in kwargs
@@ -309,28 +344,13 @@ async def aadapt(
     cache_enable = chat_cache.cache_enable_func(*args, **kwargs)
     context = kwargs.pop("cache_context", {})
     embedding_data = None
-    # you want to retry to send the request to chatgpt when the cache is negative
-
-    if 0 < temperature < 2:
-        cache_skip_options = [True, False]
-        prob_cache_skip = [0, 1]
-        cache_skip = kwargs.pop(
-            "cache_skip",
-            temperature_softmax(
-                messages=cache_skip_options,
-                scores=prob_cache_skip,
-                temperature=temperature,
-            ),
-        )
-    elif temperature >= 2:
-        cache_skip = kwargs.pop("cache_skip", True)
-    else:  # temperature <= 0
-        cache_skip = kwargs.pop("cache_skip", False)
+    cache_skip = _pop_cache_skip(kwargs, temperature)
     cache_factor = kwargs.pop("cache_factor", 1.0)
     pre_embedding_res = time_cal(
         chat_cache.pre_embedding_func,
         func_name="pre_process",
         report_func=chat_cache.report.pre,
+        cache_obj=chat_cache,
     )(
         kwargs,
         extra_param=context.get("pre_embedding_func", None),
@@ -354,18 +374,23 @@ async def aadapt(
             chat_cache.embedding_func,
             func_name="embedding",
             report_func=chat_cache.report.embedding,
+            cache_obj=chat_cache,
         )(pre_embedding_data, extra_param=context.get("embedding_func", None))
     if cache_enable and not cache_skip:
+        top_k = (
+            kwargs.pop("top_k", 5)
+            if (user_temperature and not user_top_k)
+            else kwargs.pop("top_k", -1)
+        )
         search_data_list = time_cal(
             chat_cache.data_manager.search,
             func_name="search",
             report_func=chat_cache.report.search,
+            cache_obj=chat_cache,
         )(
             embedding_data,
             extra_param=context.get("search_func", None),
-            top_k=kwargs.pop("top_k", 5)
-            if (user_temperature and not user_top_k)
-            else kwargs.pop("top_k", -1),
+            top_k=top_k,
         )
         if search_data_list is None:
             search_data_list = []
@@ -380,17 +405,21 @@ async def aadapt(
             if rank_threshold < min_rank
             else rank_threshold
         )
+        best_rank, session_filtered = None, False
         for search_data in search_data_list:
-            cache_data = time_cal(
-                chat_cache.data_manager.get_scalar_data,
+            cache_data = await atime_cal(
+                chat_cache.data_manager.aget_scalar_data,
                 func_name="get_data",
                 report_func=chat_cache.report.data,
+                cache_obj=chat_cache,
             )(
                 search_data,
                 extra_param=context.get("get_scalar_data", None),
                 session=session,
             )
             if cache_data is None:
+                # the data manager returns None for the data rejected by the session
+                session_filtered = session_filtered or session is not None
                 continue
 
             if "deps" in context and hasattr(cache_data.question, "deps"):
@@ -422,11 +451,13 @@ async def aadapt(
                 chat_cache.similarity_evaluation.evaluation,
                 func_name="evaluation",
                 report_func=chat_cache.report.evaluation,
+                cache_obj=chat_cache,
             )(
                 eval_query_data,
                 eval_cache_data,
                 extra_param=context.get("evaluation_func", None),
             )
+            best_rank = rank if best_rank is None else max(best_rank, rank)
             gptcache_log.debug(
                 "similarity: [user question] %s, [cache question] %s, [value] %f",
                 pre_store_data,
@@ -440,6 +471,14 @@ async def aadapt(
                 chat_cache.data_manager.hit_cache_callback(search_data)
         cache_answers = sorted(cache_answers, key=lambda x: x[0], reverse=True)
         answers_dict = dict((d[1], d) for d in cache_answers)
+        set_span_attributes(
+            chat_cache,
+            {
+                "gptcache.top_k": top_k,
+                "gptcache.candidate_count": len(search_data_list),
+                "gptcache.best_score": None if best_rank is None else float(best_rank),
+            },
+        )
         if len(cache_answers) != 0:
             def post_process():
                 if chat_cache.post_process_messages_func is temperature_softmax:
@@ -458,18 +497,22 @@ async def aadapt(
                 post_process,
                 func_name="post_process",
                 report_func=chat_cache.report.post,
+                cache_obj=chat_cache,
             )()
             chat_cache.report.hint_cache()
+            set_span_attributes(chat_cache, {"gptcache.hit": True})
+            if isinstance(return_message, str):
+                chat_cache.report.save_tokens(estimate_token_count(return_message))
             cache_whole_data = answers_dict.get(str(return_message))
             if session and cache_whole_data:
-                chat_cache.data_manager.add_session(
+                await chat_cache.data_manager.aadd_session(
                     cache_whole_data[2], session.name, pre_embedding_data
                 )
             if cache_whole_data:
                 # user_question / cache_question / cache_question_id / cache_answer / similarity / consume time/ time
                 report_cache_data = cache_whole_data[3]
                 report_search_data = cache_whole_data[2]
-                chat_cache.data_manager.report_cache(
+                await chat_cache.data_manager.areport_cache(
                     pre_store_data if isinstance(pre_store_data, str) else "",
                     report_cache_data.question
                     if isinstance(report_cache_data.question, str)
@@ -482,6 +525,9 @@ async def aadapt(
                     round(time.time() - start_time, 6),
                 )
             return cache_data_convert(return_message)
+        _miss_cache(chat_cache, _miss_reason(best_rank is not None, session_filtered))
+    else:
+        _miss_cache(chat_cache, Report.MISS_CACHE_SKIP)
 
     next_cache = chat_cache.next_cache
     if next_cache:
@@ -493,7 +539,12 @@ async def aadapt(
             llm_handler, cache_data_convert, update_cache_callback, *args, **kwargs
         )
     else:
-        llm_data = await llm_handler(*args, **kwargs)
+        llm_data = await atime_cal(
+            llm_handler,
+            func_name="llm_request",
+            report_func=chat_cache.report.llm,
+            cache_obj=chat_cache,
+        )(*args, **kwargs)
 
     if cache_enable:
         try:
@@ -511,6 +562,7 @@ async def aadapt(
                     chat_cache.data_manager.save,
                     func_name="save",
                     report_func=chat_cache.report.save,
+                    cache_obj=chat_cache,
                 )(
                     question,
                     handled_llm_data,
@@ -532,6 +584,264 @@ async def aadapt(
     return llm_data
 
 
+def _pop_cache_skip(kwargs, temperature):
+    # you want to retry to send the request to chatgpt when the cache is negative
+    if 0 < temperature < 2:
+        cache_skip_options = [True, False]
+        prob_cache_skip = [0, 1]
+        return kwargs.pop(
+            "cache_skip",
+            temperature_softmax(
+                messages=cache_skip_options,
+                scores=prob_cache_skip,
+                temperature=temperature,
+            ),
+        )
+    if temperature >= 2:
+        return kwargs.pop("cache_skip", True)
+    # temperature <= 0
+    return kwargs.pop("cache_skip", False)
+
+
+def _pre_embedding(chat_cache, data, context):
+    pre_embedding_res = chat_cache.pre_embedding_func(
+        data,
+        extra_param=context.get("pre_embedding_func", None),
+        prompts=chat_cache.config.prompts,
+        cache_config=chat_cache.config,
+    )
+    if isinstance(pre_embedding_res, tuple):
+        pre_store_data, pre_embedding_data = pre_embedding_res
+    else:
+        pre_store_data = pre_embedding_data = pre_embedding_res
+    if chat_cache.config.input_summary_len is not None:
+        pre_embedding_data = _summarize_input(
+            pre_embedding_data, chat_cache.config.input_summary_len
+        )
+    return pre_store_data, pre_embedding_data
+
+
+def _batch_embedding(chat_cache, datas, context):
+    embedding_func = chat_cache.embedding_func
+    extra_param = context.get("embedding_func", None)
+    # the embedding function is usually the `to_embeddings` of a model, whose batch method infers all the data at once
+    batch_func = getattr(getattr(embedding_func, "__self__", None), "batch_to_embeddings", None)
+    if batch_func is None:
+        return [embedding_func(data, extra_param=extra_param) for data in datas]
+    return batch_func(datas, extra_param=extra_param)
+
+
+def adapt_batch_get(requests, **kwargs):
+    """Look up the cache for a batch of requests, the embedding, the vector search and the scalar reads
+    of the whole batch are done at once, so the cost of every call is shared by the batch.
+
+    The requests are only searched in the cache, like `gptcache.adapter.api.get`,
+    and the misses of the cache are searched in the next cache if there is one.
+
+    :param requests: the llm request data of every request, like `[{"prompt": "hello"}]`.
+    :type requests: List[Dict[str, Any]]
+    :param kwargs: the gptcache params, which include `cache_obj`, `session`, `top_k` and `cache_context`,
+                   the other params, like `cache_skip` and `temperature`, are the defaults of every request.
+    :return: the answers, None for the misses.
+    """
+    chat_cache = kwargs.pop("cache_obj", cache)
+    session = kwargs.pop("session", None)
+    top_k = kwargs.pop("top_k", -1)
+    context = kwargs.pop("cache_context", {})
+    if not chat_cache.has_init:
+        raise NotInitError()
+    results = [None] * len(requests)
+    with start_span(chat_cache, "gptcache.adapt_batch", {"gptcache.batch_size": len(requests)}):
+        start_time = time.time()
+        # every request skips the cache like the single request of `adapt`
+        datas = [dict(kwargs, **request) for request in requests]
+        cache_skips = [_pop_cache_skip(data, data.pop("temperature", 0.0)) for data in datas]
+        pre_datas = time_cal(
+            lambda: [_pre_embedding(chat_cache, data, context) for data in datas],
+            func_name="pre_process",
+            report_func=chat_cache.report.pre,
+            cache_obj=chat_cache,
+        )()
+        indexes = [
+            i
+            for i, request in enumerate(requests)
+            if chat_cache.cache_enable_func(**request) and not cache_skips[i]
+        ]
+        for _ in range(len(requests) - len(indexes)):
+            chat_cache.report.miss_cache(Report.MISS_CACHE_SKIP)
+        if indexes:
+            embedding_datas = time_cal(
+                _batch_embedding,
+                func_name="embedding",
+                report_func=chat_cache.report.embedding,
+                cache_obj=chat_cache,
+            )(chat_cache, [pre_datas[i][1] for i in indexes], context)
+            search_data_lists = time_cal(
+                chat_cache.data_manager.batch_search,
+                func_name="search",
+                report_func=chat_cache.report.search,
+                cache_obj=chat_cache,
+            )(embedding_datas, top_k=top_k)
+            candidates = [
+                (n, search_data)
+                for n, search_data_list in enumerate(search_data_lists)
+                for search_data in search_data_list or []
+            ]
+            cache_datas = time_cal(
+                chat_cache.data_manager.batch_get_scalar_data,
+                func_name="get_data",
+                report_func=chat_cache.report.data,
+                cache_obj=chat_cache,
+            )([search_data for _, search_data in candidates], session=session)
+
+            min_rank, max_rank = chat_cache.similarity_evaluation.range()
+            rank_threshold = (max_rank - min_rank) * chat_cache.config.similarity_threshold
+            rank_threshold = min(max(rank_threshold, min_rank), max_rank)
+            cache_answers = [[] for _ in indexes]
+            best_ranks = [None] * len(indexes)
+            session_filtered = [False] * len(indexes)
+            for (n, search_data), cache_data in zip(candidates, cache_datas):
+                if cache_data is None:
+                    session_filtered[n] = session_filtered[n] or session is not None
+                    continue
+                if chat_cache.config.data_check and not cache_health_check(
+                    chat_cache.data_manager.v,
+                    {"embedding": cache_data.embedding_data, "search_result": search_data},
+                ):
+                    continue
+                rank = time_cal(
+                    chat_cache.similarity_evaluation.evaluation,
+                    func_name="evaluation",
+                    report_func=chat_cache.report.evaluation,
+                    cache_obj=chat_cache,
+                )(
+                    {"question": pre_datas[indexes[n]][0], "embedding": embedding_datas[n]},
+                    {
+                        "question": cache_data.question,
+                        "answer": cache_data.answers[0].answer,
+                        "search_result": search_data,
+                        "cache_data": cache_data,
+                        "embedding": cache_data.embedding_data,
+                    },
+                    extra_param=context.get("evaluation_func", None),
+                )
+                best_ranks[n] = rank if best_ranks[n] is None else max(best_ranks[n], rank)
+                if rank_threshold <= rank:
+                    cache_answers[n].append(
+                        (float(rank), cache_data.answers[0].answer, search_data, cache_data)
+                    )
+                    chat_cache.data_manager.hit_cache_callback(search_data)
+
+            for n, i in enumerate(indexes):
+                if not cache_answers[n]:
+                    chat_cache.report.miss_cache(_miss_reason(best_ranks[n] is not None, session_filtered[n]))
+                    continue
+                answers = sorted(cache_answers[n], key=lambda x: x[0], reverse=True)
+                if chat_cache.post_process_messages_func is temperature_softmax:
+                    return_message = chat_cache.post_process_messages_func(
+                        messages=[t[1] for t in answers],
+                        scores=[t[0] for t in answers],
+                        temperature=0.0,
+                    )
+                else:
+                    return_message = chat_cache.post_process_messages_func([t[1] for t in answers])
+                chat_cache.report.hint_cache()
+                if isinstance(return_message, str):
+                    chat_cache.report.save_tokens(estimate_token_count(return_message))
+                cache_whole_data = dict((d[1], d) for d in answers).get(str(return_message))
+                if session and cache_whole_data:
+                    chat_cache.data_manager.add_session(cache_whole_data[2], session.name, pre_datas[i][1])
+                if cache_whole_data and not chat_cache.config.disable_report:
+                    pre_store_data, report_cache_data = pre_datas[i][0], cache_whole_data[3]
+                    chat_cache.data_manager.report_cache(
+                        pre_store_data if isinstance(pre_store_data, str) else "",
+                        report_cache_data.question if isinstance(report_cache_data.question, str) else "",
+                        cache_whole_data[2][1],
+                        report_cache_data.answers[0].answer
+                        if isinstance(report_cache_data.answers[0].answer, str)
+                        else "",
+                        cache_whole_data[0],
+                        round(time.time() - start_time, 6),
+                    )
+                results[i] = return_message
+        set_span_attributes(
+            chat_cache, {"gptcache.hit_count": sum(result is not None for result in results)}
+        )
+
+    misses = [i for i, result in enumerate(results) if result is None]
+    if chat_cache.next_cache and misses:
+        next_results = adapt_batch_get(
+            [dict(requests[i], cache_skip=cache_skips[i]) for i in misses],
+            cache_obj=chat_cache.next_cache,
+            session=session,
+            top_k=top_k,
+            cache_context=context,
+            **kwargs,
+        )
+        for i, result in zip(misses, next_results):
+            results[i] = result
+    return results
+
+
+def adapt_batch_put(requests, answers, **kwargs):
+    """Save a batch of requests and their answers to the cache, the embedding and the writes of the whole batch
+    are done at once.
+
+    :param requests: the llm request data of every request, like `[{"prompt": "hello"}]`.
+    :type requests: List[Dict[str, Any]]
+    :param answers: the answers of the requests.
+    :type answers: List[Any]
+    :param kwargs: the gptcache params, which include `cache_obj`, `session` and `cache_context`.
+    """
+    chat_cache = kwargs.pop("cache_obj", cache)
+    session = kwargs.pop("session", None)
+    context = kwargs.pop("cache_context", {})
+    if not chat_cache.has_init:
+        raise NotInitError()
+    if len(requests) != len(answers):
+        raise ParamError("The numbers of the requests and the answers are different")
+    indexes = [i for i, request in enumerate(requests) if chat_cache.cache_enable_func(**request)]
+    if not indexes:
+        return
+    with start_span(chat_cache, "gptcache.adapt_batch", {"gptcache.batch_size": len(requests)}):
+        pre_datas = time_cal(
+            lambda: [_pre_embedding(chat_cache, dict(requests[i]), context) for i in indexes],
+            func_name="pre_process",
+            report_func=chat_cache.report.pre,
+            cache_obj=chat_cache,
+        )()
+        embedding_datas = time_cal(
+            _batch_embedding,
+            func_name="embedding",
+            report_func=chat_cache.report.embedding,
+            cache_obj=chat_cache,
+        )(chat_cache, [pre_data[1] for pre_data in pre_datas], context)
+        time_cal(
+            chat_cache.data_manager.import_data,
+            func_name="save",
+            report_func=chat_cache.report.save,
+            cache_obj=chat_cache,
+        )(
+            questions=[pre_data[0] for pre_data in pre_datas],
+            answers=[answers[i] for i in indexes],
+            embedding_datas=embedding_datas,
+            session_ids=[session.name if session else None for _ in indexes],
+        )
+
+
+def _miss_cache(chat_cache, reason):
+    chat_cache.report.miss_cache(reason)
+    set_span_attributes(chat_cache, {"gptcache.hit": False, "gptcache.miss_reason": reason})
+
+
+def _miss_reason(evaluated, session_filtered):
+    if evaluated:
+        return Report.MISS_BELOW_THRESHOLD
+    if session_filtered:
+        return Report.MISS_SESSION_FILTERED
+    return Report.MISS_NO_CANDIDATES
+
+
 _input_summarizer = None
 
 
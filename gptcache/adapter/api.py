@@ -1,10 +1,10 @@
 # pylint: disable=wrong-import-position
-from typing import Any, Optional, Callable
+from typing import Any, Optional, Callable, List
 
 import gptcache.processor.post
 import gptcache.processor.pre
 from gptcache import Cache, cache, Config
-from gptcache.adapter.adapter import adapt
+from gptcache.adapter.adapter import adapt, adapt_batch_get, adapt_batch_put
 from gptcache.embedding import (
     Onnx,
     Huggingface,
@@ -131,6 +131,54 @@ def get(prompt: str, **kwargs) -> Any:
     return res
 
 
+def put_batch(prompts: List[str], datas: List[Any], **kwargs) -> None:
+    """put_batch api, put a batch of qa pairs to GPTCache, the embeddings are generated in one batch
+    and the pairs are written in one bulk insert
+    Please make sure that the `pre_embedding_func` param is `get_prompt` when initializing the cache
+
+    :param prompts: the cache data keys, usually question texts
+    :type prompts: List[str]
+    :param datas: the cache data values, usually answer texts
+    :type datas: List[Any]
+    :param kwargs: list of user-defined parameters
+    :type kwargs: Dict
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.adapter.api import put_batch
+            from gptcache.processor.pre import get_prompt
+
+            cache.init(pre_embedding_func=get_prompt)
+            put_batch(["hello", "hi"], ["foo", "bar"])
+    """
+    adapt_batch_put([{"prompt": prompt} for prompt in prompts], datas, **kwargs)
+
+
+def get_batch(prompts: List[str], **kwargs) -> List[Any]:
+    """get_batch api, get the cache data of a batch of prompts, the embedding, the vector search
+    and the scalar reads of the batch are done at once
+    Please make sure that the `pre_embedding_func` param is `get_prompt` when initializing the cache
+
+    :param prompts: the cache data keys, usually question texts
+    :type prompts: List[str]
+    :param kwargs: list of user-defined parameters
+    :type kwargs: Dict
+    :return: the cache data of every prompt, None for the misses
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.adapter.api import put_batch, get_batch
+            from gptcache.processor.pre import get_prompt
+
+            cache.init(pre_embedding_func=get_prompt)
+            put_batch(["hello", "hi"], ["foo", "bar"])
+            print(get_batch(["hello", "hi"]))
+    """
+    return adapt_batch_get([{"prompt": prompt} for prompt in prompts], **kwargs)
+
+
 def init_similar_cache(
     data_dir: str = "api_cache",
     cache_obj: Optional[Cache] = None,
@@ -191,7 +239,22 @@ def init_similar_cache(
     )
 
 
-def init_similar_cache_from_config(config_dir: str, cache_obj: Optional[Cache] = None):
+def init_similar_cache_from_config(
+    config_dir: str,
+    cache_obj: Optional[Cache] = None,
+    data_manager_loader: Optional[Callable[[dict], DataManager]] = None,
+):
+    """Init the cache with the yaml config file.
+
+    :param config_dir: the path of the yaml config file.
+    :type config_dir: str
+    :param cache_obj: the cache to init, defaults to the global `cache`.
+    :type cache_obj: Cache
+    :param data_manager_loader: the function which creates the data manager from the `storage_config`
+                                of the file, defaults to `manager_factory(**storage_config)`.
+    :type data_manager_loader: Callable[[dict], DataManager]
+    :return: the loaded config.
+    """
     import_ruamel()
     from ruamel.yaml import YAML  # pylint: disable=C0415
 
@@ -218,7 +281,10 @@ def init_similar_cache_from_config(config_dir: str, cache_obj: Optional[Cache] =
     storage_config.setdefault("vector_params", {})
     storage_config["vector_params"] = storage_config["vector_params"] or {}
     storage_config["vector_params"]["dimension"] = embedding_model.dimension
-    data_manager = manager_factory(**storage_config)
+    if data_manager_loader is None:
+        data_manager = manager_factory(**storage_config)
+    else:
+        data_manager = data_manager_loader(storage_config)
 
     eval_strategy = init_conf.get("evaluation", "distance")
     # Due to the problem with the first naming, it is reserved to ensure compatibility
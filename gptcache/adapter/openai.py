@@ -1,9 +1,10 @@
+import asyncio
 import base64
 import json
 import os
 import time
 from io import BytesIO
-from typing import Any, AsyncGenerator, Iterator, List
+from typing import Any, AsyncIterator, Iterator, List
 
 # GPTCache imports
 from gptcache import cache
@@ -56,7 +57,6 @@ init_clients()
 from openai import OpenAIError
 
 from openai.types.chat import ChatCompletionChunk
-from openai.types.chat.chat_completion_chunk import Choice, ChoiceDelta
 
 # ------------------------------------------------------------------------------
 # Utility functions (unchanged)
@@ -68,6 +68,12 @@ async def async_iter(input_list):
         yield item
 
 
+def _with_api_key(openai_client, llm_kwargs):
+    # the api key of a request, like the one of the server proxy, isn't a param of the create method
+    api_key = llm_kwargs.pop("api_key", None)
+    return openai_client.with_options(api_key=api_key) if api_key else openai_client
+
+
 def _construct_resp_from_cache(return_message, saved_token):
     return {
         "gptcache": True,
@@ -85,55 +91,52 @@ def _construct_resp_from_cache(return_message, saved_token):
     }
 
 
-def _construct_stream_resp_from_cache(return_message, saved_token):
+def _construct_stream_resp_from_cache(return_message, saved_token, chunk_size=None):
     created = int(time.time())
-    chunks = []
-    
-    # First chunk with role
-    chunks.append(ChatCompletionChunk(
-        id="chat-chunk-" + str(created),
-        choices=[Choice(
-            delta=ChoiceDelta(role="assistant"),
-            finish_reason=None,
-            index=0
-        )],
-        created=created,
-        model="cached",
-        object="chat.completion.chunk"
-    ))
-    
-    # Content chunk
-    chunks.append(ChatCompletionChunk(
-        id="chat-chunk-" + str(created),
-        choices=[Choice(
-            delta=ChoiceDelta(content=return_message),
-            finish_reason=None,
-            index=0
-        )],
-        created=created,
-        model="cached",
-        object="chat.completion.chunk"
-    ))
-    
-    # Final chunk with finish reason
-    chunks.append(ChatCompletionChunk(
-        id="chat-chunk-" + str(created),
-        choices=[Choice(
-            delta=ChoiceDelta(),
-            finish_reason="stop",
-            index=0
-        )],
-        created=created,
-        model="cached",
-        object="chat.completion.chunk",
-        # Custom fields for gptcache
-        gptcache=True,
-        saved_token=saved_token
-    ))
-    
+    chunk_id = "chat-chunk-" + str(created)
+
+    def _chunk(delta, finish_reason=None, **extra):
+        # the chunks are built from the cached answer, so the validation of the fields is skipped
+        return ChatCompletionChunk.construct(
+            id=chunk_id,
+            choices=[{"delta": delta, "finish_reason": finish_reason, "index": 0}],
+            created=created,
+            model="cached",
+            object="chat.completion.chunk",
+            **extra,
+        )
+
+    chunks = [_chunk({"role": "assistant"})]
+    if chunk_size:
+        chunks.extend(
+            _chunk({"content": return_message[i : i + chunk_size]})
+            for i in range(0, len(return_message), chunk_size)
+        )
+    else:
+        chunks.append(_chunk({"content": return_message}))
+    # the last chunk has the finish reason and the custom fields of gptcache
+    chunks.append(_chunk({}, "stop", gptcache=True, saved_token=saved_token))
     return chunks
 
 
+SSE_DONE_FRAME = b"data: [DONE]\n\n"
+
+
+def to_sse_frame(chunk) -> bytes:
+    """Encode a chunk of a chat completion stream as a server-sent event, the chunk is serialized by pydantic
+    without the unset fields, like the stream of openai, and the dict chunks of a custom llm by json.
+
+    :param chunk: the chunk of the stream.
+    :type chunk: ChatCompletionChunk or dict
+    :return: the bytes of the event.
+    """
+    if isinstance(chunk, dict):
+        data = json.dumps(chunk, separators=(",", ":"))
+    else:
+        data = chunk.to_json(indent=None)
+    return b"data: " + data.encode("utf-8") + b"\n\n"
+
+
 def _construct_text_from_cache(return_text):
     return {
         "gptcache": True,
@@ -224,7 +227,7 @@ class ChatCompletion(BaseCacheLLM):
         """
         try:
             if cls.llm is None:  # if no custom LLM, call OpenAI
-                return client.chat.completions.create(*llm_args, **llm_kwargs)
+                return _with_api_key(client, llm_kwargs).chat.completions.create(*llm_args, **llm_kwargs)
             else:  # otherwise call custom LLM
                 return cls.llm(*llm_args, **llm_kwargs)
         except OpenAIError as e:
@@ -237,7 +240,7 @@ class ChatCompletion(BaseCacheLLM):
         """
         try:
             if cls.llm is None:
-                return await aclient.chat.completions.create(*llm_args, **llm_kwargs)
+                return await _with_api_key(aclient, llm_kwargs).chat.completions.create(*llm_args, **llm_kwargs)
             else:
                 return await cls.llm(*llm_args, **llm_kwargs)
         except OpenAIError as e:
@@ -246,14 +249,16 @@ class ChatCompletion(BaseCacheLLM):
     @staticmethod
     def _update_cache_callback(llm_data, update_cache_func, *args, **kwargs):
         try:
-            if isinstance(llm_data, AsyncGenerator):
+            if isinstance(llm_data, AsyncIterator):
                 async def hook_openai_data(it):
-                    total_answer = ""
+                    contents = []
                     async for item in it:
-                        content = get_stream_message_from_openai_answer(item) or ""
-                        total_answer += content
+                        contents.append(get_stream_message_from_openai_answer(item) or "")
                         yield item
-                    update_cache_func(Answer(total_answer, DataType.STR))
+                    # the embedding and the storage writes of the save don't block the event loop
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, update_cache_func, Answer("".join(contents), DataType.STR)
+                    )
                 return hook_openai_data(llm_data)
             elif not isinstance(llm_data, Iterator):
                 # Handle modern OpenAI response object
@@ -277,21 +282,11 @@ class ChatCompletion(BaseCacheLLM):
             else:
                 # streaming in an iterable
                 def hook_openai_data(it):
-                    total_answer = ""
+                    contents = []
                     for item in it:
-                        # Handle modern OpenAI streaming response
-                        if hasattr(item, 'choices') and len(item.choices) > 0:
-                            choice = item.choices[0]
-                            if hasattr(choice, 'delta'):
-                                content = choice.delta.content if hasattr(choice.delta, 'content') else ""
-                                total_answer += content or ""  # Handle None case
-                                yield item
-                        else:
-                            # Fallback for older format
-                            content = get_stream_message_from_openai_answer(item) or ""
-                            total_answer += content
-                            yield item
-                    update_cache_func(Answer(total_answer, DataType.STR))
+                        contents.append(get_stream_message_from_openai_answer(item) or "")
+                        yield item
+                    update_cache_func(Answer("".join(contents), DataType.STR))
                 return hook_openai_data(llm_data)
         except Exception as e:
             print(f"Unexpected error in update_cache_callback: {e}")
@@ -315,7 +310,9 @@ class ChatCompletion(BaseCacheLLM):
                 saved_token = [0, 0]
 
             if kwargs.get("stream", False):
-                return _construct_stream_resp_from_cache(cache_data, saved_token)
+                return _construct_stream_resp_from_cache(
+                    cache_data, saved_token, chat_cache.config.stream_chunk_size
+                )
             return _construct_resp_from_cache(cache_data, saved_token)
 
         kwargs = cls.fill_base_args(**kwargs)
@@ -345,7 +342,9 @@ class ChatCompletion(BaseCacheLLM):
 
             if kwargs.get("stream", False):
                 return async_iter(
-                    _construct_stream_resp_from_cache(cache_data, saved_token)
+                    _construct_stream_resp_from_cache(
+                        cache_data, saved_token, chat_cache.config.stream_chunk_size
+                    )
                 )
             return _construct_resp_from_cache(cache_data, saved_token)
 
@@ -392,14 +391,16 @@ class Completion(BaseCacheLLM):
     @staticmethod
     def _update_cache_callback(llm_data, update_cache_func, *args, **kwargs):
         try:
-            if isinstance(llm_data, AsyncGenerator):
+            if isinstance(llm_data, AsyncIterator):
                 async def hook_openai_data(it):
-                    total_answer = ""
+                    contents = []
                     async for item in it:
-                        content = get_stream_message_from_openai_answer(item) or ""
-                        total_answer += content
+                        contents.append(get_stream_message_from_openai_answer(item) or "")
                         yield item
-                    update_cache_func(Answer(total_answer, DataType.STR))
+                    # the embedding and the storage writes of the save don't block the event loop
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, update_cache_func, Answer("".join(contents), DataType.STR)
+                    )
                 return hook_openai_data(llm_data)
             elif not isinstance(llm_data, Iterator):
                 # Handle modern OpenAI response object
@@ -423,21 +424,11 @@ class Completion(BaseCacheLLM):
             else:
                 # streaming in an iterable
                 def hook_openai_data(it):
-                    total_answer = ""
+                    contents = []
                     for item in it:
-                        # Handle modern OpenAI streaming response
-                        if hasattr(item, 'choices') and len(item.choices) > 0:
-                            choice = item.choices[0]
-                            if hasattr(choice, 'delta'):
-                                content = choice.delta.content if hasattr(choice.delta, 'content') else ""
-                                total_answer += content or ""  # Handle None case
-                                yield item
-                        else:
-                            # Fallback for older format
-                            content = get_stream_message_from_openai_answer(item) or ""
-                            total_answer += content
-                            yield item
-                    update_cache_func(Answer(total_answer, DataType.STR))
+                        contents.append(get_stream_message_from_openai_answer(item) or "")
+                        yield item
+                    update_cache_func(Answer("".join(contents), DataType.STR))
                 return hook_openai_data(llm_data)
         except Exception as e:
             print(f"Unexpected error in update_cache_callback: {e}")
@@ -596,7 +587,7 @@ class Moderation(BaseCacheLLM):
     @classmethod
     def _update_cache_callback(cls, llm_data, update_cache_func, *args, **kwargs):
         try:
-            if isinstance(llm_data, AsyncGenerator):
+            if isinstance(llm_data, AsyncIterator):
                 async def hook_openai_data(it):
                     total_answer = ""
                     async for item in it:
@@ -0,0 +1,6 @@
+__all__ = ["Benchmark", "MockLLM", "HashEmbedding", "Query", "Workload", "load_workload", "main"]
+
+from gptcache.benchmark.dataset import Query, Workload, load_workload
+from gptcache.benchmark.mock import HashEmbedding, MockLLM
+from gptcache.benchmark.runner import Benchmark
+from gptcache.benchmark.cli import main
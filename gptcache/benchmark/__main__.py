@@ -0,0 +1,4 @@
+from gptcache.benchmark.cli import main
+
+if __name__ == "__main__":
+    main()
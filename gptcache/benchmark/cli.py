@@ -0,0 +1,85 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from gptcache.benchmark.dataset import load_workload
+from gptcache.benchmark.runner import Benchmark
+
+
+def _print_summary(result):
+    for item in result["results"]:
+        name = f"{item['manager']} | {item['embedding']} | {item['evaluation']}"
+        if "error" in item or "skipped" in item:
+            print(f"{name}: {item.get('error') or 'skipped, ' + item['skipped']}", file=sys.stderr)
+            continue
+        print(
+            f"{name}: {item['throughput']:.1f} req/s, "
+            f"p50 {item['latency']['p50'] * 1000:.2f} ms, p99 {item['latency']['p99'] * 1000:.2f} ms, "
+            f"hit ratio {item['hit_ratio']:.3f}, precision {item['precision']:.3f}, recall {item['recall']:.3f}",
+            file=sys.stderr,
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="gptcache_benchmark",
+        description="Replay a dataset or a trace against the caches with a mock llm, "
+        "and write the results as json.",
+    )
+    parser.add_argument(
+        "dataset",
+        help="the question pairs, like examples/benchmark/similiar_qqp_full.json.gz, or a JSON lines trace",
+    )
+    parser.add_argument("-n", "--limit", type=int, default=None, help="the max number of the queries")
+    parser.add_argument(
+        "-m",
+        "--manager",
+        action="append",
+        help="the data manager, like 'map' or 'sqlite,faiss', it can be repeated, defaults to 'sqlite,faiss'",
+    )
+    parser.add_argument(
+        "-e",
+        "--embedding",
+        action="append",
+        help="the embedding: string, hash, onnx, huggingface, sbert or fasttext, the model can be set like "
+        "'sbert:all-MiniLM-L6-v2', it can be repeated, defaults to 'onnx'",
+    )
+    parser.add_argument(
+        "-v",
+        "--evaluation",
+        action="append",
+        help="the similarity evaluation: distance, exact, numpy, onnx or sbert_crossencoder, "
+        "it can be repeated, defaults to 'distance'",
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="the number of the concurrent requests")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="the latency in seconds of the mock llm")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="the jitter in seconds of the mock llm")
+    parser.add_argument("-t", "--threshold", type=float, default=0.8, help="the similarity threshold")
+    parser.add_argument("-d", "--data-dir", default=None, help="the cache data dir, defaults to a temporary dir")
+    parser.add_argument("--trace-memory", action="store_true", help="measure the peak memory with tracemalloc")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the mock llm")
+    parser.add_argument("-o", "--output", default=None, help="the json file of the results, defaults to stdout")
+    args = parser.parse_args(argv)
+
+    benchmark = Benchmark(
+        load_workload(args.dataset, args.limit),
+        managers=args.manager or ["sqlite,faiss"],
+        embeddings=args.embedding or ["onnx"],
+        evaluations=args.evaluation or ["distance"],
+        concurrency=args.concurrency,
+        llm_latency=args.llm_latency,
+        llm_jitter=args.llm_jitter,
+        similarity_threshold=args.threshold,
+        data_dir=args.data_dir,
+        trace_memory=args.trace_memory,
+        seed=args.seed,
+    )
+    result = benchmark.run()
+    _print_summary(result)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,124 @@
+import gzip
+import json
+import tarfile
+from typing import Any, Dict, List, Optional
+
+
+class Query:
+    """A benchmark request, the queries of the same group are expected to get the same answer.
+
+    :param prompt: the question sent to the cache.
+    :type prompt: str
+    :param group: the equivalence group of the question, a hit is correct if it returns the answer of the group.
+    :type group: str
+    """
+
+    __slots__ = ("prompt", "group")
+
+    def __init__(self, prompt: str, group: str):
+        self.prompt = prompt
+        self.group = group
+
+    def __repr__(self):
+        return f"Query(prompt={self.prompt!r}, group={self.group!r})"
+
+
+class Workload:
+    """The questions imported into the cache before the benchmark, and the queries replayed against it.
+
+    :param name: the name of the workload, it is written to the benchmark result.
+    :type name: str
+    :param warmup: the questions imported into the cache.
+    :type warmup: List[Query]
+    :param queries: the queries replayed against the cache.
+    :type queries: List[Query]
+    """
+
+    def __init__(self, name: str, warmup: List[Query], queries: List[Query]):
+        self.name = name
+        self.warmup = warmup
+        self.queries = queries
+
+    def prompts(self) -> Dict[str, str]:
+        """The group of every prompt, the mock llm answers a prompt with the answer of its group."""
+        groups = {}
+        for query in self.warmup + self.queries:
+            groups.setdefault(query.prompt, query.group)
+        return groups
+
+
+def answer_of(group: str) -> str:
+    return f"answer of {group}"
+
+
+def _read_json(path: str) -> Any:
+    if not path.endswith(".gz"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    # the qqp dataset of the examples is a tar archive of one json file, despite of the suffix
+    if tarfile.is_tarfile(path):
+        with tarfile.open(path, "r:gz") as tar:
+            member = next(m for m in tar.getmembers() if m.isfile())
+            return json.load(tar.extractfile(member))
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_pairs(path: str, limit: Optional[int] = None) -> Workload:
+    """Load a dataset of question pairs, the first questions are imported into the cache and the second ones
+    are the queries.
+
+    It supports the qqp dataset, such as `examples/benchmark/similiar_qqp_full.json.gz`, whose items are
+    `{"text_a": ..., "text_b": ..., "label": 0 or 1}`, a pair is a duplicate if the label is 1,
+    and the mock dataset, such as `examples/benchmark/mock_data.json`, whose items are
+    `{"origin": ..., "similar": ...}`, all the pairs of it are duplicates.
+
+    :param path: the path of the json file, which can be gzipped.
+    :type path: str
+    :param limit: the max number of the pairs, defaults to None, which means all the pairs.
+    :type limit: int
+    """
+    items = _read_json(path)[:limit]
+    warmup, queries = [], []
+    for i, item in enumerate(items):
+        if "text_a" in item:
+            first, second, duplicate = item["text_a"], item["text_b"], int(item.get("label", 1)) == 1
+        else:
+            first, second, duplicate = item["origin"], item["similar"], True
+        warmup.append(Query(first, str(i)))
+        queries.append(Query(second, str(i) if duplicate else f"{i}-negative"))
+    return Workload(path, warmup, queries)
+
+
+def load_trace(path: str, limit: Optional[int] = None) -> Workload:
+    """Load a JSON lines trace of the user requests, which are replayed in order.
+
+    Every line is `{"prompt": ..., "group": ..., "warmup": false}`, the `group` defaults to the prompt,
+    so only the same prompts are equivalent, and the lines whose `warmup` is true are imported into the cache
+    before the replay.
+
+    :param path: the path of the trace.
+    :type path: str
+    :param limit: the max number of the replayed requests, defaults to None, which means all the requests.
+    :type limit: int
+    """
+    warmup, queries = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            query = Query(item["prompt"], str(item.get("group", item["prompt"])))
+            if item.get("warmup", False):
+                warmup.append(query)
+            elif limit is None or len(queries) < limit:
+                queries.append(query)
+    return Workload(path, warmup, queries)
+
+
+def load_workload(path: str, limit: Optional[int] = None) -> Workload:
+    """Load a trace if the path ends with `.jsonl`, otherwise a dataset of question pairs."""
+    if path.endswith(".jsonl"):
+        return load_trace(path, limit)
+    return load_pairs(path, limit)
@@ -0,0 +1,76 @@
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+import numpy as np
+
+from gptcache.benchmark.dataset import answer_of
+from gptcache.embedding.base import BaseEmbedding
+
+
+class MockLLM:
+    """A local llm which sleeps for the configured latency and answers a prompt with the answer of its group,
+    so the benchmark measures the cache instead of a remote service.
+
+    :param groups: the group of every prompt, the unknown prompts are their own groups.
+    :type groups: Dict[str, str]
+    :param latency: the average latency in seconds of a call, defaults to 0.
+    :type latency: float
+    :param jitter: the latency is uniformly drawn in `latency ± jitter`, defaults to 0.
+    :type jitter: float
+    :param seed: the seed of the latency jitter, defaults to None.
+    :type seed: int
+    """
+
+    def __init__(
+        self,
+        groups: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self._groups = groups or {}
+        self._latency = latency
+        self._jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.call_count = 0
+
+    def __call__(self, *_, **kwargs) -> str:
+        with self._lock:
+            self.call_count += 1
+            delay = self._latency
+            if self._jitter:
+                delay += self._random.uniform(-self._jitter, self._jitter)
+        if delay > 0:
+            time.sleep(delay)
+        prompt = kwargs.get("prompt")
+        return answer_of(self._groups.get(prompt, prompt))
+
+
+class HashEmbedding(BaseEmbedding):
+    """A deterministic embedding which hashes the words and the word bigrams of the text, it needs no model,
+    so the backends can be benchmarked without downloading one. The similar questions share most of their words,
+    so they are close to each other, but it doesn't understand the meaning like a real model.
+
+    :param dimension: the dimension of the embedding, defaults to 128.
+    :type dimension: int
+    """
+
+    def __init__(self, dimension: int = 128):
+        self._dimension = dimension
+
+    def to_embeddings(self, data, **_):
+        words = re.findall(r"\w+", str(data).lower())
+        vector = np.zeros(self._dimension, dtype="float32")
+        for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            vector[zlib.crc32(token.encode("utf-8")) % self._dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @property
+    def dimension(self):
+        return self._dimension
@@ -0,0 +1,327 @@
+import atexit
+import itertools
+import platform
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from gptcache import Cache, Config
+from gptcache.adapter.adapter import adapt
+from gptcache.benchmark.dataset import Query, Workload, answer_of
+from gptcache.benchmark.mock import HashEmbedding, MockLLM
+from gptcache.embedding.string import to_embeddings as string_embedding
+from gptcache.manager import manager_factory
+from gptcache.processor.pre import get_prompt
+from gptcache.utils.error import ParamError
+from gptcache.utils.histogram import LatencyHistogram
+from gptcache.utils.log import gptcache_log
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+def _split_name(name: str) -> Tuple[str, Optional[str]]:
+    # the model of the embedding or the evaluation can be set after a colon, like `sbert:all-MiniLM-L6-v2`
+    kind, _, model = name.partition(":")
+    return kind.strip().lower(), model.strip() or None
+
+
+def get_embedding(name: str):
+    """Get the embedding function and its dimension by the name, the dimension of the string embedding is None.
+
+    :param name: 'string', 'hash', 'onnx', 'huggingface', 'sbert' or 'fasttext',
+                 the model can be set after a colon, like 'sbert:all-MiniLM-L6-v2'.
+    :type name: str
+    """
+    kind, model = _split_name(name)
+    if kind == "string":
+        return string_embedding, None
+    if kind == "hash":
+        embedding = HashEmbedding(int(model) if model else 128)
+        return embedding.to_embeddings, embedding.dimension
+
+    from gptcache.embedding import Onnx, Huggingface, SBERT, FastText  # pylint: disable=import-outside-toplevel
+
+    models = {"onnx": Onnx, "huggingface": Huggingface, "sbert": SBERT, "fasttext": FastText}
+    if kind not in models:
+        raise ParamError(f"Unsupported benchmark embedding: {name}")
+    embedding = models[kind](model) if model else models[kind]()
+    return embedding.to_embeddings, embedding.dimension
+
+
+def get_evaluation(name: str):
+    """Get the similarity evaluation by the name.
+
+    :param name: 'distance', 'exact', 'numpy', 'onnx' or 'sbert_crossencoder',
+                 the model can be set after a colon, like 'onnx:GPTCache/albert-duplicate-onnx'.
+    :type name: str
+    """
+    kind, model = _split_name(name)
+    from gptcache import similarity_evaluation  # pylint: disable=import-outside-toplevel
+
+    if kind == "distance":
+        return similarity_evaluation.SearchDistanceEvaluation()
+    if kind == "exact":
+        return similarity_evaluation.ExactMatchEvaluation()
+    if kind == "numpy":
+        return similarity_evaluation.NumpyNormEvaluation(enable_normal=True)
+    if kind == "onnx":
+        return similarity_evaluation.OnnxModelEvaluation(model) if model else similarity_evaluation.OnnxModelEvaluation()
+    if kind == "sbert_crossencoder":
+        return (
+            similarity_evaluation.SbertCrossencoderEvaluation(model)
+            if model
+            else similarity_evaluation.SbertCrossencoderEvaluation()
+        )
+    raise ParamError(f"Unsupported benchmark evaluation: {name}")
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # the max rss is in bytes on macOS and in kilobytes on linux
+    return rss / 1024 / 1024 if platform.system() == "Darwin" else rss / 1024
+
+
+class _Counter:
+    def __init__(self):
+        self.hits = 0
+        self.correct_hits = 0
+        self.expected_hits = 0
+        self.recalled = 0
+
+
+def _update_cache_callback(llm_data, update_cache_func, *args, **kwargs):  # pylint: disable=W0613
+    update_cache_func(llm_data)
+    return llm_data
+
+
+class Benchmark:
+    """Benchmark replays a workload against the caches built from the combinations of the data managers,
+    the embeddings and the similarity evaluations, and measures the throughput, the latency percentiles of
+    the requests and of every stage, the precision and the recall of the hits, and the memory.
+
+    The cache misses are answered by a local :class:`gptcache.benchmark.mock.MockLLM`, and the answers are saved
+    to the cache like a real application does. A hit is correct if it returns the answer of the group of the query,
+    the precision is the ratio of the correct hits to the hits, and the recall is the ratio of the correct hits to
+    the queries whose group is already in the cache when they are sent.
+
+    :param workload: the workload, it can be loaded with :func:`gptcache.benchmark.dataset.load_workload`.
+    :type workload: Workload
+    :param managers: the data managers, like 'map' or 'sqlite,faiss', see :func:`gptcache.manager.manager_factory`.
+    :type managers: List[str]
+    :param embeddings: the embeddings, see :func:`get_embedding`.
+    :type embeddings: List[str]
+    :param evaluations: the similarity evaluations, see :func:`get_evaluation`.
+    :type evaluations: List[str]
+    :param concurrency: the number of the concurrent requests, defaults to 1.
+    :type concurrency: int
+    :param llm_latency: the latency in seconds of the mock llm, defaults to 0.
+    :type llm_latency: float
+    :param llm_jitter: the jitter in seconds of the latency of the mock llm, defaults to 0.
+    :type llm_jitter: float
+    :param similarity_threshold: the similarity threshold of the cache, defaults to 0.8.
+    :type similarity_threshold: float
+    :param data_dir: the directory of the cache files, defaults to None, which means a temporary directory.
+    :type data_dir: str
+    :param trace_memory: measure the peak of the memory traced by tracemalloc, which slows down the benchmark,
+                         defaults to False.
+    :type trace_memory: bool
+    :param seed: the seed of the mock llm, defaults to 0.
+    :type seed: int
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.benchmark import Benchmark, load_workload
+
+            workload = load_workload("examples/benchmark/mock_data.json")
+            benchmark = Benchmark(workload, managers=["sqlite,faiss"], embeddings=["onnx"], evaluations=["distance"])
+            result = benchmark.run()
+    """
+
+    def __init__(
+        self,
+        workload: Workload,
+        managers: List[str],
+        embeddings: List[str],
+        evaluations: List[str],
+        concurrency: int = 1,
+        llm_latency: float = 0.0,
+        llm_jitter: float = 0.0,
+        similarity_threshold: float = 0.8,
+        data_dir: Optional[str] = None,
+        trace_memory: bool = False,
+        seed: int = 0,
+    ):
+        if concurrency < 1:
+            raise ParamError(f"Invalid concurrency: {concurrency}, it must be positive")
+        self.workload = workload
+        self.managers = managers
+        self.embeddings = embeddings
+        self.evaluations = evaluations
+        self.concurrency = concurrency
+        self.llm_latency = llm_latency
+        self.llm_jitter = llm_jitter
+        self.similarity_threshold = similarity_threshold
+        self.data_dir = data_dir
+        self.trace_memory = trace_memory
+        self.seed = seed
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "workload": self.workload.name,
+            "warmup_size": len(self.workload.warmup),
+            "query_size": len(self.workload.queries),
+            "managers": self.managers,
+            "embeddings": self.embeddings,
+            "evaluations": self.evaluations,
+            "concurrency": self.concurrency,
+            "llm_latency": self.llm_latency,
+            "llm_jitter": self.llm_jitter,
+            "similarity_threshold": self.similarity_threshold,
+            "seed": self.seed,
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """Run all the combinations, and return the config and the results, which can be dumped as json."""
+        data_dir = self.data_dir
+        if data_dir is None:
+            data_dir = tempfile.mkdtemp(prefix="gptcache-benchmark-")
+            # the caches are closed at exit too, so the directory is removed after them
+            atexit.register(shutil.rmtree, data_dir, True)
+        results = []
+        combinations = itertools.product(self.managers, self.embeddings, self.evaluations)
+        for i, (manager, embedding, evaluation) in enumerate(combinations):
+            result = {"manager": manager, "embedding": embedding, "evaluation": evaluation}
+            # the map manager uses the embedding as the key, and the vector stores need a vector
+            if (manager.strip().lower() in ("map", "compact_map")) != (_split_name(embedding)[0] == "string"):
+                result["skipped"] = f"the embedding {embedding} doesn't work with the data manager {manager}"
+                results.append(result)
+                continue
+            gptcache_log.info("benchmark %s, %s, %s", manager, embedding, evaluation)
+            try:
+                result.update(self.run_one(manager, embedding, evaluation, f"{data_dir}/run-{i}"))
+            except Exception as e:  # pylint: disable=W0703
+                gptcache_log.error("benchmark %s, %s, %s failed", manager, embedding, evaluation, exc_info=True)
+                result["error"] = f"{type(e).__name__}: {e}"
+            results.append(result)
+        return {"config": self.config(), "results": results}
+
+    def _build_cache(self, manager: str, embedding: str, evaluation: str, data_dir: str) -> Cache:
+        embedding_func, dimension = get_embedding(embedding)
+        # no question is evicted, so the hits only depend on the similarity
+        max_size = len(self.workload.warmup) + len(self.workload.queries) + 1
+        data_manager = manager_factory(
+            manager,
+            data_dir=data_dir,
+            max_size=max_size,
+            vector_params={"dimension": dimension} if dimension else None,
+            eviction_params={"max_size": max_size},
+        )
+        cache_obj = Cache()
+        cache_obj.init(
+            pre_embedding_func=get_prompt,
+            embedding_func=embedding_func,
+            data_manager=data_manager,
+            similarity_evaluation=get_evaluation(evaluation),
+            config=Config(similarity_threshold=self.similarity_threshold),
+        )
+        return cache_obj
+
+    def run_one(self, manager: str, embedding: str, evaluation: str, data_dir: str) -> Dict[str, Any]:
+        """Benchmark one combination of the data manager, the embedding and the similarity evaluation."""
+        if self.trace_memory:
+            tracemalloc.start()
+        try:
+            cache_obj = self._build_cache(manager, embedding, evaluation, data_dir)
+            try:
+                return self._replay(cache_obj)
+            finally:
+                cache_obj.data_manager.close()
+        finally:
+            if self.trace_memory:
+                tracemalloc.stop()
+
+    def _replay(self, cache_obj: Cache) -> Dict[str, Any]:
+        workload = self.workload
+        start = time.perf_counter()
+        if workload.warmup:
+            cache_obj.import_data(
+                questions=[query.prompt for query in workload.warmup],
+                answers=[answer_of(query.group) for query in workload.warmup],
+            )
+        warmup_time = time.perf_counter() - start
+
+        llm = MockLLM(workload.prompts(), self.llm_latency, self.llm_jitter, self.seed)
+        cached_groups = {query.group for query in workload.warmup}
+        expected = []
+        for query in workload.queries:
+            # with the concurrency, a group may not be saved yet when the next query of it is sent,
+            # the recall is computed in the order of the replay
+            expected.append(query.group in cached_groups)
+            cached_groups.add(query.group)
+
+        latency = LatencyHistogram()
+        counter = _Counter()
+
+        def send(args: Tuple[Query, bool]):
+            query, expect_hit = args
+            calls = []
+
+            def llm_handler(*llm_args, **llm_kwargs):
+                calls.append(1)
+                return llm(*llm_args, **llm_kwargs)
+
+            begin = time.perf_counter()
+            answer = adapt(
+                llm_handler,
+                lambda data: data,
+                _update_cache_callback,
+                prompt=query.prompt,
+                cache_obj=cache_obj,
+            )
+            latency.record(time.perf_counter() - begin)
+            hit = not calls
+            correct = hit and answer == answer_of(query.group)
+            return hit, correct, expect_hit
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for hit, correct, expect_hit in executor.map(send, zip(workload.queries, expected)):
+                counter.hits += hit
+                counter.correct_hits += correct
+                counter.expected_hits += expect_hit
+                counter.recalled += correct and expect_hit
+        elapsed = time.perf_counter() - start
+
+        requests = len(workload.queries)
+        memory = {"max_rss_mb": _max_rss_mb()}
+        if self.trace_memory:
+            memory["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        stages = {
+            stage: summary
+            for stage, summary in cache_obj.report.latency_summary().items()
+            if summary["count"]
+        }
+        return {
+            "requests": requests,
+            "warmup_time": warmup_time,
+            "elapsed": elapsed,
+            "throughput": requests / elapsed if elapsed else 0.0,
+            "latency": latency.percentiles(),
+            "stages": stages,
+            "hits": counter.hits,
+            "hit_ratio": counter.hits / requests if requests else 0.0,
+            "precision": counter.correct_hits / counter.hits if counter.hits else 0.0,
+            "recall": counter.recalled / counter.expected_hits if counter.expected_hits else 0.0,
+            "llm_calls": llm.call_count,
+            "miss_reasons": dict(cache_obj.report.miss_cache_count),
+            "memory": memory,
+        }
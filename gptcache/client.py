@@ -1,7 +1,6 @@
-import asyncio
-import json
+from typing import Any, List, Optional
 
-from gptcache.utils import import_httpx
+from gptcache.utils import import_httpx, import_h2
 
 import_httpx()
 
@@ -14,8 +13,20 @@ _CLIENT_HEADER = {"Content-Type": "application/json", "Accept": "application/jso
 class Client:
     """GPTCache client to send requests to GPTCache server.
 
+    The client keeps a pool of keep-alive connections, so the requests don't pay the connection setup.
+    The sync methods share a `httpx.Client`, and the async ones share a `httpx.AsyncClient`,
+    which are created on the first use, call `close` or `aclose` to release the connections.
+
     :param uri: the uri leads to the server, defaults to "http://localhost:8000".
     :type uri: str
+    :param http2: use HTTP/2 if the server supports it, which needs the `h2` package, defaults to False.
+    :type http2: bool
+    :param timeout: the timeout in seconds of the requests, defaults to 10.
+    :type timeout: float
+    :param max_connections: the max number of the connections of the pool, defaults to 100.
+    :type max_connections: int
+    :param max_keepalive_connections: the max number of the idle connections kept alive, defaults to 20.
+    :type max_keepalive_connections: int
 
     Example:
         .. code-block:: python
@@ -25,35 +36,47 @@ class Client:
             client = Client(uri="http://localhost:8000")
             client.put("Hi", "Hi back")
             ans = client.get("Hi")
+            answers = client.get_batch(["Hi", "Hello"])
+
+            # in a coroutine
+            ans = await client.aget("Hi")
     """
 
-    def __init__(self, uri: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        uri: str = "http://localhost:8000",
+        http2: bool = False,
+        timeout: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+    ):
+        if http2:
+            import_h2()
         self._uri = uri
-
-    async def _put(self, question: str, answer: str):
-        async with httpx.AsyncClient() as client:
-            data = {
-                "prompt": question,
-                "answer": answer,
-            }
-
-            response = await client.post(
-                f"{self._uri}/put", headers=_CLIENT_HEADER, data=json.dumps(data)
-            )
-
-        return response.status_code
-
-    async def _get(self, question: str):
-        async with httpx.AsyncClient() as client:
-            data = {
-                "prompt": question,
-            }
-
-            response = await client.post(
-                f"{self._uri}/get", headers=_CLIENT_HEADER, data=json.dumps(data)
-            )
-
-        return response.json().get("answer")
+        self._client_kwargs = {
+            "base_url": uri,
+            "headers": _CLIENT_HEADER,
+            "http2": http2,
+            "timeout": timeout,
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+        }
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(**self._client_kwargs)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_kwargs)
+        return self._async_client
 
     def put(self, question: str, answer: str):
         """
@@ -63,7 +86,8 @@ class Client:
         :type answer: str
         :return: status code.
         """
-        return asyncio.run(self._put(question, answer))
+        response = self.client.post("/put", json={"prompt": question, "answer": answer})
+        return response.status_code
 
     def get(self, question: str):
         """
@@ -71,4 +95,67 @@ class Client:
         :type question: str
         :return: answer to the question.
         """
-        return asyncio.run(self._get(question))
+        response = self.client.post("/get", json={"prompt": question})
+        return response.json().get("answer")
+
+    def put_batch(self, questions: List[str], answers: List[str]):
+        """
+        :param questions: the questions to be put.
+        :type questions: List[str]
+        :param answers: the answers to the questions to be put.
+        :type answers: List[str]
+        :return: status code.
+        """
+        response = self.client.post("/put_batch", json={"prompts": questions, "answers": answers})
+        return response.status_code
+
+    def get_batch(self, questions: List[str]) -> List[Any]:
+        """
+        :param questions: the questions to get the answers.
+        :type questions: List[str]
+        :return: the answers to the questions, None for the misses.
+        """
+        response = self.client.post("/get_batch", json={"prompts": questions})
+        return response.json().get("answers")
+
+    async def aput(self, question: str, answer: str):
+        response = await self.async_client.post("/put", json={"prompt": question, "answer": answer})
+        return response.status_code
+
+    async def aget(self, question: str):
+        response = await self.async_client.post("/get", json={"prompt": question})
+        return response.json().get("answer")
+
+    async def aput_batch(self, questions: List[str], answers: List[str]):
+        response = await self.async_client.post(
+            "/put_batch", json={"prompts": questions, "answers": answers}
+        )
+        return response.status_code
+
+    async def aget_batch(self, questions: List[str]) -> List[Any]:
+        response = await self.async_client.post("/get_batch", json={"prompts": questions})
+        return response.json().get("answers")
+
+    def close(self):
+        """Close the connections of the sync methods."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        """Close the connections of the async methods."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.aclose()
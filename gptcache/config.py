@@ -25,6 +25,15 @@ class Config:
     :type skip_list: Optional[List[str]]
     :param context_len: optional, the length of context.
     :type context_len: Optional[int]
+    :param enable_tracing: create opentelemetry spans for the stages of the cache, default to False.
+     The spans are exported by the tracer provider configured with the opentelemetry sdk.
+    :type enable_tracing: bool
+    :param profile_sample_rate: optional, enable the profiler of the cache with the fraction of the requests to
+     profile, see :class:`gptcache.profiler.Profiler`.
+    :type profile_sample_rate: Optional[float]
+    :param stream_chunk_size: optional, the number of characters of every content chunk when a cached answer is
+     returned as a stream, defaults to None, which returns the whole answer in a single content chunk.
+    :type stream_chunk_size: Optional[int]
 
     Example:
         .. code-block:: python
@@ -47,6 +56,9 @@ class Config:
             skip_list: List[str] = None,
             data_check: bool = False,
             disable_report: bool = False,
+            enable_tracing: bool = False,
+            profile_sample_rate: Optional[float] = None,
+            stream_chunk_size: Optional[int] = None,
     ):
         if similarity_threshold < 0 or similarity_threshold > 1:
             raise CacheError(
@@ -65,3 +77,8 @@ class Config:
         self.skip_list = skip_list
         self.data_check = data_check
         self.disable_report = disable_report
+        self.enable_tracing = enable_tracing
+        self.profile_sample_rate = profile_sample_rate
+        if stream_chunk_size is not None and stream_chunk_size <= 0:
+            raise CacheError("Invalid the stream chunk size param, it should be a positive integer")
+        self.stream_chunk_size = stream_chunk_size
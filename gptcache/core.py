@@ -1,20 +1,33 @@
 import atexit
 import os
-from typing import Optional, List, Any
+from typing import TYPE_CHECKING, Optional, List, Any
 
 from gptcache.config import Config
 from gptcache.embedding.string import to_embeddings as string_embedding
-from gptcache.manager import get_data_manager
-from gptcache.manager.data_manager import DataManager
 from gptcache.processor.post import temperature_softmax
 from gptcache.processor.pre import last_content
+from gptcache.profiler import Profiler
 from gptcache.report import Report
-from gptcache.similarity_evaluation import ExactMatchEvaluation
-from gptcache.similarity_evaluation import SimilarityEvaluation
 from gptcache.utils import import_openai
 from gptcache.utils.cache_func import cache_all
 from gptcache.utils.log import gptcache_log
 
+if TYPE_CHECKING:
+    from gptcache.manager.data_manager import DataManager
+    from gptcache.similarity_evaluation import SimilarityEvaluation
+
+# the data manager of the caches initialized without one, it is created by the first of them
+_default_data_manager: Optional["DataManager"] = None
+
+
+def _get_default_data_manager() -> "DataManager":
+    global _default_data_manager  # pylint: disable=W0603
+    if _default_data_manager is None:
+        from gptcache.manager import get_data_manager  # pylint: disable=C0415
+
+        _default_data_manager = get_data_manager()
+    return _default_data_manager
+
 
 class Cache:
     """GPTCache core object.
@@ -36,11 +49,12 @@ class Cache:
         self.cache_enable_func = None
         self.pre_embedding_func = None
         self.embedding_func = None
-        self.data_manager: Optional[DataManager] = None
-        self.similarity_evaluation: Optional[SimilarityEvaluation] = None
+        self.data_manager: Optional["DataManager"] = None
+        self.similarity_evaluation: Optional["SimilarityEvaluation"] = None
         self.post_process_messages_func = None
         self.config = Config()
         self.report = Report()
+        self.profiler = Profiler()
         self.next_cache = None
 
     def init(
@@ -49,11 +63,11 @@ class Cache:
         pre_embedding_func=last_content,
         pre_func=None,
         embedding_func=string_embedding,
-        data_manager: DataManager = get_data_manager(),
-        similarity_evaluation=ExactMatchEvaluation(),
+        data_manager: Optional["DataManager"] = None,
+        similarity_evaluation: Optional["SimilarityEvaluation"] = None,
         post_process_messages_func=temperature_softmax,
         post_func=None,
-        config=Config(),
+        config: Optional[Config] = None,
         next_cache=None,
     ):
         """Pass parameters to initialize GPTCache.
@@ -62,22 +76,34 @@ class Cache:
         :param pre_embedding_func: a function to preprocess embedding, defaults to ``last_content``
         :param pre_func: a function to preprocess embedding, same as ``pre_embedding_func``
         :param embedding_func: a function to extract embeddings from requests for similarity search, defaults to ``string_embedding``
-        :param data_manager: a ``DataManager`` module, defaults to ``get_data_manager()``
+        :param data_manager: a ``DataManager`` module, defaults to ``get_data_manager()``, which is created on the first
+                             call and shared by the caches without a data manager
         :param similarity_evaluation: a module to calculate embedding similarity, defaults to ``ExactMatchEvaluation()``
         :param post_process_messages_func: a function to post-process messages, defaults to ``temperature_softmax`` with a default temperature of 0.0
         :param post_func: a function to post-process messages, same as ``post_process_messages_func``
         :param config: a module to pass configurations, defaults to ``Config()``
         :param next_cache: customized method for next cache
         """
+        # the default modules are imported when they are used, so a custom stack doesn't load them
+        if data_manager is None:
+            data_manager = _get_default_data_manager()
+        if similarity_evaluation is None:
+            from gptcache.similarity_evaluation import ExactMatchEvaluation  # pylint: disable=C0415
+
+            similarity_evaluation = ExactMatchEvaluation()
+        if config is None:
+            config = Config()
         self.has_init = True
         self.cache_enable_func = cache_enable_func
         self.pre_embedding_func = pre_func if pre_func else pre_embedding_func
         self.embedding_func = embedding_func
-        self.data_manager: DataManager = data_manager
+        self.data_manager = data_manager
         self.similarity_evaluation = similarity_evaluation
         self.post_process_messages_func = post_func if post_func else post_process_messages_func
         self.config = config
         self.next_cache = next_cache
+        if config.profile_sample_rate:
+            self.profiler.enable(sample_rate=config.profile_sample_rate)
 
         @atexit.register
         def close():
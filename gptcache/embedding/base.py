@@ -1,4 +1,5 @@
 from abc import ABCMeta, abstractmethod
+from typing import Sequence
 
 
 class BaseEmbedding(metaclass=ABCMeta):
@@ -10,6 +11,22 @@ class BaseEmbedding(metaclass=ABCMeta):
     def to_embeddings(self, data, **kwargs):
         pass
 
+    def batch_to_embeddings(self, datas, **kwargs):
+        """Generate the embeddings of a list of data, the models which can infer a batch at once override it."""
+        return [self.to_embeddings(data, **kwargs) for data in datas]
+
+    def warmup(self, lengths: Sequence[int], iterations: int):
+        """Run the dummy inferences of the model, see :class:`gptcache.warmup.ModelWarmup`.
+        It does nothing by default, the local models override it, and the remote apis aren't called.
+        """
+
+    def _warmup_texts(self, lengths: Sequence[int], iterations: int):
+        from gptcache.warmup import warmup_text  # pylint: disable=C0415
+
+        for _ in range(iterations):
+            for length in lengths:
+                self.to_embeddings(warmup_text(length))
+
     @property
     @abstractmethod
     def dimension(self) -> int:
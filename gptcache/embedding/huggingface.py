@@ -72,6 +72,9 @@ class Huggingface(BaseEmbedding):
         ) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
         return sentence_embs
 
+    def warmup(self, lengths, iterations):
+        self._warmup_texts(lengths, iterations)
+
     @property
     def dimension(self):
         """Embedding dimension.
@@ -1,3 +1,5 @@
+import os
+
 import numpy as np
 
 from gptcache.embedding.base import BaseEmbedding
@@ -19,6 +21,11 @@ import onnxruntime  # pylint: disable=C0413
 class Onnx(BaseEmbedding):
     """Generate text embedding for given text using ONNX Model.
 
+    :param model: the repo id of the model on the Hugging Face hub, or a local directory with the `model.onnx`,
+                  the tokenizer and the config of the model, which is loaded offline,
+                  defaults to 'GPTCache/paraphrase-albert-onnx'.
+    :type model: str
+
     Example:
         .. code-block:: python
 
@@ -31,13 +38,15 @@ class Onnx(BaseEmbedding):
 
     def __init__(self, model="GPTCache/paraphrase-albert-onnx"):
         tokenizer_name = "GPTCache/paraphrase-albert-small-v2"
+        if os.path.isdir(model):
+            tokenizer_name = model
+            onnx_model_path = os.path.join(model, "model.onnx")
+        else:
+            onnx_model_path = hf_hub_download(repo_id=model, filename="model.onnx")
         self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
         self.model = model
-        onnx_model_path = hf_hub_download(repo_id=model, filename="model.onnx")
         self.ort_session = onnxruntime.InferenceSession(onnx_model_path)
-        config = AutoConfig.from_pretrained(
-            "GPTCache/paraphrase-albert-small-v2"
-        )
+        config = AutoConfig.from_pretrained(tokenizer_name)
         self.__dimension = config.hidden_size
 
     def to_embeddings(self, data, **_):
@@ -48,19 +57,33 @@ class Onnx(BaseEmbedding):
 
         :return: a text embedding in shape of (dim,).
         """
-        encoded_text = self.tokenizer.encode_plus(data, padding="max_length")
-
-        ort_inputs = {
-            "input_ids": np.array(encoded_text["input_ids"]).astype("int64").reshape(1, -1),
-            "attention_mask": np.array(encoded_text["attention_mask"]).astype("int64").reshape(1, -1),
-            "token_type_ids": np.array(encoded_text["token_type_ids"]).astype("int64").reshape(1, -1),
-        }
-
+        ort_inputs = self._tokenize([data])
         ort_outputs = self.ort_session.run(None, ort_inputs)
         ort_feat = ort_outputs[0]
         emb = self.post_proc(ort_feat, ort_inputs["attention_mask"])
         return emb.flatten()
 
+    def batch_to_embeddings(self, datas, **_):
+        """Generate the embeddings of a list of texts with one inference.
+
+        :param datas: the list of texts.
+        :type datas: List[str]
+
+        :return: a list of text embeddings in shape of (dim,).
+        """
+        ort_inputs = self._tokenize(list(datas))
+        ort_outputs = self.ort_session.run(None, ort_inputs)
+        embs = self.post_proc(ort_outputs[0], ort_inputs["attention_mask"])
+        return list(embs)
+
+    def _tokenize(self, datas):
+        # the single and the batch embeddings tokenize the same way, so a text has the same embedding in both
+        encoded_texts = self.tokenizer(datas, padding="max_length", truncation=True)
+        return {
+            name: np.array(encoded_texts[name]).astype("int64")
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+        }
+
     def post_proc(self, token_embeddings, attention_mask):
         input_mask_expanded = (
             np.expand_dims(attention_mask, -1)
@@ -72,6 +95,9 @@ class Onnx(BaseEmbedding):
         )
         return sentence_embs
 
+    def warmup(self, lengths, iterations):
+        self._warmup_texts(lengths, iterations)
+
     @property
     def dimension(self):
         """Embedding dimension.
@@ -44,6 +44,22 @@ class SBERT(BaseEmbedding):
             self.__dimension = len(emb)
         return np.array(emb).astype("float32")
 
+    def batch_to_embeddings(self, datas, **_):
+        """Generate the embeddings of a list of texts with one inference.
+
+        :param datas: the list of texts.
+        :type datas: List[str]
+
+        :return: a list of text embeddings in shape of (dim,).
+        """
+        embs = np.array(self.model.encode(list(datas))).astype("float32")
+        if not self.__dimension and len(embs):
+            self.__dimension = embs.shape[1]
+        return list(embs)
+
+    def warmup(self, lengths, iterations):
+        self._warmup_texts(lengths, iterations)
+
     @property
     def dimension(self):
         """Embedding dimension.
@@ -0,0 +1,161 @@
+import base64
+import json
+import os
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from gptcache.manager.scalar_data.base import Answer
+from gptcache.utils.error import CacheError
+from gptcache.utils.log import gptcache_log
+
+# the first line of the log, the version is increased when the records change
+_HEADER = {"gptcache_map_log": 1}
+_PICKLE_PROTOCOL_PREFIX = b"\x80"
+
+
+def encode_value(value: Any) -> Any:
+    """Encode the value of the map as json, the types which json doesn't have are tagged by a dict."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Answer):
+        return {"answer": [encode_value(value.answer), int(value.answer_type)]}
+    if isinstance(value, (bytes, bytearray)):
+        return {"bytes": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, tuple):
+        return {"tuple": [encode_value(v) for v in value]}
+    if isinstance(value, list):
+        return [encode_value(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {"set": [encode_value(v) for v in value]}
+    if isinstance(value, dict):
+        return {"dict": [[encode_value(k), encode_value(v)] for k, v in value.items()]}
+    raise CacheError(f"the map data manager can't persist the value of the type {type(value).__name__}")
+
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    (tag, data), = value.items()
+    if tag == "answer":
+        return Answer(decode_value(data[0]), data[1])
+    if tag == "bytes":
+        return base64.b64decode(data)
+    if tag == "tuple":
+        return tuple(decode_value(v) for v in data)
+    if tag == "set":
+        return {decode_value(v) for v in data}
+    if tag == "dict":
+        return {decode_value(k): decode_value(v) for k, v in data}
+    raise CacheError(f"unknown tag {tag} of the map log")
+
+
+class AppendLog:
+    """AppendLog persists a map as an append-only log of json lines, a record sets or deletes a key,
+    so a flush writes the changes only. The log is compacted to the live items when it has more than
+    `compact_ratio` times as many records as the live items, and the old pickle file of the map is converted
+    to the log on the first load.
+
+    :param path: the path of the log.
+    :type path: str
+    :param compact_ratio: the ratio of the records to the live items which compacts the log, defaults to 2.
+    :type compact_ratio: float
+    :param compact_min_records: the min number of the records which compacts the log, defaults to 1024.
+    :type compact_min_records: int
+    """
+
+    def __init__(self, path: str, compact_ratio: float = 2.0, compact_min_records: int = 1024):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min_records = compact_min_records
+        self.records = 0
+
+    def load(self) -> Iterator[Tuple[str, Any, Optional[List[Any]]]]:
+        """Scan the log, and return the records, ('set', key, values) or ('delete', key, None)."""
+        self.records = 0
+        try:
+            f = open(self.path, "rb")  # pylint: disable=R1732
+        except FileNotFoundError:
+            return
+        cut_at = None
+        with f:
+            if f.peek(1)[:1] == _PICKLE_PROTOCOL_PREFIX:
+                yield from self._load_pickle(f)
+                return
+            header = f.readline()
+            if not header:
+                return
+            if json.loads(header) != _HEADER:
+                raise CacheError(f"the file <{self.path}> isn't a map log of gptcache")
+            end = len(header)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("the record isn't complete")
+                    record = json.loads(line)
+                except ValueError:
+                    # the last record may be cut by a crash in the middle of a write
+                    cut_at = end
+                    break
+                end += len(line)
+                self.records += 1
+                if record[0] == "s":
+                    yield "set", decode_value(record[1]), [decode_value(v) for v in record[2:]]
+                else:
+                    yield "delete", decode_value(record[1]), None
+        if cut_at is not None:
+            gptcache_log.warning("the map log <%s> has a broken record, it is cut at %d", self.path, cut_at)
+            os.truncate(self.path, cut_at)
+
+    def _load_pickle(self, f):
+        import pickle  # pylint: disable=C0415
+
+        # the map of the older versions, it is written to the log by the next compaction
+        data = pickle.load(f)
+        self.records = float("inf")
+        for key, value in data.items():
+            yield "set", key, list(value)
+
+    def should_compact(self, live_items: int) -> bool:
+        return self.records > max(self.compact_min_records, self.compact_ratio * live_items)
+
+    def append(self, records: Iterable[Tuple[str, Any, Optional[List[Any]]]]):
+        """Append the records, ('set', key, values) or ('delete', key, None), to the log."""
+        lines = _encode_records(records)
+        if not lines:
+            return
+        if self.records == 0 and not os.path.isfile(self.path):
+            self.rewrite([])
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+        self.records += len(lines)
+
+    def rewrite(self, items: Iterable[Tuple[Any, List[Any]]]):
+        """Write the live items to a new log, which replaces the old one."""
+        tmp_path = f"{self.path}.tmp"
+        records = 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(_HEADER) + "\n")
+            for line in _encode_records(("set", key, values) for key, values in items):
+                f.write(line)
+                records += 1
+        os.replace(tmp_path, self.path)
+        self.records = records
+
+
+def _encode_record(op: str, key: Any, values: Optional[List[Any]]) -> str:
+    if op == "set":
+        record = ["s", encode_value(key)] + [encode_value(v) for v in values]
+    else:
+        record = ["d", encode_value(key)]
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def _encode_records(records) -> List[str]:
+    lines = []
+    for op, key, values in records:
+        try:
+            lines.append(_encode_record(op, key, values))
+        except CacheError as e:
+            gptcache_log.error("%s, the key %r isn't persisted", e, key)
+    return lines
@@ -0,0 +1,299 @@
+import os
+import threading
+import time
+from typing import Any, List, Optional
+
+import numpy as np
+import requests
+
+from gptcache.manager.data_manager import DataManager
+from gptcache.manager.scalar_data.base import CacheData
+from gptcache.manager.snapshot import Snapshot, _import_rows, _load_question, _question_content, read_snapshot
+from gptcache.utils import import_boto3
+from gptcache.utils.log import gptcache_log
+
+# the number of the mapped vectors converted to float32 at once by the search
+_SEARCH_CHUNK = 65536
+
+
+class _SnapshotResult(tuple):
+    """The search result of the snapshot, (distance, position of the row in the snapshot)."""
+
+
+class BootstrapDataManager(DataManager):
+    """BootstrapDataManager serves a cache from a mapped snapshot while a background thread imports the snapshot
+    to the stores of the data manager, so a new server is ready as soon as the snapshot is mapped,
+    instead of after the whole import.
+
+    Before the import finishes, the searches scan the mapped vectors of the snapshot besides the stores,
+    and the rows of the snapshot are decoded on the first read. The writes go to the data manager.
+    Once the import finishes, the data manager serves the cache alone, and the results of the snapshot
+    which are still in use are mapped to the new ids.
+
+    :param snapshot: the snapshot read by :func:`gptcache.manager.snapshot.read_snapshot`.
+    :type snapshot: Snapshot
+    :param data_manager: the data manager which the snapshot is imported to, it should be empty.
+    :type data_manager: DataManager
+    :param top_k: the number of the results of the snapshot search without a `top_k` param, defaults to 1,
+                  which is the `top_k` of the default vector stores.
+    :type top_k: int
+    :param batch_size: the number of the data imported at once, defaults to 1000.
+    :type batch_size: int
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import manager_factory
+            from gptcache.manager.bootstrap import BootstrapDataManager
+            from gptcache.manager.snapshot import read_snapshot
+
+            data_manager = manager_factory("sqlite,faiss", data_dir="gptcache_data", vector_params={"dimension": 768})
+            data_manager = BootstrapDataManager(read_snapshot("gptcache.snapshot"), data_manager)
+    """
+
+    def __init__(self, snapshot: Snapshot, data_manager: DataManager, top_k: int = 1, batch_size: int = 1000):
+        self._snapshot = snapshot
+        self._data_manager = data_manager
+        self._top_k = top_k
+        self._batch_size = batch_size
+        self._vectors = snapshot.vectors
+        self._lock = threading.Lock()
+        self._new_ids: Optional[List[Any]] = None
+        self._imported = False
+        self._pending_sessions = []
+        self._hydrated = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._hydrate, name="gptcache-bootstrap", daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, name):
+        # the attributes of the stores, such as `s` and `v`, are the ones of the data manager
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._data_manager, name)
+
+    @property
+    def hydrated(self) -> bool:
+        return self._hydrated.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the import of the snapshot, and return whether it succeeded."""
+        self._done.wait(timeout)
+        return self._hydrated.is_set()
+
+    def _hydrate(self):
+        start_time = time.time()
+        try:
+            new_ids = _import_rows(self._data_manager, self._snapshot, self._batch_size)
+            self._data_manager.flush()
+        except Exception:  # pylint: disable=W0703
+            gptcache_log.error("failed to import the snapshot, the cache keeps serving it", exc_info=True)
+            self._done.set()
+            return
+        with self._lock:
+            self._new_ids = new_ids
+            self._imported = True
+            pending, self._pending_sessions = self._pending_sessions, []
+        for position, session_id, pre_embedding_data in pending:
+            self.add_session(_SnapshotResult((0.0, position)), session_id, pre_embedding_data)
+        self._hydrated.set()
+        self._done.set()
+        gptcache_log.info(
+            "imported %d data of the snapshot in %.2fs", self._snapshot.count, time.time() - start_time
+        )
+
+    def _new_id(self, res_data) -> Optional[Any]:
+        if self._new_ids is None:
+            return None
+        return self._new_ids[res_data[1]]
+
+    def _search_snapshot(self, embedding_data, top_k: int) -> List[_SnapshotResult]:
+        count = len(self._vectors)
+        if count == 0:
+            return []
+        query = np.asarray(embedding_data, dtype="float32").reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        distances, positions = [], []
+        for start in range(0, count, _SEARCH_CHUNK):
+            chunk = np.asarray(self._vectors[start : start + _SEARCH_CHUNK], dtype="float32")
+            # the squared l2 distance, like the default vector stores
+            dist = (chunk * chunk).sum(axis=1) - 2 * chunk.dot(query) + query.dot(query)
+            best = np.argpartition(dist, top_k)[:top_k] if len(dist) > top_k else np.arange(len(dist))
+            distances.append(dist[best])
+            positions.append(best + start)
+        distances, positions = np.concatenate(distances), np.concatenate(positions)
+        order = np.argsort(distances)[:top_k]
+        return [_SnapshotResult((float(distances[i]), int(positions[i]))) for i in order]
+
+    def search(self, embedding_data, **kwargs):
+        if self._hydrated.is_set():
+            return self._data_manager.search(embedding_data, **kwargs)
+        top_k = kwargs.get("top_k", -1)
+        top_k = top_k if top_k > 0 else self._top_k
+        results = list(self._data_manager.search(embedding_data, **kwargs) or [])
+        results.extend(self._search_snapshot(embedding_data, top_k))
+        results.sort(key=lambda res: res[0])
+        return results[:top_k]
+
+    def batch_search(self, embedding_datas, **kwargs):
+        if self._hydrated.is_set():
+            return self._data_manager.batch_search(embedding_datas, **kwargs)
+        return [self.search(embedding_data, **kwargs) for embedding_data in embedding_datas]
+
+    def get_scalar_data(self, res_data, **kwargs) -> Optional[CacheData]:
+        if not isinstance(res_data, _SnapshotResult):
+            return self._data_manager.get_scalar_data(res_data, **kwargs)
+        new_id = self._new_id(res_data)
+        if new_id is not None:
+            return self._data_manager.get_scalar_data((res_data[0], new_id), **kwargs)
+        row = self._snapshot.rows()[res_data[1]]
+        cache_data = CacheData(question=_load_question(row["question"]), answers=self._snapshot.answers(row))
+        session = kwargs.get("session", None)
+        if session and not session.check_hit_func(
+            session.name,
+            row["sessions"],
+            [_question_content(cache_data.question)] * len(row["sessions"]),
+            cache_data.answers[0].answer,
+        ):
+            return None
+        return cache_data
+
+    def hit_cache_callback(self, res_data, **kwargs):
+        if not isinstance(res_data, _SnapshotResult):
+            self._data_manager.hit_cache_callback(res_data, **kwargs)
+            return
+        new_id = self._new_id(res_data)
+        if new_id is not None:
+            self._data_manager.hit_cache_callback((res_data[0], new_id), **kwargs)
+
+    def save(self, question, answer, embedding_data, **kwargs):
+        self._data_manager.save(question, answer, embedding_data, **kwargs)
+
+    def import_data(self, questions, answers, embedding_datas, session_ids):
+        return self._data_manager.import_data(questions, answers, embedding_datas, session_ids)
+
+    def flush(self):
+        self._data_manager.flush()
+
+    def add_session(self, res_data, session_id, pre_embedding_data):
+        if not isinstance(res_data, _SnapshotResult):
+            self._data_manager.add_session(res_data, session_id, pre_embedding_data)
+            return
+        with self._lock:
+            if not self._imported:
+                # the session is added once the data is imported
+                self._pending_sessions.append((res_data[1], session_id, pre_embedding_data))
+                return
+        new_id = self._new_id(res_data)
+        if new_id is None:
+            gptcache_log.warning("the data manager doesn't return the new ids, the session %s is dropped", session_id)
+            return
+        self._data_manager.add_session((res_data[0], new_id), session_id, pre_embedding_data)
+
+    def list_sessions(self, session_id=None, key=None):
+        return self._data_manager.list_sessions(session_id, key)
+
+    def delete_session(self, session_id):
+        self._data_manager.delete_session(session_id)
+
+    def expire_sessions(self, max_idle: float) -> List[str]:
+        return self._data_manager.expire_sessions(max_idle)
+
+    def report_cache(
+        self,
+        user_question,
+        cache_question,
+        cache_question_id,
+        cache_answer,
+        similarity_value,
+        cache_delta_time,
+    ):
+        self._data_manager.report_cache(
+            user_question,
+            cache_question,
+            cache_question_id,
+            cache_answer,
+            similarity_value,
+            cache_delta_time,
+        )
+
+    def close(self):
+        self._data_manager.close()
+
+
+def fetch_snapshot(source: str, path: str, chunk_size: int = 1 << 20) -> str:
+    """Download a snapshot to a local file, and return the path of the file.
+
+    :param source: the http(s) url of the snapshot, like the `/snapshot` url of a gptcache server,
+                   the `s3://bucket/key` of an object, or a local path, which is used in place.
+    :type source: str
+    :param path: the path of the downloaded file.
+    :type path: str
+    :param chunk_size: the size in bytes of the chunks of the download, defaults to 1MB.
+    :type chunk_size: int
+    :return: the local path of the snapshot.
+    """
+    if not source.startswith(("http://", "https://", "s3://")):
+        return source
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    if source.startswith("s3://"):
+        import_boto3()
+        import boto3  # pylint: disable=C0415
+
+        bucket, _, key = source[len("s3://"):].partition("/")
+        boto3.client("s3").download_file(bucket, key, tmp_path)
+    else:
+        with requests.get(source, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+    os.replace(tmp_path, path)
+    return path
+
+
+def bootstrap_data_manager(
+    source: str, data_manager: DataManager, data_dir: str = ".", wait: bool = False, **kwargs
+) -> DataManager:
+    """Warm start a cache from the snapshot of a peer or an object store, see :class:`BootstrapDataManager`.
+    The data manager with data is returned as it is, so a restarted server keeps its own stores.
+
+    :param source: the url, the `s3://` object or the local path of the snapshot.
+    :type source: str
+    :param data_manager: the data manager which the snapshot is imported to.
+    :type data_manager: DataManager
+    :param data_dir: the dir of the downloaded snapshot, defaults to the current dir.
+    :type data_dir: str
+    :param wait: wait for the import of the snapshot, defaults to False.
+    :type wait: bool
+    :param kwargs: the params of :class:`BootstrapDataManager`.
+    :return: the data manager which serves the cache.
+
+    Example:
+        .. code-block:: python
+
+            from gptcache import cache
+            from gptcache.manager.bootstrap import bootstrap_data_manager
+
+            cache.data_manager = bootstrap_data_manager(
+                "http://peer:8000/snapshot?key=your_key", cache.data_manager, data_dir="gptcache_data"
+            )
+    """
+    storage = getattr(data_manager, "s", None)
+    if storage is not None and storage.count() > 0:
+        gptcache_log.info("the cache has data, it doesn't bootstrap from %s", source)
+        return data_manager
+    start_time = time.time()
+    snapshot = read_snapshot(fetch_snapshot(source, os.path.join(data_dir, "bootstrap.snapshot")))
+    gptcache_log.info(
+        "mapped the snapshot of %d data from %s in %.2fs", snapshot.count, source, time.time() - start_time
+    )
+    bootstrap = BootstrapDataManager(snapshot, data_manager, **kwargs)
+    if wait:
+        bootstrap.wait()
+    return bootstrap
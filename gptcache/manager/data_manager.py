@@ -1,16 +1,21 @@
-import pickle
+import hashlib
+import sys
+import time
+import unicodedata
 from abc import abstractmethod, ABCMeta
-from typing import List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union
 
 import cachetools
 import numpy as np
-import requests
 
+from gptcache.manager.append_log import AppendLog
 from gptcache.manager.eviction import EvictionBase
 from gptcache.manager.eviction.distributed_cache import NoOpEviction
 from gptcache.manager.eviction_manager import EvictionManager
 from gptcache.manager.object_data.base import ObjectBase
+from gptcache.manager.report_sink import ReportBuffer
 from gptcache.manager.scalar_data.base import (
+    AsyncCacheStorage,
     CacheStorage,
     CacheData,
     DataType,
@@ -18,6 +23,7 @@ from gptcache.manager.scalar_data.base import (
     Question,
 )
 from gptcache.manager.vector_data.base import VectorBase, VectorData
+from gptcache.processor.check_hit import check_hit_session
 from gptcache.utils.error import CacheError, ParamError
 from gptcache.utils.log import gptcache_log
 
@@ -43,6 +49,10 @@ class DataManager(metaclass=ABCMeta):
     def get_scalar_data(self, res_data, **kwargs) -> CacheData:
         pass
 
+    def batch_get_scalar_data(self, res_datas, **kwargs) -> List[Optional[CacheData]]:
+        """get the data of the search results, the data managers with a batch read override it to save round trips"""
+        return [self.get_scalar_data(res_data, **kwargs) for res_data in res_datas]
+
     def hit_cache_callback(self, res_data, **kwargs):
         pass
 
@@ -54,6 +64,13 @@ class DataManager(metaclass=ABCMeta):
         """
         pass
 
+    def batch_search(self, embedding_datas, **kwargs):
+        """search the data of every embedding data
+
+        :return: a list of search results, one for every embedding data
+        """
+        return [self.search(embedding_data, **kwargs) or [] for embedding_data in embedding_datas]
+
     def flush(self):
         pass
 
@@ -69,6 +86,16 @@ class DataManager(metaclass=ABCMeta):
     def delete_session(self, session_id):
         pass
 
+    def expire_sessions(self, max_idle: float) -> List[str]:  # pylint: disable=unused-argument
+        """Delete the sessions which haven't been used for `max_idle` seconds, like the sessions of the conversations
+        which never call `Session.drop`.
+
+        :param max_idle: the idle time of the expired sessions in seconds.
+        :type max_idle: float
+        :return: the ids of the expired sessions.
+        """
+        return []
+
     def report_cache(
         self,
         user_question,
@@ -84,15 +111,126 @@ class DataManager(metaclass=ABCMeta):
     def close(self):
         pass
 
+    # The awaitable methods are used by `aadapt`. They call the sync methods by default,
+    # the data managers with an asyncio storage override them to not block the event loop.
+
+    async def asave(self, question, answer, embedding_data, **kwargs):
+        self.save(question, answer, embedding_data, **kwargs)
+
+    async def aimport_data(
+            self,
+            questions: List[Any],
+            answers: List[Any],
+            embedding_datas: List[Any],
+            session_ids: List[Optional[str]],
+    ):
+        self.import_data(questions, answers, embedding_datas, session_ids)
+
+    async def aget_scalar_data(self, res_data, **kwargs) -> CacheData:
+        return self.get_scalar_data(res_data, **kwargs)
+
+    async def aflush(self):
+        self.flush()
+
+    async def aadd_session(self, res_data, session_id, pre_embedding_data):
+        self.add_session(res_data, session_id, pre_embedding_data)
+
+    async def alist_sessions(self, session_id=None, key=None):
+        return self.list_sessions(session_id, key)
+
+    async def adelete_session(self, session_id):
+        self.delete_session(session_id)
+
+    async def aexpire_sessions(self, max_idle: float) -> List[str]:
+        return self.expire_sessions(max_idle)
+
+    async def areport_cache(
+        self,
+        user_question,
+        cache_question,
+        cache_question_id,
+        cache_answer,
+        similarity_value,
+        cache_delta_time,
+    ):
+        self.report_cache(
+            user_question,
+            cache_question,
+            cache_question_id,
+            cache_answer,
+            similarity_value,
+            cache_delta_time,
+        )
+
+    async def aclose(self):
+        self.close()
+
+
+class _SessionIndex:
+    """The keys of the data of every session and the last time the sessions were used,
+    so a data manager finds the data of a session without a scan of the cache, and expires the idle sessions."""
+
+    def __init__(self):
+        self._keys: Dict[str, set] = {}
+        self._last_used: Dict[str, float] = {}
+
+    def add(self, session_id, key=None):
+        if key is not None:
+            self._keys.setdefault(session_id, set()).add(key)
+        self._last_used[session_id] = time.time()
+
+    def load(self, session_ids):
+        """Track the sessions of the stores, which are used from now on unless they are tracked already."""
+        now = time.time()
+        for session_id in session_ids:
+            self._last_used.setdefault(session_id, now)
+
+    def discard(self, session_id, key):
+        keys = self._keys.get(session_id)
+        if keys is not None:
+            keys.discard(key)
+
+    def keys(self, session_id) -> set:
+        return self._keys.get(session_id, set())
+
+    def session_ids(self) -> List[str]:
+        return [session_id for session_id, keys in self._keys.items() if keys]
+
+    def pop(self, session_id) -> set:
+        self._last_used.pop(session_id, None)
+        return self._keys.pop(session_id, set())
+
+    def idle(self, max_idle: float) -> List[str]:
+        deadline = time.time() - max_idle
+        return [session_id for session_id, last_used in self._last_used.items() if last_used < deadline]
+
+
+class _EvictionLRUCache(cachetools.LRUCache):
+    """LRUCache which reports the evicted items, so their deletes are written to the log of the map."""
+
+    def __init__(self, maxsize, on_evict):
+        super().__init__(maxsize)
+        self._on_evict = on_evict
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._on_evict(key, value)
+        return key, value
+
 
 class MapDataManager(DataManager):
     """MapDataManager, store all data in a map data structure.
 
+    The map is persisted as an append-only log, see :class:`gptcache.manager.append_log.AppendLog`,
+    a flush appends the changes since the last one, and the log is compacted when most of its records are stale.
+    The pickle file of the older versions is converted to the log when it is loaded.
+
     :param data_path: the path to save the map data, defaults to 'data_map.txt'.
     :type data_path:  str
     :param max_size: the max size for the cache, defaults to 1000.
     :type max_size: int
     :param get_data_container: a Callable to get the data container, defaults to None.
+                               The evictions of a custom container aren't written to the log.
     :type get_data_container:  Callable
 
 
@@ -105,30 +243,78 @@ class MapDataManager(DataManager):
     """
 
     def __init__(self, data_path, max_size, get_data_container=None):
+        # the keys changed since the last flush, True for the set ones and False for the deleted ones
+        self._changes = {}
+        self._sessions = _SessionIndex()
         if get_data_container is None:
-            self.data = cachetools.LRUCache(max_size)
+            self.data = _EvictionLRUCache(max_size, self._on_evict)
         else:
             self.data = get_data_container(max_size)
         self.data_path = data_path
+        self._log = AppendLog(data_path)
         self.init()
 
+    def _on_evict(self, key, value):
+        self._changes[key] = False
+        for session_id in self._value_sessions(value):
+            self._sessions.discard(session_id, key)
+
+    def _set(self, key, value):
+        old_value = self.data.get(key)
+        if old_value is not None:
+            for session_id in self._value_sessions(old_value):
+                self._sessions.discard(session_id, key)
+        self.data[key] = value
+        self._changes[key] = True
+        for session_id in self._value_sessions(value):
+            self._sessions.add(session_id, key)
+
     def init(self):
         try:
-            with open(self.data_path, "rb") as f:
-                self.data = pickle.load(f)
-        except FileNotFoundError:
-            return
+            for op, key, values in self._log.load():
+                if op == "set":
+                    self._restore(key, values)
+                else:
+                    self.data.pop(self._restore_key(key), None)
         except PermissionError:
             raise CacheError(  # pylint: disable=W0707
                 f"You don't have permission to access this file <{self.data_path}>."
             )
+        self._changes = {}
+        for key, value in self.data.items():
+            for session_id in self._value_sessions(value):
+                self._sessions.add(session_id, key)
+        if self._log.should_compact(len(self.data)):
+            self._compact()
+
+    def _restore_key(self, key):
+        return key
+
+    def _restore(self, key, values):
+        # the values of the old pickle file are the whole tuples
+        question, answer, session_ids = values[0], values[1], values[-1]
+        self.data[key] = (question, answer, key, set(session_ids))
+
+    def _log_values(self, value) -> List[Any]:
+        return [value[0], value[1], value[3]]
+
+    def _value_sessions(self, value):
+        return value[3]
+
+    def _remove_session(self, value, session_id) -> bool:
+        """Remove the session from the value, and return whether the value has other sessions."""
+        value[3].discard(session_id)
+        return len(value[3]) > 0
+
+    def _add_session(self, value, session_id):
+        value[3].add(session_id)
 
     def save(self, question, answer, embedding_data, **kwargs):
         if isinstance(question, Question):
             question = question.content
         session = kwargs.get("session", None)
         session_id = {session.name} if session else set()
-        self.data[embedding_data] = (question, answer, embedding_data, session_id)
+        self._set(embedding_data, (question, answer, embedding_data, session_id))
 
     def import_data(
         self,
@@ -144,11 +330,14 @@ class MapDataManager(DataManager):
         ):
             raise ParamError("Make sure that all parameters have the same length")
         for i, embedding_data in enumerate(embedding_datas):
-            self.data[embedding_data] = (
-                questions[i],
-                answers[i],
-                embedding_datas[i],
-                {session_ids[i]} if session_ids[i] else set(),
+            self._set(
+                embedding_data,
+                (
+                    questions[i],
+                    answers[i],
+                    embedding_datas[i],
+                    {session_ids[i]} if session_ids[i] else set(),
+                ),
             )
 
     def get_scalar_data(self, res_data, **kwargs) -> CacheData:
@@ -169,38 +358,215 @@ class MapDataManager(DataManager):
         except KeyError:
             return []
 
+    def _compact(self):
+        try:
+            self._log.rewrite(
+                (key, self._log_values(value)) for key, value in list(self.data.items())
+            )
+        except PermissionError:
+            gptcache_log.error(
+                "You don't have permission to access this file %s.", self.data_path
+            )
+
     def flush(self):
+        changes, self._changes = self._changes, {}
+        records = []
+        for key, alive in changes.items():
+            value = self.data.get(key) if alive else None
+            if value is None:
+                records.append(("delete", key, None))
+            else:
+                records.append(("set", key, self._log_values(value)))
         try:
-            with open(self.data_path, "wb") as f:
-                pickle.dump(self.data, f)
+            self._log.append(records)
         except PermissionError:
             gptcache_log.error(
                 "You don't have permission to access this file %s.", self.data_path
             )
+            return
+        if self._log.should_compact(len(self.data)):
+            self._compact()
 
     def add_session(self, res_data, session_id, pre_embedding_data):
-        res_data[3].add(session_id)
+        key = res_data[2]
+        value = self.data.get(key)
+        if value is None:
+            return
+        self._add_session(value, session_id)
+        self._sessions.add(session_id, key)
+        self._changes[key] = True
+
+    def _session_keys(self, session_id) -> List[Any]:
+        # the index may keep the keys evicted by a custom container
+        return [
+            key for key in self._sessions.keys(session_id)
+            if key in self.data and session_id in self._value_sessions(self.data[key])
+        ]
 
     def list_sessions(self, session_id=None, key=None):
-        session_ids = set()
-        for k in self.data:
-            if session_id and session_id in self.data[k][3]:
-                session_ids.add(k)
-            elif len(self.data[k][3]) > 0:
-                session_ids.update(self.data[k][3])
-        return list(session_ids)
+        if session_id:
+            return self._session_keys(session_id)
+        return self._sessions.session_ids()
 
     def delete_session(self, session_id):
-        keys = self.list_sessions(session_id=session_id)
+        keys = self._session_keys(session_id)
+        self._sessions.pop(session_id)
         for k in keys:
-            self.data[k][3].remove(session_id)
-            if len(self.data[k][3]) == 0:
+            if self._remove_session(self.data[k], session_id):
+                self._changes[k] = True
+            else:
                 del self.data[k]
+                self._changes[k] = False
+
+    def expire_sessions(self, max_idle: float) -> List[str]:
+        session_ids = self._sessions.idle(max_idle)
+        for session_id in session_ids:
+            self.delete_session(session_id)
+        return session_ids
+
+    def _entry_size(self, key, value, seen) -> int:
+        return _deep_sizeof(key, seen) + _deep_sizeof(value, seen)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Report the memory of the keys and the values of the map, without the container,
+        the strings shared by the entries, like the interned session ids, are counted once.
+
+        :return: a dict with the `count` of the entries, the total `bytes` and the `bytes_per_entry`.
+        """
+        seen = set()
+        total = 0
+        for key, value in list(self.data.items()):
+            total += self._entry_size(key, value, seen)
+        count = len(self.data)
+        return {"count": count, "bytes": total, "bytes_per_entry": total / count if count else 0.0}
 
     def close(self):
         self.flush()
 
 
+def _deep_sizeof(obj, seen) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, Answer):
+        size += _deep_sizeof(obj.answer, seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(_deep_sizeof(getattr(obj, name), seen) for name in obj.__slots__)
+    return size
+
+
+class _MapRecord:
+    """The value of :class:`CompactMapDataManager`, the session ids are a tuple of the interned names."""
+
+    __slots__ = ("question", "answer", "session_ids")
+
+    def __init__(self, question, answer, session_ids=()):
+        self.question = question
+        self.answer = answer
+        self.session_ids = session_ids
+
+
+def _intern_sessions(session_ids) -> tuple:
+    return tuple(sys.intern(s) if isinstance(s, str) else s for s in session_ids if s)
+
+
+def prompt_digest(embedding_data) -> bytes:
+    """The 128-bit key of :class:`CompactMapDataManager`, the prompt is normalized to NFC without
+    the leading and trailing whitespace, so the same question keeps the same key."""
+    if isinstance(embedding_data, str):
+        data = unicodedata.normalize("NFC", embedding_data).strip().encode("utf-8")
+    elif isinstance(embedding_data, (bytes, bytearray)):
+        data = bytes(embedding_data)
+    elif isinstance(embedding_data, np.ndarray):
+        data = embedding_data.tobytes()
+    else:
+        data = repr(embedding_data).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class CompactMapDataManager(MapDataManager):
+    """CompactMapDataManager, the exact match map for a lot of data.
+    It keys the map on a 128-bit digest of the normalized prompt instead of the prompt, which is stored once,
+    in a `__slots__` record, and interns the session ids, so the entries of the long prompts take a fraction
+    of the memory of :class:`MapDataManager`, see :meth:`memory_usage`.
+
+    The third item of the search results is the digest instead of the embedding data.
+
+    :param data_path: the path to save the map data, defaults to 'data_map.txt'.
+    :type data_path:  str
+    :param max_size: the max size for the cache, defaults to 1000.
+    :type max_size: int
+    :param get_data_container: a Callable to get the data container, defaults to None.
+                               The evictions of a custom container aren't written to the log.
+    :type get_data_container:  Callable
+
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import manager_factory
+
+            data_manager = manager_factory("compact_map", data_dir="./workspace", max_size=1000000)
+    """
+
+    def _restore_key(self, key):
+        # the keys of a plain map are converted
+        return key if isinstance(key, bytes) else prompt_digest(key)
+
+    def _restore(self, key, values):
+        question, answer, session_ids = values[0], values[1], values[-1]
+        self.data[self._restore_key(key)] = _MapRecord(question, answer, _intern_sessions(session_ids))
+
+    def _log_values(self, value) -> List[Any]:
+        return [value.question, value.answer, list(value.session_ids)]
+
+    def _value_sessions(self, value):
+        return value.session_ids
+
+    def _remove_session(self, value, session_id) -> bool:
+        value.session_ids = tuple(s for s in value.session_ids if s != session_id)
+        return len(value.session_ids) > 0
+
+    def _add_session(self, value, session_id):
+        if session_id not in value.session_ids:
+            value.session_ids = value.session_ids + _intern_sessions([session_id])
+
+    def save(self, question, answer, embedding_data, **kwargs):
+        if isinstance(question, Question):
+            question = question.content
+        session = kwargs.get("session", None)
+        session_ids = _intern_sessions([session.name]) if session else ()
+        self._set(prompt_digest(embedding_data), _MapRecord(question, answer, session_ids))
+
+    def import_data(
+        self,
+        questions: List[Any],
+        answers: List[Any],
+        embedding_datas: List[Any],
+        session_ids: List[Optional[str]],
+    ):
+        if (
+            len(questions) != len(answers)
+            or len(questions) != len(embedding_datas)
+            or len(questions) != len(session_ids)
+        ):
+            raise ParamError("Make sure that all parameters have the same length")
+        for question, answer, embedding_data, session_id in zip(questions, answers, embedding_datas, session_ids):
+            self._set(prompt_digest(embedding_data), _MapRecord(question, answer, _intern_sessions([session_id])))
+
+    def search(self, embedding_data, **kwargs):
+        key = prompt_digest(embedding_data)
+        record = self.data.get(key)
+        if record is None:
+            return []
+        return [(record.question, record.answer, key, record.session_ids)]
+
+
 def normalize(vec):
     magnitude = np.linalg.norm(vec)
     normalized_v = vec / magnitude
@@ -218,6 +584,13 @@ class SSDataManager(DataManager):
     :type o:  ObjectBase
     :param e: EvictionBase to manager the eviction data, it can be generated with :meth:`gptcache.manager.EvictionBase`.
     :type e:  EvictionBase
+    :param async_s: AsyncCacheStorage used by the awaitable methods, it can be generated with
+                    :meth:`gptcache.manager.AsyncCacheBase`. It should work on the same database as `s`,
+                    the awaitable methods fall back to `s` if it is None.
+    :type async_s: AsyncCacheStorage
+    :param report_buffer: ReportBuffer which writes the cache reports in a background thread, the reports are written
+                          to `s` on the hit path if it is None.
+    :type report_buffer: ReportBuffer
     """
 
     def __init__(
@@ -228,9 +601,16 @@ class SSDataManager(DataManager):
         e: Optional[EvictionBase],
         max_size,
         clean_size,
-        policy="LRU"
+        policy="LRU",
+        async_s: Optional[AsyncCacheStorage] = None,
+        report_buffer: Optional[ReportBuffer] = None,
     ):
         self.s = s
+        self.async_s = async_s
+        self.report_buffer = report_buffer
+        # the storages index the sessions, the data manager keeps when the sessions were used
+        self._sessions = _SessionIndex()
+        self._sessions_loaded = False
         self.v = v
         self.o = o
         self.eviction_manager = EvictionManager(self.s, self.v)
@@ -244,7 +624,7 @@ class SSDataManager(DataManager):
 
         if not isinstance(self.eviction_base, NoOpEviction):
             # if eviction manager is no op redis, we don't need to put data into eviction base
-            self.eviction_base.put(self.s.get_ids(deleted=False))
+            self.eviction_base.put(self.s.get_lru_ids())
 
     def _clear(self, marked_keys):
         self.eviction_manager.soft_evict(marked_keys)
@@ -292,12 +672,14 @@ class SSDataManager(DataManager):
 
             for dep in question.deps:
                 if dep.dep_type == DataType.IMAGE_URL:
+                    import requests  # pylint: disable=C0415
+
                     dep.dep_type.data = self.o.put(requests.get(dep.data).content)
             return question
 
         return Question(question)
 
-    def import_data(
+    def _to_cache_datas(
         self,
         questions: List[Any],
         answers: List[Answer],
@@ -328,40 +710,118 @@ class SSDataManager(DataManager):
                     session_id=session_ids[i],
                 )
             )
-        ids = self.s.batch_insert(cache_datas)
+        return cache_datas, embedding_datas
+
+    def _add_vectors(self, ids, embedding_datas):
         self.v.mul_add(
             [
                 VectorData(id=ids[i], data=embedding_data)
                 for i, embedding_data in enumerate(embedding_datas)
             ]
         )
+        self.eviction_manager.on_insert(len(ids))
         self.eviction_base.put(ids)
 
+    def import_data(
+        self,
+        questions: List[Any],
+        answers: List[Answer],
+        embedding_datas: List[Any],
+        session_ids: List[Optional[str]],
+    ):
+        cache_datas, embedding_datas = self._to_cache_datas(
+            questions, answers, embedding_datas, session_ids
+        )
+        ids = self.s.batch_insert(cache_datas)
+        self._add_vectors(ids, embedding_datas)
+        self._use_sessions(session_ids)
+        return ids
+
+    async def asave(self, question, answer, embedding_data, **kwargs):
+        session = kwargs.get("session", None)
+        session_id = session.name if session else None
+        await self.aimport_data([question], [answer], [embedding_data], [session_id])
+
+    async def aimport_data(
+        self,
+        questions: List[Any],
+        answers: List[Answer],
+        embedding_datas: List[Any],
+        session_ids: List[Optional[str]],
+    ):
+        if self.async_s is None:
+            return self.import_data(questions, answers, embedding_datas, session_ids)
+        cache_datas, embedding_datas = self._to_cache_datas(
+            questions, answers, embedding_datas, session_ids
+        )
+        ids = await self.async_s.batch_insert(cache_datas)
+        self._add_vectors(ids, embedding_datas)
+        self._use_sessions(session_ids)
+        return ids
+
+    @staticmethod
+    def _check_session_hit(session, cache_data, res_list):
+        cache_answer = (
+            cache_data.answers[0].answer
+            if isinstance(cache_data.answers[0], Answer)
+            else cache_data.answers[0]
+        )
+        cache_session_ids, cache_questions = [r.session_id for r in res_list], [
+            r.session_question for r in res_list
+        ]
+        return session.check_hit_func(
+            session.name, cache_session_ids, cache_questions, cache_answer
+        )
+
+    def _check_batch_session_hit(self, session, res_data, cache_data):
+        if session.check_hit_func is check_hit_session:
+            # the default check only needs the session ids, which are read with the data
+            return check_hit_session(session.name, cache_data.session_id or [], [], None)
+        return self._check_session_hit(session, cache_data, self.list_sessions(key=res_data[1]))
+
+    def _load_answers(self, cache_data):
+        for ans in cache_data.answers:
+            if ans.answer_type != DataType.STR:
+                ans.answer = self.o.get(ans.answer)
+        return cache_data
+
     def get_scalar_data(self, res_data, **kwargs) -> Optional[CacheData]:
         session = kwargs.get("session", None)
         cache_data = self.s.get_data_by_id(res_data[1])
         if cache_data is None:
             return None
 
-        if session:
-            cache_answer = (
-                cache_data.answers[0].answer
-                if isinstance(cache_data.answers[0], Answer)
-                else cache_data.answers[0]
-            )
-            res_list = self.list_sessions(key=res_data[1])
-            cache_session_ids, cache_questions = [r.session_id for r in res_list], [
-                r.session_question for r in res_list
-            ]
-            if not session.check_hit_func(
-                session.name, cache_session_ids, cache_questions, cache_answer
+        if session and not self._check_session_hit(
+            session, cache_data, self.list_sessions(key=res_data[1])
+        ):
+            return None
+        return self._load_answers(cache_data)
+
+    def batch_get_scalar_data(self, res_datas, **kwargs) -> List[Optional[CacheData]]:
+        session = kwargs.get("session", None)
+        cache_datas = self.s.batch_get_data_by_id([res_data[1] for res_data in res_datas])
+        results = []
+        for res_data, cache_data in zip(res_datas, cache_datas):
+            if cache_data is not None and session and not self._check_batch_session_hit(
+                session, res_data, cache_data
             ):
-                return None
+                cache_data = None
+            results.append(None if cache_data is None else self._load_answers(cache_data))
+        return results
 
-        for ans in cache_data.answers:
-            if ans.answer_type != DataType.STR:
-                ans.answer = self.o.get(ans.answer)
-        return cache_data
+    async def aget_scalar_data(self, res_data, **kwargs) -> Optional[CacheData]:
+        if self.async_s is None:
+            return self.get_scalar_data(res_data, **kwargs)
+        session = kwargs.get("session", None)
+        cache_data = await self.async_s.get_data_by_id(res_data[1])
+        if cache_data is None:
+            return None
+
+        if session and not self._check_session_hit(
+            session, cache_data, await self.alist_sessions(key=res_data[1])
+        ):
+            return None
+        return self._load_answers(cache_data)
 
     def hit_cache_callback(self, res_data, **kwargs):
         self.eviction_base.get(res_data[1])
@@ -371,24 +831,81 @@ class SSDataManager(DataManager):
         top_k = kwargs.get("top_k", -1)
         return self.v.search(data=embedding_data, top_k=top_k)
 
+    def batch_search(self, embedding_datas, **kwargs):
+        top_k = kwargs.get("top_k", -1)
+        return self.v.mul_search([normalize(embedding_data) for embedding_data in embedding_datas], top_k)
+
     def flush(self):
+        if self.report_buffer is not None:
+            self.report_buffer.flush()
         self.s.flush()
         self.v.flush()
 
+    def _use_sessions(self, session_ids):
+        for session_id in session_ids:
+            if session_id:
+                self._sessions.add(session_id)
+
     def add_session(self, res_data, session_id, pre_embedding_data):
         self.s.add_session(res_data[1], session_id, pre_embedding_data)
+        self._sessions.add(session_id)
 
-    def list_sessions(self, session_id=None, key=None):
-        res = self.s.list_sessions(session_id, key)
+    @staticmethod
+    def _session_result(res, session_id=None, key=None):
         if key:
             return res
         if session_id:
             return list(r.id for r in res)
         return list(set(r.session_id for r in res))
 
+    def list_sessions(self, session_id=None, key=None):
+        res = self.s.list_sessions(session_id, key)
+        return self._session_result(res, session_id, key)
+
     def delete_session(self, session_id):
+        # the rows of a session are found by the session index of the storage
         keys = self.list_sessions(session_id=session_id)
         self.s.delete_session(keys)
+        self._sessions.pop(session_id)
+
+    def expire_sessions(self, max_idle: float) -> List[str]:
+        """Delete the sessions which haven't been used for `max_idle` seconds.
+        The data manager knows when the sessions were used since it was created, so the sessions which were already
+        in the storage are listed once, by the first call, and they are used at that time.
+        """
+        if not self._sessions_loaded:
+            self._sessions.load(self.list_sessions())
+            self._sessions_loaded = True
+        session_ids = self._sessions.idle(max_idle)
+        for session_id in session_ids:
+            self.delete_session(session_id)
+        return session_ids
+
+    async def aflush(self):
+        if self.async_s is not None:
+            await self.async_s.flush()
+        self.flush()
+
+    async def aadd_session(self, res_data, session_id, pre_embedding_data):
+        if self.async_s is None:
+            self.add_session(res_data, session_id, pre_embedding_data)
+            return
+        await self.async_s.add_session(res_data[1], session_id, pre_embedding_data)
+        self._sessions.add(session_id)
+
+    async def alist_sessions(self, session_id=None, key=None):
+        if self.async_s is None:
+            return self.list_sessions(session_id, key)
+        res = await self.async_s.list_sessions(session_id, key)
+        return self._session_result(res, session_id, key)
+
+    async def adelete_session(self, session_id):
+        if self.async_s is None:
+            self.delete_session(session_id)
+            return
+        keys = await self.alist_sessions(session_id=session_id)
+        await self.async_s.delete_session(keys)
+        self._sessions.pop(session_id)
 
     def report_cache(
         self,
@@ -399,6 +916,16 @@ class SSDataManager(DataManager):
         similarity_value,
         cache_delta_time,
     ):
+        if self.report_buffer is not None:
+            self.report_buffer.report_cache(
+                user_question,
+                cache_question,
+                cache_question_id,
+                cache_answer,
+                similarity_value,
+                cache_delta_time,
+            )
+            return
         self.s.report_cache(
             user_question,
             cache_question,
@@ -408,6 +935,42 @@ class SSDataManager(DataManager):
             cache_delta_time,
         )
 
+    async def areport_cache(
+        self,
+        user_question,
+        cache_question,
+        cache_question_id,
+        cache_answer,
+        similarity_value,
+        cache_delta_time,
+    ):
+        if self.async_s is None or self.report_buffer is not None:
+            self.report_cache(
+                user_question,
+                cache_question,
+                cache_question_id,
+                cache_answer,
+                similarity_value,
+                cache_delta_time,
+            )
+            return
+        await self.async_s.report_cache(
+            user_question,
+            cache_question,
+            cache_question_id,
+            cache_answer,
+            similarity_value,
+            cache_delta_time,
+        )
+
     def close(self):
+        if self.report_buffer is not None:
+            self.report_buffer.close()
+        self.eviction_base.close()
         self.s.close()
         self.v.close()
+
+    async def aclose(self):
+        if self.async_s is not None:
+            await self.async_s.close()
+        self.close()
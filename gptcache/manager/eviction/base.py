@@ -19,3 +19,6 @@ class EvictionBase(metaclass=ABCMeta):
     @abstractmethod
     def policy(self) -> str:
         pass
+
+    def close(self):
+        pass
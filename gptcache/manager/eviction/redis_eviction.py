@@ -1,9 +1,11 @@
 # pylint: disable=wrong-import-position
+import threading
 from abc import ABC
 from typing import List
 
 from gptcache.manager.eviction.distributed_cache import DistributedEviction
 from gptcache.utils import import_redis
+from gptcache.utils.log import gptcache_log
 
 
 import_redis()
@@ -11,6 +13,16 @@ import redis
 from redis_om import get_redis_connection
 
 
+# Fallback for servers older than 6.2, which do not support `GETEX`.
+_GET_AND_EXPIRE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return value
+"""
+
+
 class RedisCacheEviction(DistributedEviction, ABC):
     """eviction: Distributed Cache Eviction Strategy using Redis.
 
@@ -33,6 +45,13 @@ class RedisCacheEviction(DistributedEviction, ABC):
     :type ttl: int
     :param maxmemory_samples: Number of keys to sample when evicting keys
     :type maxmemory_samples: int
+    :param async_refresh: refresh the access time of the accessed keys in a background thread,
+        in this mode `get` only queues the key and returns None, defaults to False
+    :type async_refresh: bool
+    :param refresh_interval: the interval in seconds of the background refresh, defaults to 1.0
+    :type refresh_interval: float
+    :param refresh_batch_size: refresh immediately when this number of keys is queued, defaults to 1000
+    :type refresh_batch_size: int
     :param kwargs: the kwargs
     :type kwargs: Any
     """
@@ -45,6 +64,9 @@ class RedisCacheEviction(DistributedEviction, ABC):
                  global_key_prefix="gptcache",
                  ttl: int = None,
                  maxmemory_samples: int = None,
+                 async_refresh: bool = False,
+                 refresh_interval: float = 1.0,
+                 refresh_batch_size: int = 1000,
                  **kwargs):
         self._redis = get_redis_connection(host=host, port=port, **kwargs)
         if maxmemory:
@@ -57,27 +79,97 @@ class RedisCacheEviction(DistributedEviction, ABC):
 
         self._global_key_prefix = global_key_prefix
         self._ttl = ttl
+        self._use_getex = True
+        self._get_and_expire = self._redis.register_script(_GET_AND_EXPIRE_SCRIPT)
+
+        self._async_refresh = async_refresh
+        self._refresh_interval = refresh_interval
+        self._refresh_batch_size = refresh_batch_size
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._refresh_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+        if self._async_refresh:
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop, name="gptcache-redis-eviction", daemon=True
+            )
+            self._refresh_thread.start()
 
     def _create_key(self, key: str) -> str:
         return f"{self._global_key_prefix}:evict:{key}"
 
     def put(self, objs: List[str], expire=False):
+        if not objs:
+            return
         ttl = self._ttl if expire else None
-        for key in objs:
-            self._redis.set(self._create_key(key), "True", ex=ttl)
+        if ttl is None:
+            self._redis.mset({self._create_key(key): "True" for key in objs})
+            return
+        with self._redis.pipeline(transaction=False) as pipeline:
+            for key in objs:
+                pipeline.set(self._create_key(key), "True", ex=ttl)
+            pipeline.execute()
 
     def get(self, obj: str):
+        if self._async_refresh:
+            with self._pending_lock:
+                self._pending.add(obj)
+                full = len(self._pending) >= self._refresh_batch_size
+            if full:
+                self._refresh_event.set()
+            return None
 
+        key = self._create_key(obj)
         try:
-            value = self._redis.get(self._create_key(obj))
-            # update key expire time when accessed
-            if self._ttl:
-                self._redis.expire(self._create_key(obj), self._ttl)
-            return value
+            if not self._ttl:
+                return self._redis.get(key)
+            # get the value and update key expire time when accessed, in one round trip
+            if self._use_getex:
+                try:
+                    return self._redis.getex(key, ex=self._ttl)
+                except redis.ResponseError:
+                    self._use_getex = False
+            return self._get_and_expire(keys=[key], args=[self._ttl])
         except redis.RedisError:
-            print(f"Error getting key {obj} from cache")
+            gptcache_log.error("Error getting key %s from cache", obj)
             return None
 
+    def _refresh_loop(self):
+        while not self._stop_event.is_set():
+            self._refresh_event.wait(self._refresh_interval)
+            self._refresh_event.clear()
+            self.refresh()
+
+    def refresh(self):
+        """Refresh the access time of all the queued keys in a single round trip.
+        It is called periodically by the background thread when `async_refresh` is enabled.
+        """
+        with self._pending_lock:
+            keys, self._pending = self._pending, set()
+        if not keys:
+            return
+        keys = [self._create_key(key) for key in keys]
+        try:
+            if self._ttl:
+                with self._redis.pipeline(transaction=False) as pipeline:
+                    for key in keys:
+                        pipeline.expire(key, self._ttl)
+                    pipeline.execute()
+            else:
+                self._redis.touch(*keys)
+        except redis.RedisError:
+            gptcache_log.error("Error refreshing %d keys in cache", len(keys))
+
+    def close(self):
+        """Stop the background refresh thread and refresh the remaining queued keys."""
+        if self._refresh_thread is not None:
+            self._stop_event.set()
+            self._refresh_event.set()
+            self._refresh_thread.join()
+            self._refresh_thread = None
+        self.refresh()
+
     @property
     def policy(self) -> str:
         return self._policy
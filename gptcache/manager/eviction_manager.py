@@ -2,6 +2,10 @@ class EvictionManager:
     """
     EvictionManager to manager the eviction policy.
 
+    The live and soft-deleted counts of the scalar storage are maintained in memory on insert, mark and clear,
+    so that `check_evict` doesn't count the storage every time. They are loaded from the storage on the first
+    check and reconciled with it every `RECONCILE_INTERVAL` checks, to correct the drift caused by other writers.
+
     :param scalar_storage: CacheStorage to manager the scalar data.
     :type scalar_storage: :class:`CacheStorage`
     :param vector_base: VectorBase to manager the vector data.
@@ -12,18 +16,41 @@ class EvictionManager:
     MAX_MARK_RATE = 0.1
     BATCH_SIZE = 100000
     REBUILD_CONDITION = 5
+    RECONCILE_INTERVAL = 100
 
     def __init__(self, scalar_storage, vector_base):
         self._scalar_storage = scalar_storage
         self._vector_base = vector_base
         self.delete_count = 0
+        self._mark_count = None
+        self._all_count = None
+        self._check_count = 0
+
+    @property
+    def mark_count(self):
+        if self._mark_count is None:
+            self.reconcile()
+        return self._mark_count
+
+    @property
+    def all_count(self):
+        if self._all_count is None:
+            self.reconcile()
+        return self._all_count
+
+    def reconcile(self):
+        self._mark_count = self._scalar_storage.count(state=-1)
+        self._all_count = self._scalar_storage.count(is_all=True)
+        self._check_count = 0
 
     def check_evict(self):
-        mark_count = self._scalar_storage.count(state=-1)
-        all_count = self._scalar_storage.count(is_all=True)
+        if self._check_count >= self.RECONCILE_INTERVAL:
+            self.reconcile()
+        self._check_count += 1
+        mark_count, all_count = self.mark_count, self.all_count
         if (
             mark_count > self.MAX_MARK_COUNT
-            or mark_count / all_count > self.MAX_MARK_RATE
+            or (all_count > 0 and mark_count / all_count > self.MAX_MARK_RATE)
         ):
             return True
         return False
@@ -32,6 +59,9 @@ class EvictionManager:
         mark_ids = self._scalar_storage.get_ids(deleted=True)
         self._scalar_storage.clear_deleted_data()
         self._vector_base.delete(mark_ids)
+        if self._all_count is not None:
+            self._all_count = max(self._all_count - len(mark_ids), 0)
+        self._mark_count = 0
         self.delete_count += 1
         if self.delete_count >= self.REBUILD_CONDITION:
             self.rebuild()
@@ -40,7 +70,15 @@ class EvictionManager:
         self._scalar_storage.clear_deleted_data()
         ids = self._scalar_storage.get_ids(deleted=False)
         self._vector_base.rebuild(ids)
+        self._mark_count = 0
+        self._all_count = len(ids)
         self.delete_count = 0
 
     def soft_evict(self, marked_keys):
         self._scalar_storage.mark_deleted(marked_keys)
+        if self._mark_count is not None:
+            self._mark_count += len(marked_keys)
+
+    def on_insert(self, count):
+        if self._all_count is not None:
+            self._all_count += count
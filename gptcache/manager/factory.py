@@ -2,9 +2,10 @@ import os
 from pathlib import Path
 from typing import Union, Callable
 
-from gptcache.manager import CacheBase, VectorBase, ObjectBase
-from gptcache.manager.data_manager import SSDataManager, MapDataManager
+from gptcache.manager import CacheBase, AsyncCacheBase, VectorBase, ObjectBase
+from gptcache.manager.data_manager import SSDataManager, MapDataManager, CompactMapDataManager
 from gptcache.manager.eviction import EvictionBase
+from gptcache.manager.report_sink import ReportBuffer
 from gptcache.utils.log import gptcache_log
 
 
@@ -22,12 +23,14 @@ def manager_factory(manager="map",
        By using this factory method, you only need to specify the root directory of the data,
        and it can automatically manage all the local files.
 
-    :param manager: Type of DataManager. Supports: Map, or {scalar_name},{vector_name}
-                    or {scalar_name},{vector_name},{object_name}
+    :param manager: Type of DataManager. Supports: Map, Compact_Map, or {scalar_name},{vector_name}
+                    or {scalar_name},{vector_name},{object_name}.
+                    Compact_Map is the exact match map keyed on the digests of the prompts,
+                    see :class:`gptcache.manager.data_manager.CompactMapDataManager`.
     :type manager: str
     :param data_dir: Root path for data storage.
     :type data_dir: str
-    :param max_size: the max size for the LRU cache in MapDataManager, defaults to 1000.
+    :param max_size: the max size for the LRU cache in MapDataManager and CompactMapDataManager, defaults to 1000.
     :type max_size: int
     :param eviction_manager: The eviction manager, defaults to "memory".
                              It supports "memory" and "redis" and 'no_op_eviction'.
@@ -72,6 +75,8 @@ def manager_factory(manager="map",
 
     if manager == "map":
         return MapDataManager(os.path.join(data_dir, "data_map.txt"), max_size, get_data_container)
+    if manager == "compact_map":
+        return CompactMapDataManager(os.path.join(data_dir, "data_map.txt"), max_size, get_data_container)
 
     db_infos = manager.split(",")
     if len(db_infos) not in [2, 3]:
@@ -86,11 +91,13 @@ def manager_factory(manager="map",
         scalar_params = {}
     if scalar == "sqlite":
         scalar_params["sql_url"] = "sqlite:///" + os.path.join(data_dir, "sqlite.db")
+    elif scalar == "duckdb":
+        scalar_params["sql_url"] = "duckdb:///" + os.path.join(data_dir, "duck.db")
     s = CacheBase(name=scalar, **scalar_params)
 
     if vector_params is None:
         vector_params = {}
-    local_vector_type = ["faiss", "hnswlib", "docarray"]
+    local_vector_type = ["faiss", "hnswlib", "docarray", "usearch"]
     if vector in local_vector_type:
         vector_params["index_path"] = os.path.join(data_dir, f"{vector}.index")
     elif vector == "milvus" and vector_params.get("local_mode", False) is True:
@@ -141,6 +148,8 @@ def get_data_manager(
         eviction: str = "LRU",
         data_path: str = "data_map.txt",
         get_data_container: Callable = None,
+        async_cache_base: Union[AsyncCacheBase, str] = None,
+        report_buffer: ReportBuffer = None,
 ):
     """Generate `SSDataManager` (with `cache_base`, `vector_base`, `max_size`, `clean_size` and `eviction` params),
        or `MAPDataManager` (with `data_path`, `max_size` and `get_data_container` params) to manager the data.
@@ -168,6 +177,13 @@ def get_data_manager(
     :type data_path:  str
     :param get_data_container: a Callable to get the data container, defaults to None.
     :type get_data_container:  Callable
+    :param async_cache_base: a AsyncCacheBase object, or the name of the asyncio cache storage, which is used by the
+                             awaitable methods of `SSDataManager` in `aadapt`. It should work on the same database as
+                             `cache_base`, it is support 'sqlite', 'postgresql', 'mysql', 'mariadb' and 'mongo' now.
+    :type async_cache_base: :class:`AsyncCacheBase` or str
+    :param report_buffer: a ReportBuffer object, which moves the cache report writes of `SSDataManager` off the hit
+                          path, defaults to None.
+    :type report_buffer: :class:`gptcache.manager.report_sink.ReportBuffer`
 
 
     :return: SSDataManager or MapDataManager.
@@ -202,5 +218,17 @@ def get_data_manager(
         object_base = ObjectBase(name=object_base)
     if isinstance(eviction_base, str) and eviction_base != "memory":
         eviction_base = EvictionBase(name=eviction_base)
+    if isinstance(async_cache_base, str):
+        async_cache_base = AsyncCacheBase(name=async_cache_base)
     assert cache_base and vector_base
-    return SSDataManager(cache_base, vector_base, object_base, eviction_base, max_size, clean_size, eviction)
+    return SSDataManager(
+        cache_base,
+        vector_base,
+        object_base,
+        eviction_base,
+        max_size,
+        clean_size,
+        eviction,
+        async_s=async_cache_base,
+        report_buffer=report_buffer,
+    )
@@ -0,0 +1,303 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from gptcache.manager.data_manager import DataManager
+from gptcache.manager.scalar_data.base import CacheData
+from gptcache.utils.log import gptcache_log
+
+# the operations which change the files of the local stores, so the writer flushes the stores after them
+_FILE_WRITES = ("import_data", "add_session", "delete_session", "expire_sessions")
+
+
+class ReplicaDataManager(DataManager):
+    """ReplicaDataManager serves the reads of a worker process from its own copy of the stores, and sends the writes
+    to the single writer process through a queue, so several processes can share the local stores, such as
+    sqlite and faiss, without writing the same files.
+
+    The writer flushes the stores and increases the shared generation after the writes, and a background thread of
+    the replica loads the stores again when the generation changes, so the writes are visible to the replicas after
+    the next flush. The shared lock is held by the writer when it flushes and by the replica when it loads,
+    so a replica never reads a half-written file.
+
+    :param loader: the function which creates the data manager of the stores, like `manager_factory` with the config
+                   of the writer, and with `record_last_access=False` in the `scalar_params`, so the replica
+                   doesn't write the last access time of its hits, the writer records them.
+    :type loader: Callable[[], DataManager]
+    :param writes: the queue of the writes, it is consumed by :class:`ReplicaWriter`.
+    :type writes: multiprocessing.Queue
+    :param name: the name of the cache, the writer applies the writes to the cache of the same name.
+    :type name: str
+    :param generation: the shared generation of the flushes, like `multiprocessing.Value("q", 0)`.
+    :type generation: multiprocessing.Value
+    :param lock: the shared lock of the flushes and the loads.
+    :type lock: multiprocessing.Lock
+    :param reload_interval: the interval in seconds of the generation check, defaults to 1.
+    :type reload_interval: float
+    :param data_manager: the loaded data manager, defaults to None, which means the loader is called.
+    :type data_manager: DataManager
+
+    Example:
+        .. code-block:: python
+
+            import multiprocessing
+            from functools import partial
+
+            from gptcache.manager import manager_factory
+            from gptcache.manager.replica import ReplicaDataManager
+
+            # in the worker process, the queue, the generation and the lock are shared by the writer process
+            cache.data_manager = ReplicaDataManager(
+                partial(
+                    manager_factory,
+                    "sqlite,faiss",
+                    data_dir="gptcache_data",
+                    scalar_params={"record_last_access": False},
+                    vector_params={"dimension": 768},
+                ),
+                writes, "default", generation, lock,
+            )
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], DataManager],
+        writes,
+        name: str,
+        generation,
+        lock,
+        reload_interval: float = 1.0,
+        data_manager: Optional[DataManager] = None,
+    ):
+        self._loader = loader
+        self._writes = writes
+        self._name = name
+        self._generation = generation
+        self._lock = lock
+        self._reload_interval = reload_interval
+        with self._lock:
+            self._loaded_generation = self._generation.value
+            self._data_manager = data_manager if data_manager is not None else loader()
+        self._stop_event = threading.Event()
+        self._reload_thread = threading.Thread(
+            target=self._reload_loop, name="gptcache-replica-reload", daemon=True
+        )
+        self._reload_thread.start()
+
+    def __getattr__(self, name):
+        # the attributes of the stores, such as `v` and `eviction_manager`, are the ones of the loaded data manager
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._data_manager, name)
+
+    @property
+    def generation(self) -> int:
+        return self._loaded_generation
+
+    def _send(self, op: str, *args):
+        self._writes.put((self._name, op, args))
+
+    def reload(self):
+        """Load the stores again, the old ones are released without a flush, which would overwrite the writes."""
+        with self._lock:
+            generation = self._generation.value
+            data_manager = self._loader()
+        old, self._data_manager = self._data_manager, data_manager
+        self._loaded_generation = generation
+        _release(old)
+
+    def _reload_loop(self):
+        while not self._stop_event.wait(self._reload_interval):
+            if self._generation.value == self._loaded_generation:
+                continue
+            try:
+                self.reload()
+            except Exception:  # pylint: disable=W0703
+                gptcache_log.error("failed to reload the replica of the cache %s", self._name, exc_info=True)
+
+    def save(self, question, answer, embedding_data, **kwargs):
+        session = kwargs.get("session", None)
+        self._send("import_data", [question], [answer], [embedding_data], [session.name if session else None])
+
+    def import_data(
+        self,
+        questions: List[Any],
+        answers: List[Any],
+        embedding_datas: List[Any],
+        session_ids: List[Optional[str]],
+    ):
+        self._send("import_data", list(questions), list(answers), list(embedding_datas), list(session_ids))
+
+    def get_scalar_data(self, res_data, **kwargs) -> Optional[CacheData]:
+        return self._data_manager.get_scalar_data(res_data, **kwargs)
+
+    def batch_get_scalar_data(self, res_datas, **kwargs) -> List[Optional[CacheData]]:
+        return self._data_manager.batch_get_scalar_data(res_datas, **kwargs)
+
+    def hit_cache_callback(self, res_data, **kwargs):
+        # the eviction policy and the last access time of the writer are updated by the hits of all the replicas
+        self._send("hit_cache_callback", res_data)
+
+    def search(self, embedding_data, **kwargs):
+        return self._data_manager.search(embedding_data, **kwargs)
+
+    def batch_search(self, embedding_datas, **kwargs):
+        return self._data_manager.batch_search(embedding_datas, **kwargs)
+
+    def flush(self):
+        self._send("flush")
+
+    def add_session(self, res_data, session_id, pre_embedding_data):
+        self._send("add_session", res_data, session_id, pre_embedding_data)
+
+    def list_sessions(self, session_id=None, key=None):
+        return self._data_manager.list_sessions(session_id, key)
+
+    def delete_session(self, session_id):
+        self._send("delete_session", session_id)
+
+    def expire_sessions(self, max_idle: float) -> List[str]:
+        # the writer knows when the sessions of all the replicas were used, the expired ids aren't sent back
+        self._send("expire_sessions", max_idle)
+        return []
+
+    def report_cache(
+        self,
+        user_question,
+        cache_question,
+        cache_question_id,
+        cache_answer,
+        similarity_value,
+        cache_delta_time,
+    ):
+        self._send(
+            "report_cache",
+            user_question,
+            cache_question,
+            cache_question_id,
+            cache_answer,
+            similarity_value,
+            cache_delta_time,
+        )
+
+    def close(self):
+        self._stop_event.set()
+        self._reload_thread.join()
+        _release(self._data_manager)
+
+
+def _release(data_manager: DataManager):
+    # only the connections of the scalar storage are closed, closing the vector store would write its file,
+    # and the storage of a replica doesn't record the last access time, so closing it doesn't write either
+    storage = getattr(data_manager, "s", None)
+    if storage is None:
+        return
+    try:
+        storage.close()
+    except Exception:  # pylint: disable=W0703
+        gptcache_log.warning("failed to close the scalar storage of the replica", exc_info=True)
+
+
+def _record_access(data_manager: DataManager, res_data):
+    # the replicas don't write the last access time of their hits, so the writer records it in its storage
+    storage = getattr(data_manager, "s", None)
+    if storage is not None:
+        storage.record_access([res_data[1]])
+
+
+class ReplicaWriter:
+    """ReplicaWriter applies the writes of the :class:`ReplicaDataManager` of all the worker processes to the data
+    managers of the writer process, and flushes them at most every `flush_interval` seconds after the writes,
+    then increases the shared generation, so the replicas load the new stores.
+
+    :param data_managers: the data managers of the writer by the name of the cache.
+    :type data_managers: Dict[str, DataManager]
+    :param writes: the queue of the writes.
+    :type writes: multiprocessing.Queue
+    :param generation: the shared generation of the flushes.
+    :type generation: multiprocessing.Value
+    :param lock: the shared lock of the flushes and the loads.
+    :type lock: multiprocessing.Lock
+    :param flush_interval: the min interval in seconds between two flushes, defaults to 1.
+    :type flush_interval: float
+    """
+
+    def __init__(
+        self,
+        data_managers: Dict[str, DataManager],
+        writes,
+        generation,
+        lock,
+        flush_interval: float = 1.0,
+    ):
+        self._data_managers = data_managers
+        self._writes = writes
+        self._generation = generation
+        self._lock = lock
+        self._flush_interval = flush_interval
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self.applied = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="gptcache-replica-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Apply the queued writes, flush the data managers and stop the writer thread."""
+        self._writes.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def flush(self):
+        with self._lock:
+            for data_manager in self._data_managers.values():
+                data_manager.flush()
+            self._generation.value += 1
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def apply(self, name: str, op: str, args):
+        data_manager = self._data_managers.get(name)
+        if data_manager is None:
+            gptcache_log.warning("the write %s of the unknown cache %s is dropped", op, name)
+            return
+        if op == "flush":
+            self._dirty = True
+            self._last_flush = 0.0
+            return
+        getattr(data_manager, op)(*args)
+        if op == "hit_cache_callback":
+            _record_access(data_manager, args[0])
+        self.applied += 1
+        if op in _FILE_WRITES:
+            self._dirty = True
+
+    def run(self):
+        while True:
+            timeout = None
+            if self._dirty:
+                timeout = max(self._last_flush + self._flush_interval - time.monotonic(), 0)
+            try:
+                item = self._writes.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                try:
+                    self.apply(*item)
+                except Exception:  # pylint: disable=W0703
+                    gptcache_log.error("failed to apply the write %s of the cache %s", item[1], item[0], exc_info=True)
+            if self._dirty and time.monotonic() - self._last_flush >= self._flush_interval:
+                self._flush_safely()
+        self._flush_safely()
+
+    def _flush_safely(self):
+        try:
+            self.flush()
+        except Exception:  # pylint: disable=W0703
+            gptcache_log.error("failed to flush the caches of the writer", exc_info=True)
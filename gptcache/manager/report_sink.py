@@ -0,0 +1,270 @@
+import json
+import os
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from gptcache.manager.scalar_data.base import CacheStorage
+from gptcache.utils import import_pyarrow
+from gptcache.utils.error import ParamError
+from gptcache.utils.log import gptcache_log
+
+
+def report_row(
+    user_question,
+    cache_question,
+    cache_question_id,
+    cache_answer,
+    similarity_value,
+    cache_delta_time,
+) -> Dict:
+    """Build the report row of a cache hit, the keys are the columns of the report table."""
+    return {
+        "user_question": user_question,
+        "cache_question": cache_question,
+        "cache_question_id": cache_question_id,
+        "cache_answer": cache_answer,
+        "similarity": similarity_value,
+        "cache_delta_time": cache_delta_time,
+        "cache_time": datetime.now(),
+    }
+
+
+class ReportSink(metaclass=ABCMeta):
+    """ReportSink is the destination of the report rows buffered by :class:`ReportBuffer`."""
+
+    @abstractmethod
+    def write(self, rows: List[Dict]):
+        pass
+
+    def close(self):
+        pass
+
+
+class StorageReportSink(ReportSink):
+    """Write the report rows to the report table of the cache storage, with one bulk insert per batch.
+
+    :param storage: the cache storage, it can be generated with :meth:`gptcache.manager.CacheBase`.
+    :type storage: CacheStorage
+    """
+
+    def __init__(self, storage: CacheStorage):
+        self._storage = storage
+
+    def write(self, rows: List[Dict]):
+        self._storage.batch_report_cache(rows)
+
+
+class JsonlReportSink(ReportSink):
+    """Append the report rows to a JSON lines file.
+
+    :param path: the path of the file.
+    :type path: str
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def write(self, rows: List[Dict]):
+        with open(self._path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=_json_default, ensure_ascii=False))
+                f.write("\n")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class ParquetReportSink(ReportSink):
+    """Write every batch of report rows as a parquet file in a directory.
+
+    :param directory: the directory of the parquet files, it is created if it doesn't exist.
+    :type directory: str
+    """
+
+    def __init__(self, directory: str):
+        import_pyarrow()
+        self._directory = directory
+        self._seq = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, rows: List[Dict]):
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+        self._seq += 1
+        path = os.path.join(self._directory, f"report-{time.time_ns()}-{self._seq}.parquet")
+        pq.write_table(pa.Table.from_pylist(rows), path)
+
+
+class ReportBuffer:
+    """ReportBuffer keeps the report rows of the cache hits in a bounded in-memory buffer, and a background thread
+    writes them to the sink in batches, so the hit doesn't wait for the analytics write.
+
+    The buffer is written when it holds `batch_size` rows or every `flush_interval` seconds. When it is full,
+    the `overflow` policy decides what happens to a new row:
+
+        - 'drop_newest': the new row is dropped.
+        - 'drop_oldest': the oldest buffered row is dropped to make room for it.
+        - 'block': the caller waits up to `block_timeout` seconds for room, then the new row is dropped.
+
+    :param sink: the destination of the rows.
+    :type sink: ReportSink
+    :param max_size: the max number of the buffered rows, defaults to 10000.
+    :type max_size: int
+    :param batch_size: the number of the rows which triggers a write, defaults to 1000.
+    :type batch_size: int
+    :param flush_interval: the max interval in seconds between two writes, defaults to 1.0.
+    :type flush_interval: float
+    :param overflow: the policy when the buffer is full, defaults to 'drop_newest'.
+    :type overflow: str
+    :param block_timeout: the max waiting time in seconds of the 'block' policy, None waits until there is room.
+    :type block_timeout: float
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import get_data_manager, CacheBase, VectorBase
+            from gptcache.manager.report_sink import ReportBuffer, StorageReportSink
+
+            cache_base = CacheBase('sqlite')
+            data_manager = get_data_manager(
+                cache_base,
+                VectorBase('faiss', dimension=128),
+                report_buffer=ReportBuffer(StorageReportSink(cache_base)),
+            )
+    """
+
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+
+    def __init__(
+        self,
+        sink: ReportSink,
+        max_size: int = 10000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        overflow: str = DROP_NEWEST,
+        block_timeout: Optional[float] = None,
+    ):
+        if overflow not in (self.DROP_NEWEST, self.DROP_OLDEST, self.BLOCK):
+            raise ParamError(f"Unsupported overflow policy: {overflow}")
+        self._sink = sink
+        self._max_size = max_size
+        self._batch_size = min(batch_size, max_size)
+        self._flush_interval = flush_interval
+        self._overflow = overflow
+        self._block_timeout = block_timeout
+        self._rows = deque()
+        self._cond = threading.Condition()
+        # the background thread and `flush` don't write at the same time, so the rows keep their order
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self.dropped = 0
+        self.written = 0
+        self._thread = threading.Thread(
+            target=self._run, name="gptcache-report-buffer", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, row: Dict) -> bool:
+        """Buffer a report row, return False if it is dropped."""
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if len(self._rows) >= self._max_size:
+                if self._overflow == self.DROP_OLDEST:
+                    self._rows.popleft()
+                    self.dropped += 1
+                elif self._overflow == self.BLOCK:
+                    self._cond.notify_all()
+                    if not self._cond.wait_for(
+                        lambda: len(self._rows) < self._max_size or self._closed,
+                        timeout=self._block_timeout,
+                    ) or self._closed:
+                        self.dropped += 1
+                        return False
+                else:
+                    self.dropped += 1
+                    return False
+            self._rows.append(row)
+            if len(self._rows) >= self._batch_size:
+                self._cond.notify_all()
+            return True
+
+    def report_cache(
+        self,
+        user_question,
+        cache_question,
+        cache_question_id,
+        cache_answer,
+        similarity_value,
+        cache_delta_time,
+    ) -> bool:
+        return self.put(
+            report_row(
+                user_question,
+                cache_question,
+                cache_question_id,
+                cache_answer,
+                similarity_value,
+                cache_delta_time,
+            )
+        )
+
+    def __len__(self):
+        with self._cond:
+            return len(self._rows)
+
+    def _take(self) -> List[Dict]:
+        rows = [self._rows.popleft() for _ in range(min(self._batch_size, len(self._rows)))]
+        self._cond.notify_all()
+        return rows
+
+    def _write(self, rows: List[Dict]):
+        try:
+            self._sink.write(rows)
+            self.written += len(rows)
+        except Exception:  # pylint: disable=W0703
+            self.dropped += len(rows)
+            gptcache_log.error("failed to write %d report rows", len(rows), exc_info=True)
+
+    def flush(self):
+        """Write all the buffered rows in the calling thread."""
+        with self._write_lock:
+            while True:
+                with self._cond:
+                    rows = self._take()
+                if not rows:
+                    return
+                self._write(rows)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._rows) >= self._batch_size,
+                    timeout=self._flush_interval,
+                )
+                if self._closed:
+                    return
+            self.flush()
+
+    def close(self):
+        """Stop the background thread, write the buffered rows and close the sink."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+        self._sink.close()
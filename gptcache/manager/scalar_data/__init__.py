@@ -1,4 +1,4 @@
-__all__ = ["CacheBase"]
+__all__ = ["CacheBase", "AsyncCacheBase"]
 
 from gptcache.utils.lazy_import import LazyImport
 
@@ -12,3 +12,10 @@ def CacheBase(name: str, **kwargs):
        `SQLDataBase` (with `name`, `sql_url` and `table_name` params) to manage SQLite, PostgreSQL, MySQL, MariaDB, SQL Server and Oracle.
     """
     return scalar_manager.CacheBase.get(name, **kwargs)
+
+
+def AsyncCacheBase(name: str, **kwargs):
+    """Generate specific AsyncCacheStorage with the configuration, which serves the awaitable methods of the data manager.
+       It supports SQLite, PostgreSQL, MySQL and MariaDB (with the `sql_url` of an asyncio driver), MongoDB and Redis.
+    """
+    return scalar_manager.AsyncCacheBase.get(name, **kwargs)
@@ -0,0 +1,352 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Optional
+
+import numpy as np
+
+from gptcache.manager.scalar_data.base import (
+    AsyncCacheStorage,
+    CacheData,
+    Question,
+    QuestionDep,
+)
+from gptcache.manager.scalar_data.mongo import (
+    MongoEmbeddedStorage,
+    _embedded_document,
+    _embedded_session_updates,
+    _embedded_sessions_pipeline,
+    _embedded_to_cache_data,
+    _to_session,
+)
+from gptcache.utils import import_motor
+
+import_motor()
+
+# pylint: disable=C0413
+from bson import Binary
+from pymongo import ReturnDocument
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+class AsyncMongoStorage(AsyncCacheStorage):
+    """
+    Using motor to manage mongodb documents without blocking the event loop.
+    The documents and the id counters are the same as the ones of :class:`MongoStorage`,
+    so both of them can work on the same database.
+
+    :param host: mongodb host, default value 'localhost'
+    :type host: str
+    :param port: mongodb port, default value 27017
+    :type host: int
+    :param dbname: database name, default value 'gptcache'
+    :type host: str
+    :param username: username for authentication, default value None
+    :type host: str
+    :param password: password for authentication, default value None
+    :type host: str
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import AsyncCacheBase
+
+            cache_store = AsyncCacheBase('mongo', mongo_host="localhost", mongo_port=27017, dbname="gptcache")
+    """
+
+    # mongoengine keeps the value of every `SequenceField` in this collection
+    COUNTER_COLLECTION = "mongoengine.counters"
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 27017,
+        dbname: str = "gptcache",
+        username: str = None,
+        password: str = None,
+        **kwargs
+    ):
+        self.con = AsyncIOMotorClient(
+            host=host, port=port, username=username, password=password, **kwargs
+        )
+        self._db = self.con[dbname]
+        self._ques = self._db["questions"]
+        self._answer = self._db["answers"]
+        self._ques_dep = self._db["question_deps"]
+        self._session = self._db["sessions"]
+        self._report = self._db["report"]
+        self._counter = self._db[self.COUNTER_COLLECTION]
+
+    async def create(self):
+        await asyncio.gather(
+            self._ques.create_index("deleted"),
+            self._answer.create_index("question_id"),
+            self._ques_dep.create_index("question_id"),
+            self._session.create_index("question_id"),
+            self._session.create_index("session_id"),
+        )
+
+    async def _next_ids(self, collection, count: int) -> List[int]:
+        """Reserve a range of `count` ids of the collection with one round trip."""
+        if count == 0:
+            return []
+        counter = await self._counter.find_one_and_update(
+            {"_id": f"{collection.name}._id"},
+            {"$inc": {"next": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        end = counter["next"]
+        return list(range(end - count + 1, end + 1))
+
+    async def _insert_many(self, collection, docs: List[dict]):
+        if not docs:
+            return
+        for doc, new_id in zip(docs, await self._next_ids(collection, len(docs))):
+            doc["_id"] = new_id
+        await collection.insert_many(docs, ordered=False)
+
+    async def batch_insert(self, all_data: List[CacheData]):
+        ids = await self._next_ids(self._ques, len(all_data))
+        now = datetime.now()
+        questions, answers, deps, sessions = [], [], [], []
+        for q_id, data in zip(ids, all_data):
+            question = data.question if isinstance(data.question, str) else data.question.content
+            questions.append(
+                {
+                    "_id": q_id,
+                    "question": question,
+                    "create_on": now,
+                    "last_access": now,
+                    "embedding_data": Binary(data.embedding_data.tobytes())
+                    if data.embedding_data is not None
+                    else None,
+                    "deleted": 0,
+                }
+            )
+            if isinstance(data.question, Question) and data.question.deps is not None:
+                for dep in data.question.deps:
+                    deps.append(
+                        {
+                            "question_id": q_id,
+                            "dep_name": dep.name,
+                            "dep_data": dep.data,
+                            "dep_type": dep.dep_type,
+                        }
+                    )
+            for answer in data.answers if isinstance(data.answers, list) else [data.answers]:
+                answers.append(
+                    {
+                        "question_id": q_id,
+                        "answer": answer.answer,
+                        "answer_type": int(answer.answer_type),
+                    }
+                )
+            if data.session_id:
+                sessions.append(
+                    {
+                        "question_id": q_id,
+                        "session_id": data.session_id,
+                        "session_question": question,
+                    }
+                )
+        if questions:
+            await self._ques.insert_many(questions, ordered=False)
+        await asyncio.gather(
+            self._insert_many(self._answer, answers),
+            self._insert_many(self._ques_dep, deps),
+            self._insert_many(self._session, sessions),
+        )
+        return ids
+
+    async def get_data_by_id(self, key) -> Optional[CacheData]:
+        # the question is read and its last access time is updated in one round trip,
+        # and its answers, deps and sessions are read concurrently
+        qs, answers, deps, sessions = await asyncio.gather(
+            self._ques.find_one_and_update(
+                {"_id": key, "deleted": 0},
+                {"$set": {"last_access": datetime.now()}},
+                return_document=ReturnDocument.BEFORE,
+            ),
+            self._answer.find({"question_id": key}).to_list(None),
+            self._ques_dep.find({"question_id": key}).to_list(None),
+            self._session.find({"question_id": key}, {"session_id": 1}).to_list(None),
+        )
+        if qs is None:
+            return None
+        res_ans = [(item["answer"], item["answer_type"]) for item in answers]
+        res_deps = [
+            QuestionDep(item["dep_name"], item["dep_data"], item["dep_type"])
+            for item in deps
+        ]
+        return CacheData(
+            question=qs["question"] if not res_deps else Question(qs["question"], res_deps),
+            answers=res_ans,
+            embedding_data=np.frombuffer(qs["embedding_data"], dtype=np.float32),
+            session_id=[item["session_id"] for item in sessions],
+            create_on=qs.get("create_on"),
+            last_access=qs.get("last_access"),
+        )
+
+    async def mark_deleted(self, keys):
+        await self._ques.update_many({"_id": {"$in": list(keys)}}, {"$set": {"deleted": -1}})
+
+    async def clear_deleted_data(self):
+        q_ids = await self.get_ids(deleted=True)
+        await asyncio.gather(
+            self._answer.delete_many({"question_id": {"$in": q_ids}}),
+            self._ques_dep.delete_many({"question_id": {"$in": q_ids}}),
+            self._session.delete_many({"question_id": {"$in": q_ids}}),
+        )
+        await self._ques.delete_many({"_id": {"$in": q_ids}})
+
+    async def get_ids(self, deleted: bool = True):
+        state = -1 if deleted else 0
+        return [
+            doc["_id"] for doc in await self._ques.find({"deleted": state}, {"_id": 1}).to_list(None)
+        ]
+
+    async def count(self, state: int = 0, is_all: bool = False):
+        if is_all:
+            return await self._ques.count_documents({})
+        return await self._ques.count_documents({"deleted": state})
+
+    async def add_session(self, question_id, session_id, session_question):
+        await self._insert_many(
+            self._session,
+            [
+                {
+                    "question_id": question_id,
+                    "session_id": session_id,
+                    "session_question": session_question,
+                }
+            ],
+        )
+
+    async def list_sessions(self, session_id=None, key=None):
+        query = {}
+        if session_id:
+            query["session_id"] = session_id
+        if key:
+            query["question_id"] = key
+        return [
+            SimpleNamespace(
+                id=doc["_id"],
+                question_id=doc.get("question_id"),
+                session_id=doc.get("session_id"),
+                session_question=doc.get("session_question"),
+            )
+            for doc in await self._session.find(query).to_list(None)
+        ]
+
+    async def delete_session(self, keys):
+        await self._session.delete_many({"_id": {"$in": list(keys)}})
+
+    async def report_cache(
+        self,
+        user_question,
+        cache_question,
+        cache_question_id,
+        cache_answer,
+        similarity_value,
+        cache_delta_time,
+    ):
+        await self._insert_many(
+            self._report,
+            [
+                {
+                    "user_question": user_question,
+                    "cache_question": cache_question,
+                    "cache_question_id": cache_question_id,
+                    "cache_answer": cache_answer,
+                    "similarity": similarity_value,
+                    "cache_delta_time": cache_delta_time,
+                    "cache_time": datetime.now(),
+                }
+            ],
+        )
+
+    async def close(self):
+        self.con.close()
+
+
+class AsyncMongoEmbeddedStorage(AsyncMongoStorage):
+    """
+    Using motor to manage the embedded documents of :class:`MongoEmbeddedStorage` without blocking the event loop.
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import AsyncCacheBase
+
+            cache_store = AsyncCacheBase('mongo', mongo_host="localhost", mongo_port=27017, storage_mode="embedded")
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 27017,
+        dbname: str = "gptcache",
+        username: str = None,
+        password: str = None,
+        **kwargs
+    ):
+        super().__init__(host, port, dbname, username, password, **kwargs)
+        self._docs = self._db[MongoEmbeddedStorage.COLLECTION]
+
+    async def create(self):
+        await asyncio.gather(
+            self._docs.create_index("deleted"),
+            self._docs.create_index("sessions.session_id"),
+        )
+
+    async def batch_insert(self, all_data: List[CacheData]):
+        ids = await self._next_ids(self._docs, len(all_data))
+        now = datetime.now()
+        if ids:
+            await self._docs.insert_many(
+                [_embedded_document(q_id, data, now) for q_id, data in zip(ids, all_data)],
+                ordered=False,
+            )
+        return ids
+
+    async def get_data_by_id(self, key) -> Optional[CacheData]:
+        doc = await self._docs.find_one_and_update(
+            {"_id": key, "deleted": 0},
+            {"$set": {"last_access": datetime.now()}},
+            projection={"deleted": False},
+            return_document=ReturnDocument.BEFORE,
+        )
+        return _embedded_to_cache_data(doc) if doc is not None else None
+
+    async def mark_deleted(self, keys):
+        await self._docs.update_many({"_id": {"$in": list(keys)}}, {"$set": {"deleted": -1}})
+
+    async def clear_deleted_data(self):
+        await self._docs.delete_many({"deleted": -1})
+
+    async def get_ids(self, deleted: bool = True):
+        state = -1 if deleted else 0
+        return [
+            doc["_id"] for doc in await self._docs.find({"deleted": state}, {"_id": True}).to_list(None)
+        ]
+
+    async def count(self, state: int = 0, is_all: bool = False):
+        if is_all:
+            return await self._docs.count_documents({})
+        return await self._docs.count_documents({"deleted": state})
+
+    async def add_session(self, question_id, session_id, session_question):
+        await self._docs.update_one(
+            {"_id": question_id},
+            {"$push": {"sessions": {"session_id": session_id, "session_question": session_question}}},
+        )
+
+    async def list_sessions(self, session_id=None, key=None):
+        cursor = self._docs.aggregate(_embedded_sessions_pipeline(session_id, key))
+        return [_to_session(doc) for doc in await cursor.to_list(None)]
+
+    async def delete_session(self, keys):
+        updates = _embedded_session_updates(keys)
+        if updates:
+            await self._docs.bulk_write(updates, ordered=False)
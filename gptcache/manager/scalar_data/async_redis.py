@@ -0,0 +1,214 @@
+from typing import List, Optional
+
+from gptcache.manager.scalar_data.base import AsyncCacheStorage, CacheData
+from gptcache.manager.scalar_data.redis_hash_storage import (
+    _Keys,
+    _decode,
+    _expired_sessions,
+    _get_result_size,
+    _id_range,
+    _queue_add_session,
+    _queue_delete_questions,
+    _queue_delete_sessions,
+    _queue_expire_sessions,
+    _queue_get,
+    _queue_insert,
+    _report_data,
+    _reserve_ids,
+    _to_cache_data,
+    _to_session,
+)
+from gptcache.utils import import_redis
+
+import_redis()
+
+# pylint: disable=C0413
+from redis.asyncio import Redis
+
+
+class AsyncRedisHashCacheStorage(AsyncCacheStorage):
+    """
+    Using redis.asyncio to manage the redis hashes without blocking the event loop.
+    The keys are the same as the ones of :class:`RedisHashCacheStorage`, so both of them can work on the same data.
+
+    :param host: redis host, default value 'localhost'
+    :type host: str
+    :param port: redis port, default value 6379
+    :type port: int
+    :param global_key_prefix: A global prefix for keys against which data is stored.
+    :type global_key_prefix: str
+    :param ttl: Time to live for the questions and their sessions in seconds, default value None
+    :type ttl: int
+    :param url: the redis url, the host and port are ignored if it is set
+    :type url: str
+    :param kwargs: Additional parameters to provide in order to create redis connection
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import AsyncCacheBase
+
+            cache_store = AsyncCacheBase('redis', redis_host="localhost", redis_port=6379, global_key_prefix="gptcache")
+    """
+
+    def __init__(
+            self,
+            global_key_prefix: str = "gptcache",
+            host: str = "localhost",
+            port: int = 6379,
+            ttl: int = None,
+            url: str = None,
+            **kwargs
+    ):
+        kwargs["decode_responses"] = False
+        self.con = Redis.from_url(url, **kwargs) if url else Redis(host=host, port=port, **kwargs)
+        self._keys = _Keys(global_key_prefix)
+        self.default_ttl = ttl
+
+    async def create(self):
+        pass
+
+    async def batch_insert(self, all_data: List[CacheData]):
+        if not all_data:
+            return []
+        session_count = sum(1 for data in all_data if data.session_id)
+        async with self.con.pipeline(transaction=False) as pipe:
+            _reserve_ids(pipe, self._keys, len(all_data), session_count)
+            q_end, s_end = await pipe.execute()
+        ids = _id_range(q_end, len(all_data))
+        async with self.con.pipeline(transaction=False) as pipe:
+            _queue_insert(
+                pipe, self._keys, ids, _id_range(s_end, session_count), all_data, self.default_ttl
+            )
+            await pipe.execute()
+        return ids
+
+    async def get_data_by_id(self, key) -> Optional[CacheData]:
+        return (await self.batch_get_data_by_id([key]))[0]
+
+    async def batch_get_data_by_id(self, keys) -> List[Optional[CacheData]]:
+        async with self.con.pipeline(transaction=False) as pipe:
+            for key in keys:
+                _queue_get(pipe, self._keys, key, self.default_ttl)
+            results = await pipe.execute()
+        size = _get_result_size(self.default_ttl)
+        all_data = [
+            _to_cache_data(results[i * size: (i + 1) * size]) for i in range(len(keys))
+        ]
+        expired = [
+            key for key, result in zip(keys, results[::size]) if result[0] is None
+        ]
+        if expired:
+            async with self.con.pipeline(transaction=False) as pipe:
+                pipe.srem(self._keys.live, *expired)
+                pipe.srem(self._keys.deleted, *expired)
+                pipe.zrem(self._keys.last_access, *expired)
+                await pipe.execute()
+        if self.default_ttl:
+            async with self.con.pipeline(transaction=False) as pipe:
+                if _queue_expire_sessions(pipe, self._keys, results, self.default_ttl):
+                    await pipe.execute()
+        return all_data
+
+    async def mark_deleted(self, keys):
+        async with self.con.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.smove(self._keys.live, self._keys.deleted, key)
+                pipe.hset(self._keys.question(key), "deleted", -1)
+            await pipe.execute()
+
+    async def clear_deleted_data(self):
+        q_ids = await self.get_ids(deleted=True)
+        async with self.con.pipeline(transaction=False) as pipe:
+            for q_id in q_ids:
+                pipe.hkeys(self._keys.question_sessions(q_id))
+            sids = [sid for sids in await pipe.execute() for sid in sids]
+        await self.delete_session(sids)
+        async with self.con.pipeline(transaction=False) as pipe:
+            _queue_delete_questions(pipe, self._keys, q_ids)
+            await pipe.execute()
+
+    async def get_ids(self, deleted=True):
+        key = self._keys.deleted if deleted else self._keys.live
+        return sorted(int(q_id) for q_id in await self.con.smembers(key))
+
+    async def count(self, state: int = 0, is_all: bool = False):
+        if is_all:
+            async with self.con.pipeline(transaction=False) as pipe:
+                pipe.scard(self._keys.live)
+                pipe.scard(self._keys.deleted)
+                return sum(await pipe.execute())
+        return await self.con.scard(self._keys.deleted if state == -1 else self._keys.live)
+
+    async def add_session(self, question_id, session_id, session_question):
+        sid = await self.con.incr(self._keys.session_counter)
+        async with self.con.pipeline(transaction=False) as pipe:
+            _queue_add_session(
+                pipe, self._keys, sid, question_id, session_id, session_question, self.default_ttl
+            )
+            await pipe.execute()
+
+    async def _session_ids(self, session_id=None, key=None):
+        if key:
+            sessions = await self.con.hgetall(self._keys.question_sessions(key))
+            return [
+                sid for sid, value in sessions.items()
+                if not session_id or _decode(value) == session_id
+            ]
+        if session_id:
+            return list(await self.con.smembers(self._keys.session_id(session_id)))
+        return [
+            key.rsplit(b":", 1)[1]
+            async for key in self.con.scan_iter(match=self._keys.session_pattern())
+        ]
+
+    async def _get_sessions(self, sids):
+        async with self.con.pipeline(transaction=False) as pipe:
+            for sid in sids:
+                pipe.hgetall(self._keys.session(_decode(sid)))
+            return await pipe.execute()
+
+    async def list_sessions(self, session_id=None, key=None):
+        sids = sorted(await self._session_ids(session_id, key), key=int)
+        sessions = await self._get_sessions(sids)
+        expired = _expired_sessions(sids, sessions)
+        if session_id and expired:
+            await self.con.srem(self._keys.session_id(session_id), *expired)
+        return [
+            _to_session(sid, values)
+            for sid, values in zip(sids, sessions)
+            if values
+        ]
+
+    async def delete_session(self, keys):
+        sids = [_decode(key) for key in keys]
+        if not sids:
+            return
+        sessions = await self._get_sessions(sids)
+        async with self.con.pipeline(transaction=False) as pipe:
+            _queue_delete_sessions(pipe, self._keys, sids, sessions)
+            await pipe.execute()
+
+    async def report_cache(
+        self,
+        user_question,
+        cache_question,
+        cache_question_id,
+        cache_answer,
+        similarity_value,
+        cache_delta_time,
+    ):
+        await self.con.rpush(
+            self._keys.report,
+            _report_data(
+                user_question,
+                cache_question,
+                cache_question_id,
+                cache_answer,
+                similarity_value,
+                cache_delta_time,
+            ),
+        )
+
+    async def close(self):
+        await self.con.aclose()
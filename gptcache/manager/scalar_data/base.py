@@ -2,7 +2,7 @@ from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from enum import IntEnum
-from typing import Optional, Any, List, Union, Dict
+from typing import Optional, Any, List, Union, Dict, Tuple
 
 import numpy as np
 
@@ -113,6 +113,32 @@ class CacheStorage(metaclass=ABCMeta):
     def get_data_by_id(self, key):
         pass
 
+    def batch_get_data_by_id(self, keys) -> List[Optional[CacheData]]:
+        """Get the data of the keys, the storages with a batch read override it to save round trips."""
+        return [self.get_data_by_id(key) for key in keys]
+
+    def export_data_by_id(self, keys) -> List[Optional[CacheData]]:
+        """Get the data of the keys for a snapshot, the storages which record the access time of the reads
+        override it to read the data without updating it."""
+        return self.batch_get_data_by_id(keys)
+
+    def export_data(self) -> List[Tuple[Any, CacheData]]:
+        """Get the ids and the data of all the live questions for a snapshot. By default the ids are listed first,
+        and their data is read after, so the writes in the meantime may be half in the result, the storages
+        which can read all of them at once override it."""
+        keys = self.get_ids(deleted=False)
+        return [(key, data) for key, data in zip(keys, self.export_data_by_id(keys)) if data is not None]
+
+    def get_lru_ids(self) -> List[Any]:
+        """Get the ids of the live questions, the least recently used first, the eviction policy of the data manager
+        starts with them in this order. By default it is the order of `get_ids`, the storages which keep the
+        access order of the questions override it."""
+        return self.get_ids(deleted=False)
+
+    def record_access(self, keys):
+        """Record the access time of the keys which were hit without being read by this storage, like the hits
+        of the replicas, the storages which record the access time of the reads override it."""
+
     @abstractmethod
     def mark_deleted(self, keys):
         pass
@@ -156,6 +182,85 @@ class CacheStorage(metaclass=ABCMeta):
     ):
         pass
 
+    def batch_report_cache(self, rows: List[Dict]):
+        """Report the rows built by :func:`gptcache.manager.report_sink.report_row`,
+        the storages with a bulk insert override it to save round trips."""
+        for row in rows:
+            self.report_cache(
+                row["user_question"],
+                row["cache_question"],
+                row["cache_question_id"],
+                row["cache_answer"],
+                row["similarity"],
+                row["cache_delta_time"],
+            )
+
     @abstractmethod
     def close(self):
         pass
+
+
+class AsyncCacheStorage(metaclass=ABCMeta):
+    """
+    BaseStorage for scalar data with awaitable methods, the counterpart of :class:`CacheStorage`
+    which doesn't block the event loop.
+    """
+
+    @abstractmethod
+    async def create(self):
+        pass
+
+    @abstractmethod
+    async def batch_insert(self, all_data: List[CacheData]):
+        pass
+
+    @abstractmethod
+    async def get_data_by_id(self, key):
+        pass
+
+    @abstractmethod
+    async def mark_deleted(self, keys):
+        pass
+
+    @abstractmethod
+    async def clear_deleted_data(self):
+        pass
+
+    @abstractmethod
+    async def get_ids(self, deleted=True):
+        pass
+
+    @abstractmethod
+    async def count(self, state: int = 0, is_all: bool = False):
+        pass
+
+    async def flush(self):
+        pass
+
+    @abstractmethod
+    async def add_session(self, question_id, session_id, session_question):
+        pass
+
+    @abstractmethod
+    async def list_sessions(self, session_id, key):
+        pass
+
+    @abstractmethod
+    async def delete_session(self, keys):
+        pass
+
+    @abstractmethod
+    async def report_cache(
+        self,
+        user_question,
+        cache_question,
+        cache_question_id,
+        cache_answer,
+        similarity_value,
+        cache_delta_time,
+    ):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
@@ -1,11 +1,10 @@
-from functools import reduce
 from random import randint, SystemRandom
 from datetime import datetime
+from types import SimpleNamespace
 from typing import List, Optional, Dict
 from decimal import Decimal
 from gptcache.manager.scalar_data.base import CacheStorage, CacheData, Question, QuestionDep, Answer
 from gptcache.utils import import_boto3
-from gptcache.utils.log import gptcache_log
 from concurrent.futures import ThreadPoolExecutor, wait
 import numpy as np
 import math
@@ -34,9 +33,15 @@ class DynamoStorage(CacheStorage):
     :param aws_endpoint_url: AWS endpoint URL. This is normally handled automatically but is exposed to allow overriding for testing purposes
                             (using something like LocalStack or dynamoDB-local for example).
     :type aws_endpoint_url: str
+
+    :param max_workers: The number of threads used to run the independent requests concurrently, such as the queries
+                        of the shards of the 'deleted' GSI and the segments of a parallel scan. Defaults to 10.
+    :type max_workers: int
     """
 
     max_cardinality_suffix = 10
+    scan_segments = 4
+    batch_get_size = 100
 
     def __init__(
         self,
@@ -45,6 +50,7 @@ class DynamoStorage(CacheStorage):
         aws_region_name: str = None,
         aws_profile_name: str = None,
         aws_endpoint_url: str = None,
+        max_workers: int = 10,
     ):
         self._aws_session = AwsSession(
             aws_access_key_id = aws_access_key_id,
@@ -56,6 +62,7 @@ class DynamoStorage(CacheStorage):
             "dynamodb",
             endpoint_url=aws_endpoint_url,
         )
+        self._executor = ThreadPoolExecutor(max_workers = max_workers)
         self.create()
 
     def create(self):
@@ -107,15 +114,19 @@ class DynamoStorage(CacheStorage):
                 BillingMode = recommended_billing_mode,
             )
 
+        # The table handles are kept, so the operations don't wait for the tables or describe them again.
+        self._questions = self._dynamo.Table("gptcache_questions")
+        self._reports = self._dynamo.Table("gptcache_reports")
+        self._questions.wait_until_exists()
+        self._reports.wait_until_exists()
+
     def batch_insert(self, all_data: List[CacheData]) -> List[str]:
         """
         Inserts a list of CacheData objects into the DynamoDB table and returns the ids of the inserted rows
         """
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
         ids = []
 
-        with table.batch_writer() as batch:
+        with self._questions.batch_writer() as batch:
             for item in all_data:
                 item_deps = item.question.deps if isinstance(item.question, Question) and item.question.deps is not None else []
                 new_id_without_prefix = self._generate_id()
@@ -130,7 +141,6 @@ class DynamoStorage(CacheStorage):
                         "question": self._question_text(item.question),
                         "answers": [self._serialize_answer(answer) for answer in item.answers],
                         "deps": [self._serialize_question_deps(dep) for dep in item_deps],
-                        #"session_id": item.session_id if item.session_id is not None else None,
                         "create_on": creation_time.isoformat(timespec="microseconds"),
                         "last_access": item.last_access.isoformat(timespec="microseconds") if item.last_access is not None else None,
                         "embedding_data": DynamoBinary(item.embedding_data.tobytes()) if item.embedding_data is not None else None,
@@ -149,155 +159,104 @@ class DynamoStorage(CacheStorage):
         return ids
 
     def get_data_by_id(self, key: str) -> Optional[CacheData]:
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
-
         key_with_prefix = f"questions#{key}"
 
-        # get all sessions that contain this question
-        sessions_containing_question = table.query(
-            KeyConditionExpression = DynamoKey("pk").eq(key_with_prefix) & DynamoKey("id").begins_with("sessions#"),
-        )["Items"]
-
-        # then get the question info itself
-        response = table.get_item(
-            Key={"pk": key_with_prefix, "id": key_with_prefix},
-        )
-
-        if "Item" not in response or self._deserialize_deleted_value(response["Item"]["deleted"]):
+        # The last_access timestamp is updated by a conditional UpdateItem which returns the item as it was before the
+        # update, so the question is read with the same call. The sessions are queried concurrently.
+        sessions_future = self._executor.submit(self._query_sessions, key_with_prefix)
+        try:
+            response = self._questions.update_item(
+                Key = {"pk": key_with_prefix, "id": key_with_prefix},
+                UpdateExpression = "SET last_access = :last_access",
+                ConditionExpression = DynamoAttr("pk").exists() & DynamoAttr("deleted").begins_with("False_"),
+                ExpressionAttributeValues = {
+                    ":last_access": datetime.utcnow().isoformat(timespec="microseconds"),
+                },
+                ReturnValues = "ALL_OLD",
+            )
+        except self._dynamo.meta.client.exceptions.ConditionalCheckFailedException:
+            sessions_future.cancel()
             return None
 
-        # after it's accessed, we need to update that particular item's last_access timestamp
-        table.update_item(
-            Key={"pk": key_with_prefix, "id": key_with_prefix},
-            UpdateExpression="SET last_access = :last_access",
-            ExpressionAttributeValues={
-                ":last_access": datetime.utcnow().isoformat(timespec="microseconds"),
-            },
-        )
-
-        cache_data = self._response_item_to_cache_data(response["Item"])
-        cache_data.session_id = [session["id"].split("#")[1] for session in sessions_containing_question]
+        cache_data = self._response_item_to_cache_data(response["Attributes"])
+        cache_data.session_id = [session["id"].split("#")[1] for session in sessions_future.result()]
         return cache_data
 
-    def mark_deleted(self, keys: str):
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
+    def batch_get_data_by_id(self, keys: List[str]) -> List[Optional[CacheData]]:
+        """
+        Hydrates several questions at once: the questions are read with BatchGetItem, the sessions of each of them
+        are queried concurrently, and the last_access timestamps are then updated concurrently.
+        """
+        keys_with_prefix = [f"questions#{key}" for key in keys]
+        sessions_futures = [
+            self._executor.submit(self._query_sessions, key_with_prefix) for key_with_prefix in keys_with_prefix
+        ]
+        items = self._batch_get_items(keys_with_prefix)
+
+        all_data = []
+        update_futures = []
+        last_access = datetime.utcnow().isoformat(timespec="microseconds")
+        for key_with_prefix, sessions_future in zip(keys_with_prefix, sessions_futures):
+            item = items.get(key_with_prefix)
+            if item is None or self._deserialize_deleted_value(item["deleted"]):
+                all_data.append(None)
+                continue
+            update_futures.append(self._executor.submit(
+                self._questions.update_item,
+                Key = {"pk": key_with_prefix, "id": key_with_prefix},
+                UpdateExpression = "SET last_access = :last_access",
+                ExpressionAttributeValues = {":last_access": last_access},
+            ))
+            cache_data = self._response_item_to_cache_data(item)
+            cache_data.session_id = [session["id"].split("#")[1] for session in sessions_future.result()]
+            all_data.append(cache_data)
+        wait(update_futures)
+        return all_data
 
-        with table.batch_writer() as batch:
-            for key in keys:
-                batch.put_item(
-                    Item={
-                        "pk": f"questions#{key}",
-                        "id": f"questions#{key}",
-                        "deleted": self._serialize_deleted_value(True),
-                    }
-                )
+    def mark_deleted(self, keys: str):
+        # UpdateItem keeps the rest of the question, a PutItem in the batch writer would replace the whole item.
+        futures = [
+            self._executor.submit(
+                self._questions.update_item,
+                Key = {"pk": f"questions#{key}", "id": f"questions#{key}"},
+                UpdateExpression = "SET deleted = :deleted",
+                ExpressionAttributeValues = {":deleted": self._serialize_deleted_value(True)},
+            )
+            for key in keys
+        ]
+        wait(futures)
 
     def clear_deleted_data(self):
-        # Since the 'deleted' attribute is a string, we need to query for all items that have a 'deleted' value of
-        # 'True_*'. Then we can call delete on them.
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
-
-        # Build out all possible values for the 'deleted' attribute and query it in 1 go. It cannot be done as one
-        # network call unfortunately due to limitations of DynamoDB. The DB only allows running queries on the GSI
-        # with a SINGLE, concrete value for the partition key.
-        #
-        # To address this, we're gonna spin up a thread pool and query concurrently
-        with ThreadPoolExecutor(max_workers = 10) as executor:
-            futures = []
-            for i in range(1, self.max_cardinality_suffix + 1):
-                futures.append(executor.submit(
-                    table.query,
-                    IndexName = "gsi_questions_by_deletion_status",
-                    KeyConditionExpression = DynamoKey("deleted").eq(f"True_{i}")
-                ))
-
-            completed_responses, incomplete_responses = wait(futures, timeout = 10)
-
-            if len(incomplete_responses) > 0:
-                gptcache_log.error(
-                    """
-                    Unable to complete deletion of all soft-deleted items due to request timeout.
-                    Some items may remain in the cache. %s",
-                    """,
-                    incomplete_responses,
-                )
-
-        soft_deleted_entries_per_partition = [response.result()["Items"] for response in completed_responses]
-        soft_deleted_entries = reduce(lambda x, y: x + y, soft_deleted_entries_per_partition)
-
-        keys = [entry["id"] for entry in soft_deleted_entries]
+        # The soft-deleted questions are found by querying every shard of the 'deleted' GSI concurrently, then each
+        # of their partitions, which also holds their sessions, is deleted.
+        keys = [item["pk"] for item in self._query_deleted_shards(True, ProjectionExpression = "pk")]
+        partitions = self._executor.map(
+            lambda key: self._fetch_all_items(
+                self._questions.query,
+                ProjectionExpression = "pk, id",
+                KeyConditionExpression = DynamoKey("pk").eq(key),
+            ),
+            keys,
+        )
 
-        with table.batch_writer() as batch:
-            for key in keys:
-                batch.delete_item(
-                    Key={"pk": key, "id": key},
-                )
+        with self._questions.batch_writer() as batch:
+            for items in partitions:
+                for item in items:
+                    batch.delete_item(
+                        Key={"pk": item["pk"], "id": item["id"]},
+                    )
 
     def get_ids(self, deleted: bool = True) -> List[str]:
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
-
-        def run_scan_operation(last_evaluated_key):
-            filter_expression = (
-                DynamoAttr("id").begins_with("questions#") & DynamoAttr("deleted").begins_with(f"{deleted}_")
-            )
-
-            if last_evaluated_key is None:
-                return table.scan(
-                    Select = "SPECIFIC_ATTRIBUTES",
-                    ProjectionExpression = "pk",
-                    FilterExpression = filter_expression,
-                )
-            return table.scan(
-                Select = "SPECIFIC_ATTRIBUTES",
-                ProjectionExpression = "pk",
-                FilterExpression = filter_expression,
-                ExclusiveStartKey = last_evaluated_key,
-            )
-
-        all_responses = self._fetch_all_pages(run_scan_operation)
-        all_items = reduce(lambda x, y: x + y, [response["Items"] for response in all_responses])
-        all_ids = [int(item["pk"].replace("questions#", "")) for item in all_items]
-        return all_ids
+        items = self._query_deleted_shards(deleted, ProjectionExpression = "pk")
+        return [int(item["pk"].replace("questions#", "")) for item in items]
 
     def count(self, state: int = 0, is_all: bool = False) -> int:
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
-        key_condition_expression = DynamoAttr("id").begins_with("questions#")
-
-        if not is_all and state == 0:
-            key_condition_expression &= DynamoAttr("deleted").begins_with("False_")
-        elif not is_all and state != 0:
-            key_condition_expression &= DynamoAttr("deleted").begins_with("True_")
-
-        # TODO: find out if specifying a "COUNT" select type results in a single page or not. For now, assume the worst
-        #       and attempt pagination anyway.
-        def run_scan_operation(last_evaluated_key):
-            if last_evaluated_key is None:
-                return table.scan(
-                    IndexName = "gsi_questions_by_deletion_status",
-                    FilterExpression = key_condition_expression,
-                    Select = "COUNT",
-                )
-
-            return table.scan(
-                IndexName = "gsi_questions_by_deletion_status",
-                FilterExpression = key_condition_expression,
-                ExclusiveStartKey = last_evaluated_key,
-                Select = "COUNT",
-            )
-
-        all_responses = self._fetch_all_pages(run_scan_operation)
-        return sum([response["Count"] for response in all_responses])
+        if is_all:
+            return self._count_deleted_shards(False) + self._count_deleted_shards(True)
+        return self._count_deleted_shards(state != 0)
 
     def add_session(self, question_id: str, session_id: str, session_question: str):
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
-
-        table.put_item(
+        self._questions.put_item(
             Item = {
                 "pk": f"questions#{question_id}",
                 "id": f"sessions#{session_id}",
@@ -305,86 +264,65 @@ class DynamoStorage(CacheStorage):
             },
         )
 
-    def list_sessions(self, session_id = None, key = None) -> List[str]:
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
-
+    def list_sessions(self, session_id = None, key = None) -> List[SimpleNamespace]:
+        """
+        Lists the session items, one per question of a session. Their `id` is the session id, which is the key of
+        :meth:`delete_session`, since the session items of a session are found by the session id.
+        """
         if session_id and key:
-            response = table.query(
+            items = self._fetch_all_items(
+                self._questions.query,
                 IndexName = "gsi_items_by_type",
-                ProjectionExpression = "id",
+                ProjectionExpression = "pk, id, question",
                 KeyConditionExpression = DynamoKey("id").eq(f"sessions#{session_id}"),
                 FilterExpression = DynamoAttr("pk").eq(f"questions#{key}"),
             )
         elif session_id:
-            response = table.query(
+            items = self._fetch_all_items(
+                self._questions.query,
                 IndexName = "gsi_items_by_type",
-                ProjectionExpression = "id",
+                ProjectionExpression = "pk, id, question",
                 KeyConditionExpression = DynamoKey("id").eq(f"sessions#{session_id}"),
             )
         elif key:
-            response = table.query(
-                ProjectionExpression = "id",
-                KeyConditionExpression = DynamoKey("pk").eq(f"questions#{key}") & DynamoKey("id").begins_with("sessions#"),
-            )
+            items = self._query_sessions(f"questions#{key}", projection = "pk, id, question")
         else:
-            def run_scan_operation(last_evaluated_key):
-                filter_expression = DynamoAttr("id").begins_with("sessions#")
-
-                if last_evaluated_key is None:
-                    return table.scan(
-                        ProjectionExpression = "id",
-                        FilterExpression = filter_expression,
-                    )
-                return table.scan(
-                    ProjectionExpression = "id",
-                    FilterExpression = filter_expression,
-                    ExclusiveStartKey = last_evaluated_key,
-                )
-
-            response = self._fetch_all_pages(run_scan_operation)
-
-            # since these are paginated results, merge all items in each response to a new dict
-            response = reduce(lambda x, y: { "Items": x["Items"] + y["Items"] }, response)
-
-        # since sessions can be the shared across multiple items, we need to dedupe the results
-        return list({ item["id"].replace("questions#", "") for item in response["Items"] })
+            items = self._parallel_scan(
+                ProjectionExpression = "pk, id, question",
+                FilterExpression = DynamoAttr("id").begins_with("sessions#"),
+            )
+        return [self._item_to_session(item) for item in items]
+
+    @staticmethod
+    def _item_to_session(item: Dict) -> SimpleNamespace:
+        session_id = item["id"].replace("sessions#", "", 1)
+        return SimpleNamespace(
+            id = session_id,
+            question_id = int(item["pk"].replace("questions#", "", 1)),
+            session_id = session_id,
+            session_question = item.get("question"),
+        )
 
     def delete_session(self, keys: List[str]):
-        table = self._dynamo.Table("gptcache_questions")
-        table.wait_until_exists()
-
-        # first find all items with that session_id
-        # unfortunately, there is no "batch get" operation on a GSI. So we need to spin up a thread pool and query
-        # concurrently
-        with ThreadPoolExecutor(max_workers = 10) as executor:
-            futures = []
-            for key in keys:
-                futures.append(executor.submit(
-                    table.query,
-                    IndexName = "gsi_items_by_type",
-                    Select = "SPECIFIC_ATTRIBUTES",
-                    ProjectionExpression = "pk, id",
-                    KeyConditionExpression = DynamoKey("id").eq(f"sessions#{key}")
-                ))
-
-            completed_responses, incomplete_responses = wait(futures, timeout = 10)
-
-            if len(incomplete_responses) > 0:
-                gptcache_log.error(
-                    "Unable to query all questions in session due to request timeout. %s",
-                    incomplete_responses,
-                )
-
-        items_per_session = [response.result()["Items"] for response in completed_responses]
-        all_relevant_items = reduce(lambda x, y: x + y, items_per_session)
+        # first find all items with that session_id, the keys are deduped since a session can have many questions.
+        # unfortunately, there is no "batch get" operation on a GSI. So we query concurrently
+        items_per_session = self._executor.map(
+            lambda key: self._fetch_all_items(
+                self._questions.query,
+                IndexName = "gsi_items_by_type",
+                ProjectionExpression = "pk, id",
+                KeyConditionExpression = DynamoKey("id").eq(f"sessions#{key}"),
+            ),
+            set(keys),
+        )
 
         # now we need to delete all items with those keys to clear out all session data.
-        with table.batch_writer() as batch:
-            for item in all_relevant_items:
-                batch.delete_item(
-                    Key={"pk": item["pk"], "id": item["id"]},
-                )
+        with self._questions.batch_writer() as batch:
+            for items in items_per_session:
+                for item in items:
+                    batch.delete_item(
+                        Key={"pk": item["pk"], "id": item["id"]},
+                    )
 
     def report_cache(
         self,
@@ -395,10 +333,7 @@ class DynamoStorage(CacheStorage):
         similarity_value,
         cache_delta_time,
     ):
-        table = self._dynamo.Table("gptcache_reports")
-        table.wait_until_exists()
-
-        table.put_item(
+        self._reports.put_item(
             Item={
                 "id": str(self._generate_id()),
                 "user_question": user_question,
@@ -416,7 +351,87 @@ class DynamoStorage(CacheStorage):
         )
 
     def close(self):
-        pass
+        self._executor.shutdown(wait = True)
+
+    def _query_sessions(self, key_with_prefix: str, projection: str = "id") -> List[Dict]:
+        return self._fetch_all_items(
+            self._questions.query,
+            ProjectionExpression = projection,
+            KeyConditionExpression = DynamoKey("pk").eq(key_with_prefix) & DynamoKey("id").begins_with("sessions#"),
+        )
+
+    def _batch_get_items(self, keys_with_prefix: List[str]) -> Dict[str, Dict]:
+        """
+        Reads the question items with BatchGetItem, which takes at most `batch_get_size` keys per request and may
+        return some of them as unprocessed, so those are requested again.
+        """
+        items = {}
+        unique_keys = list(dict.fromkeys(keys_with_prefix))
+        for i in range(0, len(unique_keys), self.batch_get_size):
+            request_items = {
+                "gptcache_questions": {
+                    "Keys": [{"pk": key, "id": key} for key in unique_keys[i: i + self.batch_get_size]],
+                }
+            }
+            while request_items:
+                response = self._dynamo.batch_get_item(RequestItems = request_items)
+                for item in response["Responses"].get("gptcache_questions", []):
+                    items[item["pk"]] = item
+                request_items = response.get("UnprocessedKeys")
+        return items
+
+    def _query_deleted_shards(self, deleted: bool, **kwargs) -> List[Dict]:
+        """
+        Queries every shard of the 'deleted' GSI concurrently. A GSI query only accepts one concrete partition key, so
+        there is one (paginated) query per suffix of the sharded 'deleted' value.
+        """
+        shards = self._executor.map(
+            lambda i: self._fetch_all_items(
+                self._questions.query,
+                IndexName = "gsi_questions_by_deletion_status",
+                KeyConditionExpression = DynamoKey("deleted").eq(f"{deleted}_{i}"),
+                **kwargs,
+            ),
+            range(1, self.max_cardinality_suffix + 1),
+        )
+        return [item for items in shards for item in items]
+
+    def _count_deleted_shards(self, deleted: bool) -> int:
+        responses = self._executor.map(
+            lambda i: self._fetch_all_pages(
+                lambda last_evaluated_key: self._questions.query(
+                    IndexName = "gsi_questions_by_deletion_status",
+                    KeyConditionExpression = DynamoKey("deleted").eq(f"{deleted}_{i}"),
+                    Select = "COUNT",
+                    **({"ExclusiveStartKey": last_evaluated_key} if last_evaluated_key else {}),
+                )
+            ),
+            range(1, self.max_cardinality_suffix + 1),
+        )
+        return sum(response["Count"] for pages in responses for response in pages)
+
+    def _parallel_scan(self, **kwargs) -> List[Dict]:
+        """
+        Scans the questions table in `scan_segments` segments concurrently. It is only used by maintenance operations.
+        """
+        segments = self._executor.map(
+            lambda segment: self._fetch_all_items(
+                self._questions.scan,
+                Segment = segment,
+                TotalSegments = self.scan_segments,
+                **kwargs,
+            ),
+            range(self.scan_segments),
+        )
+        return [item for items in segments for item in items]
+
+    def _fetch_all_items(self, operation, **kwargs) -> List[Dict]:
+        def run_operation(last_evaluated_key):
+            if last_evaluated_key is None:
+                return operation(**kwargs)
+            return operation(ExclusiveStartKey = last_evaluated_key, **kwargs)
+
+        return [item for response in self._fetch_all_pages(run_operation) for item in response["Items"]]
 
     def _does_table_already_exist_and_is_active(self, table_name: str) -> bool:
         try:
@@ -425,15 +440,6 @@ class DynamoStorage(CacheStorage):
             return False
         return True
 
-    def _wait_until_table_exists(self, table_name: str):
-        """
-        When tables are created in DynamoDB, they are not immediately available as table creation is asynchronous.
-        This function will block until the table is available in order to ensure we don't attempt to perform any
-        operations on a table that doesn't exist yet.
-        """
-        self._dynamo.Table(table_name).wait_until_exists()
-
-
     def _response_item_to_cache_data(self, question_resp: Dict) -> Optional[CacheData]:
         deps = question_resp["deps"] if "deps" in question_resp else []
         return CacheData(
@@ -493,15 +499,18 @@ class DynamoStorage(CacheStorage):
                 sanitized[k] = v
         return sanitized
 
-    def _serialize_deleted_value(self, value: bool, suffix_value = randint(1, max_cardinality_suffix)) -> str:
+    def _serialize_deleted_value(self, value: bool, suffix_value: int = None) -> str:
         """
         We need to be able to query and filter on the 'deleted' attribute. However, in order for us to use this value
         as an indexable value, it cannot be a BOOL (DynamoDB doesn't support it due to low cardinaility).
 
-        To increase the cardinality, we first convert the boolean to a string and append a random integer.
+        To increase the cardinality, we first convert the boolean to a string and append a random integer. The integer
+        is drawn for every item, so the items are spread across the shards of the GSI.
 
         see: https://aws.amazon.com/blogs/database/how-to-design-amazon-dynamodb-global-secondary-indexes/
         """
+        if suffix_value is None:
+            suffix_value = randint(1, self.max_cardinality_suffix)
         return f"{value}_{suffix_value}"
 
     def _serialize_answer(self, answer: Answer) -> Dict:
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import List, NamedTuple, Optional
 
 import numpy as np
 
@@ -17,6 +18,8 @@ import_mongodb()
 from mongoengine import Document
 from mongoengine import fields
 import mongoengine as me
+from bson import Binary
+from pymongo import ASCENDING, ReplaceOne, ReturnDocument, UpdateMany
 
 
 def get_models():
@@ -57,7 +60,7 @@ def get_models():
         session collection
         """
 
-        meta = {"collection": "sessions", "indexes": ["question_id"]}
+        meta = {"collection": "sessions", "indexes": ["question_id", "session_id"]}
         _id = fields.SequenceField()
         session_id = fields.StringField()
         session_question = fields.StringField()
@@ -245,7 +248,7 @@ class MongoStorage(CacheStorage):
         qs.save()
         answers = self._answer.objects(question_id=qs.oid)
         deps = self._ques_dep.objects(question_id=qs.oid)
-        session_ids = self._session.objects(question_id=qs.oid)
+        session_ids = [item.session_id for item in self._session.objects(question_id=qs.oid)]
 
         res_ans = [(item.answer, item.answer_type) for item in answers]
         res_deps = [
@@ -295,10 +298,19 @@ class MongoStorage(CacheStorage):
         if key:
             query["question_id"] = key
 
-        return self._session.objects(__raw__=query)
+        # the ids of the sessions are the ones of their documents, the data manager deletes a session by them
+        return [
+            SimpleNamespace(
+                id=session.oid,
+                question_id=session.question_id,
+                session_id=session.session_id,
+                session_question=session.session_question,
+            )
+            for session in self._session.objects(__raw__=query)
+        ]
 
     def delete_session(self, keys):
-        self._session.objects(question_id__in=keys).delete()
+        self._session.objects(_id__in=list(keys)).delete()
 
     def count_answers(self):
         return self._answer.objects.count()
@@ -325,3 +337,307 @@ class MongoStorage(CacheStorage):
     def close(self):
         me.disconnect()
         self.con.close()
+
+
+def _embedded_document(q_id, data: CacheData, now: datetime) -> dict:
+    question = data.question if isinstance(data.question, str) else data.question.content
+    deps = (
+        data.question.deps
+        if isinstance(data.question, Question) and data.question.deps is not None
+        else []
+    )
+    answers = data.answers if isinstance(data.answers, list) else [data.answers]
+    return {
+        "_id": q_id,
+        "question": question,
+        "answers": [
+            {"answer": ans.answer, "answer_type": int(ans.answer_type)} for ans in answers
+        ],
+        "deps": [
+            {"dep_name": dep.name, "dep_data": dep.data, "dep_type": int(dep.dep_type)}
+            for dep in deps
+        ],
+        "sessions": [{"session_id": data.session_id, "session_question": question}]
+        if data.session_id
+        else [],
+        "create_on": now,
+        "last_access": now,
+        "embedding_data": Binary(data.embedding_data.astype(np.float32).tobytes())
+        if data.embedding_data is not None
+        else None,
+        "deleted": 0,
+    }
+
+
+def _embedded_to_cache_data(doc: dict) -> CacheData:
+    res_deps = [
+        QuestionDep(item["dep_name"], item["dep_data"], item["dep_type"])
+        for item in doc["deps"]
+    ]
+    return CacheData(
+        question=doc["question"] if not res_deps else Question(doc["question"], res_deps),
+        answers=[(item["answer"], item["answer_type"]) for item in doc["answers"]],
+        embedding_data=np.frombuffer(doc["embedding_data"], dtype=np.float32)
+        if doc["embedding_data"] is not None
+        else None,
+        session_id=[item["session_id"] for item in doc["sessions"]],
+        create_on=doc["create_on"],
+        last_access=doc["last_access"],
+    )
+
+
+def _embedded_sessions_pipeline(session_id=None, key=None) -> List[dict]:
+    match = {}
+    if session_id:
+        match["sessions.session_id"] = session_id
+    if key:
+        match["_id"] = key
+    pipeline = [{"$match": match}, {"$unwind": "$sessions"}]
+    if session_id:
+        pipeline.append({"$match": {"sessions.session_id": session_id}})
+    pipeline.append(
+        {"$project": {"session_id": "$sessions.session_id", "session_question": "$sessions.session_question"}}
+    )
+    return pipeline
+
+
+class _SessionKey(NamedTuple):
+    """The id of a session embedded in a question, a question may have many sessions."""
+
+    question_id: int
+    session_id: str
+
+
+def _to_session(doc: dict):
+    return SimpleNamespace(
+        id=_SessionKey(doc["_id"], doc["session_id"]),
+        question_id=doc["_id"],
+        session_id=doc["session_id"],
+        session_question=doc["session_question"],
+    )
+
+
+def _embedded_session_updates(keys) -> List[UpdateMany]:
+    # the session keys pull their own sessions, and the question ids clear all the sessions of the questions
+    question_ids, sessions = [], {}
+    for key in keys:
+        if isinstance(key, _SessionKey):
+            sessions.setdefault(key.session_id, []).append(key.question_id)
+        else:
+            question_ids.append(key)
+    updates = [
+        UpdateMany({"_id": {"$in": q_ids}}, {"$pull": {"sessions": {"session_id": session_id}}})
+        for session_id, q_ids in sessions.items()
+    ]
+    if question_ids:
+        updates.append(UpdateMany({"_id": {"$in": question_ids}}, {"$set": {"sessions": []}}))
+    return updates
+
+
+class MongoEmbeddedStorage(MongoStorage):
+    """
+    Using one mongodb document per question, with its answers, deps and sessions embedded in it.
+    The documents are stored in the 'cache_data' collection, so a hit is a single `find_one_and_update`,
+    which reads the question and updates its last access time, instead of four queries and a save.
+
+    The ids are reserved in the mongoengine counters, so :meth:`migrate` can copy the questions of
+    :class:`MongoStorage` with their ids, and the vector store keeps working.
+
+    :param host: mongodb host, default value 'localhost'
+    :type host: str
+    :param port: mongodb port, default value 27017
+    :type host: int
+    :param dbname: database name, default value 'gptcache'
+    :type host: str
+    :param username: username for authentication, default value None
+    :type host: str
+    :param password: password for authentication, default value None
+    :type host: str
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import CacheBase
+
+            cache_store = CacheBase('mongo', mongo_host="localhost", mongo_port=27017, storage_mode="embedded")
+            # copy the data of the collections of `MongoStorage`
+            cache_store.migrate()
+    """
+
+    COLLECTION = "cache_data"
+    COUNTER_COLLECTION = "mongoengine.counters"
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 27017,
+        dbname: str = "gptcache",
+        username: str = None,
+        password: str = None,
+        **kwargs
+    ):
+        super().__init__(host, port, dbname, username, password, **kwargs)
+        self._db = self.con[dbname]
+        self._docs = self._db[self.COLLECTION]
+        self._counter = self._db[self.COUNTER_COLLECTION]
+        self.create()
+
+    def create(self):
+        self._docs.create_index("deleted")
+        self._docs.create_index("sessions.session_id")
+
+    def _next_ids(self, count: int) -> List[int]:
+        if count == 0:
+            return []
+        counter = self._counter.find_one_and_update(
+            {"_id": f"{self.COLLECTION}._id"},
+            {"$inc": {"next": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        end = counter["next"]
+        return list(range(end - count + 1, end + 1))
+
+    def batch_insert(self, all_data: List[CacheData]):
+        ids = self._next_ids(len(all_data))
+        now = datetime.now()
+        if ids:
+            self._docs.insert_many(
+                [_embedded_document(q_id, data, now) for q_id, data in zip(ids, all_data)],
+                ordered=False,
+            )
+        return ids
+
+    def get_data_by_id(self, key) -> Optional[CacheData]:
+        doc = self._docs.find_one_and_update(
+            {"_id": key, "deleted": 0},
+            {"$set": {"last_access": datetime.now()}},
+            projection={"deleted": False},
+            return_document=ReturnDocument.BEFORE,
+        )
+        return _embedded_to_cache_data(doc) if doc is not None else None
+
+    def batch_get_data_by_id(self, keys) -> List[Optional[CacheData]]:
+        docs = {
+            doc["_id"]: doc
+            for doc in self._docs.find({"_id": {"$in": list(keys)}, "deleted": 0}, {"deleted": False})
+        }
+        if docs:
+            self._docs.update_many(
+                {"_id": {"$in": list(docs)}}, {"$set": {"last_access": datetime.now()}}
+            )
+        return [
+            _embedded_to_cache_data(docs[key]) if key in docs else None for key in keys
+        ]
+
+    def mark_deleted(self, keys):
+        self._docs.update_many({"_id": {"$in": list(keys)}}, {"$set": {"deleted": -1}})
+
+    def clear_deleted_data(self):
+        self._docs.delete_many({"deleted": -1})
+
+    def get_ids(self, deleted: bool = True):
+        state = -1 if deleted else 0
+        return [doc["_id"] for doc in self._docs.find({"deleted": state}, {"_id": True})]
+
+    def count(self, state: int = 0, is_all: bool = False):
+        if is_all:
+            return self._docs.count_documents({})
+        return self._docs.count_documents({"deleted": state})
+
+    def add_session(self, question_id, session_id, session_question):
+        self._docs.update_one(
+            {"_id": question_id},
+            {"$push": {"sessions": {"session_id": session_id, "session_question": session_question}}},
+        )
+
+    def list_sessions(self, session_id=None, key=None):
+        return [
+            _to_session(doc)
+            for doc in self._docs.aggregate(_embedded_sessions_pipeline(session_id, key))
+        ]
+
+    def delete_session(self, keys):
+        updates = _embedded_session_updates(keys)
+        if updates:
+            self._docs.bulk_write(updates, ordered=False)
+
+    def count_answers(self):
+        result = list(
+            self._docs.aggregate(
+                [{"$group": {"_id": None, "count": {"$sum": {"$size": "$answers"}}}}]
+            )
+        )
+        return result[0]["count"] if result else 0
+
+    def migrate(self, batch_size: int = 1000) -> int:
+        """
+        Copy the questions of the collections of :class:`MongoStorage` to the embedded documents, with their ids.
+        The copy is an upsert by id, so an interrupted migration can be run again, and the old collections are kept.
+
+        :param batch_size: the number of the questions copied with one `bulk_write`, defaults to 1000.
+        :type batch_size: int
+
+        :return: the number of the copied questions.
+        """
+        # pylint: disable=protected-access
+        questions = self._db[self._ques._get_collection_name()]
+        answers = self._db[self._answer._get_collection_name()]
+        deps = self._db[self._ques_dep._get_collection_name()]
+        sessions = self._db[self._session._get_collection_name()]
+        # pylint: enable=protected-access
+
+        count, max_id = 0, 0
+        batch = []
+        for question in questions.find().sort("_id", ASCENDING).batch_size(batch_size):
+            batch.append(question)
+            if len(batch) == batch_size:
+                max_id = self._migrate_batch(batch, answers, deps, sessions)
+                count += len(batch)
+                batch = []
+        if batch:
+            max_id = self._migrate_batch(batch, answers, deps, sessions)
+            count += len(batch)
+
+        # the new questions get the ids after the copied ones
+        self._counter.update_one(
+            {"_id": f"{self.COLLECTION}._id"}, {"$max": {"next": max_id}}, upsert=True
+        )
+        return count
+
+    def _migrate_batch(self, questions, answers, deps, sessions) -> int:
+        q_ids = [question["_id"] for question in questions]
+        children = {q_id: {"answers": [], "deps": [], "sessions": []} for q_id in q_ids}
+        for answer in answers.find({"question_id": {"$in": q_ids}}).sort("_id", ASCENDING):
+            children[answer["question_id"]]["answers"].append(
+                {"answer": answer["answer"], "answer_type": answer["answer_type"]}
+            )
+        for dep in deps.find({"question_id": {"$in": q_ids}}).sort("_id", ASCENDING):
+            children[dep["question_id"]]["deps"].append(
+                {"dep_name": dep["dep_name"], "dep_data": dep["dep_data"], "dep_type": dep["dep_type"]}
+            )
+        for session in sessions.find({"question_id": {"$in": q_ids}}).sort("_id", ASCENDING):
+            children[session["question_id"]]["sessions"].append(
+                {"session_id": session["session_id"], "session_question": session["session_question"]}
+            )
+
+        self._docs.bulk_write(
+            [
+                ReplaceOne(
+                    {"_id": question["_id"]},
+                    {
+                        "_id": question["_id"],
+                        "question": question.get("question"),
+                        **children[question["_id"]],
+                        "create_on": question.get("create_on"),
+                        "last_access": question.get("last_access"),
+                        "embedding_data": question.get("embedding_data"),
+                        "deleted": question.get("deleted", 0),
+                    },
+                    upsert=True,
+                )
+                for question in questions
+            ],
+            ordered=False,
+        )
+        return q_ids[-1]
@@ -0,0 +1,437 @@
+import datetime
+import json
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+
+import numpy as np
+
+from gptcache.manager.scalar_data.base import (
+    CacheStorage,
+    CacheData,
+    Question,
+    QuestionDep,
+)
+from gptcache.utils import import_redis
+
+import_redis()
+
+# pylint: disable=C0413
+from redis import Redis
+
+
+_QUESTION_FIELDS = ("question", "answers", "deps", "embedding", "create_on", "deleted")
+
+
+class _Keys:
+    """The keys of the hash layout, all of them start with the global key prefix."""
+
+    def __init__(self, prefix: str):
+        self.counter = f"{prefix}:counter"
+        self.session_counter = f"{prefix}:session_counter"
+        self.live = f"{prefix}:ids:live"
+        self.deleted = f"{prefix}:ids:deleted"
+        # the last access time of the questions, it is also the lru order of them
+        self.last_access = f"{prefix}:last_access"
+        self.report = f"{prefix}:report"
+        self._prefix = prefix
+
+    def question(self, key):
+        return f"{self._prefix}:question:{key}"
+
+    def question_sessions(self, key):
+        return f"{self._prefix}:sessions:{key}"
+
+    def session(self, sid):
+        return f"{self._prefix}:session:{sid}"
+
+    def session_id(self, session_id):
+        return f"{self._prefix}:session_id:{session_id}"
+
+    def session_pattern(self):
+        return f"{self._prefix}:session:*"
+
+
+def _from_timestamp(value):
+    return datetime.datetime.fromtimestamp(float(value)) if value is not None else None
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _reserve_ids(pipe, keys: _Keys, count: int, session_count: int):
+    """Queue the `INCRBY` of the counters, the ids of a batch are reserved in one round trip."""
+    pipe.incrby(keys.counter, count)
+    pipe.incrby(keys.session_counter, session_count)
+
+
+def _id_range(end: int, count: int) -> List[int]:
+    return list(range(end - count + 1, end + 1))
+
+
+def _queue_insert(pipe, keys: _Keys, ids, session_ids, all_data: List[CacheData], ttl):
+    now = time.time()
+    sessions = iter(session_ids)
+    for q_id, data in zip(ids, all_data):
+        question = data.question if isinstance(data.question, str) else data.question.content
+        answers = data.answers if isinstance(data.answers, list) else [data.answers]
+        deps = (
+            data.question.deps
+            if isinstance(data.question, Question) and data.question.deps is not None
+            else []
+        )
+        q_key = keys.question(q_id)
+        pipe.hset(
+            q_key,
+            mapping={
+                "question": question,
+                "answers": json.dumps([[ans.answer, int(ans.answer_type)] for ans in answers]),
+                "deps": json.dumps([[dep.name, dep.data, int(dep.dep_type)] for dep in deps]),
+                "embedding": data.embedding_data.astype(np.float32).tobytes()
+                if data.embedding_data is not None
+                else b"",
+                "create_on": now,
+                "deleted": 0,
+            },
+        )
+        pipe.sadd(keys.live, q_id)
+        pipe.zadd(keys.last_access, {q_id: now})
+        if ttl:
+            pipe.expire(q_key, ttl)
+        if data.session_id:
+            _queue_add_session(pipe, keys, next(sessions), q_id, data.session_id, question, ttl)
+
+
+def _queue_add_session(pipe, keys: _Keys, sid, question_id, session_id, session_question, ttl=None):
+    pipe.hset(
+        keys.session(sid),
+        mapping={
+            "question_id": question_id,
+            "session_id": session_id,
+            "session_question": session_question,
+        },
+    )
+    pipe.hset(keys.question_sessions(question_id), sid, session_id)
+    pipe.sadd(keys.session_id(session_id), sid)
+    if ttl:
+        pipe.expire(keys.question_sessions(question_id), ttl)
+        pipe.expire(keys.session(sid), ttl)
+        pipe.expire(keys.session_id(session_id), ttl)
+
+
+def _queue_get(pipe, keys: _Keys, key, ttl):
+    """Queue the reads of a question, and fold its last access time into the `last_access` sorted set."""
+    pipe.hmget(keys.question(key), _QUESTION_FIELDS)
+    pipe.zscore(keys.last_access, key)
+    pipe.zadd(keys.last_access, {key: time.time()}, xx=True)
+    pipe.hgetall(keys.question_sessions(key))
+    if ttl:
+        pipe.expire(keys.question(key), ttl)
+        pipe.expire(keys.question_sessions(key), ttl)
+
+
+def _get_result_size(ttl):
+    return 6 if ttl else 4
+
+
+def _queue_expire_sessions(pipe, keys: _Keys, results, ttl) -> bool:
+    """Queue the expiry of the sessions of the read questions, so the sessions live as long as their questions."""
+    queued = False
+    for sessions in results[3:: _get_result_size(ttl)]:
+        for sid, session_id in sessions.items():
+            pipe.expire(keys.session(_decode(sid)), ttl)
+            pipe.expire(keys.session_id(_decode(session_id)), ttl)
+            queued = True
+    return queued
+
+
+def _expired_sessions(sids, sessions) -> List:
+    return [sid for sid, values in zip(sids, sessions) if not values]
+
+
+def _to_cache_data(results) -> Optional[CacheData]:
+    (question, answers, deps, embedding, create_on, deleted), last_access, _, sessions = results[:4]
+    if question is None or int(deleted) != 0:
+        return None
+    res_deps = [QuestionDep(name, data, dep_type) for name, data, dep_type in json.loads(deps)]
+    question = _decode(question)
+    return CacheData(
+        question=question if not res_deps else Question(question, res_deps),
+        answers=[tuple(ans) for ans in json.loads(answers)],
+        embedding_data=np.frombuffer(embedding, dtype=np.float32) if embedding else None,
+        session_id=[_decode(session_id) for session_id in sessions.values()],
+        create_on=_from_timestamp(create_on),
+        last_access=_from_timestamp(last_access),
+    )
+
+
+def _to_session(sid, values):
+    return SimpleNamespace(
+        id=int(sid),
+        question_id=int(values[b"question_id"]),
+        session_id=_decode(values[b"session_id"]),
+        session_question=_decode(values[b"session_question"]),
+    )
+
+
+def _queue_delete_sessions(pipe, keys: _Keys, sids, sessions):
+    for sid, values in zip(sids, sessions):
+        pipe.delete(keys.session(sid))
+        if values:
+            pipe.hdel(keys.question_sessions(_decode(values[b"question_id"])), sid)
+            pipe.srem(keys.session_id(_decode(values[b"session_id"])), sid)
+
+
+def _queue_delete_questions(pipe, keys: _Keys, q_ids):
+    for q_id in q_ids:
+        pipe.delete(keys.question(q_id), keys.question_sessions(q_id))
+    if q_ids:
+        pipe.srem(keys.deleted, *q_ids)
+        pipe.srem(keys.live, *q_ids)
+        pipe.zrem(keys.last_access, *q_ids)
+
+
+def _report_data(
+    user_question,
+    cache_question,
+    cache_question_id,
+    cache_answer,
+    similarity_value,
+    cache_delta_time,
+):
+    return json.dumps(
+        {
+            "user_question": user_question,
+            "cache_question": cache_question,
+            "cache_question_id": cache_question_id,
+            "cache_answer": cache_answer,
+            "similarity": similarity_value,
+            "cache_delta_time": cache_delta_time,
+            "cache_time": time.time(),
+        }
+    )
+
+
+class RedisHashCacheStorage(CacheStorage):
+    """
+    Using redis hashes to store data in redis cache storage, which is leaner than the redis-om json models
+    of :class:`RedisCacheStorage`.
+
+    A question is one hash with its answers, deps and raw float32 embedding bytes, the ids of a batch are reserved
+    with one `INCRBY`, and every read is one pipeline. The last access time isn't written to the question,
+    it is kept in a sorted set, which is also the lru order of the questions.
+
+    :param host: redis host, default value 'localhost'
+    :type host: str
+    :param port: redis port, default value 6379
+    :type port: int
+    :param global_key_prefix: A global prefix for keys against which data is stored.
+    For example, for a global_key_prefix ='gptcache', the key of a question would look like this:
+    gptcache:question:1
+    :type global_key_prefix: str
+    :param maxmemory: Maximum memory to use for redis cache storage
+    :type maxmemory: str
+    :param policy: Policy to use for eviction, default value 'allkeys-lru'
+    :type policy: str
+    :param ttl: Time to live for the questions and their sessions in seconds, default value None.
+        The ids of the expired questions are removed from the id sets when they are read,
+        and the ids of the expired sessions are removed from the sets of their session ids when they are listed.
+    :type ttl: int
+    :param maxmemory_samples: Number of keys to sample when evicting keys
+    :type maxmemory_samples: int
+    :param url: the redis url, the host and port are ignored if it is set
+    :type url: str
+    :param kwargs: Additional parameters to provide in order to create redis connection
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import CacheBase
+
+            cache_store = CacheBase('redis',
+                redis_host="localhost",
+                redis_port=6379,
+                global_key_prefix="gptcache",
+                storage_mode="hash",
+            )
+    """
+
+    def __init__(
+            self,
+            global_key_prefix: str = "gptcache",
+            host: str = "localhost",
+            port: int = 6379,
+            maxmemory: str = None,
+            policy: str = None,
+            ttl: int = None,
+            maxmemory_samples: int = None,
+            url: str = None,
+            **kwargs
+    ):
+        # the embedding is stored as raw bytes, so the responses are not decoded
+        kwargs["decode_responses"] = False
+        self.con = Redis.from_url(url, **kwargs) if url else Redis(host=host, port=port, **kwargs)
+        self._keys = _Keys(global_key_prefix)
+        self.default_ttl = ttl
+        if maxmemory:
+            self.con.config_set("maxmemory", maxmemory)
+        if policy:
+            self.con.config_set("maxmemory-policy", policy)
+        if maxmemory_samples:
+            self.con.config_set("maxmemory-samples", maxmemory_samples)
+
+    def create(self):
+        pass
+
+    def batch_insert(self, all_data: List[CacheData]):
+        if not all_data:
+            return []
+        session_count = sum(1 for data in all_data if data.session_id)
+        with self.con.pipeline(transaction=False) as pipe:
+            _reserve_ids(pipe, self._keys, len(all_data), session_count)
+            q_end, s_end = pipe.execute()
+        ids = _id_range(q_end, len(all_data))
+        with self.con.pipeline(transaction=False) as pipe:
+            _queue_insert(
+                pipe, self._keys, ids, _id_range(s_end, session_count), all_data, self.default_ttl
+            )
+            pipe.execute()
+        return ids
+
+    def get_data_by_id(self, key) -> Optional[CacheData]:
+        return self.batch_get_data_by_id([key])[0]
+
+    def batch_get_data_by_id(self, keys) -> List[Optional[CacheData]]:
+        """Get the data of the ids with one pipeline."""
+        with self.con.pipeline(transaction=False) as pipe:
+            for key in keys:
+                _queue_get(pipe, self._keys, key, self.default_ttl)
+            results = pipe.execute()
+        size = _get_result_size(self.default_ttl)
+        all_data = [
+            _to_cache_data(results[i * size: (i + 1) * size]) for i in range(len(keys))
+        ]
+        expired = [
+            key for key, result in zip(keys, results[::size]) if result[0] is None
+        ]
+        if expired:
+            self._remove_ids(expired)
+        if self.default_ttl:
+            with self.con.pipeline(transaction=False) as pipe:
+                if _queue_expire_sessions(pipe, self._keys, results, self.default_ttl):
+                    pipe.execute()
+        return all_data
+
+    def _remove_ids(self, keys):
+        with self.con.pipeline(transaction=False) as pipe:
+            pipe.srem(self._keys.live, *keys)
+            pipe.srem(self._keys.deleted, *keys)
+            pipe.zrem(self._keys.last_access, *keys)
+            pipe.execute()
+
+    def mark_deleted(self, keys):
+        with self.con.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.smove(self._keys.live, self._keys.deleted, key)
+                pipe.hset(self._keys.question(key), "deleted", -1)
+            pipe.execute()
+
+    def clear_deleted_data(self):
+        q_ids = self.get_ids(deleted=True)
+        with self.con.pipeline(transaction=False) as pipe:
+            for q_id in q_ids:
+                pipe.hkeys(self._keys.question_sessions(q_id))
+            sids = [sid for sids in pipe.execute() for sid in sids]
+        self.delete_session(sids)
+        with self.con.pipeline(transaction=False) as pipe:
+            _queue_delete_questions(pipe, self._keys, q_ids)
+            pipe.execute()
+
+    def get_ids(self, deleted=True):
+        key = self._keys.deleted if deleted else self._keys.live
+        return sorted(int(q_id) for q_id in self.con.smembers(key))
+
+    def get_lru_ids(self):
+        # the `last_access` sorted set keeps the order of the hits of all the processes
+        with self.con.pipeline(transaction=False) as pipe:
+            pipe.zrange(self._keys.last_access, 0, -1)
+            pipe.smembers(self._keys.live)
+            ordered, live = pipe.execute()
+        live = {int(q_id) for q_id in live}
+        ids = [q_id for q_id in map(int, ordered) if q_id in live]
+        return ids + sorted(live.difference(ids))
+
+    def count(self, state: int = 0, is_all: bool = False):
+        if is_all:
+            with self.con.pipeline(transaction=False) as pipe:
+                pipe.scard(self._keys.live)
+                pipe.scard(self._keys.deleted)
+                return sum(pipe.execute())
+        return self.con.scard(self._keys.deleted if state == -1 else self._keys.live)
+
+    def add_session(self, question_id, session_id, session_question):
+        sid = self.con.incr(self._keys.session_counter)
+        with self.con.pipeline(transaction=False) as pipe:
+            _queue_add_session(
+                pipe, self._keys, sid, question_id, session_id, session_question, self.default_ttl
+            )
+            pipe.execute()
+
+    def _session_ids(self, session_id=None, key=None):
+        if key:
+            sessions = self.con.hgetall(self._keys.question_sessions(key))
+            return [
+                sid for sid, value in sessions.items()
+                if not session_id or _decode(value) == session_id
+            ]
+        if session_id:
+            return list(self.con.smembers(self._keys.session_id(session_id)))
+        return [
+            key.rsplit(b":", 1)[1]
+            for key in self.con.scan_iter(match=self._keys.session_pattern())
+        ]
+
+    def _get_sessions(self, sids):
+        with self.con.pipeline(transaction=False) as pipe:
+            for sid in sids:
+                pipe.hgetall(self._keys.session(_decode(sid)))
+            return pipe.execute()
+
+    def list_sessions(self, session_id=None, key=None):
+        sids = sorted(self._session_ids(session_id, key), key=int)
+        sessions = self._get_sessions(sids)
+        expired = _expired_sessions(sids, sessions)
+        if session_id and expired:
+            self.con.srem(self._keys.session_id(session_id), *expired)
+        return [
+            _to_session(sid, values)
+            for sid, values in zip(sids, sessions)
+            if values
+        ]
+
+    def delete_session(self, keys):
+        sids = [_decode(key) for key in keys]
+        if not sids:
+            return
+        sessions = self._get_sessions(sids)
+        with self.con.pipeline(transaction=False) as pipe:
+            _queue_delete_sessions(pipe, self._keys, sids, sessions)
+            pipe.execute()
+
+    def report_cache(self, user_question, cache_question, cache_question_id, cache_answer, similarity_value,
+                     cache_delta_time):
+        self.con.rpush(
+            self._keys.report,
+            _report_data(
+                user_question,
+                cache_question,
+                cache_question_id,
+                cache_answer,
+                similarity_value,
+                cache_delta_time,
+            ),
+        )
+
+    def close(self):
+        self.con.close()
@@ -1,5 +1,6 @@
+import threading
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 
 import numpy as np
 
@@ -10,12 +11,30 @@ from gptcache.manager.scalar_data.base import (
     QuestionDep,
 )
 from gptcache.utils import import_sqlalchemy
+from gptcache.utils.log import gptcache_log
 
 import_sqlalchemy()
 
 # pylint: disable=C0413
 import sqlalchemy
-from sqlalchemy import func, create_engine, Column, Sequence
+from sqlalchemy import (
+    func,
+    create_engine,
+    event,
+    insert,
+    update,
+    select,
+    union_all,
+    literal,
+    cast,
+    null,
+    bindparam,
+    true,
+    inspect,
+    Column,
+    Index,
+    Sequence,
+)
 from sqlalchemy.types import (
     String,
     DateTime,
@@ -34,6 +53,15 @@ DEFAULT_LEN_DOCT = {
     "dep_data": 3000,
 }
 
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -20000,
+}
+
+_ANSWER_ROW, _DEP_ROW, _SESSION_ROW = 0, 1, 2
+
 
 def _get_table_len(config: Dict, column_alias: str) -> int:
     if config and column_alias in config and config[column_alias] > 0:
@@ -50,7 +78,10 @@ def get_models(table_prefix, db_type, table_len_config):
         """
 
         __tablename__ = table_prefix + "_question"
-        __table_args__ = {"extend_existing": True}
+        __table_args__ = (
+            Index(f"ix_{__tablename__}_deleted", "deleted"),
+            {"extend_existing": True},
+        )
 
         if db_type in ("oracle", "duckdb"):
             question_id_seq = Sequence(f"{__tablename__}_id_seq", start=1)
@@ -72,7 +103,10 @@ def get_models(table_prefix, db_type, table_len_config):
         """
 
         __tablename__ = table_prefix + "_answer"
-        __table_args__ = {"extend_existing": True}
+        __table_args__ = (
+            Index(f"ix_{__tablename__}_question_id", "question_id"),
+            {"extend_existing": True},
+        )
 
         if db_type in ("oracle", "duckdb"):
             answer_id_seq = Sequence(f"{__tablename__}_id_seq")
@@ -91,7 +125,12 @@ def get_models(table_prefix, db_type, table_len_config):
         """
 
         __tablename__ = table_prefix + "_session"
-        __table_args__ = {"extend_existing": True}
+        __table_args__ = (
+            Index(f"ix_{__tablename__}_question_id", "question_id"),
+            # mysql limits the length of an index key
+            Index(f"ix_{__tablename__}_session_id", "session_id", mysql_length=255),
+            {"extend_existing": True},
+        )
 
         if db_type in ("oracle", "duckdb"):
             session_id_seq = Sequence(f"{__tablename__}_id_seq", start=1)
@@ -118,7 +157,10 @@ def get_models(table_prefix, db_type, table_len_config):
         """
 
         __tablename__ = table_prefix + "_question_dep"
-        __table_args__ = {"extend_existing": True}
+        __table_args__ = (
+            Index(f"ix_{__tablename__}_question_id", "question_id"),
+            {"extend_existing": True},
+        )
 
         if db_type in ("oracle", "duckdb"):
             question_dep_id_seq = Sequence(f"{__tablename__}_id_seq", start=1)
@@ -178,6 +220,217 @@ def get_models(table_prefix, db_type, table_len_config):
     return QuestionTable, AnswerTable, QuestionDepTable, SessionTable, ReportTable
 
 
+def _engine_kwargs(
+    pool_size: Optional[int],
+    max_overflow: Optional[int],
+    pool_pre_ping: bool,
+    pool_recycle: Optional[int],
+) -> Dict:
+    engine_kwargs = {"pool_pre_ping": pool_pre_ping}
+    for name, value in (
+        ("pool_size", pool_size),
+        ("max_overflow", max_overflow),
+        ("pool_recycle", pool_recycle),
+    ):
+        if value is not None:
+            engine_kwargs[name] = value
+    return engine_kwargs
+
+
+def _set_sqlite_pragmas(engine, pragmas: Dict):
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _create_tables(bind, models):
+    """Create the tables, and the indexes missing from the tables created by a previous version."""
+    inspector = inspect(bind)
+    existing_tables = [
+        model.__table__ for model in models if inspector.has_table(model.__table__.name)
+    ]
+    for model in models:
+        model.__table__.create(bind=bind, checkfirst=True)
+    for table in existing_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                index.create(bind=bind)
+            except sqlalchemy.exc.DatabaseError as e:
+                # some dialects, such as duckdb, can't reflect the indexes which already exist
+                gptcache_log.debug("Skip creating the index %s: %s", index.name, e)
+
+
+def _question_content(question):
+    return question if isinstance(question, str) else question.content
+
+
+def _question_rows(all_data: List[CacheData]) -> List[Dict]:
+    return [
+        {
+            "question": _question_content(data.question),
+            "embedding_data": data.embedding_data.tobytes()
+            if data.embedding_data is not None
+            else None,
+        }
+        for data in all_data
+    ]
+
+
+def _child_rows(ids: List[int], all_data: List[CacheData]):
+    """Get the answer, dep and session rows of the inserted questions."""
+    all_answers, all_deps, all_sessions = [], [], []
+    for q_id, data in zip(ids, all_data):
+        if isinstance(data.question, Question) and data.question.deps is not None:
+            for dep in data.question.deps:
+                all_deps.append(
+                    {
+                        "question_id": q_id,
+                        "dep_name": dep.name,
+                        "dep_data": dep.data,
+                        "dep_type": dep.dep_type,
+                    }
+                )
+        answers = data.answers if isinstance(data.answers, list) else [data.answers]
+        for answer in answers:
+            all_answers.append(
+                {
+                    "question_id": q_id,
+                    "answer": answer.answer,
+                    "answer_type": int(answer.answer_type),
+                }
+            )
+        if data.session_id:
+            all_sessions.append(
+                {
+                    "question_id": q_id,
+                    "session_id": data.session_id,
+                    "session_question": _question_content(data.question),
+                }
+            )
+    return all_answers, all_deps, all_sessions
+
+
+def _to_cache_data(rows, last_access) -> CacheData:
+    res_ans, res_deps, session_ids = [], [], []
+    for row in rows:
+        if row.kind == _ANSWER_ROW:
+            res_ans.append((row.name, row.type))
+        elif row.kind == _DEP_ROW:
+            res_deps.append(QuestionDep(row.name, row.data, row.type))
+        elif row.kind == _SESSION_ROW:
+            session_ids.append(row.name)
+    qs = rows[0]
+    return CacheData(
+        question=qs.question if not res_deps else Question(qs.question, res_deps),
+        answers=res_ans,
+        embedding_data=np.frombuffer(qs.embedding_data, dtype=np.float32),
+        session_id=session_ids,
+        create_on=qs.create_on,
+        last_access=last_access,
+    )
+
+
+class _Statements:
+    """
+    The statements of the hot and maintenance paths, built once so that their compiled form is reused.
+    """
+
+    def __init__(self, models, bulk_insert: bool):
+        ques_model, answer_model, ques_dep_model, session_model, report_model = models
+        ques, answer = ques_model.__table__, answer_model.__table__
+        ques_dep, session = ques_dep_model.__table__, session_model.__table__
+        self.insert_questions = (
+            insert(ques).returning(ques.c.id, sort_by_parameter_order=True)
+            if bulk_insert
+            else None
+        )
+        self.insert_question = insert(ques)
+        self.insert_answers = insert(answer)
+        self.insert_deps = insert(ques_dep)
+        self.insert_sessions = insert(session)
+        self.insert_report = insert(report_model.__table__)
+        key = bindparam("key")
+        self.get_data = self._build_get_data(ques, answer, ques_dep, session, lambda column: column == key)
+        # the expanding param renders one placeholder per key, so a batch of keys is read by one query
+        keys = bindparam("keys", expanding=True)
+        self.batch_get_data = self._build_get_data(
+            ques, answer, ques_dep, session, lambda column: column.in_(keys)
+        )
+        # all the live questions are read by one statement, which sees a consistent state of the tables
+        self.export_data = self._build_get_data(ques, answer, ques_dep, session, lambda _: true())
+        self.get_ids = select(ques.c.id).where(ques.c.deleted == bindparam("state"))
+        self.count = select(func.count()).select_from(ques).where(
+            ques.c.deleted == bindparam("state")
+        )
+        self.count_all = select(func.count()).select_from(ques)
+        self.list_sessions = select(session)
+        self.list_sessions_by_id = select(session).where(
+            session.c.session_id == bindparam("session_id")
+        )
+        self.list_sessions_by_key = select(session).where(
+            session.c.question_id == bindparam("key")
+        )
+        self.update_last_access = (
+            update(ques)
+            .where(ques.c.id == bindparam("b_id"))
+            .values(last_access=bindparam("b_last_access"))
+        )
+
+    @staticmethod
+    def _build_get_data(ques, answer, ques_dep, session, match):
+        # answers, deps and session ids share the columns of one union, tagged by `kind`
+        children = union_all(
+            select(
+                literal(_ANSWER_ROW).label("kind"),
+                answer.c.question_id,
+                answer.c.answer.label("name"),
+                cast(null(), String).label("data"),
+                answer.c.answer_type.label("type"),
+            ).where(match(answer.c.question_id)),
+            select(
+                literal(_DEP_ROW),
+                ques_dep.c.question_id,
+                ques_dep.c.dep_name,
+                ques_dep.c.dep_data,
+                ques_dep.c.dep_type,
+            ).where(match(ques_dep.c.question_id)),
+            select(
+                literal(_SESSION_ROW),
+                session.c.question_id,
+                session.c.session_id,
+                cast(null(), String),
+                cast(null(), Integer),
+            ).where(match(session.c.question_id)),
+        ).subquery()
+        return (
+            select(
+                ques.c.id,
+                ques.c.question,
+                ques.c.create_on,
+                ques.c.last_access,
+                ques.c.embedding_data,
+                children.c.kind,
+                children.c.name,
+                children.c.data,
+                children.c.type,
+            )
+            .select_from(
+                ques.outerjoin(children, children.c.question_id == ques.c.id)
+            )
+            .where(match(ques.c.id))
+            .where(ques.c.deleted == 0)
+        )
+
+
 class SQLStorage(CacheStorage):
     """
     Using sqlalchemy to manage SQLite, PostgreSQL, MySQL, MariaDB, SQL Server and Oracle.
@@ -196,14 +449,42 @@ class SQLStorage(CacheStorage):
     :type sql_url: str
     :param table_name: the table name for sql database, defaults to 'gptcache'.
     :type table_name: str
+    :param sqlite_pragmas: the pragmas executed on every new sqlite connection, defaults to `SQLITE_PRAGMAS`,
+                           which enables the WAL journal mode. Pass an empty dict to keep the sqlite defaults.
+    :type sqlite_pragmas: dict
+    :param last_access_interval: the interval in seconds to write the buffered last access time of the hit questions,
+                                 defaults to 1.0. None writes it on every hit.
+    :type last_access_interval: float
+    :param record_last_access: write the last access time of the hit questions, defaults to True. The read-only
+                               replicas of the worker processes disable it, their hits are recorded by the writer.
+    :type record_last_access: bool
+    :param pool_size: the number of connections kept in the connection pool, defaults to the sqlalchemy default.
+    :type pool_size: int
+    :param max_overflow: the number of connections allowed beyond `pool_size`, defaults to the sqlalchemy default.
+    :type max_overflow: int
+    :param pool_pre_ping: test the connection for liveness before using it, defaults to False.
+    :type pool_pre_ping: bool
+    :param pool_recycle: recycle the connections older than this number of seconds, defaults to the sqlalchemy default.
+    :type pool_recycle: int
     """
 
+    # the number of the keys read by one query, every key is bound 4 times, which keeps a query under the limits
+    # of the bound params of the older sqlite versions (999) and of the `IN` lists of oracle (1000)
+    read_batch_size = 200
+
     def __init__(
         self,
         db_type: str = "sqlite",
         url: str = "sqlite:///./sqlite.db",
         table_name: str = "gptcache",
         table_len_config=None,
+        sqlite_pragmas: Optional[Dict] = None,
+        last_access_interval: Optional[float] = 1.0,
+        record_last_access: bool = True,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        pool_pre_ping: bool = False,
+        pool_recycle: Optional[int] = None,
     ):
         if table_len_config is None:
             table_len_config = {}
@@ -211,121 +492,174 @@ class SQLStorage(CacheStorage):
         self._ques, self._answer, self._ques_dep, self._session, self._report = get_models(
             table_name, db_type, table_len_config
         )
-        self._engine = create_engine(self._url)
+        self._engine = create_engine(
+            self._url,
+            **_engine_kwargs(pool_size, max_overflow, pool_pre_ping, pool_recycle),
+        )
+        if self._engine.dialect.name == "sqlite":
+            _set_sqlite_pragmas(
+                self._engine, SQLITE_PRAGMAS if sqlite_pragmas is None else sqlite_pragmas
+            )
+        # insert all the questions of a batch with one statement and get back their ids in order,
+        # the dialects without this support fall back to one flush per question
+        self._bulk_insert = getattr(
+            self._engine.dialect,
+            "insert_executemany_returning_sort_by_parameter_order",
+            False,
+        )
         self.Session = sessionmaker(bind=self._engine)  # pylint: disable=invalid-name
         self.create()
 
+        self._stmts = _Statements(
+            (self._ques, self._answer, self._ques_dep, self._session, self._report),
+            self._bulk_insert,
+        )
+        # the last access time of the hit questions is buffered, so that a read doesn't need a write transaction
+        self._last_access = {}
+        self._last_access_lock = threading.Lock()
+        self._last_access_interval = last_access_interval
+        self._record_last_access = record_last_access
+        self._stop_event = threading.Event()
+        self._last_access_thread = None
+        if self._record_last_access and self._last_access_interval is not None:
+            self._last_access_thread = threading.Thread(
+                target=self._last_access_loop, name="gptcache-sql-last-access", daemon=True
+            )
+            self._last_access_thread.start()
+
     def create(self):
-        self._ques.__table__.create(bind=self._engine, checkfirst=True)
-        self._answer.__table__.create(bind=self._engine, checkfirst=True)
-        self._ques_dep.__table__.create(bind=self._engine, checkfirst=True)
-        self._session.__table__.create(bind=self._engine, checkfirst=True)
-        self._report.__table__.create(bind=self._engine, checkfirst=True)
+        _create_tables(
+            self._engine,
+            (self._ques, self._answer, self._ques_dep, self._session, self._report),
+        )
 
     def _insert(self, data: CacheData, session: sqlalchemy.orm.Session) -> Column:
-        ques_data = self._ques(
-            question=data.question
-            if isinstance(data.question, str)
-            else data.question.content,
-            embedding_data=data.embedding_data.tobytes()
-            if data.embedding_data is not None
-            else None,
-        )
+        ques_data = self._ques(**_question_rows([data])[0])
         session.add(ques_data)
         session.flush()
-        if isinstance(data.question, Question) and data.question.deps is not None:
-            all_deps = []
-            for dep in data.question.deps:
-                all_deps.append(
-                    self._ques_dep(
-                        question_id=ques_data.id,
-                        dep_name=dep.name,
-                        dep_data=dep.data,
-                        dep_type=dep.dep_type,
-                    )
-                )
-            session.add_all(all_deps)
-        answers = data.answers if isinstance(data.answers, list) else [data.answers]
-        all_data = []
-        for answer in answers:
-            answer_data = self._answer(
-                question_id=ques_data.id,
-                answer=answer.answer,
-                answer_type=int(answer.answer_type),
-            )
-            all_data.append(answer_data)
-        session.add_all(all_data)
-        if data.session_id:
-            session_data = self._session(
-                question_id=ques_data.id,
-                session_id=data.session_id,
-                session_question=data.question
-                if isinstance(data.question, str)
-                else data.question.content,
-            )
-            session.add(session_data)
+        all_answers, all_deps, all_sessions = _child_rows([ques_data.id], [data])
+        session.add_all([self._ques_dep(**row) for row in all_deps])
+        session.add_all([self._answer(**row) for row in all_answers])
+        session.add_all([self._session(**row) for row in all_sessions])
         return ques_data.id
 
+    def _bulk_insert_all(self, all_data: List[CacheData], session: sqlalchemy.orm.Session) -> List[int]:
+        ids = session.execute(
+            self._stmts.insert_questions, _question_rows(all_data)
+        ).scalars().all()
+        all_answers, all_deps, all_sessions = _child_rows(ids, all_data)
+        for stmt, rows in (
+            (self._stmts.insert_answers, all_answers),
+            (self._stmts.insert_deps, all_deps),
+            (self._stmts.insert_sessions, all_sessions),
+        ):
+            if rows:
+                session.execute(stmt, rows)
+        return list(ids)
+
     def batch_insert(self, all_data: List[CacheData]):
-        ids = []
         with self.Session() as session:
-            for data in all_data:
-                ids.append(self._insert(data, session))
+            if self._bulk_insert and all_data:
+                ids = self._bulk_insert_all(all_data, session)
+            else:
+                ids = [self._insert(data, session) for data in all_data]
             session.commit()
         return ids
 
     def get_data_by_id(self, key: int) -> Optional[CacheData]:
-        with self.Session() as session:
-            qs = (
-                session.query(self._ques)
-                .filter(self._ques.id == key)
-                .filter(self._ques.deleted == 0)
-                .first()
-            )
-            if qs is None:
-                return None
-            last_access = qs.last_access
-            qs.last_access = datetime.now()
-            ans = (
-                session.query(self._answer.answer, self._answer.answer_type)
-                .filter(self._answer.question_id == qs.id)
-                .all()
-            )
-            deps = (
-                session.query(
-                    self._ques_dep.dep_name,
-                    self._ques_dep.dep_data,
-                    self._ques_dep.dep_type,
-                )
-                .filter(self._ques_dep.question_id == qs.id)
-                .all()
+        with self._engine.connect() as conn:
+            rows = conn.execute(self._stmts.get_data, {"key": key}).all()
+        if not rows:
+            return None
+
+        now = datetime.now()
+        with self._last_access_lock:
+            last_access = self._last_access.get(key, rows[0].last_access)
+            if self._record_last_access:
+                self._last_access[key] = now
+        if self._last_access_interval is None:
+            self.flush_last_access()
+        return _to_cache_data(rows, last_access)
+
+    def _read_rows(self, keys, conn=None):
+        """Read the rows of the keys with one query per `read_batch_size` keys, grouped by the question id."""
+        if conn is None:
+            with self._engine.connect() as new_conn:
+                return self._read_rows(keys, new_conn)
+        keys = list(keys)
+        rows_by_id = {}
+        for start in range(0, len(keys), self.read_batch_size):
+            batch = keys[start : start + self.read_batch_size]
+            for row in conn.execute(self._stmts.batch_get_data, {"keys": batch}):
+                rows_by_id.setdefault(row.id, []).append(row)
+        return [rows_by_id.get(key, []) for key in keys]
+
+    def batch_get_data_by_id(self, keys) -> List[Optional[CacheData]]:
+        all_rows = self._read_rows(keys)
+        now = datetime.now()
+        results = []
+        with self._last_access_lock:
+            for key, rows in zip(keys, all_rows):
+                if not rows:
+                    results.append(None)
+                    continue
+                last_access = self._last_access.get(key, rows[0].last_access)
+                if self._record_last_access:
+                    self._last_access[key] = now
+                results.append(_to_cache_data(rows, last_access))
+        if self._last_access_interval is None:
+            self.flush_last_access()
+        return results
+
+    def export_data_by_id(self, keys) -> List[Optional[CacheData]]:
+        all_rows = self._read_rows(keys)
+        with self._last_access_lock:
+            buffered = dict(self._last_access)
+        return [
+            _to_cache_data(rows, buffered.get(key, rows[0].last_access)) if rows else None
+            for key, rows in zip(keys, all_rows)
+        ]
+
+    def export_data(self) -> List[Tuple[int, CacheData]]:
+        rows_by_id = {}
+        with self._engine.connect() as conn:
+            for row in conn.execute(self._stmts.export_data):
+                rows_by_id.setdefault(row.id, []).append(row)
+        with self._last_access_lock:
+            buffered = dict(self._last_access)
+        return [
+            (key, _to_cache_data(rows, buffered.get(key, rows[0].last_access)))
+            for key, rows in rows_by_id.items()
+        ]
+
+    def record_access(self, keys):
+        now = datetime.now()
+        with self._last_access_lock:
+            for key in keys:
+                self._last_access[key] = now
+        if self._last_access_interval is None:
+            self.flush_last_access()
+
+    def flush_last_access(self):
+        """Write the buffered last access time of the hit questions in one batch."""
+        with self._last_access_lock:
+            if not self._last_access:
+                return
+            last_access, self._last_access = self._last_access, {}
+        with self._engine.begin() as conn:
+            conn.execute(
+                self._stmts.update_last_access,
+                [{"b_id": k, "b_last_access": v} for k, v in last_access.items()],
             )
-            session_ids = (
-                session.query(self._session.session_id)
-                .filter(self._session.question_id == qs.id)
-                .all()
-            )
-            res_ans = [(item.answer, item.answer_type) for item in ans]
-            res_deps = [
-                QuestionDep(item.dep_name, item.dep_data, item.dep_type)
-                for item in deps
-            ]
-            session.commit()
 
-            return CacheData(
-                question=qs.question if not deps else Question(qs.question, res_deps),
-                answers=res_ans,
-                embedding_data=np.frombuffer(qs.embedding_data, dtype=np.float32),
-                session_id=session_ids,
-                create_on=qs.create_on,
-                last_access=last_access,
-            )
+    def _last_access_loop(self):
+        while not self._stop_event.wait(self._last_access_interval):
+            self.flush_last_access()
 
     def get_ids(self, deleted=True):
         state = -1 if deleted else 0
-        with self.Session() as session:
-            res = session.query(self._ques.id).filter(self._ques.deleted == state).all()
-            return [item.id for item in res]
+        with self._engine.connect() as conn:
+            return list(conn.execute(self._stmts.get_ids, {"state": state}).scalars())
 
     def mark_deleted(self, keys):
         with self.Session() as session:
@@ -351,14 +685,10 @@ class SQLStorage(CacheStorage):
             session.commit()
 
     def count(self, state: int = 0, is_all: bool = False):
-        with self.Session() as session:
+        with self._engine.connect() as conn:
             if is_all:
-                return session.query(func.count(self._ques.id)).scalar()
-            return (
-                session.query(func.count(self._ques.id))
-                .filter(self._ques.deleted == state)
-                .scalar()
-            )
+                return conn.execute(self._stmts.count_all).scalar()
+            return conn.execute(self._stmts.count, {"state": state}).scalar()
 
     def add_session(self, question_id, session_id, session_question):
         with self.Session() as session:
@@ -376,13 +706,14 @@ class SQLStorage(CacheStorage):
             session.commit()
 
     def list_sessions(self, session_id=None, key=None):
-        with self.Session() as session:
-            query = session.query(self._session)
+        with self._engine.connect() as conn:
             if session_id:
-                query = query.filter(self._session.session_id == session_id)
-            elif key:
-                query = query.filter(self._session.question_id == key)
-            return query.all()
+                return conn.execute(
+                    self._stmts.list_sessions_by_id, {"session_id": session_id}
+                ).all()
+            if key:
+                return conn.execute(self._stmts.list_sessions_by_key, {"key": key}).all()
+            return conn.execute(self._stmts.list_sessions).all()
 
     def report_cache(self, user_question, cache_question, cache_question_id, cache_answer, similarity_value, cache_delta_time):
         with self.Session() as session:
@@ -397,8 +728,21 @@ class SQLStorage(CacheStorage):
             session.add(report_data)
             session.commit()
 
+    def batch_report_cache(self, rows: List[Dict]):
+        if not rows:
+            return
+        with self._engine.begin() as conn:
+            conn.execute(self._stmts.insert_report, rows)
+
+    def flush(self):
+        self.flush_last_access()
+
     def close(self):
-        pass
+        if self._last_access_thread is not None:
+            self._stop_event.set()
+            self._last_access_thread.join()
+            self._last_access_thread = None
+        self.flush_last_access()
 
     def count_answers(self):
         # for UT
@@ -0,0 +1,392 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from gptcache.manager.data_manager import DataManager
+from gptcache.manager.scalar_data.base import Answer, CacheData, DataType, Question, QuestionDep
+from gptcache.utils.error import CacheError, ParamError
+from gptcache.utils.log import gptcache_log
+
+SNAPSHOT_MAGIC = b"GPTCSNAP"
+SNAPSHOT_VERSION = 1
+
+# magic, version and the length of the json manifest
+_PREFIX = struct.Struct("<8sII")
+# the sections start at aligned offsets, so the vectors can be mapped as a numpy array without a copy
+_ALIGN = 64
+_SECTIONS = ("ids", "vectors", "rows", "blobs")
+_DTYPES = ("float32", "float16")
+
+
+def _padding(size: int) -> int:
+    return -size % _ALIGN
+
+
+def _dump_time(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _dump_question(question: Union[str, Question]):
+    if isinstance(question, Question):
+        if not question.deps:
+            return question.content
+        return {
+            "content": question.content,
+            "deps": [[dep.name, dep.data, int(dep.dep_type)] for dep in question.deps],
+        }
+    return question
+
+
+def _load_question(question) -> Union[str, Question]:
+    if isinstance(question, dict):
+        return Question(
+            question["content"], [QuestionDep(name, data, dep_type) for name, data, dep_type in question["deps"]]
+        )
+    return question
+
+
+def _session_ids(session_id) -> List[str]:
+    if not session_id:
+        return []
+    if isinstance(session_id, str):
+        return [session_id]
+    return list(session_id)
+
+
+def _question_content(question) -> str:
+    return question.content if isinstance(question, Question) else question
+
+
+def _collect(data_manager: DataManager) -> List[Tuple[int, CacheData, np.ndarray]]:
+    storage = getattr(data_manager, "s", None)
+    if storage is None:
+        raise CacheError("the snapshot needs a data manager with a scalar storage, such as the one of `manager_factory`")
+    entries = []
+    for key, data in storage.export_data():
+        vector = data.embedding_data
+        if vector is None or vector.size == 0:
+            try:
+                vector = data_manager.v.get_embeddings(key)
+            except NotImplementedError:
+                vector = None
+        if vector is None:
+            gptcache_log.warning("the data %s has no embedding, it is not in the snapshot", key)
+            continue
+        try:
+            key = int(key)
+        except (TypeError, ValueError) as e:
+            raise CacheError(f"the snapshot needs the integer ids of the scalar storage, got {key!r}") from e
+        entries.append((key, data, np.asarray(vector, dtype="float32").reshape(-1)))
+    # the least recently used data comes first, so the import keeps the order of the eviction
+    entries.sort(key=lambda entry: entry[1].last_access or entry[1].create_on or datetime.min)
+    return entries
+
+
+def _encode(data_manager: DataManager, dtype: str) -> Tuple[bytes, List[Any], int]:
+    entries = _collect(data_manager)
+    object_store = getattr(data_manager, "o", None)
+    blobs = bytearray()
+    rows = []
+    for _, data, _ in entries:
+        answers = []
+        for answer in data.answers:
+            value = answer.answer
+            if answer.answer_type != DataType.STR and object_store is not None:
+                value = object_store.get(value)
+            if isinstance(value, (bytes, bytearray)):
+                start = len(blobs)
+                blobs.extend(value)
+                value = {"blob": [start, len(value)]}
+            answers.append([value, int(answer.answer_type)])
+        rows.append(
+            {
+                "question": _dump_question(data.question),
+                "answers": answers,
+                "sessions": _session_ids(data.session_id),
+                "create_on": _dump_time(data.create_on),
+                "last_access": _dump_time(data.last_access),
+            }
+        )
+    dimension = len(entries[0][2]) if entries else 0
+    ids = np.asarray([key for key, _, _ in entries], dtype="<i8")
+    vectors = np.empty((len(entries), dimension), dtype=dtype)
+    for i, (_, _, vector) in enumerate(entries):
+        if len(vector) != dimension:
+            raise CacheError(f"the dimensions of the embeddings are different, {len(vector)} and {dimension}")
+        vectors[i] = vector
+    vectors = vectors.astype(np.dtype(dtype).newbyteorder("<"), copy=False)
+    rows_data = zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"))
+
+    sections, layout, offset = [], {}, 0
+    for name, data in zip(_SECTIONS, (ids.tobytes(), vectors.tobytes(), rows_data, bytes(blobs))):
+        layout[name] = [offset, len(data)]
+        sections.append(data)
+        offset += len(data) + _padding(len(data))
+    manifest = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "count": len(entries),
+            "dimension": dimension,
+            "dtype": dtype,
+            "rows_encoding": "json+zlib",
+            "created": datetime.now().isoformat(),
+            "sections": layout,
+        }
+    ).encode("utf-8")
+    header = _PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(manifest)) + manifest
+    return header + b"\0" * _padding(len(header)), sections, len(entries)
+
+
+def iter_snapshot(data_manager: DataManager, dtype: str = "float32", chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    """Read a snapshot of the cache, and return the chunks of its bytes, which can be streamed over http
+    or written to a file. The data is read from the scalar storage, including the embeddings, so the snapshot
+    doesn't depend on the files of the vector store, which may be written at the same time. The sql storages
+    read all the data with one statement, so the snapshot is consistent with the concurrent writes,
+    the other storages list the ids before reading the data.
+
+    The snapshot is a versioned binary bundle: a manifest, the int64 ids, the vectors as a raw float32 or float16
+    matrix, the zlib compressed json rows of the questions, answers and sessions, and the bytes of the objects.
+    The sections are aligned, so :func:`read_snapshot` maps the vectors of a file without a copy.
+
+    :param data_manager: the data manager with a scalar storage, like the one of `manager_factory`.
+    :type data_manager: DataManager
+    :param dtype: the dtype of the vectors, 'float32' or 'float16', defaults to 'float32'.
+    :type dtype: str
+    :param chunk_size: the max size in bytes of the chunks, defaults to 1MB.
+    :type chunk_size: int
+    :return: the iterator of the bytes of the snapshot.
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import manager_factory
+            from gptcache.manager.snapshot import iter_snapshot
+
+            data_manager = manager_factory("sqlite,faiss", data_dir="gptcache_data", vector_params={"dimension": 768})
+            with open("gptcache.snapshot", "wb") as f:
+                for chunk in iter_snapshot(data_manager, dtype="float16"):
+                    f.write(chunk)
+    """
+    if dtype not in _DTYPES:
+        raise ParamError(f"Unsupported the dtype of the snapshot vectors: {dtype}, the supported ones are {_DTYPES}")
+    header, sections, _ = _encode(data_manager, dtype)
+
+    def _chunks():
+        yield header
+        for data in sections:
+            view = memoryview(data)
+            for start in range(0, len(view), chunk_size):
+                yield bytes(view[start : start + chunk_size])
+            if _padding(len(data)):
+                yield b"\0" * _padding(len(data))
+
+    return _chunks()
+
+
+def write_snapshot(data_manager: DataManager, target: Union[str, BinaryIO], dtype: str = "float32") -> int:
+    """Write a snapshot of the cache to a file, see :func:`iter_snapshot`, the file of a path is replaced
+    once the snapshot is fully written.
+
+    :param data_manager: the data manager with a scalar storage.
+    :type data_manager: DataManager
+    :param target: the path or the binary file object of the snapshot.
+    :type target: str or BinaryIO
+    :param dtype: the dtype of the vectors, 'float32' or 'float16', defaults to 'float32'.
+    :type dtype: str
+    :return: the number of the data in the snapshot.
+    """
+    if dtype not in _DTYPES:
+        raise ParamError(f"Unsupported the dtype of the snapshot vectors: {dtype}, the supported ones are {_DTYPES}")
+    header, sections, count = _encode(data_manager, dtype)
+    if not isinstance(target, (str, os.PathLike)):
+        _write_sections(target, header, sections)
+        return count
+    tmp_path = f"{target}.tmp"
+    with open(tmp_path, "wb") as f:
+        _write_sections(f, header, sections)
+    os.replace(tmp_path, target)
+    return count
+
+
+def _write_sections(f: BinaryIO, header: bytes, sections: List[bytes]):
+    f.write(header)
+    for data in sections:
+        f.write(data)
+        f.write(b"\0" * _padding(len(data)))
+
+
+class Snapshot:
+    """Snapshot reads the sections of a snapshot, it is returned by :func:`read_snapshot`.
+
+    The ids and the vectors are numpy arrays on the buffer of the snapshot, which is a read-only memory map
+    for a file, so they are loaded by the os when they are read.
+    """
+
+    def __init__(self, buffer, manifest: Dict[str, Any], data_offset: int, file: Optional[BinaryIO] = None):
+        self.manifest = manifest
+        self._buffer = buffer
+        self._data_offset = data_offset
+        self._file = file
+        self._rows: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def count(self) -> int:
+        return self.manifest["count"]
+
+    @property
+    def dimension(self) -> int:
+        return self.manifest["dimension"]
+
+    def _section(self, name: str) -> Tuple[int, int]:
+        offset, length = self.manifest["sections"][name]
+        return self._data_offset + offset, length
+
+    @property
+    def ids(self) -> np.ndarray:
+        offset, _ = self._section("ids")
+        return np.frombuffer(self._buffer, dtype="<i8", count=self.count, offset=offset)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        offset, _ = self._section("vectors")
+        dtype = np.dtype(self.manifest["dtype"]).newbyteorder("<")
+        return np.frombuffer(
+            self._buffer, dtype=dtype, count=self.count * self.dimension, offset=offset
+        ).reshape(self.count, self.dimension)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """The json rows of the questions, answers and sessions, in the order of the ids."""
+        if self._rows is None:
+            offset, length = self._section("rows")
+            self._rows = json.loads(zlib.decompress(self._buffer[offset : offset + length]).decode("utf-8"))
+        return self._rows
+
+    def answers(self, row: Dict[str, Any]) -> List[Answer]:
+        blobs_offset, _ = self._section("blobs")
+        answers = []
+        for value, answer_type in row["answers"]:
+            if isinstance(value, dict):
+                start, length = value["blob"]
+                value = bytes(self._buffer[blobs_offset + start : blobs_offset + start + length])
+            answers.append(Answer(value, answer_type))
+        return answers
+
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            self._buffer.close()
+        except BufferError:
+            # the arrays of the snapshot are still used, the map is released with them
+            pass
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def read_snapshot(source: Union[str, bytes, BinaryIO]) -> Snapshot:
+    """Read a snapshot written by :func:`write_snapshot` or :func:`iter_snapshot`.
+
+    :param source: the path, the bytes or the binary file object of the snapshot, a path is mapped in memory,
+                   and a file object is read to the end.
+    :type source: str, bytes or BinaryIO
+    :return: the :class:`Snapshot`, close it to release the file of a path.
+    """
+    file = None
+    if isinstance(source, (str, os.PathLike)):
+        file = open(source, "rb")  # pylint: disable=R1732
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        buffer = source
+    else:
+        buffer = source.read()
+    try:
+        if len(buffer) < _PREFIX.size:
+            raise CacheError("the snapshot is truncated")
+        magic, version, manifest_length = _PREFIX.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise CacheError("the data isn't a gptcache snapshot")
+        if version > SNAPSHOT_VERSION:
+            raise CacheError(f"the version {version} of the snapshot isn't supported, upgrade gptcache to read it")
+        header_length = _PREFIX.size + manifest_length
+        manifest = json.loads(bytes(buffer[_PREFIX.size : header_length]).decode("utf-8"))
+        data_offset = header_length + _padding(header_length)
+        end = max((offset + length for offset, length in manifest["sections"].values()), default=0)
+        if len(buffer) < data_offset + end:
+            raise CacheError("the snapshot is truncated")
+    except Exception:
+        if file is not None:
+            buffer.close()
+            file.close()
+        raise
+    return Snapshot(buffer, manifest, data_offset, file)
+
+
+def import_snapshot(
+    data_manager: DataManager, source: Union[str, bytes, BinaryIO, Snapshot], batch_size: int = 1000
+) -> int:
+    """Import a snapshot to the cache with the embeddings of the snapshot, so the data isn't embedded again.
+    The new data gets the ids of the data manager, and the object answers are put to its object store.
+
+    :param data_manager: the data manager to import the data to.
+    :type data_manager: DataManager
+    :param source: the snapshot, or its path, bytes or binary file object.
+    :type source: str, bytes, BinaryIO or Snapshot
+    :param batch_size: the number of the data imported at once, defaults to 1000.
+    :type batch_size: int
+    :return: the number of the imported data.
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.manager import manager_factory
+            from gptcache.manager.snapshot import import_snapshot
+
+            data_manager = manager_factory("sqlite,faiss", data_dir="new_data", vector_params={"dimension": 768})
+            import_snapshot(data_manager, "gptcache.snapshot")
+    """
+    snapshot = source if isinstance(source, Snapshot) else read_snapshot(source)
+    try:
+        _import_rows(data_manager, snapshot, batch_size)
+        return snapshot.count
+    finally:
+        if snapshot is not source:
+            snapshot.close()
+
+
+def _import_rows(data_manager: DataManager, snapshot: Snapshot, batch_size: int) -> Optional[List[Any]]:
+    """Import the rows of the snapshot, and return the new ids in the order of the rows,
+    or None if the data manager doesn't return them."""
+    rows, vectors = snapshot.rows(), snapshot.vectors
+    new_ids: Optional[List[Any]] = []
+    for start in range(0, snapshot.count, batch_size):
+        batch = rows[start : start + batch_size]
+        questions = [_load_question(row["question"]) for row in batch]
+        sessions = [row["sessions"] for row in batch]
+        ids = data_manager.import_data(
+            questions,
+            [snapshot.answers(row) for row in batch],
+            [np.array(vector, dtype="float32") for vector in vectors[start : start + len(batch)]],
+            [session_ids[0] if session_ids else None for session_ids in sessions],
+        )
+        if ids is None:
+            new_ids = None
+            continue
+        if new_ids is not None:
+            new_ids.extend(ids)
+        # the data managers which return the new ids get the other sessions of the data
+        for new_id, question, session_ids in zip(ids, questions, sessions):
+            for session_id in session_ids[1:]:
+                data_manager.add_session((None, new_id), session_id, _question_content(question))
+    return new_ids
@@ -22,6 +22,10 @@ class VectorBase(ABC):
     def search(self, data: np.ndarray, top_k: int):
         pass
 
+    def mul_search(self, datas: List[np.ndarray], top_k: int = -1) -> List[list]:
+        """Search the vectors, the stores with a batch search override it to search them at once."""
+        return [self.search(data, top_k) or [] for data in datas]
+
     @abstractmethod
     def rebuild(self, ids=None) -> bool:
         pass
@@ -1,4 +1,5 @@
 import os
+import threading
 from typing import List
 
 import numpy as np
@@ -27,6 +28,8 @@ class Faiss(VectorBase):
         self._dimension = dimension
         self._index = faiss.index_factory(self._dimension, "IDMap,Flat", faiss.METRIC_L2)
         self._top_k = top_k
+        # the faiss index can't be searched while it's being changed
+        self._lock = threading.Lock()
         if os.path.isfile(index_file_path):
             self._index = faiss.read_index(index_file_path)
 
@@ -34,7 +37,8 @@ class Faiss(VectorBase):
         data_array, id_array = map(list, zip(*((data.data, data.id) for data in datas)))
         np_data = np.array(data_array).astype("float32")
         ids = np.array(id_array)
-        self._index.add_with_ids(np_data, ids)
+        with self._lock:
+            self._index.add_with_ids(np_data, ids)
 
     def search(self, data: np.ndarray, top_k: int = -1):
         if self._index.ntotal == 0:
@@ -42,19 +46,36 @@ class Faiss(VectorBase):
         if top_k == -1:
             top_k = self._top_k
         np_data = np.array(data).astype("float32").reshape(1, -1)
-        dist, ids = self._index.search(np_data, top_k)
+        with self._lock:
+            dist, ids = self._index.search(np_data, top_k)
         ids = [int(i) for i in ids[0]]
         return list(zip(dist[0], ids))
 
+    def mul_search(self, datas: List[np.ndarray], top_k: int = -1):
+        if self._index.ntotal == 0:
+            return [[] for _ in datas]
+        if top_k == -1:
+            top_k = self._top_k
+        np_data = np.array(datas).astype("float32").reshape(len(datas), -1)
+        with self._lock:
+            dist, ids = self._index.search(np_data, top_k)
+        # faiss pads the results with -1 if there are less than top_k vectors
+        return [
+            [(d, int(i)) for d, i in zip(row_dist, row_ids) if i >= 0]
+            for row_dist, row_ids in zip(dist, ids)
+        ]
+
     def rebuild(self, ids=None):
         return True
 
     def delete(self, ids):
         ids_to_remove = np.array(ids)
-        self._index.remove_ids(faiss.IDSelectorBatch(ids_to_remove.size, faiss.swig_ptr(ids_to_remove)))
+        with self._lock:
+            self._index.remove_ids(faiss.IDSelectorBatch(ids_to_remove.size, faiss.swig_ptr(ids_to_remove)))
 
     def flush(self):
-        faiss.write_index(self._index, self._index_file_path)
+        with self._lock:
+            faiss.write_index(self._index, self._index_file_path)
 
     def close(self):
         self.flush()
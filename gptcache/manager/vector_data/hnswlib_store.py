@@ -51,7 +51,8 @@ class Hnswlib(VectorBase):
         if top_k == -1:
             top_k = self._top_k
         ids, dist = self._index.knn_query(data=np_data, k=top_k)
-        return list(zip(dist[0], ids[0]))
+        # the labels are numpy.uint64, which the sql drivers can't bind
+        return list(zip(dist[0], (int(i) for i in ids[0])))
 
     def rebuild(self, ids):
         all_data = self._index.get_items(ids)
@@ -69,7 +69,8 @@ class USearch(VectorBase):
             top_k = self._top_k
         np_data = np.array(data).astype("float32").reshape(1, -1)
         ids, dist, _ = self._index.search(np_data, top_k)
-        return list(zip(dist[0], ids[0]))
+        # the labels are numpy.uint64, which the sql drivers can't bind
+        return list(zip(dist[0], (int(i) for i in ids[0])))
 
     def rebuild(self, ids=None):
         return True
@@ -0,0 +1,194 @@
+from typing import Dict, List, Optional, Tuple
+
+from gptcache.core import Cache
+from gptcache.utils.log import gptcache_log
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _MetricFamily:
+    """A metric of the prometheus text format, with its samples."""
+
+    def __init__(self, name: str, metric_type: str, documentation: str):
+        self.name = name
+        self.type = metric_type
+        self.documentation = documentation
+        self.samples: List[Tuple[str, Dict[str, str], float]] = []
+
+    def add(self, labels: Dict[str, str], value, suffix: str = ""):
+        self.samples.append((suffix, labels, value))
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, labels, value in self.samples:
+            label_str = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f"{self.name}{suffix}{{{label_str}}} {_format_value(value)}")
+        return lines
+
+
+class CacheMetrics:
+    """CacheMetrics collects the metrics of the registered `Cache` objects, and renders them in the
+    prometheus text format, every metric is labelled by the name of the cache.
+
+    The metrics include the latency histogram and percentiles of every stage, the hits, the misses by reason,
+    the hit ratio, the sizes of the scalar and vector stores, the eviction backlog and the estimated llm tokens
+    saved by the cache hits.
+
+    :param buckets: the upper bounds in seconds of the latency histograms.
+    :type buckets: Tuple[float]
+    :param window: use the latencies of the sliding window of the report instead of the ones since the start,
+                   defaults to False.
+    :type window: bool
+
+    Example:
+        .. code-block:: python
+
+            from gptcache import cache
+            from gptcache.metrics import CacheMetrics
+
+            metrics = CacheMetrics()
+            metrics.register(cache, "default")
+            text = metrics.render()
+    """
+
+    def __init__(self, buckets: Tuple[float] = DEFAULT_BUCKETS, window: bool = False):
+        self._buckets = list(buckets)
+        self._window = window
+        self._caches: Dict[str, Cache] = {}
+
+    def register(self, cache_obj: Cache, name: str = "default"):
+        self._caches[name] = cache_obj
+
+    def unregister(self, name: str):
+        self._caches.pop(name, None)
+
+    def _families(self) -> Dict[str, _MetricFamily]:
+        families = [
+            _MetricFamily(
+                "gptcache_stage_duration_seconds", "histogram", "The latency of the stages of the cache."
+            ),
+            _MetricFamily(
+                "gptcache_stage_latency_seconds", "summary", "The latency percentiles of the stages of the cache."
+            ),
+            _MetricFamily("gptcache_hits_total", "counter", "The count of the cache hits."),
+            _MetricFamily("gptcache_misses_total", "counter", "The count of the cache misses by reason."),
+            _MetricFamily(
+                "gptcache_hit_ratio", "gauge", "The ratio of the cache hits to the cache lookups which are not skipped."
+            ),
+            _MetricFamily(
+                "gptcache_scalar_store_size", "gauge", "The count of the questions in the scalar store by state."
+            ),
+            _MetricFamily("gptcache_vector_store_size", "gauge", "The count of the vectors in the vector store."),
+            _MetricFamily(
+                "gptcache_eviction_backlog",
+                "gauge",
+                "The count of the soft-deleted questions which are waiting to be cleared.",
+            ),
+            _MetricFamily(
+                "gptcache_llm_tokens_saved_total",
+                "counter",
+                "The estimated count of the llm tokens which are not generated because of the cache hits.",
+            ),
+        ]
+        return {family.name: family for family in families}
+
+    def _collect_report(self, families: Dict[str, _MetricFamily], name: str, cache_obj: Cache):
+        report = cache_obj.report
+        for stage in report.STAGES:
+            histogram = getattr(report, f"op_{stage}").histogram
+            labels = {"cache": name, "stage": stage}
+            buckets = histogram.buckets(self._buckets, self._window)
+            duration = families["gptcache_stage_duration_seconds"]
+            for bound, count in zip(self._buckets, buckets["buckets"]):
+                duration.add({**labels, "le": _format_value(bound)}, count, "_bucket")
+            duration.add({**labels, "le": "+Inf"}, buckets["count"], "_bucket")
+            duration.add(labels, buckets["sum"], "_sum")
+            duration.add(labels, buckets["count"], "_count")
+
+            percentiles = histogram.percentiles(self._window)
+            latency = families["gptcache_stage_latency_seconds"]
+            for quantile, key in (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99"), ("1", "max")):
+                latency.add({**labels, "quantile": quantile}, percentiles[key])
+            latency.add(labels, percentiles["average"] * percentiles["count"], "_sum")
+            latency.add(labels, percentiles["count"], "_count")
+
+        hits = report.hint_cache_count
+        # the skipped requests, such as the ones of `gptcache.adapter.api.put`, don't search the cache
+        misses = sum(
+            count for reason, count in report.miss_cache_count.items() if reason != report.MISS_CACHE_SKIP
+        )
+        families["gptcache_hits_total"].add({"cache": name}, hits)
+        for reason, count in report.miss_cache_count.items():
+            families["gptcache_misses_total"].add({"cache": name, "reason": reason}, count)
+        families["gptcache_hit_ratio"].add(
+            {"cache": name}, hits / (hits + misses) if hits + misses else 0.0
+        )
+        families["gptcache_llm_tokens_saved_total"].add({"cache": name}, report.llm_tokens_saved)
+
+    @staticmethod
+    def _collect_stores(families: Dict[str, _MetricFamily], name: str, cache_obj: Cache):
+        data_manager = cache_obj.data_manager
+        if data_manager is None:
+            return
+        eviction_manager = getattr(data_manager, "eviction_manager", None)
+        if eviction_manager is not None:
+            # the counts are maintained by the eviction manager, so the stores are not counted on every scrape
+            deleted = eviction_manager.mark_count
+            live = max(eviction_manager.all_count - deleted, 0)
+            families["gptcache_eviction_backlog"].add({"cache": name}, deleted)
+        elif hasattr(data_manager, "data"):
+            live, deleted = len(data_manager.data), 0
+        else:
+            return
+        families["gptcache_scalar_store_size"].add({"cache": name, "state": "live"}, live)
+        families["gptcache_scalar_store_size"].add({"cache": name, "state": "deleted"}, deleted)
+
+        # not all the vector stores can be counted
+        vector_base = getattr(data_manager, "v", None)
+        if hasattr(vector_base, "count"):
+            families["gptcache_vector_store_size"].add({"cache": name}, vector_base.count())
+
+    def collect(self) -> List[_MetricFamily]:
+        families = self._families()
+        for name, cache_obj in list(self._caches.items()):
+            self._collect_report(families, name, cache_obj)
+            try:
+                self._collect_stores(families, name, cache_obj)
+            except Exception:  # pylint: disable=W0703
+                gptcache_log.warning("failed to collect the store metrics of the cache %s", name, exc_info=True)
+        return [family for family in families.values() if family.samples]
+
+    def render(self) -> str:
+        """Render the metrics in the prometheus text format."""
+        lines = []
+        for family in self.collect():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+_default_metrics: Optional[CacheMetrics] = None
+
+
+def default_metrics() -> CacheMetrics:
+    """The CacheMetrics shared by the process, such as the one of the gptcache server."""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = CacheMetrics()
+    return _default_metrics
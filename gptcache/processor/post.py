@@ -1,8 +1,6 @@
 import random
 from typing import List, Any
 
-import numpy
-
 from gptcache.utils import softmax
 
 
@@ -82,6 +80,8 @@ def temperature_softmax(messages: List[Any], scores: List[float], temperature: f
     """
 
     if temperature > 0:
+        import numpy  # pylint: disable=C0415
+
         scores = softmax([x / temperature for x in scores])
         return numpy.random.choice(messages, size=1, p=scores)[0]
     else:
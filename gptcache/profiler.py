@@ -0,0 +1,269 @@
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Set
+
+from gptcache.utils.error import ParamError
+
+# the sampled request of the context, every asyncio task of the async adapter has its own
+_active: ContextVar[Optional["_Request"]] = ContextVar("gptcache_profiler_request", default=None)
+
+
+class _StageStats:
+    """The total count, times and allocations of a stage."""
+
+    __slots__ = ("count", "wall_ns", "cpu_ns", "alloc_bytes", "alloc_blocks")
+
+    def __init__(self):
+        self.count = 0
+        self.wall_ns = 0
+        self.cpu_ns = 0
+        self.alloc_bytes = 0
+        self.alloc_blocks = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "wall_time": self.wall_ns / 1e9,
+            "cpu_time": self.cpu_ns / 1e9,
+            "alloc_bytes": self.alloc_bytes,
+            "alloc_blocks": self.alloc_blocks,
+        }
+
+
+class _Stage:
+    """The context manager which profiles a stage of a sampled request."""
+
+    __slots__ = ("_request", "_name", "_parent", "_wall", "_cpu", "_bytes", "_blocks")
+
+    def __init__(self, request: "_Request", name: str):
+        self._request = request
+        self._name = name
+
+    def __enter__(self):
+        self._parent, self._request.stage = self._request.stage, self._name
+        self._bytes = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self._blocks = sys.getallocatedblocks()
+        self._cpu = time.thread_time_ns()
+        self._wall = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_):
+        wall = time.perf_counter_ns() - self._wall
+        cpu = time.thread_time_ns() - self._cpu
+        blocks = sys.getallocatedblocks() - self._blocks
+        alloc = tracemalloc.get_traced_memory()[0] - self._bytes if tracemalloc.is_tracing() else 0
+        self._request.stage = self._parent
+        self._request.profiler.record(self._name, wall, cpu, alloc, blocks)
+
+
+class _Request:
+    """The context manager of a sampled request, which holds its current stage."""
+
+    __slots__ = ("profiler", "stage", "root_frame", "_token")
+
+    def __init__(self, profiler: "Profiler"):
+        self.profiler = profiler
+        self.stage = "adapt"
+        self.root_frame = None
+
+    def __enter__(self):
+        self._token = _active.set(self)
+        # the stacks are sampled up to the frame which starts the request, such as `adapt` or `aadapt`
+        self.root_frame = sys._getframe(1)  # pylint: disable=protected-access
+        self.profiler.add_request(self)
+        return self
+
+    def __exit__(self, *_):
+        self.profiler.remove_request(self)
+        _active.reset(self._token)
+
+
+class Profiler:
+    """Profiler samples a fraction of the cache requests, and records the wall time, the cpu time and the allocations
+    of every stage of the sampled requests. A background thread samples the python stacks of the threads which are
+    handling the sampled requests, and the stacks are aggregated in the collapsed format of the flamegraph tools,
+    whose root is the stage.
+
+    It is disabled by default, and a disabled profiler only costs an attribute check per stage. The allocations
+    are the changes of `sys.getallocatedblocks`, and of the memory traced by `tracemalloc` if `trace_malloc` is
+    True, note that tracemalloc slows down all the allocations of the process when it is tracing.
+
+    The concurrent requests of the async adapter are profiled separately, and a stack is sampled for the request
+    whose coroutine is running. But the cpu time and the allocations are the ones of the thread, so the stages
+    which await include the work of the other tasks of the event loop in the meantime.
+
+    :param sample_rate: the fraction of the requests to profile, defaults to 0.01.
+    :type sample_rate: float
+    :param interval: the interval in seconds of the stack sampling, defaults to 0.005.
+    :type interval: float
+    :param trace_malloc: start tracemalloc to record the traced memory deltas, defaults to False.
+    :type trace_malloc: bool
+    :param max_depth: the max depth of the sampled stacks, defaults to 64.
+    :type max_depth: int
+
+    Example:
+        .. code-block:: python
+
+            from gptcache import cache
+
+            cache.profiler.enable(sample_rate=0.1)
+            # ... handle the requests
+            print(cache.profiler.stats())
+            with open("gptcache.folded", "w") as f:
+                f.write(cache.profiler.dump_stacks())
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        interval: float = 0.005,
+        trace_malloc: bool = False,
+        max_depth: int = 64,
+    ):
+        self.enabled = False
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.trace_malloc = trace_malloc
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._stages: Dict[str, _StageStats] = {}
+        self._stacks: Counter = Counter()
+        # the sampled requests which are being handled
+        self._requests: Set[_Request] = set()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+        self.sampled_count = 0
+
+    def enable(self, sample_rate: Optional[float] = None, trace_malloc: Optional[bool] = None):
+        """Enable the profiler, it can be called again to change the sample rate."""
+        if sample_rate is not None:
+            if not 0 <= sample_rate <= 1:
+                raise ParamError(f"Invalid sample rate: {sample_rate}, reasonable range: 0-1")
+            self.sample_rate = sample_rate
+        if trace_malloc is not None:
+            self.trace_malloc = trace_malloc
+        if self.trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        with self._lock:
+            self.enabled = True
+            if self._sampler is None:
+                self._sampler = threading.Thread(
+                    target=self._sample_stacks, name="gptcache-profiler", daemon=True
+                )
+                self._sampler.start()
+
+    def disable(self):
+        """Disable the profiler, the recorded stats and stacks are kept until `reset`."""
+        with self._cond:
+            self.enabled = False
+            sampler, self._sampler = self._sampler, None
+            self._cond.notify_all()
+        if sampler is not None:
+            sampler.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._stacks = Counter()
+            self.sampled_count = 0
+
+    def request(self):
+        """Return a context manager which profiles the request if it is sampled."""
+        request = _active.get()
+        if not self.enabled or (request is not None and request.profiler is self):
+            return nullcontext()
+        if random.random() >= self.sample_rate:
+            return nullcontext()
+        with self._lock:
+            self.sampled_count += 1
+        return _Request(self)
+
+    def stage(self, name: str):
+        """Return a context manager which profiles the stage if the request is sampled."""
+        request = _active.get()
+        if request is None or request.profiler is not self:
+            return nullcontext()
+        return _Stage(request, name)
+
+    def add_request(self, request: _Request):
+        with self._cond:
+            self._requests.add(request)
+            self._cond.notify_all()
+
+    def remove_request(self, request: _Request):
+        with self._cond:
+            self._requests.discard(request)
+
+    def record(self, name: str, wall_ns: int, cpu_ns: int, alloc_bytes: int, alloc_blocks: int):
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats()
+            stats.count += 1
+            stats.wall_ns += wall_ns
+            stats.cpu_ns += cpu_ns
+            stats.alloc_bytes += alloc_bytes
+            stats.alloc_blocks += alloc_blocks
+
+    def _format_stack(self, frame, roots: Dict[Any, _Request]) -> Optional[str]:
+        # the stack belongs to the request whose root frame it runs in, the suspended coroutines aren't in it
+        frames = []
+        while frame is not None and frame not in roots:
+            frames.append(frame)
+            frame = frame.f_back
+        if frame is None:
+            return None
+        frames.append(frame)
+        names = [f"{f.f_globals.get('__name__', '?')}.{f.f_code.co_name}" for f in frames[: self.max_depth]]
+        names.append(roots[frame].stage)
+        return ";".join(reversed(names))
+
+    def _sample_stacks(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: not self.enabled or self._requests)
+                if not self.enabled:
+                    return
+                roots = {request.root_frame: request for request in self._requests}
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            stacks = [stack for stack in (self._format_stack(frame, roots) for frame in frames.values()) if stack]
+            with self._lock:
+                self._stacks.update(stacks)
+            time.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """The total count, wall time, cpu time and allocations of every stage of the sampled requests."""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stages.items()}
+
+    def dump_stacks(self) -> str:
+        """The sampled stacks in the collapsed format, one `stage;frame;...;frame count` per line,
+        which can be rendered by flamegraph.pl, speedscope or inferno."""
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+def profile_request(cache_obj):
+    profiler = getattr(cache_obj, "profiler", None)
+    if profiler is None or not profiler.enabled:
+        return nullcontext()
+    return profiler.request()
+
+
+def profile_stage(cache_obj, name: str):
+    profiler = getattr(cache_obj, "profiler", None)
+    if profiler is None or not profiler.enabled:
+        return nullcontext()
+    return profiler.stage(name)
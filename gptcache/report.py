@@ -1,81 +1,105 @@
+from typing import Dict
+
+from gptcache.utils.histogram import LatencyHistogram
+
+
 class Report:
-    """Get GPTCache report including time and counts for different operations."""
-
-    def __init__(self):
-        self.op_pre = OpCounter()
-        self.op_embedding = OpCounter()
-        self.op_search = OpCounter()
-        self.op_data = OpCounter()
-        self.op_evaluation = OpCounter()
-        self.op_post = OpCounter()
-        self.op_llm = OpCounter()
-        self.op_save = OpCounter()
+    """Get GPTCache report including time and counts for different operations.
+
+    Besides the averages, every operation keeps a latency histogram, see :meth:`latency`,
+    and the cache misses are counted by reason, see :meth:`miss_cache`.
+
+    :param window: the length in seconds of the sliding window of the latency histograms, defaults to 60.
+    :type window: float
+    :param relative_accuracy: the relative accuracy of the latency percentiles, defaults to 0.01.
+    :type relative_accuracy: float
+    """
+
+    STAGES = ("pre", "embedding", "search", "data", "evaluation", "post", "llm", "save")
+
+    # no data is found by the search, or the found data is unhealthy
+    MISS_NO_CANDIDATES = "no_candidates"
+    # the similarity of all the found data is lower than the threshold
+    MISS_BELOW_THRESHOLD = "below_threshold"
+    # the found data is rejected by the `check_hit_func` of the session
+    MISS_SESSION_FILTERED = "session_filtered"
+    # the cache is skipped by `cache_skip`, the temperature or `cache_enable_func`
+    MISS_CACHE_SKIP = "cache_skip"
+    MISS_REASONS = (MISS_NO_CANDIDATES, MISS_BELOW_THRESHOLD, MISS_SESSION_FILTERED, MISS_CACHE_SKIP)
+
+    def __init__(self, window: float = 60.0, relative_accuracy: float = 0.01):
+        self._window = window
+        self._relative_accuracy = relative_accuracy
+        self.op_pre = self._op_counter()
+        self.op_embedding = self._op_counter()
+        self.op_search = self._op_counter()
+        self.op_data = self._op_counter()
+        self.op_evaluation = self._op_counter()
+        self.op_post = self._op_counter()
+        self.op_llm = self._op_counter()
+        self.op_save = self._op_counter()
         self.hint_cache_count = 0
+        self.miss_cache_count = dict.fromkeys(self.MISS_REASONS, 0)
+        self.llm_tokens_saved = 0
+
+    def _op_counter(self):
+        return OpCounter(LatencyHistogram(self._relative_accuracy, self._window))
 
     def pre(self, delta_time):
         """Pre-process counts and time.
 
         :param delta_time: additional runtime.
         """
-        self.op_pre.total_time += delta_time
-        self.op_pre.count += 1
+        self.op_pre.record(delta_time)
 
     def embedding(self, delta_time):
         """Embedding counts and time.
 
         :param delta_time: additional runtime.
         """
-        self.op_embedding.total_time += delta_time
-        self.op_embedding.count += 1
+        self.op_embedding.record(delta_time)
 
     def search(self, delta_time):
         """Search counts and time.
 
         :param delta_time: additional runtime.
         """
-        self.op_search.total_time += delta_time
-        self.op_search.count += 1
+        self.op_search.record(delta_time)
 
     def data(self, delta_time):
         """Get data counts and time.
 
         :param delta_time: additional runtime.
         """
-
-        self.op_data.total_time += delta_time
-        self.op_data.count += 1
+        self.op_data.record(delta_time)
 
     def evaluation(self, delta_time):
         """Evaluation counts and time.
 
         :param delta_time: additional runtime.
         """
-        self.op_evaluation.total_time += delta_time
-        self.op_evaluation.count += 1
+        self.op_evaluation.record(delta_time)
 
     def post(self, delta_time):
         """Post-process counts and time.
 
         :param delta_time: additional runtime.
         """
-        self.op_post.total_time += delta_time
-        self.op_post.count += 1
+        self.op_post.record(delta_time)
 
     def llm(self, delta_time):
         """LLM counts and time.
 
         :param delta_time: additional runtime.
         """
-        self.op_llm.total_time += delta_time
-        self.op_llm.count += 1
+        self.op_llm.record(delta_time)
 
     def save(self, delta_time):
         """Save counts and time.
 
         :param delta_time: additional runtime.
         """
-        self.op_save.total_time += delta_time
-        self.op_save.count += 1
+        self.op_save.record(delta_time)
 
     def average_pre_time(self):
         """Average pre-process time."""
@@ -113,6 +137,40 @@ class Report:
         """hint cache count."""
         self.hint_cache_count += 1
 
+    def save_tokens(self, count: int):
+        """the count of the llm tokens which are not generated because of the cache hit.
+
+        :param count: the token count of the cached answer.
+        """
+        self.llm_tokens_saved += count
+
+    def miss_cache(self, reason: str):
+        """miss cache count of the reason.
+
+        :param reason: one of :attr:`MISS_REASONS`.
+        """
+        self.miss_cache_count[reason] = self.miss_cache_count.get(reason, 0) + 1
+
+    def latency(self, stage: str, window: bool = False) -> Dict[str, float]:
+        """The count, average, p50, p90, p99 and max latency in seconds of the stage.
+
+        :param stage: one of :attr:`STAGES`.
+        :param window: only use the latencies of the sliding window, defaults to False.
+        """
+        return getattr(self, f"op_{stage}").histogram.percentiles(window)
+
+    def latency_summary(self, window: bool = False) -> Dict[str, Dict[str, float]]:
+        """The latencies of all the stages, see :meth:`latency`."""
+        return {stage: self.latency(stage, window) for stage in self.STAGES}
+
+    def reset(self):
+        """Reset all the counts, times and latencies."""
+        for stage in self.STAGES:
+            getattr(self, f"op_{stage}").reset()
+        self.hint_cache_count = 0
+        self.miss_cache_count = dict.fromkeys(self.MISS_REASONS, 0)
+        self.llm_tokens_saved = 0
+
 
 class OpCounter:
     """Operation counter."""
@@ -122,6 +180,25 @@ class OpCounter:
     total_time = 0
     """Total time."""
 
+    def __init__(self, histogram: LatencyHistogram = None):
+        self.histogram = histogram if histogram is not None else LatencyHistogram()
+        """Latency histogram."""
+
+    def record(self, delta_time):
+        """Record an operation.
+
+        :param delta_time: the runtime in seconds.
+        """
+        self.total_time += delta_time
+        self.count += 1
+        self.histogram.record(delta_time)
+
+    def reset(self):
+        """Reset the count, time and latencies."""
+        self.count = 0
+        self.total_time = 0
+        self.histogram.reset()
+
     def average(self):
         """Average time."""
         return round(self.total_time / self.count, 4) if self.count != 0 else 0
@@ -1,3 +1,4 @@
+import os
 from typing import Dict, List, Tuple, Any
 
 import numpy as np
@@ -32,6 +33,8 @@ class OnnxModelEvaluation(SimilarityEvaluation):
     This evaluator use the ONNX model to evaluate the similarity of two sentences.
 
     :param model: model name of OnnxModelEvaluation. Default is 'GPTCache/albert-duplicate-onnx'.
+                  It can be a local directory with the `model.onnx` and the tokenizer of the model,
+                  which is loaded offline.
     :type model: str
 
     Example:
@@ -52,9 +55,13 @@ class OnnxModelEvaluation(SimilarityEvaluation):
 
     def __init__(self, model: str = "GPTCache/albert-duplicate-onnx"):
         tokenizer_name = "albert-base-v2"
+        if os.path.isdir(model):
+            tokenizer_name = model
+            onnx_model_path = os.path.join(model, "model.onnx")
+        else:
+            onnx_model_path = hf_hub_download(repo_id=model, filename="model.onnx")
         self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
         self.model = model
-        onnx_model_path = hf_hub_download(repo_id=model, filename="model.onnx")
         self.ort_session = onnxruntime.InferenceSession(onnx_model_path)
 
     # WARNING: the model cannot evaluate text with more than 512 tokens
@@ -79,6 +86,13 @@ class OnnxModelEvaluation(SimilarityEvaluation):
         except Exception:  # pylint: disable=W0703
             return 0
 
+    def warmup(self, lengths, iterations):
+        from gptcache.warmup import warmup_text  # pylint: disable=C0415
+
+        for _ in range(iterations):
+            for length in lengths:
+                self.inference(warmup_text(length), [warmup_text(length // 2 + 1)])
+
     def range(self) -> Tuple[float, float]:
         """Range of similarity score.
 
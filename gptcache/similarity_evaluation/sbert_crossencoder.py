@@ -52,6 +52,13 @@ class SbertCrossencoderEvaluation(SimilarityEvaluation):
         except Exception: # pylint: disable=W0703
             return 0
 
+    def warmup(self, lengths, iterations):
+        from gptcache.warmup import warmup_text  # pylint: disable=C0415
+
+        for _ in range(iterations):
+            for length in lengths:
+                self.model.predict([(warmup_text(length), warmup_text(length // 2 + 1))])
+
     def range(self) -> Tuple[float, float]:
         """Range of similarity score.
 
@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from typing import Tuple, Dict, Any
+from typing import Sequence, Tuple, Dict, Any
 
 
 class SimilarityEvaluation(metaclass=ABCMeta):
@@ -31,6 +31,11 @@ class SimilarityEvaluation(metaclass=ABCMeta):
         """
         pass
 
+    def warmup(self, lengths: Sequence[int], iterations: int):
+        """Run the dummy inferences of the model, see :class:`gptcache.warmup.ModelWarmup`.
+        It does nothing by default, the evaluations with a local model override it.
+        """
+
     @abstractmethod
     def range(self) -> Tuple[float, float]:
         """Range of similarity score.
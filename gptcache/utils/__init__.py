@@ -15,7 +15,11 @@ __all__ = [
     "import_chromadb",
     "import_sqlalchemy",
     "import_sql_client",
+    "import_async_sql_client",
     "import_mongodb",
+    "import_motor",
+    "import_pyarrow",
+    "import_opentelemetry",
     "import_pydantic",
     "import_langchain",
     "import_pillow",
@@ -32,6 +36,7 @@ __all__ = [
     "import_ruamel",
     "import_selective_context",
     "import_httpx",
+    "import_h2",
     "import_openai",
     "import_docarray",
     "softmax",
@@ -47,7 +52,6 @@ __all__ = [
 import importlib.util
 from typing import Optional
 
-from gptcache.utils.dependency_control import prompt_install
 from gptcache.utils.softmax import softmax  # pylint: disable=unused-argument
 
 
@@ -56,6 +60,8 @@ def _check_library(libname: str, prompt: bool = True, package: Optional[str] = N
     if importlib.util.find_spec(libname):
         is_avail = True
     if not is_avail and prompt:
+        from gptcache.utils.dependency_control import prompt_install  # pylint: disable=C0415
+
         prompt_install(package if package else libname)
     return is_avail
 
@@ -161,11 +167,33 @@ def import_sql_client(db_name):
         import_duckdb()
 
 
+def import_async_sql_client(db_name):
+    _check_library("greenlet")
+    if db_name == "sqlite":
+        _check_library("aiosqlite")
+    elif db_name == "postgresql":
+        _check_library("asyncpg")
+    elif db_name in ["mysql", "mariadb"]:
+        _check_library("aiomysql")
+
+
 def import_mongodb():
     _check_library("pymongo")
     _check_library("mongoengine")
 
 
+def import_motor():
+    _check_library("motor")
+
+
+def import_pyarrow():
+    _check_library("pyarrow")
+
+
+def import_opentelemetry():
+    _check_library("opentelemetry", package="opentelemetry-api")
+
+
 def import_pydantic():
     _check_library("pydantic")
 
@@ -230,6 +258,10 @@ def import_httpx():
     _check_library("httpx")
 
 
+def import_h2():
+    _check_library("h2")
+
+
 def import_openai():
     _check_library("openai", package="openai==1.40.0")
 
@@ -239,6 +271,8 @@ def import_docarray():
 
 
 def import_paddle():
+    from gptcache.utils.dependency_control import prompt_install  # pylint: disable=C0415
+
     prompt_install("protobuf==3.20.0")
     _check_library("paddlepaddle")
 
@@ -0,0 +1,231 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+from gptcache.utils.error import ParamError
+
+
+class _Sketch:
+    """The log-spaced bins of a sketch, only the thread which owns it writes it."""
+
+    __slots__ = ("bins", "zero_count", "count", "total", "max")
+
+    def __init__(self):
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, index: Optional[int], value: float):
+        if index is None:
+            self.zero_count += 1
+        else:
+            self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "_Sketch"):
+        # `dict` copies the bins in one step, so the owner thread can keep writing them
+        for index, count in dict(other.bins).items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+class _Shard:
+    __slots__ = ("total", "slots")
+
+    def __init__(self):
+        self.total = _Sketch()
+        self.slots: Dict[int, _Sketch] = {}
+
+
+class LatencyHistogram:
+    """LatencyHistogram records the latencies in log-spaced bins (DDSketch style), so that every quantile is
+    estimated within `relative_accuracy` of the real value with a bounded memory.
+
+    Every thread records into its own shard, so the hot path takes no lock, and the shards are merged when the
+    histogram is read. The histogram keeps the latencies since the last `reset`, and the ones of the sliding
+    window of the last `window` seconds, which is rotated in `window_slots` slots.
+
+    :param relative_accuracy: the relative accuracy of the quantiles, defaults to 0.01.
+    :type relative_accuracy: float
+    :param window: the length in seconds of the sliding window, defaults to 60.
+    :type window: float
+    :param window_slots: the number of the slots of the sliding window, defaults to 6.
+    :type window_slots: int
+    :param min_value: the values which are not larger than it are counted in the zero bin, defaults to 1e-9.
+    :type min_value: float
+
+    Example:
+        .. code-block:: python
+
+            from gptcache.utils.histogram import LatencyHistogram
+
+            histogram = LatencyHistogram()
+            histogram.record(0.12)
+            p99 = histogram.quantile(0.99)
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        window: float = 60.0,
+        window_slots: int = 6,
+        min_value: float = 1e-9,
+    ):
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._min_value = min_value
+        self._slot_seconds = window / window_slots
+        self._window_slots = window_slots
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[_Shard] = []
+        self._generation = 0
+
+    def _shard(self) -> _Shard:
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            with self._lock:
+                local.shard = _Shard()
+                local.generation = self._generation
+                self._shards.append(local.shard)
+        return local.shard
+
+    def _index(self, value: float) -> Optional[int]:
+        if value <= self._min_value:
+            return None
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: Optional[int]) -> float:
+        if index is None:
+            return 0.0
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+    def _slot(self) -> int:
+        return int(time.monotonic() // self._slot_seconds)
+
+    def record(self, value: float):
+        """Record a latency in seconds."""
+        index = self._index(value)
+        shard = self._shard()
+        shard.total.add(index, value)
+        slot = self._slot()
+        sketch = shard.slots.get(slot)
+        if sketch is None:
+            sketch = shard.slots[slot] = _Sketch()
+            for old in [s for s in shard.slots if s <= slot - self._window_slots]:
+                del shard.slots[old]
+        sketch.add(index, value)
+
+    def _snapshot(self, window: bool = False) -> _Sketch:
+        with self._lock:
+            shards = list(self._shards)
+        merged = _Sketch()
+        first_slot = self._slot() - self._window_slots + 1
+        for shard in shards:
+            if not window:
+                merged.merge(shard.total)
+                continue
+            for slot, sketch in list(shard.slots.items()):
+                if slot >= first_slot:
+                    merged.merge(sketch)
+        return merged
+
+    def merge(self, other: "LatencyHistogram"):
+        """Merge the latencies of another histogram with the same relative accuracy into this one,
+        the latencies of its window are merged into the current slot of the window."""
+        if not math.isclose(self._gamma, other._gamma):  # pylint: disable=protected-access
+            raise ParamError("Only the histograms with the same relative accuracy can be merged")
+        total = other._snapshot()  # pylint: disable=protected-access
+        windowed = other._snapshot(window=True)  # pylint: disable=protected-access
+        shard = self._shard()
+        shard.total.merge(total)
+        slot = self._slot()
+        shard.slots.setdefault(slot, _Sketch()).merge(windowed)
+
+    def reset(self):
+        """Drop all the recorded latencies."""
+        with self._lock:
+            self._generation += 1
+            self._shards = []
+
+    def count(self, window: bool = False) -> int:
+        return self._snapshot(window).count
+
+    def quantile(self, q: float, window: bool = False) -> float:
+        """Estimate the `q` quantile (0 <= q <= 1) of the latencies, return 0 if there is no latency.
+
+        :param q: the quantile.
+        :type q: float
+        :param window: only use the latencies of the sliding window, defaults to False.
+        :type window: bool
+        """
+        return self._quantiles(self._snapshot(window), [q])[0]
+
+    def _quantiles(self, sketch: _Sketch, qs: List[float]) -> List[float]:
+        if sketch.count == 0:
+            return [0.0 for _ in qs]
+        bins = sorted(sketch.bins.items())
+        results = []
+        for q in qs:
+            if q >= 1:
+                results.append(sketch.max)
+                continue
+            rank = q * (sketch.count - 1)
+            seen = sketch.zero_count
+            value = 0.0
+            if seen <= rank:
+                for index, count in bins:
+                    seen += count
+                    if seen > rank:
+                        value = self._value(index)
+                        break
+            results.append(min(value, sketch.max))
+        return results
+
+    def buckets(self, bounds: List[float], window: bool = False) -> Dict[str, object]:
+        """Get the cumulative counts of the latencies which are not larger than every bound,
+        like the buckets of a prometheus histogram, the count and the sum of the latencies.
+
+        :param bounds: the ascending upper bounds in seconds.
+        :type bounds: List[float]
+        :param window: only use the latencies of the sliding window, defaults to False.
+        :type window: bool
+        """
+        sketch = self._snapshot(window)
+        counts = [0] * len(bounds)
+        values = [(0.0, sketch.zero_count)] + [
+            (self._value(index), count) for index, count in sketch.bins.items()
+        ]
+        for value, count in values:
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    counts[i] += count
+                    break
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        return {"buckets": counts, "count": sketch.count, "sum": sketch.total}
+
+    def percentiles(self, window: bool = False) -> Dict[str, float]:
+        """Get the count, the average, p50, p90, p99 and the max of the latencies.
+
+        :param window: only use the latencies of the sliding window, defaults to False.
+        :type window: bool
+        """
+        sketch = self._snapshot(window)
+        p50, p90, p99 = self._quantiles(sketch, [0.5, 0.9, 0.99])
+        return {
+            "count": sketch.count,
+            "average": sketch.total / sketch.count if sketch.count else 0.0,
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "max": sketch.max,
+        }
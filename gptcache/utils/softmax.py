@@ -1,7 +1,6 @@
-import numpy as np
-
-
 def softmax(x: list):
+    import numpy as np  # pylint: disable=C0415
+
     x = np.array(x)
     assert len(x.shape) == 1, f"Expect to get a shape of (len,) but got {x.shape}, x value: {x}."
     max_val = x.max()
@@ -1,17 +1,37 @@
 import time
 
 from gptcache import cache
+from gptcache.profiler import profile_stage
+from gptcache.utils.tracing import start_span
 
 
-def time_cal(func, func_name=None, report_func=None):
+def time_cal(func, func_name=None, report_func=None, cache_obj=None):
     def inner(*args, **kwargs):
-        time_start = time.time()
-        res = func(*args, **kwargs)
-        delta_time = time.time() - time_start
-        if cache.config.log_time_func:
-            cache.config.log_time_func(
-                func.__name__ if func_name is None else func_name, delta_time
-            )
+        chat_cache = cache if cache_obj is None else cache_obj
+        name = func.__name__ if func_name is None else func_name
+        with start_span(chat_cache, f"gptcache.{name}"), profile_stage(chat_cache, name):
+            time_start = time.perf_counter_ns()
+            res = func(*args, **kwargs)
+            delta_time = (time.perf_counter_ns() - time_start) / 1e9
+        if chat_cache.config and chat_cache.config.log_time_func:
+            chat_cache.config.log_time_func(name, delta_time)
+        if report_func is not None:
+            report_func(delta_time)
+        return res
+
+    return inner
+
+
+def atime_cal(func, func_name=None, report_func=None, cache_obj=None):
+    async def inner(*args, **kwargs):
+        chat_cache = cache if cache_obj is None else cache_obj
+        name = func.__name__ if func_name is None else func_name
+        with start_span(chat_cache, f"gptcache.{name}"), profile_stage(chat_cache, name):
+            time_start = time.perf_counter_ns()
+            res = await func(*args, **kwargs)
+            delta_time = (time.perf_counter_ns() - time_start) / 1e9
+        if chat_cache.config and chat_cache.config.log_time_func:
+            chat_cache.config.log_time_func(name, delta_time)
         if report_func is not None:
             report_func(delta_time)
         return res
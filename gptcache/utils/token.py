@@ -16,3 +16,8 @@ def token_counter(text):
     """Token Counter"""
     num_tokens = len(_get_encoding().encode(text))
     return num_tokens
+
+
+def estimate_token_count(text):
+    """Estimate the token count with about 4 characters per token, it is cheap enough for the hit path."""
+    return (len(text) + 3) // 4
@@ -0,0 +1,56 @@
+from contextlib import nullcontext
+from typing import Any, Dict, Optional
+
+from gptcache.utils import import_opentelemetry
+
+_tracer = None
+
+
+def _enabled(cache_obj) -> bool:
+    config = getattr(cache_obj, "config", None)
+    return config is not None and getattr(config, "enable_tracing", False)
+
+
+def _get_tracer():
+    global _tracer
+    if _tracer is None:
+        import_opentelemetry()
+        from opentelemetry import trace  # pylint: disable=C0415
+
+        _tracer = trace.get_tracer("gptcache")
+    return _tracer
+
+
+def start_span(cache_obj, name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Start an opentelemetry span as the current span if the tracing of the cache is enabled,
+    the span is the child of the current one, such as the span of the caller or the previous cache in the chain.
+
+    :param cache_obj: the cache object.
+    :type cache_obj: gptcache.Cache
+    :param name: the name of the span.
+    :type name: str
+    :param attributes: the attributes of the span.
+    :type attributes: Dict[str, Any]
+
+    :return: a context manager of the span, or of None if the tracing is disabled.
+    """
+    if not _enabled(cache_obj):
+        return nullcontext()
+    return _get_tracer().start_as_current_span(name, attributes=attributes)
+
+
+def set_span_attributes(cache_obj, attributes: Dict[str, Any]):
+    """Set the attributes of the current span if the tracing of the cache is enabled, the None values are ignored.
+
+    :param cache_obj: the cache object.
+    :type cache_obj: gptcache.Cache
+    :param attributes: the attributes of the span.
+    :type attributes: Dict[str, Any]
+    """
+    if not _enabled(cache_obj):
+        return
+    from opentelemetry import trace  # pylint: disable=C0415
+
+    trace.get_current_span().set_attributes(
+        {key: value for key, value in attributes.items() if value is not None}
+    )
@@ -0,0 +1,126 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from gptcache.utils.log import gptcache_log
+
+# the numbers of the words of the dummy inputs, like a short question, a question with some context and a long prompt
+DEFAULT_WARMUP_LENGTHS = (8, 64, 256)
+
+_LOADING, _WARMING, _READY, _FAILED = "loading", "warming", "ready", "failed"
+
+
+def warmup_text(length: int) -> str:
+    """The dummy text of the warmup of the text models, which has `length` words."""
+    words = ["what", "is", "the", "cache", "of", "a", "large", "language", "model"]
+    return " ".join(words[i % len(words)] for i in range(length))
+
+
+def _models(obj) -> List[Any]:
+    # a cache is warmed up by the models of its embedding function and its similarity evaluation
+    if hasattr(obj, "embedding_func") and hasattr(obj, "similarity_evaluation"):
+        return [getattr(obj.embedding_func, "__self__", None), obj.similarity_evaluation]
+    return [obj]
+
+
+class ModelWarmup:
+    """ModelWarmup loads the models in a background thread, and runs the dummy inferences of the models over
+    the inputs of several lengths, so the first requests don't pay the download and the load of the models,
+    nor the graph optimization and the allocations of their first inference.
+
+    The readiness is reported by :attr:`ready` and :meth:`status`, like the readiness probe of `gptcache_server`.
+
+    :param load: the function which loads the models, it returns the models, or the caches of the models,
+                 which are warmed up by their `warmup` method, the others are skipped.
+    :type load: Callable[[], Iterable[Any]]
+    :param lengths: the numbers of the words of the dummy inputs, defaults to (8, 64, 256).
+    :type lengths: Sequence[int]
+    :param iterations: the number of the dummy inferences of every length, defaults to 2, 0 means only loading.
+    :type iterations: int
+
+    Example:
+        .. code-block:: python
+
+            from gptcache import cache
+            from gptcache.adapter.api import init_similar_cache
+            from gptcache.warmup import ModelWarmup
+
+            def load():
+                init_similar_cache()
+                return [cache]
+
+            warmup = ModelWarmup(load).start()
+            warmup.wait()
+            print(warmup.status())
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Optional[Iterable[Any]]],
+        lengths: Sequence[int] = DEFAULT_WARMUP_LENGTHS,
+        iterations: int = 2,
+    ):
+        self._load = load
+        self._lengths = tuple(lengths)
+        self._iterations = iterations
+        self._state = _LOADING
+        self._error: Optional[str] = None
+        self._models: List[str] = []
+        self._load_time: Optional[float] = None
+        self._warmup_time: Optional[float] = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="gptcache-warmup", daemon=True)
+
+    def start(self) -> "ModelWarmup":
+        self._thread.start()
+        return self
+
+    @property
+    def ready(self) -> bool:
+        return self._state == _READY
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the warmup, and return whether the models are ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def run(self):
+        """Load and warm up the models in the current thread."""
+        start_time = time.time()
+        try:
+            models = [model for obj in self._load() or [] for model in _models(obj)]
+            self._load_time = time.time() - start_time
+            self._state = _WARMING
+            start_time = time.time()
+            for model in models:
+                warmup = getattr(model, "warmup", None)
+                if warmup is None:
+                    continue
+                warmup(lengths=self._lengths, iterations=self._iterations)
+                self._models.append(type(model).__name__)
+            self._warmup_time = time.time() - start_time
+        except Exception as e:  # pylint: disable=W0703
+            gptcache_log.error("failed to load the models", exc_info=True)
+            self._error = f"{type(e).__name__}: {e}"
+            self._state = _FAILED
+        else:
+            gptcache_log.info(
+                "loaded the models in %.2fs, and warmed up %s in %.2fs",
+                self._load_time,
+                self._models,
+                self._warmup_time,
+            )
+            self._state = _READY
+        finally:
+            self._done.set()
+
+    def status(self) -> Dict[str, Any]:
+        """The readiness of the models, the `state` is loading, warming, ready or failed."""
+        return {
+            "ready": self.ready,
+            "state": self._state,
+            "models": list(self._models),
+            "load_seconds": self._load_time,
+            "warmup_seconds": self._warmup_time,
+            "error": self._error,
+        }
@@ -1,25 +1,38 @@
 import argparse
-import json
+import copy
+import multiprocessing
 import os
+import signal
 import zipfile
-from typing import Optional
+from functools import partial
+from typing import Any, Dict, List, Optional
 
 from gptcache import cache, Cache
 from gptcache.adapter import openai
 from gptcache.adapter.api import (
     get,
+    get_batch,
     put,
+    put_batch,
     init_similar_cache,
     init_similar_cache_from_config,
 )
+from gptcache.embedding import Onnx
+from gptcache.manager import manager_factory
+from gptcache.manager.bootstrap import bootstrap_data_manager
+from gptcache.manager.replica import ReplicaDataManager, ReplicaWriter
+from gptcache.manager.snapshot import iter_snapshot
+from gptcache.metrics import CONTENT_TYPE_LATEST, default_metrics
 from gptcache.processor.pre import last_content
 from gptcache.utils import import_fastapi, import_pydantic, import_starlette
+from gptcache.utils.error import CacheError, ParamError
+from gptcache.warmup import ModelWarmup
 
 import_fastapi()
 import_pydantic()
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 import uvicorn
 from pydantic import BaseModel
 
@@ -28,6 +41,38 @@ app = FastAPI()
 openai_cache: Optional[Cache] = None
 cache_dir = ""
 cache_file_key = ""
+# the loading and the warmup of the models, the server is ready without it
+model_warmup: Optional[ModelWarmup] = None
+default_metrics().register(cache, "default")
+
+# the paths which are served while the models are warming up
+_PROBE_PATHS = frozenset(["/", "/ready", "/metrics"])
+
+
+class _ReadinessGate:
+    """Reject the requests of the caches until the models are loaded and warmed up."""
+
+    def __init__(self, app):  # pylint: disable=W0621
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and model_warmup is not None
+            and not model_warmup.ready
+            and scope["path"] not in _PROBE_PATHS
+        ):
+            response = JSONResponse(
+                {"detail": f"the models are {model_warmup.status()['state']}"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(_ReadinessGate)
 
 
 class CacheData(BaseModel):
@@ -35,29 +80,113 @@ class CacheData(BaseModel):
     answer: Optional[str] = ""
 
 
+class BatchCacheData(BaseModel):
+    prompts: List[str]
+    answers: Optional[List[Optional[str]]] = None
+
+
+class ProfilerConfig(BaseModel):
+    enabled: bool
+    sample_rate: Optional[float] = None
+    trace_malloc: Optional[bool] = None
+
+
+def _get_cache_obj(name: str) -> Cache:
+    if name == "default":
+        return cache
+    if name == "openai" and openai_cache is not None:
+        return openai_cache
+    raise HTTPException(status_code=404, detail=f"the cache {name} doesn't exist")
+
+
 @app.get("/")
 async def hello():
     return "hello gptcache server"
 
 
+@app.get("/ready")
+async def ready():
+    """The readiness probe, it succeeds once the models are loaded and warmed up."""
+    if model_warmup is None:
+        return {"ready": True}
+    status = model_warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 @app.post("/put")
-async def put_cache(cache_data: CacheData) -> str:
+def put_cache(cache_data: CacheData) -> str:
     put(cache_data.prompt, cache_data.answer)
     return "successfully update the cache"
 
 
 @app.post("/get")
-async def get_cache(cache_data: CacheData) -> CacheData:
+def get_cache(cache_data: CacheData) -> CacheData:
     result = get(cache_data.prompt)
     return CacheData(prompt=cache_data.prompt, answer=result)
 
 
+@app.post("/put_batch")
+def put_cache_batch(cache_data: BatchCacheData) -> str:
+    answers = cache_data.answers or []
+    if len(answers) != len(cache_data.prompts):
+        raise HTTPException(status_code=400, detail="the numbers of the prompts and the answers are different")
+    put_batch(cache_data.prompts, answers)
+    return f"successfully update the cache with {len(answers)} answers"
+
+
+@app.post("/get_batch")
+def get_cache_batch(cache_data: BatchCacheData) -> BatchCacheData:
+    return BatchCacheData(prompts=cache_data.prompts, answers=get_batch(cache_data.prompts))
+
+
 @app.post("/flush")
-async def flush_cache() -> str:
+def flush_cache() -> str:
     cache.flush()
     return "successfully flush the cache"
 
 
+@app.get("/metrics")
+async def metrics() -> Response:
+    return Response(content=default_metrics().render(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.post("/profiler")
+async def set_profiler(profiler_config: ProfilerConfig, cache_name: str = "default") -> str:
+    profiler = _get_cache_obj(cache_name).profiler
+    if profiler_config.enabled:
+        profiler.enable(
+            sample_rate=profiler_config.sample_rate,
+            trace_malloc=profiler_config.trace_malloc,
+        )
+        return f"successfully enable the profiler, sample rate: {profiler.sample_rate}"
+    profiler.disable()
+    return "successfully disable the profiler"
+
+
+@app.get("/profiler/stats")
+async def get_profiler_stats(cache_name: str = "default"):
+    profiler = _get_cache_obj(cache_name).profiler
+    return {
+        "enabled": profiler.enabled,
+        "sample_rate": profiler.sample_rate,
+        "sampled_count": profiler.sampled_count,
+        "stages": profiler.stats(),
+    }
+
+
+@app.get("/profiler/stacks")
+async def get_profiler_stacks(cache_name: str = "default") -> Response:
+    return Response(
+        content=_get_cache_obj(cache_name).profiler.dump_stacks(), media_type="text/plain"
+    )
+
+
+@app.post("/profiler/reset")
+async def reset_profiler(cache_name: str = "default") -> str:
+    _get_cache_obj(cache_name).profiler.reset()
+    return "successfully reset the profiler"
+
+
 @app.get("/cache_file")
 async def get_cache_file(key: str = "") -> FileResponse:
     global cache_dir
@@ -82,6 +211,32 @@ async def get_cache_file(key: str = "") -> FileResponse:
     return FileResponse(zip_filename)
 
 
+@app.get("/snapshot")
+def get_snapshot(key: str = "", cache_name: str = "default", dtype: str = "float32"):
+    if cache_file_key == "":
+        raise HTTPException(
+            status_code=403,
+            detail="the snapshot can't be downloaded because the cache-file-key was not specified",
+        )
+    if cache_file_key != key:
+        raise HTTPException(status_code=403, detail="the cache file key is wrong")
+
+    import_starlette()
+    from starlette.responses import StreamingResponse
+
+    try:
+        chunks = iter_snapshot(_get_cache_obj(cache_name).data_manager, dtype=dtype)
+    except ParamError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CacheError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return StreamingResponse(
+        chunks,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{cache_name}.snapshot"'},
+    )
+
+
 @app.api_route(
     "/v1/chat/completions",
     methods=["POST", "OPTIONS"],
@@ -116,17 +271,18 @@ async def chat(request: Request):
     print("messages:", openai_params.get("messages"))
     try:
         if is_stream:
-            def generate():
-                for stream_response in openai.ChatCompletion.create(
-                    cache_obj=openai_cache,
-                    cache_skip=cache_skip,
-                    api_key=openai_key,
-                    **openai_params,
-                ):
-                    if stream_response == "[DONE]":
-                        yield "data: [DONE]\n\n"
-                        break
-                    yield f"data: {json.dumps(stream_response)}\n\n"
+            stream = await openai.ChatCompletion.acreate(
+                cache_obj=openai_cache,
+                cache_skip=cache_skip,
+                api_key=openai_key,
+                **openai_params,
+            )
+
+            async def generate():
+                # the answer of a miss is saved in a thread when the stream ends, so the loop isn't blocked
+                async for chunk in stream:
+                    yield openai.to_sse_frame(chunk)
+                yield openai.SSE_DONE_FRAME
 
             return StreamingResponse(generate(), media_type="text/event-stream")
         else:
@@ -141,62 +297,70 @@ async def chat(request: Request):
         raise HTTPException(status_code=500, detail=f"openai error: {e}")
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument(
-        "-s", "--host", default="localhost", help="the hostname to listen on"
-    )
-    parser.add_argument(
-        "-p", "--port", type=int, default=8000, help="the port to listen on"
-    )
-    parser.add_argument(
-        "-d", "--cache-dir", default="gptcache_data", help="the cache data dir"
-    )
-    parser.add_argument("-k", "--cache-file-key", default="", help="the cache file key")
-    parser.add_argument(
-        "-f", "--cache-config-file", default=None, help="the cache config file"
-    )
-    parser.add_argument(
-        "-o",
-        "--openai",
-        type=bool,
-        default=False,
-        help="whether to open the openai completes proxy",
-    )
-    parser.add_argument(
-        "-of",
-        "--openai-cache-config-file",
-        default=None,
-        help="the cache config file of the openai completes proxy",
-    )
+def _embedding(args) -> Onnx:
+    # the local model directory works offline
+    return Onnx(model=args.model_dir) if args.model_dir else Onnx()
 
-    args = parser.parse_args()
+
+def _init_caches(args, replica: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Init the caches of the server, and return the params of `manager_factory` of every cache,
+    which are used to load the stores again in the worker processes. The worker processes pass `replica`,
+    so their stores are opened like the reloads of the replicas, and never in the writer mode."""
     global cache_dir
     global cache_file_key
+    global openai_cache
 
+    load = _load_data_manager if replica else _load_writer_data_manager
+    storage_configs = {}
     if args.cache_config_file:
-        init_conf = init_similar_cache_from_config(config_dir=args.cache_config_file)
+        init_conf = init_similar_cache_from_config(config_dir=args.cache_config_file, data_manager_loader=load)
         cache_dir = init_conf.get("storage_config", {}).get("data_dir", "")
+        storage_configs["default"] = init_conf["storage_config"]
     else:
-        init_similar_cache(args.cache_dir)
+        embedding = _embedding(args)
+        storage_configs["default"] = {
+            "manager": "sqlite,faiss",
+            "data_dir": args.cache_dir,
+            "vector_params": {"dimension": embedding.dimension},
+        }
+        init_similar_cache(
+            args.cache_dir,
+            embedding=embedding,
+            data_manager=load(storage_configs["default"]),
+        )
         cache_dir = args.cache_dir
     cache_file_key = args.cache_file_key
 
     if args.openai:
-        global openai_cache
         openai_cache = Cache()
         if args.openai_cache_config_file:
-            init_similar_cache_from_config(
+            init_conf = init_similar_cache_from_config(
                 config_dir=args.openai_cache_config_file,
                 cache_obj=openai_cache,
+                data_manager_loader=load,
             )
+            storage_configs["openai"] = init_conf["storage_config"]
         else:
+            embedding = _embedding(args)
+            storage_configs["openai"] = {
+                "manager": "sqlite,faiss",
+                "data_dir": "openai_server_cache",
+                "vector_params": {"dimension": embedding.dimension},
+            }
             init_similar_cache(
                 data_dir="openai_server_cache",
                 pre_func=last_content,
+                embedding=embedding,
+                data_manager=load(storage_configs["openai"]),
                 cache_obj=openai_cache,
             )
+        default_metrics().register(openai_cache, "openai")
+    return storage_configs
+
 
+def _add_cors(args):
+    # the middlewares are added before the app starts, the caches may be loaded after it
+    if args.openai:
         import_starlette()
         from starlette.middleware.cors import CORSMiddleware
 
@@ -208,6 +372,195 @@ def main():
             allow_headers=["*"],
         )
 
+
+def _caches() -> List[Cache]:
+    return [cache] if openai_cache is None else [cache, openai_cache]
+
+
+def _start_warmup(args, load):
+    """Load the caches in the background, the server rejects the requests of the caches until they are ready."""
+    global model_warmup
+
+    def _load():
+        load()
+        return _caches()
+
+    model_warmup = ModelWarmup(_load, iterations=args.warmup_iterations).start()
+
+
+def _bootstrap(args, wait: bool = False):
+    if args.bootstrap_from:
+        cache.data_manager = bootstrap_data_manager(
+            args.bootstrap_from, cache.data_manager, data_dir=cache_dir or ".", wait=wait
+        )
+
+
+def _load_worker_caches(args, writes, generation, lock):
+    storage_configs = _init_caches(args, replica=True)
+    for name, storage_config in storage_configs.items():
+        cache_obj = _get_cache_obj(name)
+        cache_obj.data_manager = ReplicaDataManager(
+            partial(_load_data_manager, storage_config),
+            writes,
+            name,
+            generation,
+            lock,
+            reload_interval=args.flush_interval,
+            data_manager=cache_obj.data_manager,
+        )
+
+
+def _serve_worker(args, sockets, writes, generation, lock):
+    """The entry of a worker process, it serves the requests with the replicas of the stores of the caches,
+    which are loaded and warmed up in the background, so every worker reports its own readiness."""
+    _add_cors(args)
+    _start_warmup(args, partial(_load_worker_caches, args, writes, generation, lock))
+    server = uvicorn.Server(uvicorn.Config(app, host=args.host, port=args.port))
+    server.run(sockets=sockets)
+
+
+def _load_writer_data_manager(storage_config):
+    # `manager_factory` fills the paths of the stores into the params
+    return manager_factory(**copy.deepcopy(storage_config))
+
+
+def _load_data_manager(storage_config):
+    # `manager_factory` fills the paths of the stores into the params,
+    # the replica doesn't write the last access time of its hits, the writer records them
+    storage_config = copy.deepcopy(storage_config)
+    storage_config["scalar_params"] = storage_config.get("scalar_params") or {}
+    storage_config["scalar_params"]["record_last_access"] = False
+    return manager_factory(**storage_config)
+
+
+def _serve_workers(args):
+    """Serve the requests with several worker processes, which share the listening socket.
+
+    The parent process is the only writer of the stores, the workers send the writes to it through a queue,
+    and it flushes the stores at most every `flush_interval` seconds, then the workers load them again.
+    """
+    storage_configs = _init_caches(args)
+    # the workers load the stores of the parent, so the snapshot is imported before they start
+    _bootstrap(args, wait=True)
+    context = multiprocessing.get_context("spawn")
+    writes = context.Queue()
+    generation = context.Value("q", 0)
+    lock = context.Lock()
+    writer = ReplicaWriter(
+        {name: _get_cache_obj(name).data_manager for name in storage_configs},
+        writes,
+        generation,
+        lock,
+        flush_interval=args.flush_interval,
+    )
+    writer.start()
+
+    config = uvicorn.Config(app, host=args.host, port=args.port)
+    sock = config.bind_socket()
+    processes = [
+        context.Process(
+            target=_serve_worker,
+            args=(args, [sock], writes, generation, lock),
+            name=f"gptcache-server-worker-{i}",
+        )
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def _interrupt(*_):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # the workers may get the same signal, the writer waits for them to stop before the last flush
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+    finally:
+        sock.close()
+        writer.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-s", "--host", default="localhost", help="the hostname to listen on"
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=8000, help="the port to listen on"
+    )
+    parser.add_argument(
+        "-d", "--cache-dir", default="gptcache_data", help="the cache data dir"
+    )
+    parser.add_argument("-k", "--cache-file-key", default="", help="the cache file key")
+    parser.add_argument(
+        "-f", "--cache-config-file", default=None, help="the cache config file"
+    )
+    parser.add_argument(
+        "-o",
+        "--openai",
+        type=bool,
+        default=False,
+        help="whether to open the openai completes proxy",
+    )
+    parser.add_argument(
+        "-of",
+        "--openai-cache-config-file",
+        default=None,
+        help="the cache config file of the openai completes proxy",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="the number of the worker processes, the writes of the workers are applied by the main process",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=1.0,
+        help="the interval in seconds of flushing the writes and reloading them in the workers",
+    )
+
+    parser.add_argument(
+        "--model-dir",
+        default=None,
+        help="the local directory of the onnx embedding model, with the model.onnx, the tokenizer and the config, "
+        "which works offline, defaults to downloading the model from the hugging face hub",
+    )
+    parser.add_argument(
+        "--warmup-iterations",
+        type=int,
+        default=2,
+        help="the number of the dummy inferences of the models over every input length before the server is ready",
+    )
+    parser.add_argument(
+        "--bootstrap-from",
+        default=None,
+        help="the url, s3:// object or path of a snapshot to warm start the empty cache from, "
+        "like the /snapshot url of a peer server",
+    )
+
+    args = parser.parse_args()
+    if args.workers > 1:
+        _serve_workers(args)
+        return
+
+    _add_cors(args)
+
+    def _load():
+        _init_caches(args)
+        _bootstrap(args)
+
+    _start_warmup(args, _load)
     uvicorn.run(app, host=args.host, port=args.port)
 
 
@@ -52,6 +52,7 @@ setuptools.setup(
     entry_points={
         'console_scripts': [
             'gptcache_server=gptcache_server.server:main',
+            'gptcache_benchmark=gptcache.benchmark.cli:main',
         ],
     },
 )
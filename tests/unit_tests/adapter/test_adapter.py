@@ -10,6 +10,8 @@ from gptcache.adapter.api import put, get
 from gptcache.manager import get_data_manager, manager_factory
 from gptcache.processor.post import first, nop
 from gptcache.processor.pre import get_prompt
+from gptcache.report import Report
+from gptcache.similarity_evaluation import SimilarityEvaluation
 from gptcache.utils.error import NotInitError
 from gptcache.utils.time import time_cal
 
@@ -125,6 +127,42 @@ def test_not_init_cache():
     assert is_exception
 
 
+def test_miss_reason():
+    class NoMatchEvaluation(SimilarityEvaluation):
+        def evaluation(self, src_dict, cache_dict, **kwargs):
+            return 0
+
+        def range(self):
+            return 0, 1
+
+    def add_llm(cache_obj, **kwargs):
+        return adapt(
+            lambda *_, **llm_kwargs: llm_kwargs["a"] + llm_kwargs["b"],
+            int,
+            lambda llm_data, update_cache_func, *_, **__: update_cache_func(str(llm_data)) or llm_data,
+            cache_obj=cache_obj,
+            **kwargs,
+        )
+
+    cache_obj = Cache()
+    cache_obj.init(
+        pre_embedding_func=lambda data, **_: f"{data.get('a')}+{data.get('b')}",
+        data_manager=manager_factory(data_dir=str(random.random())),
+    )
+    add_llm(cache_obj, a=1, b=2)
+    add_llm(cache_obj, a=1, b=2)
+    add_llm(cache_obj, a=1, b=2, cache_skip=True)
+    assert cache_obj.report.hint_cache_count == 1
+    assert cache_obj.report.miss_cache_count[Report.MISS_NO_CANDIDATES] == 1
+    assert cache_obj.report.miss_cache_count[Report.MISS_CACHE_SKIP] == 1
+    assert cache_obj.report.latency("llm")["count"] == 2
+
+    cache_obj.similarity_evaluation = NoMatchEvaluation()
+    cache_obj.config.similarity_threshold = 0.5
+    add_llm(cache_obj, a=1, b=2)
+    assert cache_obj.report.miss_cache_count[Report.MISS_BELOW_THRESHOLD] == 1
+
+
 def test_cache_temperature():
     if os.path.exists("faiss.index"):
         os.remove("faiss.index")
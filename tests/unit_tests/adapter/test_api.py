@@ -185,3 +185,69 @@ def test_init_with_new_config():
     assert answer_text == expect_answer, answer_text
 
     yaml_path.unlink()
+
+
+def test_gptcache_batch_api():
+    from tempfile import TemporaryDirectory
+
+    import numpy as np
+
+    from gptcache.adapter.adapter import adapt_batch_get
+    from gptcache.adapter.api import get_batch, put_batch
+    from gptcache.embedding.base import BaseEmbedding
+
+    class _Embedding(BaseEmbedding):
+        def __init__(self):
+            self.batch_sizes = []
+
+        def to_embeddings(self, data, **_):
+            vector = np.zeros(8, dtype="float32")
+            vector[sum(map(ord, data)) % 8] = 1.0
+            return vector
+
+        def batch_to_embeddings(self, datas, **kwargs):
+            self.batch_sizes.append(len(datas))
+            return super().batch_to_embeddings(datas, **kwargs)
+
+        @property
+        def dimension(self):
+            return 8
+
+    embedding = _Embedding()
+    with TemporaryDirectory(dir="./") as root:
+        cache_obj = Cache()
+        cache_obj.init(
+            pre_embedding_func=get_prompt,
+            embedding_func=embedding.to_embeddings,
+            data_manager=get_data_manager(
+                CacheBase("sqlite", sql_url=f"sqlite:///{root}/sqlite.db"),
+                VectorBase("faiss", dimension=8, index_path=f"{root}/faiss.index"),
+            ),
+            similarity_evaluation=SearchDistanceEvaluation(),
+            config=Config(similarity_threshold=0.9),
+        )
+        assert get_batch(["a", "b"], cache_obj=cache_obj) == [None, None]
+
+        put_batch(["a", "b", "c"], ["foo_a", "foo_b", "foo_c"], cache_obj=cache_obj)
+        assert get_batch(["b", "a", "d", "c"], cache_obj=cache_obj) == ["foo_b", "foo_a", None, "foo_c"]
+        assert embedding.batch_sizes == [2, 3, 4]
+        assert cache_obj.report.hint_cache_count == 3
+        assert cache_obj.report.miss_cache_count["no_candidates"] == 2
+        assert cache_obj.report.miss_cache_count["below_threshold"] == 1
+        assert get("c", cache_obj=cache_obj) == "foo_c"
+
+        # the requests skip the cache like the single requests
+        assert get_batch(["a"], cache_obj=cache_obj, cache_skip=True) == [None]
+        requests = [{"prompt": "a", "cache_skip": True}, {"prompt": "b", "temperature": 2}, {"prompt": "c"}]
+        assert adapt_batch_get(requests, cache_obj=cache_obj) == [None, None, "foo_c"]
+        assert cache_obj.report.miss_cache_count["cache_skip"] == 3
+        cache_obj.data_manager.close()
+
+    map_cache = Cache()
+    map_cache.init(pre_embedding_func=get_prompt, data_manager=get_data_manager())
+    next_cache = Cache()
+    next_cache.init(pre_embedding_func=get_prompt, data_manager=get_data_manager())
+    map_cache.next_cache = next_cache
+    put_batch(["hello"], ["foo"], cache_obj=map_cache)
+    put_batch(["hi"], ["bar"], cache_obj=next_cache)
+    assert get_batch(["hello", "hi", "hey"], cache_obj=map_cache) == ["foo", "bar", None]
@@ -1,8 +1,10 @@
 import asyncio
 import base64
+import json
 import os
 import random
 from io import BytesIO
+from tempfile import TemporaryDirectory
 from unittest.mock import AsyncMock, patch
 from urllib.request import urlopen
 
@@ -287,6 +289,115 @@ async def test_stream_openai_async():
     assert answer_text == expect_answer, answer_text
 
 
+class _AsyncStream:
+    """Like `openai.AsyncStream`, an async iterator which is not an async generator."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+def _stream_chunks(contents):
+    chunks = [
+        {
+            "choices": [{"delta": {"role": "assistant"}, "finish_reason": None, "index": 0}],
+            "created": 1677825464,
+            "id": "chatcmpl-6ptKyqKOGXZT6iQnqiXAH8adNLUzD",
+            "model": "gpt-3.5-turbo-0301",
+            "object": "chat.completion.chunk",
+        }
+    ]
+    for content in contents:
+        chunks.append(
+            {
+                "choices": [{"delta": {"content": content}, "finish_reason": None, "index": 0}],
+                "created": 1677825464,
+                "id": "chatcmpl-6ptKyqKOGXZT6iQnqiXAH8adNLUzD",
+                "model": "gpt-3.5-turbo-0301",
+                "object": "chat.completion.chunk",
+            }
+        )
+    return chunks
+
+
+@pytest.mark.parametrize("stream_chunk_size", (None, 4))
+def test_stream_openai_chunk_size(stream_chunk_size):
+    with TemporaryDirectory(dir="./") as root:
+        chat_cache = Cache()
+        chat_cache.init(
+            pre_embedding_func=last_content,
+            data_manager=get_data_manager(data_path=os.path.join(root, "data_map.txt")),
+            config=Config(enable_token_counter=False, stream_chunk_size=stream_chunk_size),
+        )
+        expect_answer = "the result is 2"
+        with patch("openai.resources.chat.Completions.create") as mock_create:
+            mock_create.return_value = iter(_stream_chunks(["the", " result", " is", " 2"]))
+            response = openai.ChatCompletion.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": "calculate 1+1"}],
+                stream=True,
+                cache_obj=chat_cache,
+            )
+            assert "".join(get_stream_message_from_openai_answer(res) for res in response) == expect_answer
+
+        chunks = openai.ChatCompletion.create(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": "calculate 1+1"}],
+            stream=True,
+            cache_obj=chat_cache,
+        )
+        contents = [get_stream_message_from_openai_answer(chunk) for chunk in chunks[1:-1]]
+        assert contents == (["the ", "resu", "lt i", "s 2"] if stream_chunk_size else [expect_answer])
+        assert chunks[0].choices[0].delta.role == "assistant"
+        assert chunks[-1].choices[0].finish_reason == "stop"
+        assert chunks[-1].gptcache
+
+        frame = openai.to_sse_frame(chunks[1])
+        assert frame.startswith(b"data: {") and frame.endswith(b"}\n\n")
+        assert json.loads(frame[len(b"data: "):])["choices"][0]["delta"] == {"content": contents[0]}
+        assert openai.to_sse_frame({"a": 1}) == b'data: {"a":1}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_stream_openai_async_save():
+    with TemporaryDirectory(dir="./") as root:
+        chat_cache = Cache()
+        chat_cache.init(
+            pre_embedding_func=last_content,
+            data_manager=get_data_manager(data_path=os.path.join(root, "data_map.txt")),
+            config=Config(enable_token_counter=False),
+        )
+
+        with patch("openai.resources.chat.AsyncCompletions.create", new_callable=AsyncMock) as mock_acreate:
+            mock_acreate.return_value = _AsyncStream(_stream_chunks(["the result", " is 5"]))
+            response = await openai.ChatCompletion.acreate(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": "calculate 1+4"}],
+                stream=True,
+                cache_obj=chat_cache,
+            )
+            assert [get_stream_message_from_openai_answer(res) async for res in response][1:] == [
+                "the result",
+                " is 5",
+            ]
+
+        response = await openai.ChatCompletion.acreate(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": "calculate 1+4"}],
+            stream=True,
+            cache_obj=chat_cache,
+        )
+        assert "".join([get_stream_message_from_openai_answer(res) or "" async for res in response]) == "the result is 5"
+
+
 def test_completion():
     cache.init(pre_embedding_func=get_prompt)
     question = "what is your name?"
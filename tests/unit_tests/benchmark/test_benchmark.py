@@ -0,0 +1,100 @@
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from gptcache.benchmark import Benchmark, MockLLM, load_workload, main
+from gptcache.benchmark.dataset import answer_of
+from gptcache.benchmark.mock import HashEmbedding
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_load_workload(self):
+        with TemporaryDirectory(dir="./") as root:
+            pairs = Path(root) / "pairs.json"
+            pairs.write_text(
+                json.dumps(
+                    [
+                        {"text_a": "what is the sun", "text_b": "what's the sun", "label": 1},
+                        {"text_a": "how old are you", "text_b": "how are you", "label": 0},
+                    ]
+                ),
+                encoding="utf-8",
+            )
+            workload = load_workload(str(pairs))
+            self.assertEqual([q.prompt for q in workload.warmup], ["what is the sun", "how old are you"])
+            self.assertEqual([q.group for q in workload.queries], ["0", "1-negative"])
+
+            trace = Path(root) / "trace.jsonl"
+            lines = [
+                {"prompt": "hello", "warmup": True},
+                {"prompt": "hi", "group": "hello"},
+                {"prompt": "bye"},
+                {"prompt": "bye"},
+            ]
+            trace.write_text("\n".join(json.dumps(line) for line in lines), encoding="utf-8")
+            workload = load_workload(str(trace), limit=2)
+            self.assertEqual([q.prompt for q in workload.warmup], ["hello"])
+            self.assertEqual([(q.prompt, q.group) for q in workload.queries], [("hi", "hello"), ("bye", "bye")])
+
+    def test_mock(self):
+        llm = MockLLM({"hi": "hello"}, latency=0.001, jitter=0.001, seed=1)
+        self.assertEqual(llm(prompt="hi"), answer_of("hello"))
+        self.assertEqual(llm(prompt="bye"), answer_of("bye"))
+        self.assertEqual(llm.call_count, 2)
+
+        embedding = HashEmbedding(dimension=32)
+        vector = embedding.to_embeddings("what is the sun")
+        self.assertEqual(vector.shape, (32,))
+        self.assertAlmostEqual(float((vector * vector).sum()), 1.0, places=5)
+        self.assertTrue((vector == embedding.to_embeddings("What is the sun?")).all())
+
+    def test_run(self):
+        with TemporaryDirectory(dir="./") as root:
+            trace = Path(root) / "trace.jsonl"
+            prompts = ["what is the sun", "who are you", "what is the sun", "what is the moon", "who are you"]
+            trace.write_text(
+                "\n".join(
+                    [json.dumps({"prompt": "who are you", "warmup": True})]
+                    + [json.dumps({"prompt": prompt}) for prompt in prompts]
+                ),
+                encoding="utf-8",
+            )
+            benchmark = Benchmark(
+                load_workload(str(trace)),
+                managers=["map", "sqlite,faiss"],
+                embeddings=["string", "hash"],
+                evaluations=["exact"],
+                concurrency=1,
+                data_dir=f"{root}/data",
+                trace_memory=True,
+            )
+            result = benchmark.run()
+            self.assertEqual(result["config"]["query_size"], 5)
+            results = {(item["manager"], item["embedding"]): item for item in result["results"]}
+            self.assertIn("skipped", results[("map", "hash")])
+            self.assertIn("skipped", results[("sqlite,faiss", "string")])
+            for key in [("map", "string"), ("sqlite,faiss", "hash")]:
+                item = results[key]
+                self.assertNotIn("error", item)
+                self.assertEqual(item["requests"], 5)
+                # the warmed question and the repeated ones hit the cache
+                self.assertEqual(item["hits"], 3)
+                self.assertEqual(item["llm_calls"], 2)
+                self.assertEqual(item["precision"], 1.0)
+                self.assertEqual(item["recall"], 1.0)
+                self.assertEqual(item["latency"]["count"], 5)
+                self.assertEqual(item["stages"]["embedding"]["count"], 5)
+                self.assertGreater(item["memory"]["traced_peak_mb"], 0)
+
+    def test_cli(self):
+        with TemporaryDirectory(dir="./") as root:
+            pairs = Path(root) / "pairs.json"
+            pairs.write_text(
+                json.dumps([{"origin": "what is the sun", "similar": "what is the sun"}]), encoding="utf-8"
+            )
+            output = Path(root) / "result.json"
+            main([str(pairs), "-m", "map", "-e", "string", "-v", "exact", "-d", f"{root}/data", "-o", str(output)])
+            result = json.loads(output.read_text(encoding="utf-8"))
+            self.assertEqual(result["results"][0]["hits"], 1)
+            self.assertEqual(result["results"][0]["precision"], 1.0)
@@ -1,3 +1,5 @@
+import numpy as np
+
 from gptcache.embedding import Onnx
 from gptcache.adapter.api import _get_model
 
@@ -10,3 +12,8 @@ def test_onnx():
     t = _get_model("onnx")
     data = t.to_embeddings("foo")
     assert len(data) == t.dimension, f"{len(data)}, {t.dimension}"
+
+    # the single and the batch embeddings of a text are the same, also beyond the max length of the model
+    texts = ["foo", "foo " * 1000]
+    for single, batch in zip([t.to_embeddings(text) for text in texts], t.batch_to_embeddings(texts)):
+        assert np.allclose(single, batch, atol=1e-5)
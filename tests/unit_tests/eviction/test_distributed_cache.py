@@ -209,3 +209,28 @@ class TestDistributedCache(unittest.TestCase):
         ttl = e._redis.ttl("key")
         self.assertEqual(e.get("key"), "True")
         self.assertEqual(ttl, -2)
+
+    def test_batch_put(self):
+        e = EvictionBase("redis", maxmemory="4mb", policy="allkeys-lru", ttl=5)
+        keys = [str(i) for i in range(100)]
+
+        e.put(keys)
+        for key in keys:
+            self.assertEqual(e.get(key), "True")
+        self.assertEqual(e._redis.ttl(e._create_key(keys[0])), 5)
+
+        e.put(keys, expire=True)
+        self.assertLessEqual(e._redis.ttl(e._create_key(keys[-1])), 5)
+        self.assertGreater(e._redis.ttl(e._create_key(keys[-1])), 0)
+
+    def test_async_refresh(self):
+        e = EvictionBase("redis", maxmemory="4mb", policy="allkeys-lru", ttl=5,
+                         async_refresh=True, refresh_interval=0.1)
+        e.put(["key"], expire=True)
+        time.sleep(2)
+        self.assertLess(e._redis.ttl(e._create_key("key")), 5)
+
+        self.assertIsNone(e.get("key"))
+        time.sleep(0.5)
+        self.assertEqual(e._redis.ttl(e._create_key("key")), 5)
+        e.close()
@@ -0,0 +1,80 @@
+import os
+import threading
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import numpy as np
+
+from gptcache.manager import manager_factory
+from gptcache.manager.bootstrap import BootstrapDataManager, bootstrap_data_manager, fetch_snapshot
+from gptcache.manager.snapshot import _import_rows, read_snapshot, write_snapshot
+
+DIM = 8
+
+
+def _vector(i):
+    vector = np.zeros(DIM, dtype="float32")
+    vector[i] = 1.0
+    return vector
+
+
+def _data_manager(root, name):
+    return manager_factory("sqlite,faiss", data_dir=os.path.join(root, name), vector_params={"dimension": DIM})
+
+
+class TestBootstrap(unittest.TestCase):
+    def test_bootstrap(self):
+        with TemporaryDirectory(dir="./") as root:
+            source = _data_manager(root, "source")
+            source.import_data(["q0", "q1"], ["a0", "a1"], [_vector(0), _vector(1)], ["s0", None])
+            path = os.path.join(root, "cache.snapshot")
+            write_snapshot(source, path, dtype="float16")
+
+            target = _data_manager(root, "target")
+            started = threading.Event()
+            release = threading.Event()
+
+            def slow_import(*args):
+                started.set()
+                release.wait(10)
+                return _import_rows(*args)
+
+            with patch("gptcache.manager.bootstrap._import_rows", side_effect=slow_import):
+                bootstrap = BootstrapDataManager(read_snapshot(path), target)
+                started.wait(10)
+                # the snapshot is served before it is imported
+                self.assertFalse(bootstrap.hydrated)
+                res = bootstrap.search(_vector(1))
+                self.assertEqual(len(res), 1)
+                self.assertAlmostEqual(res[0][0], 0.0, places=3)
+                self.assertEqual(bootstrap.get_scalar_data(res[0]).answers[0].answer, "a1")
+                bootstrap.add_session(res[0], "s1", "q1")
+                bootstrap.save("q2", "a2", _vector(2))
+                self.assertEqual(bootstrap.get_scalar_data(bootstrap.search(_vector(2))[0]).answers[0].answer, "a2")
+                release.set()
+                self.assertTrue(bootstrap.wait(10))
+
+            self.assertEqual(target.s.count(), 3)
+            # the results of the snapshot are mapped to the imported data
+            self.assertEqual(bootstrap.get_scalar_data(res[0]).answers[0].answer, "a1")
+            self.assertEqual(bootstrap.get_scalar_data(bootstrap.search(_vector(0))[0]).answers[0].answer, "a0")
+            self.assertEqual(sorted(bootstrap.list_sessions()), ["s0", "s1"])
+            source.close()
+            bootstrap.close()
+
+    def test_bootstrap_data_manager(self):
+        with TemporaryDirectory(dir="./") as root:
+            source = _data_manager(root, "source")
+            source.save("q0", "a0", _vector(0))
+            path = os.path.join(root, "cache.snapshot")
+            write_snapshot(source, path)
+            self.assertEqual(fetch_snapshot(path, os.path.join(root, "copy")), path)
+
+            # the cache with data keeps its own stores
+            self.assertIs(bootstrap_data_manager(path, source, data_dir=root), source)
+            target = bootstrap_data_manager(path, _data_manager(root, "target"), data_dir=root, wait=True)
+            self.assertTrue(target.hydrated)
+            self.assertEqual(target.s.count(), 1)
+            source.close()
+            target.close()
@@ -1,13 +1,17 @@
 import numpy as np
+import os
 import pytest
+import time
 import unittest
 
 from random import randint
+from tempfile import TemporaryDirectory
 from uuid import uuid4
 from datetime import datetime
 from decimal import Decimal
 from gptcache.manager.scalar_data.base import CacheStorage, CacheData, DataType, Question, QuestionDep
 from gptcache.utils import import_boto3
+from gptcache.manager import CacheBase, VectorBase, get_data_manager
 from gptcache.manager.scalar_data.dynamo_storage import DynamoStorage 
 
 import_boto3()
@@ -15,6 +19,7 @@ import_boto3()
 from boto3.dynamodb.conditions import Attr as DynamoAttr, Key as DynamoKey
 from boto3 import client as awsclient, resource as awsresource
 import boto3
+from moto import mock_aws
 
 class TestDynamoCacheStorage(unittest.TestCase):
     _dynamodb_local_endpoint_url = "http://localhost:9999"
@@ -252,23 +257,26 @@ class TestDynamoCacheStorage(unittest.TestCase):
         self.dynamo_cache_storage.add_session(persisted_ids[0], session_id2, items_to_insert[0].question.content)
         self.dynamo_cache_storage.add_session(persisted_ids[1], session_id3, items_to_insert[1].question.content)
 
-        ids_without_prefix = lambda ids: [id_with_prefix.replace("sessions#", "") for id_with_prefix in ids]
+        session_ids = lambda sessions: [session.session_id for session in sessions]
 
         # now we should be able to see those sessions
-        session_ids_with_prefix = self.dynamo_cache_storage.list_sessions()
-        assert sorted(ids_without_prefix(session_ids_with_prefix)) == sorted([session_id1, session_id2, session_id3])
+        sessions = self.dynamo_cache_storage.list_sessions()
+        assert sorted(session_ids(sessions)) == sorted([session_id1, session_id2, session_id3])
 
         # now filter by one of the session ids
-        session_ids_with_prefix = self.dynamo_cache_storage.list_sessions(session_id = session_id1)
-        assert ids_without_prefix(session_ids_with_prefix) == [session_id1]
+        sessions = self.dynamo_cache_storage.list_sessions(session_id = session_id1)
+        assert session_ids(sessions) == [session_id1]
+        assert sessions[0].id == session_id1
+        assert sessions[0].question_id == persisted_ids[0]
+        assert sessions[0].session_question == items_to_insert[0].question.content
 
         # now filter by the question id
-        session_ids_with_prefix = self.dynamo_cache_storage.list_sessions(key = persisted_ids[1])
-        assert sorted(ids_without_prefix(session_ids_with_prefix)) == sorted([session_id3])
+        sessions = self.dynamo_cache_storage.list_sessions(key = persisted_ids[1])
+        assert sorted(session_ids(sessions)) == sorted([session_id3])
 
         # now filter by both
-        session_ids_with_prefix = self.dynamo_cache_storage.list_sessions(session_id = session_id2, key = persisted_ids[0])
-        assert ids_without_prefix(session_ids_with_prefix) == [session_id2]
+        sessions = self.dynamo_cache_storage.list_sessions(session_id = session_id2, key = persisted_ids[0])
+        assert session_ids(sessions) == [session_id2]
 
     def test_delete_session(self):
         session_id1 = str(uuid4())
@@ -285,8 +293,8 @@ class TestDynamoCacheStorage(unittest.TestCase):
         self.dynamo_cache_storage.delete_session([session_id1])
 
         # There shouldn't be a session entry for session_id1 anymore but the other sessions should still exist.
-        session_ids_with_prefix = self.dynamo_cache_storage.list_sessions()
-        assert session_ids_with_prefix == [f"sessions#{session_id2}"]
+        sessions = self.dynamo_cache_storage.list_sessions()
+        assert [session.session_id for session in sessions] == [session_id2]
 
 
     def test_get_data_by_id(self):
@@ -372,6 +380,65 @@ class TestDynamoCacheStorage(unittest.TestCase):
         assert items[0]["similarity"] == Decimal(str(item_to_insert["similarity_value"]))
         assert items[0]["cache_delta_time"] == Decimal(str(item_to_insert["cache_delta_time"]))
 
+    def test_batch_get_data_by_id(self):
+        items_to_insert = [
+            self._random_cachedata_with_dependencies(session_id = "1"),
+            self._random_cachedata_without_dependencies(),
+            self._random_cachedata_without_dependencies(session_id = "2"),
+        ]
+        persisted_ids = self.dynamo_cache_storage.batch_insert(items_to_insert)
+        self.dynamo_cache_storage.mark_deleted([persisted_ids[1]])
+
+        entries = self.dynamo_cache_storage.batch_get_data_by_id(persisted_ids + [str(uuid4())])
+        assert len(entries) == 4
+        assert entries[0].question.content == items_to_insert[0].question.content
+        assert entries[0].session_id == ["1"]
+        assert entries[1] is None
+        assert entries[2].question.content == items_to_insert[2].question
+        assert entries[2].session_id == ["2"]
+        assert entries[3] is None
+
+        # the last access timestamps of the hydrated questions are updated
+        assert self.dynamo_cache_storage.get_data_by_id(persisted_ids[0]).last_access is not None
+
+    def test_mark_deleted_keeps_item(self):
+        item_to_insert = self._random_cachedata_without_dependencies()
+        persisted_id = self.dynamo_cache_storage.batch_insert([item_to_insert])[0]
+        self.dynamo_cache_storage.mark_deleted([persisted_id])
+
+        table = self._dynamo_resource().Table("gptcache_questions")
+        item = table.get_item(
+            Key={"pk": f"questions#{persisted_id}", "id": f"questions#{persisted_id}"},
+        )["Item"]
+        assert item["deleted"].startswith("True_")
+        assert item["question"] == item_to_insert.question
+
+    def test_deleted_shards(self):
+        items_to_insert = [self._random_cachedata_without_dependencies() for _ in range(30)]
+        persisted_ids = self.dynamo_cache_storage.batch_insert(items_to_insert)
+        self.dynamo_cache_storage.mark_deleted(persisted_ids[:10])
+
+        # the items are spread across the shards of the 'deleted' GSI, and every shard is queried
+        table = self._dynamo_resource().Table("gptcache_questions")
+        shards = {item["deleted"] for item in table.scan()["Items"]}
+        assert len(shards) > 2
+
+        assert self.dynamo_cache_storage.count() == 20
+        assert self.dynamo_cache_storage.count(state = -1) == 10
+        assert self.dynamo_cache_storage.count(is_all = True) == 30
+        assert sorted(self.dynamo_cache_storage.get_ids(deleted = False)) == sorted(persisted_ids[10:])
+
+    def test_clear_deleted_data_removes_sessions(self):
+        persisted_ids = self.dynamo_cache_storage.batch_insert([
+            self._random_cachedata_without_dependencies(session_id = "1"),
+            self._random_cachedata_without_dependencies(session_id = "2"),
+        ])
+        self.dynamo_cache_storage.mark_deleted([persisted_ids[0]])
+        self.dynamo_cache_storage.clear_deleted_data()
+
+        assert [session.session_id for session in self.dynamo_cache_storage.list_sessions()] == ["2"]
+        assert self.dynamo_cache_storage.count(is_all = True) == 1
+
     def _random_cachedata_without_dependencies(self, session_id = None):
         question_id = uuid4()
         return CacheData(
@@ -405,3 +472,30 @@ class TestDynamoCacheStorage(unittest.TestCase):
             region_name = self._region_name,
         )
 
+
+
+@mock_aws
+class TestDynamoSessions(unittest.TestCase):
+    def test_data_manager_sessions(self):
+        with TemporaryDirectory(dir="./") as root:
+            data_manager = get_data_manager(
+                CacheBase("dynamo", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"),
+                VectorBase("faiss", dimension=8, index_path=os.path.join(root, "faiss.index")),
+            )
+            embeddings = [np.random.rand(8).astype(np.float32) for _ in range(2)]
+            data_manager.import_data(["q0", "q1"], ["a0", "a1"], embeddings, ["s0", "s1"])
+            res_data = data_manager.search(embeddings[0])[0]
+            data_manager.add_session(res_data, "s1", "q0")
+
+            self.assertEqual(sorted(data_manager.list_sessions()), ["s0", "s1"])
+            self.assertEqual(data_manager.list_sessions("s1"), ["s1", "s1"])
+            sessions = data_manager.list_sessions(key=res_data[1])
+            self.assertEqual(sorted(session.session_id for session in sessions), ["s0", "s1"])
+
+            data_manager.delete_session("s0")
+            self.assertEqual(data_manager.list_sessions(), ["s1"])
+            self.assertEqual(data_manager.s.get_data_by_id(res_data[1]).session_id, ["s1"])
+
+            time.sleep(0.01)
+            self.assertEqual(data_manager.expire_sessions(0.005), ["s1"])
+            self.assertEqual(data_manager.list_sessions(), [])
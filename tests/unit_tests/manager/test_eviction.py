@@ -1,5 +1,6 @@
 import os
 import unittest
+from unittest.mock import patch
 import numpy as np
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -60,3 +61,29 @@ class TestEviction(unittest.TestCase):
     #
     #     cache_count = data_manager.s.count(is_all=True)
     #     self.assertEqual(cache_count, 10)
+
+    def test_eviction_counter(self):
+        with TemporaryDirectory(dir='./') as root:
+            db_path = Path(root) / 'sqlite.db'
+            cache_base = CacheBase("sqlite", sql_url="sqlite:///" + str(db_path))
+            vector_base = VectorBase("faiss", dimension=DIM)
+            data_manager = get_data_manager(
+                cache_base, vector_base, max_size=10, clean_size=2, eviction="LRU"
+            )
+            eviction_manager = data_manager.eviction_manager
+            eviction_manager.MAX_MARK_COUNT = 3
+            with patch.object(cache_base, "count", wraps=cache_base.count) as count:
+                for i in range(30):
+                    data_manager.save(f"foo{i}", f"receiver the foo {i}", mock_embeddings())
+                # the counters are loaded once and then maintained in memory
+                self.assertEqual(count.call_count, 2)
+            self.assertEqual(eviction_manager.all_count, cache_base.count(is_all=True))
+            self.assertEqual(eviction_manager.mark_count, cache_base.count(state=-1))
+
+            eviction_manager.RECONCILE_INTERVAL = 1
+            with patch.object(cache_base, "count", wraps=cache_base.count) as count:
+                data_manager.save("foo", "receiver the foo", mock_embeddings())
+                data_manager.save("bar", "receiver the bar", mock_embeddings())
+                self.assertEqual(count.call_count, 2)
+            self.assertEqual(eviction_manager.all_count, cache_base.count(is_all=True))
+            self.assertEqual(eviction_manager.mark_count, cache_base.count(state=-1))
@@ -1,6 +1,7 @@
 import unittest
 from unittest import mock
 import os
+import time
 import numpy as np
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -108,3 +109,19 @@ class TestFactory(unittest.TestCase):
         with TemporaryDirectory(dir="./") as root:
             data_dir = os.path.join(root, 'a/b')
             manager_factory('sqlite,faiss,local', data_dir=data_dir, vector_params={"dimension": 5})
+
+    def test_expire_sessions(self):
+        with TemporaryDirectory(dir="./") as root:
+            m = manager_factory("sqlite,faiss", data_dir=os.path.join(root, "old"), vector_params={"dimension": 5})
+            m.import_data(["q0", "q1"], ["a0", "a1"], [np.random.rand(5), np.random.rand(5)], ["s0", "s1"])
+            m.close()
+
+            m = manager_factory("sqlite,faiss", data_dir=os.path.join(root, "old"), vector_params={"dimension": 5})
+            # the sessions of the storage are used at the first expiry
+            self.assertEqual(m.expire_sessions(60), [])
+            time.sleep(0.01)
+            m.add_session(m.search(m.s.get_data_by_id(2).embedding_data)[0], "s1", "q1")
+            self.assertEqual(m.expire_sessions(0.005), ["s0"])
+            self.assertEqual(m.list_sessions("s0"), [])
+            self.assertEqual(len(m.list_sessions("s1")), 2)
+            m.close()
@@ -1,6 +1,15 @@
+import json
 import os
+import pickle
+import time
+from tempfile import TemporaryDirectory
 
-from gptcache.manager.data_manager import MapDataManager
+import cachetools
+import pytest
+
+from gptcache.session import Session
+from gptcache.manager.data_manager import CompactMapDataManager, MapDataManager, prompt_digest
+from gptcache.manager.scalar_data.base import Answer, DataType
 
 data_map_path = "data_map.txt"
 
@@ -19,3 +28,146 @@ def test_map():
     assert answer == "1", answer
     assert emb == "b", emb
     data_manager.close()
+
+
+def test_map_log():
+    with TemporaryDirectory(dir="./") as root:
+        path = os.path.join(root, "data_map.txt")
+        data_manager = MapDataManager(path, 3)
+        data_manager.save("a", "0", "a", session=Session("s0"))
+        data_manager.save("b", Answer("1", DataType.STR), "b")
+        data_manager.flush()
+        with open(path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 3
+
+        # a flush appends the changes only, the evicted and the deleted keys included
+        data_manager.save("c", "2", "c")
+        data_manager.save("d", "3", "d")
+        data_manager.add_session(data_manager.search("b")[0], "s1", "b")
+        data_manager.delete_session("s1")
+        data_manager.flush()
+        data_manager.flush()
+        with open(path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 7
+
+        data_manager = MapDataManager(path, 3)
+        assert data_manager.search("a") == []
+        assert data_manager.search("b") == []
+        assert data_manager.search("c")[0] == ("c", "2", "c", set())
+        assert data_manager.list_sessions() == []
+
+        # the log is compacted to the live items
+        data_manager._log.compact_min_records = 0
+        data_manager.save("e", "4", "e", session=Session("s2"))
+        data_manager.flush()
+        with open(path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 4
+        data_manager = MapDataManager(path, 3)
+        assert data_manager.search("e")[0] == ("e", "4", "e", {"s2"})
+
+
+def test_map_broken_log():
+    with TemporaryDirectory(dir="./") as root:
+        path = os.path.join(root, "data_map.txt")
+        data_manager = MapDataManager(path, 3)
+        data_manager.save("a", "0", "a")
+        data_manager.flush()
+        size = os.path.getsize(path)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('["s","b","1"')
+
+        # the record cut by a crash is dropped
+        data_manager = MapDataManager(path, 3)
+        assert data_manager.search("b") == []
+        assert os.path.getsize(path) == size
+        data_manager.save("b", "1", "b")
+        data_manager.flush()
+        assert MapDataManager(path, 3).search("b")[0][1] == "1"
+
+
+def test_map_pickle():
+    with TemporaryDirectory(dir="./") as root:
+        path = os.path.join(root, "data_map.txt")
+        data = cachetools.LRUCache(3)
+        data["a"] = ("a", "0", "a", {"s0"})
+        with open(path, "wb") as f:
+            pickle.dump(data, f)
+
+        # the pickle file of the older versions is converted to the log
+        data_manager = MapDataManager(path, 3)
+        assert data_manager.search("a")[0] == ("a", "0", "a", {"s0"})
+        with open(path, encoding="utf-8") as f:
+            assert json.loads(f.readline()) == {"gptcache_map_log": 1}
+        assert MapDataManager(path, 3).search("a")[0] == ("a", "0", "a", {"s0"})
+
+
+def test_compact_map():
+    with TemporaryDirectory(dir="./") as root:
+        path = os.path.join(root, "data_map.txt")
+        data_manager = CompactMapDataManager(path, 3)
+        data_manager.save("a", "0", " a\n", session=Session("s0"))
+        data_manager.import_data(["b", "c"], ["1", Answer("2", DataType.STR)], ["b", "c"], ["s0", None])
+        res = data_manager.search("a")[0]
+        assert res == ("a", "0", prompt_digest("a"), ("s0",))
+        assert data_manager.get_scalar_data(res).answers[0].answer == "0"
+        data_manager.add_session(res, "s1", "a")
+        assert sorted(data_manager.list_sessions()) == ["s0", "s1"]
+        data_manager.delete_session("s0")
+        assert data_manager.search("b") == []
+        assert data_manager.search("a")[0][3] == ("s1",)
+        data_manager.close()
+
+        data_manager = CompactMapDataManager(path, 3)
+        assert data_manager.search("a")[0][3] == ("s1",)
+        assert data_manager.get_scalar_data(data_manager.search("c")[0]).answers[0].answer == "2"
+
+
+def test_compact_map_memory():
+    with TemporaryDirectory(dir="./") as root:
+        prompts = [f"{i} " + "a long chat context " * 20 for i in range(100)]
+        usages = []
+        for manager_class, name in ((MapDataManager, "map.txt"), (CompactMapDataManager, "compact_map.txt")):
+            data_manager = manager_class(os.path.join(root, name), 100)
+            data_manager.import_data(prompts, ["answer"] * 100, prompts, ["session"] * 100)
+            data_manager.close()
+            # the loaded map doesn't share the prompts of the questions and the keys
+            usages.append(manager_class(os.path.join(root, name), 100).memory_usage())
+        assert usages[0]["count"] == usages[1]["count"] == 100
+        assert usages[1]["bytes_per_entry"] < usages[0]["bytes_per_entry"] * 0.6
+
+        # the plain map is converted to the compact one
+        data_manager = CompactMapDataManager(os.path.join(root, "map.txt"), 100)
+        assert data_manager.search(prompts[0])[0][3] == ("session",)
+
+
+@pytest.mark.parametrize("manager_class", [MapDataManager, CompactMapDataManager])
+def test_map_sessions(manager_class):
+    with TemporaryDirectory(dir="./") as root:
+        path = os.path.join(root, "data_map.txt")
+        data_manager = manager_class(path, 3)
+        data_manager.save("a", "0", "a", session=Session("s0"))
+        data_manager.save("b", "1", "b", session=Session("s0"))
+        data_manager.add_session(data_manager.search("b")[0], "s1", "b")
+        assert len(data_manager.list_sessions("s0")) == 2
+        assert sorted(data_manager.list_sessions()) == ["s0", "s1"]
+
+        # the index drops the evicted and the overwritten data
+        data_manager.save("c", "2", "c")
+        data_manager.save("d", "3", "d")
+        data_manager.save("b", "4", "b", session=Session("s2"))
+        assert data_manager.list_sessions("s0") == []
+        assert data_manager.list_sessions("s2") == [data_manager.search("b")[0][2]]
+
+        time.sleep(0.01)
+        data_manager.save("e", "5", "e", session=Session("s3"))
+        assert sorted(data_manager.expire_sessions(0.005)) == ["s0", "s1", "s2"]
+        assert data_manager.search("b") == []
+        assert data_manager.list_sessions() == ["s3"]
+        data_manager.close()
+
+        # the sessions are indexed again when the map is loaded
+        data_manager = manager_class(path, 3)
+        assert data_manager.list_sessions() == ["s3"]
+        assert data_manager.expire_sessions(60) == []
+        data_manager.delete_session("s3")
+        assert data_manager.search("e") == []
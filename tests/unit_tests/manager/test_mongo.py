@@ -1,9 +1,12 @@
 import time
+from tempfile import TemporaryDirectory
 
 import numpy as np
+import pytest
 
+from gptcache.manager import VectorBase, get_data_manager
 from gptcache.manager.scalar_data.base import CacheData, Question
-from gptcache.manager.scalar_data.mongo import MongoStorage
+from gptcache.manager.scalar_data.mongo import MongoStorage, MongoEmbeddedStorage
 from gptcache.utils import import_mongodb
 
 import_mongodb()
@@ -27,6 +30,46 @@ def test_mongo():
     _clear_test_db(test_dbname)
 
 
+def test_mongo_embedded():
+    test_dbname = "gptcache_test"
+    _clear_test_db(test_dbname)
+    _inner_test_embedded(test_dbname)
+
+    _clear_test_db(test_dbname)
+    _test_embedded_sessions(test_dbname)
+
+    _clear_test_db(test_dbname)
+    _test_migrate(test_dbname)
+
+    _clear_test_db(test_dbname)
+
+
+def test_mongo_sessions():
+    mongomock = pytest.importorskip("mongomock")
+    disconnect()
+    storage = MongoStorage(dbname="gptcache_sessions_test", mongo_client_class=mongomock.MongoClient)
+    with TemporaryDirectory(dir="./") as root:
+        data_manager = get_data_manager(storage, VectorBase("faiss", dimension=5, index_path=f"{root}/faiss.index"))
+        data_manager.import_data(
+            ["question_1", "question_2", "question_3"],
+            ["answer_1", "answer_2", "answer_3"],
+            [np.random.rand(5).astype("float32") for _ in range(3)],
+            ["A", "B", "A"],
+        )
+        # the ids of the sessions differ from the ids of their questions
+        data_manager.add_session((0, 2), "A", "question_2")
+        assert sorted(r.question_id for r in storage.list_sessions(session_id="A")) == [1, 2, 3]
+
+        data_manager.delete_session("A")
+        assert [(r.question_id, r.session_id) for r in storage.list_sessions()] == [(2, "B")]
+
+        data_manager.add_session((0, 1), "C", "question_1")
+        time.sleep(0.01)
+        assert sorted(data_manager.expire_sessions(0)) == ["B", "C"]
+        assert not storage.list_sessions()
+    disconnect()
+
+
 def _clear_test_db(dbname):
     con = connect(db=dbname)
     con.drop_database(dbname)
@@ -154,3 +197,96 @@ def _test_session(dbname):
 
     mongo_storage.delete_session([1, 2, 3])
     assert len(mongo_storage.list_sessions()) == 7
+
+
+def _inner_test_embedded(dbname: str):
+    mongo_storage = MongoEmbeddedStorage(dbname=dbname)
+    data = []
+    for i in range(1, 10):
+        data.append(
+            CacheData(
+                "question_" + str(i),
+                ["answer_" + str(i)] * i,
+                np.random.rand(5),
+                session_id=str(1 if i <= 5 else 0)
+            )
+        )
+    ids = mongo_storage.batch_insert(data)
+    assert ids == list(range(1, 10))
+
+    data = mongo_storage.get_data_by_id(2)
+    assert data.question == "question_2"
+    assert len(data.answers) == 2
+    assert data.session_id == ["1"]
+    last_access = data.last_access
+    time.sleep(0.1)
+    assert mongo_storage.get_data_by_id(2).last_access > last_access
+
+    results = mongo_storage.batch_get_data_by_id([1, 9, 100])
+    assert results[0].question == "question_1"
+    assert results[1].question == "question_9"
+    assert results[2] is None
+
+    assert len(mongo_storage.list_sessions()) == 9
+    assert len(mongo_storage.list_sessions(session_id="1")) == 5
+    assert len(mongo_storage.list_sessions(session_id="1", key=1)) == 1
+    mongo_storage.add_session(1, "2", "question_1")
+    assert mongo_storage.get_data_by_id(1).session_id == ["1", "2"]
+    mongo_storage.delete_session([1, 2, 3])
+    assert len(mongo_storage.list_sessions()) == 6
+
+    mongo_storage.mark_deleted([1, 2, 3])
+    assert mongo_storage.get_ids(True) == [1, 2, 3]
+    assert mongo_storage.get_data_by_id(1) is None
+    assert mongo_storage.count(is_all=True) == 9
+    assert mongo_storage.count() == 6
+    assert mongo_storage.count_answers() == 45
+    mongo_storage.clear_deleted_data()
+    assert mongo_storage.count_answers() == 39
+    assert mongo_storage.count(is_all=True) == 6
+
+
+def _test_embedded_sessions(dbname: str):
+    mongo_storage = MongoEmbeddedStorage(dbname=dbname)
+    mongo_storage.batch_insert([CacheData("question_1", "answer_1", np.random.rand(5), session_id="A")])
+    mongo_storage.add_session(1, "B", "question_1")
+
+    # the session is deleted by the ids of its sessions, like the data manager does
+    mongo_storage.delete_session([r.id for r in mongo_storage.list_sessions(session_id="A")])
+    assert mongo_storage.get_data_by_id(1).session_id == ["B"]
+    assert [r.session_id for r in mongo_storage.list_sessions()] == ["B"]
+
+
+def _test_migrate(dbname: str):
+    mongo_storage = MongoStorage(dbname=dbname)
+    mongo_storage.batch_insert(
+        [
+            CacheData(
+                Question.from_dict(
+                    {
+                        "content": "question_" + str(i),
+                        "deps": [{"name": "text", "data": "dep_" + str(i), "dep_type": 0}],
+                    }
+                ),
+                ["answer_" + str(i)] * i,
+                np.random.rand(5).astype(np.float32),
+                session_id="session_" + str(i),
+            )
+            for i in range(1, 6)
+        ]
+    )
+    old = mongo_storage.get_data_by_id(3)
+
+    embedded_storage = MongoEmbeddedStorage(dbname=dbname)
+    assert embedded_storage.migrate(batch_size=2) == 5
+    assert embedded_storage.count(is_all=True) == 5
+
+    new = embedded_storage.get_data_by_id(3)
+    assert new.question.content == old.question.content
+    assert new.question.deps[0].data == "dep_3"
+    assert [ans.answer for ans in new.answers] == [ans.answer for ans in old.answers]
+    assert new.session_id == ["session_3"]
+    assert all(np.equal(new.embedding_data, old.embedding_data))
+
+    # the new questions get the ids after the migrated ones
+    assert embedded_storage.batch_insert([CacheData("question_6", "answer_6", np.random.rand(5))]) == [6]
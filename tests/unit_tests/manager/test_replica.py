@@ -0,0 +1,87 @@
+import queue
+import threading
+import unittest
+from functools import partial
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from gptcache.manager import manager_factory
+from gptcache.manager.replica import ReplicaDataManager, ReplicaWriter
+
+
+class _Generation:
+    def __init__(self):
+        self.value = 0
+
+
+def _vector(i):
+    vector = np.zeros(8, dtype="float32")
+    vector[i] = 1.0
+    return vector
+
+
+class TestReplica(unittest.TestCase):
+    def test_replica(self):
+        with TemporaryDirectory(dir="./") as root:
+            loader = partial(
+                manager_factory,
+                "sqlite,faiss",
+                data_dir=root,
+                scalar_params={"record_last_access": False},
+                vector_params={"dimension": 8},
+            )
+            writes, generation, lock = queue.Queue(), _Generation(), threading.Lock()
+            data_manager = manager_factory("sqlite,faiss", data_dir=root, vector_params={"dimension": 8})
+            writer = ReplicaWriter(
+                {"default": data_manager}, writes, generation, lock, flush_interval=60
+            )
+            replica = ReplicaDataManager(loader, writes, "default", generation, lock, reload_interval=60)
+            other = ReplicaDataManager(loader, writes, "default", generation, lock, reload_interval=60)
+
+            replica.save("q0", "a0", _vector(0))
+            replica.import_data(["q1", "q2"], ["a1", "a2"], [_vector(1), _vector(2)], [None, None])
+            self.assertEqual(writes.qsize(), 2)
+            # the writes are not visible before they are applied and flushed
+            self.assertFalse(replica.search(_vector(0)))
+
+            writer.start()
+            replica.flush()
+            writer.stop()
+            self.assertEqual(writer.applied, 2)
+            self.assertEqual(generation.value, 2)
+
+            for r in (replica, other):
+                r.reload()
+                self.assertEqual(r.generation, 2)
+                res = r.search(_vector(1))
+                self.assertEqual(r.get_scalar_data(res[0]).answers[0].answer, "a1")
+                self.assertEqual(len(r.batch_search([_vector(0), _vector(2)])), 2)
+            # the attributes of the stores are the ones of the loaded data manager
+            self.assertEqual(other.v.count(), 3)
+            # the replicas don't write the last access time of their reads
+            for r in (replica, other):
+                self.assertIsNone(r.s._last_access_thread)
+                self.assertFalse(r.s._last_access)
+
+            last_access = data_manager.s.export_data_by_id([res[0][1]])[0].last_access
+            replica.hit_cache_callback(res[0])
+            replica.report_cache("q1", "q1", res[0][1], "a1", 1.0, 0.01)
+            self.assertEqual(writes.qsize(), 2)
+            writer.start()
+            writer.stop()
+            self.assertEqual(writer.applied, 4)
+            # the writer records the last access time of the hits of the replicas
+            self.assertGreater(data_manager.s.export_data_by_id([res[0][1]])[0].last_access, last_access)
+
+            replica.close()
+            other.close()
+            data_manager.close()
+
+    def test_unknown_cache(self):
+        writes, generation, lock = queue.Queue(), _Generation(), threading.Lock()
+        writer = ReplicaWriter({}, writes, generation, lock)
+        writes.put(("unknown", "import_data", ([], [], [], [])))
+        writer.start()
+        writer.stop()
+        self.assertEqual(writer.applied, 0)
@@ -0,0 +1,135 @@
+import json
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from gptcache.manager import CacheBase, VectorBase, get_data_manager
+from gptcache.manager.report_sink import (
+    JsonlReportSink,
+    ReportBuffer,
+    ReportSink,
+    StorageReportSink,
+    report_row,
+)
+from gptcache.utils.error import ParamError
+
+
+class _ListSink(ReportSink):
+    def __init__(self, gate: threading.Event = None):
+        self.batches = []
+        self.gate = gate
+
+    def write(self, rows):
+        if self.gate is not None:
+            self.gate.wait()
+        self.batches.append(rows)
+
+
+def _row(i):
+    return report_row(f"user_{i}", f"cache_{i}", i, f"answer_{i}", 0.9, 0.01)
+
+
+class TestReportBuffer(unittest.TestCase):
+    def test_flush_on_size(self):
+        sink = _ListSink()
+        buffer = ReportBuffer(sink, batch_size=3, flush_interval=60)
+        for i in range(7):
+            self.assertTrue(buffer.put(_row(i)))
+        buffer.close()
+        self.assertEqual([len(rows) for rows in sink.batches], [3, 3, 1])
+        ids = [row["cache_question_id"] for rows in sink.batches for row in rows]
+        self.assertEqual(ids, list(range(7)))
+        self.assertEqual(buffer.written, 7)
+
+    def test_flush_on_interval(self):
+        sink = _ListSink()
+        buffer = ReportBuffer(sink, batch_size=100, flush_interval=0.05)
+        buffer.put(_row(0))
+        for _ in range(100):
+            if sink.batches:
+                break
+            threading.Event().wait(0.02)
+        self.assertEqual(len(sink.batches), 1)
+        buffer.close()
+
+    def test_overflow(self):
+        buffer = ReportBuffer(_ListSink(), max_size=2, flush_interval=60)
+        buffer.put(_row(0))
+        buffer.put(_row(1))
+        self.assertFalse(buffer.put(_row(2)))
+        self.assertEqual(buffer.dropped, 1)
+        self.assertEqual(len(buffer), 2)
+        buffer.close()
+
+        sink = _ListSink()
+        buffer = ReportBuffer(sink, max_size=2, flush_interval=60, overflow="drop_oldest")
+        for i in range(3):
+            self.assertTrue(buffer.put(_row(i)))
+        buffer.close()
+        self.assertEqual(buffer.dropped, 1)
+        self.assertEqual([row["cache_question_id"] for row in sink.batches[0]], [1, 2])
+
+        gate = threading.Event()
+        sink = _ListSink(gate)
+        buffer = ReportBuffer(
+            sink, max_size=1, batch_size=1, flush_interval=60, overflow="block", block_timeout=0.05
+        )
+        buffer.put(_row(0))
+        # the first row is being written and the writer is blocked, so the second one waits in the buffer
+        for _ in range(100):
+            if len(buffer) == 0:
+                break
+            threading.Event().wait(0.01)
+        self.assertTrue(buffer.put(_row(1)))
+        self.assertFalse(buffer.put(_row(2)))
+        gate.set()
+        buffer.close()
+        self.assertEqual(buffer.dropped, 1)
+        self.assertEqual(buffer.written, 2)
+
+        with self.assertRaises(ParamError):
+            ReportBuffer(_ListSink(), overflow="unknown")
+
+    def test_sink_error(self):
+        class _ErrorSink(ReportSink):
+            def write(self, rows):
+                raise RuntimeError("sink is down")
+
+        buffer = ReportBuffer(_ErrorSink(), flush_interval=60)
+        buffer.put(_row(0))
+        buffer.close()
+        self.assertEqual(buffer.dropped, 1)
+        self.assertFalse(buffer.put(_row(1)))
+
+    def test_jsonl_sink(self):
+        with TemporaryDirectory(dir="./") as root:
+            path = Path(root) / "report.jsonl"
+            buffer = ReportBuffer(JsonlReportSink(str(path)), batch_size=2, flush_interval=60)
+            for i in range(3):
+                buffer.put(_row(i))
+            buffer.close()
+            rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual([row["user_question"] for row in rows], ["user_0", "user_1", "user_2"])
+            self.assertIsInstance(rows[0]["cache_time"], str)
+
+    def test_storage_sink(self):
+        with TemporaryDirectory(dir="./") as root:
+            cache_base = CacheBase("sqlite", sql_url=f"sqlite:///{root}/sqlite.db")
+            data_manager = get_data_manager(
+                cache_base,
+                VectorBase("faiss", dimension=4, index_path=f"{root}/faiss.index"),
+                report_buffer=ReportBuffer(
+                    StorageReportSink(cache_base), batch_size=10, flush_interval=60
+                ),
+            )
+            for i in range(5):
+                data_manager.report_cache(f"user_{i}", f"cache_{i}", i, f"answer_{i}", 0.9, 0.01)
+            data_manager.flush()
+            with cache_base._engine.connect() as conn:  # pylint: disable=protected-access
+                rows = conn.execute(
+                    cache_base._stmts.insert_report.table.select()  # pylint: disable=protected-access
+                ).all()
+            self.assertEqual([row.cache_question_id for row in rows], list(range(5)))
+            self.assertTrue(all(row.cache_time is not None for row in rows))
+            data_manager.close()
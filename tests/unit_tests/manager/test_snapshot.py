@@ -0,0 +1,107 @@
+import io
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import sqlalchemy
+
+from gptcache.manager import manager_factory
+from gptcache.manager.scalar_data.base import Answer, DataType
+from gptcache.manager.snapshot import import_snapshot, iter_snapshot, read_snapshot, write_snapshot
+from gptcache.utils.error import CacheError, ParamError
+
+DIM = 8
+
+
+def _vector(i):
+    vector = np.zeros(DIM, dtype="float32")
+    vector[i] = 1.0
+    return vector
+
+
+def _data_manager(root, name):
+    return manager_factory(
+        "sqlite,faiss,local",
+        data_dir=os.path.join(root, name),
+        vector_params={"dimension": DIM},
+        object_params={"path": os.path.join(root, name, "objects")},
+    )
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_export_import(self):
+        with TemporaryDirectory(dir="./") as root:
+            source = _data_manager(root, "source")
+            source.import_data(
+                ["q0", "q1", "q2"],
+                ["a0", "a1", Answer(b"image bytes", DataType.IMAGE_BASE64)],
+                [_vector(0), _vector(1), _vector(2)],
+                ["s0", None, None],
+            )
+            source.add_session(source.search(_vector(0))[0], "s1", "q0")
+
+            path = os.path.join(root, "cache.snapshot")
+            self.assertEqual(write_snapshot(source, path), 3)
+            with read_snapshot(path) as snapshot:
+                self.assertEqual(snapshot.count, 3)
+                self.assertEqual(snapshot.dimension, DIM)
+                self.assertEqual(sorted(snapshot.ids.tolist()), sorted(source.s.get_ids(deleted=False)))
+                self.assertEqual(snapshot.vectors.dtype, np.float32)
+                self.assertEqual(sorted(row["question"] for row in snapshot.rows()), ["q0", "q1", "q2"])
+
+            # the streamed chunks are the same bundle with the half precision vectors
+            streamed = b"".join(iter_snapshot(source, dtype="float16", chunk_size=16))
+            with read_snapshot(io.BytesIO(streamed)) as snapshot:
+                self.assertEqual(snapshot.vectors.dtype, np.float16)
+                self.assertEqual(snapshot.vectors.shape, (3, DIM))
+
+            target = _data_manager(root, "target")
+            self.assertEqual(import_snapshot(target, path, batch_size=2), 3)
+            for i, answer in enumerate(["a0", "a1", b"image bytes"]):
+                res = target.search(_vector(i))
+                self.assertEqual(len(res), 1)
+                self.assertEqual(target.get_scalar_data(res[0]).answers[0].answer, answer)
+            self.assertEqual(sorted(target.list_sessions()), ["s0", "s1"])
+
+            self.assertEqual(import_snapshot(target, streamed), 3)
+            self.assertEqual(target.s.count(), 6)
+            source.close()
+            target.close()
+
+    def test_one_read(self):
+        with TemporaryDirectory(dir="./") as root:
+            data_manager = _data_manager(root, "data")
+            data_manager.import_data(["q0", "q1", "q2"], ["a0", "a1", "a2"], [_vector(i) for i in range(3)], ["s0"] * 3)
+            data_manager.s.mark_deleted([2])
+            statements = []
+            sqlalchemy.event.listen(
+                data_manager.s._engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+            )
+
+            # the ids and the rows of the live data are read by one statement
+            snapshot = b"".join(iter_snapshot(data_manager))
+            self.assertEqual(len(statements), 1)
+            with read_snapshot(snapshot) as loaded:
+                self.assertEqual(sorted(loaded.ids.tolist()), [1, 3])
+                self.assertEqual([row["sessions"] for row in loaded.rows()], [["s0"], ["s0"]])
+            data_manager.close()
+
+    def test_invalid(self):
+        with TemporaryDirectory(dir="./") as root:
+            data_manager = _data_manager(root, "data")
+            with self.assertRaises(ParamError):
+                iter_snapshot(data_manager, dtype="int8")
+            with self.assertRaises(CacheError):
+                iter_snapshot(manager_factory("map", data_dir=root))
+
+            snapshot = b"".join(iter_snapshot(data_manager))
+            with read_snapshot(snapshot) as empty:
+                self.assertEqual(empty.count, 0)
+                self.assertEqual(empty.vectors.shape, (0, 0))
+            with self.assertRaises(CacheError):
+                read_snapshot(b"not a snapshot" * 4)
+            data_manager.import_data(["q"], ["a"], [_vector(0)], [None])
+            with self.assertRaises(CacheError):
+                read_snapshot(b"".join(iter_snapshot(data_manager))[:-100])
+            data_manager.close()
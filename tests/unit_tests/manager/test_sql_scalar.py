@@ -1,12 +1,16 @@
+import asyncio
 import time
 import unittest
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
 import numpy as np
+import sqlalchemy
 
+from gptcache.manager import AsyncCacheBase, CacheBase, VectorBase, get_data_manager
 from gptcache.manager.scalar_data.base import CacheData, Question
 from gptcache.manager.scalar_data.sql_storage import SQLStorage
+from gptcache.session import Session
 from gptcache.utils import import_sql_client
 
 
@@ -140,3 +144,216 @@ class TestSQLStore(unittest.TestCase):
 
             assert create_on1 == create_on2
             assert last_access1 < last_access2
+
+    def test_bulk_insert(self):
+        for bulk in (True, False):
+            with TemporaryDirectory(dir="./") as root:
+                db_path = Path(root) / "sqlite3.db"
+                db = SQLStorage(db_type="sqlite", url="sqlite:///" + str(db_path))
+                db._bulk_insert = bulk
+                data = []
+                for i in range(1, 10):
+                    data.append(
+                        CacheData(
+                            Question.from_dict(
+                                {
+                                    "content": "question_" + str(i),
+                                    "deps": [{"name": "text", "data": "dep_" + str(i), "dep_type": 0}],
+                                }
+                            ),
+                            ["answer_" + str(i)] * i,
+                            np.random.rand(5),
+                            session_id="session_" + str(i % 2),
+                        )
+                    )
+                ids = db.batch_insert(data)
+                self.assertEqual(ids, list(range(1, 10)))
+                self.assertEqual(db.count_answers(), 45)
+                for i, q_id in enumerate(ids, 1):
+                    ret = db.get_data_by_id(q_id)
+                    self.assertEqual(ret.question.content, "question_" + str(i))
+                    self.assertEqual(ret.question.deps[0].data, "dep_" + str(i))
+                    self.assertEqual(len(ret.answers), i)
+                self.assertEqual(len(db.list_sessions(session_id="session_1")), 5)
+
+    def test_batch_get_data_by_id(self):
+        with TemporaryDirectory(dir="./") as root:
+            data_manager = get_data_manager(
+                CacheBase("sqlite", sql_url="sqlite:///" + str(Path(root) / "sqlite6.db")),
+                VectorBase("faiss", dimension=5, index_path=str(Path(root) / "faiss.index")),
+            )
+            db = data_manager.s
+            db.read_batch_size = 4
+            embeddings = [np.random.rand(5).astype("float32") for _ in range(9)]
+            data_manager.import_data(
+                ["question_" + str(i) for i in range(1, 10)],
+                ["answer_" + str(i) for i in range(1, 10)],
+                embeddings,
+                ["session_" + str(i % 2) for i in range(1, 10)],
+            )
+            statements = []
+            sqlalchemy.event.listen(
+                db._engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+            )
+
+            # the keys are read by one query per `read_batch_size` keys
+            results = db.batch_get_data_by_id(list(range(1, 10)) + [100])
+            self.assertEqual(len(statements), 3)
+            self.assertEqual([data.question for data in results[:9]], ["question_" + str(i) for i in range(1, 10)])
+            self.assertEqual(results[1].answers[0].answer, "answer_2")
+            self.assertEqual(results[1].session_id, ["session_0"])
+            self.assertIsNone(results[9])
+
+            # the default session check uses the session ids which are read with the data
+            statements.clear()
+            res_datas = [data_manager.search(embeddings[i])[0] for i in range(2)]
+            session = Session("session_1", data_manager=data_manager)
+            results = data_manager.batch_get_scalar_data(res_datas, session=session)
+            self.assertIsNone(results[0])
+            self.assertEqual(results[1].question, "question_2")
+            self.assertEqual(len(statements), 1)
+            data_manager.close()
+
+    def test_last_access_buffer(self):
+        with TemporaryDirectory(dir="./") as root:
+            db_path = Path(root) / "sqlite4.db"
+            db = SQLStorage(
+                db_type="sqlite",
+                url="sqlite:///" + str(db_path),
+                last_access_interval=60,
+            )
+            q_id = db.batch_insert(
+                [CacheData("question", "answer", np.random.rand(5), session_id="session")]
+            )[0]
+            data = db.get_data_by_id(q_id)
+            self.assertEqual(data.session_id, ["session"])
+            last_access1 = data.last_access
+            with db.Session() as session:
+                self.assertEqual(session.get(db._ques, q_id).last_access, last_access1)
+
+            time.sleep(0.1)
+            last_access2 = db.get_data_by_id(q_id).last_access
+            self.assertLess(last_access1, last_access2)
+
+            db.flush()
+            with db.Session() as session:
+                self.assertLess(last_access2, session.get(db._ques, q_id).last_access)
+            db.close()
+
+    def test_index_migration(self):
+        with TemporaryDirectory(dir="./") as root:
+            db_path = Path(root) / "sqlite5.db"
+            url = "sqlite:///" + str(db_path)
+            db = SQLStorage(db_type="sqlite", url=url, pool_size=2, max_overflow=1, pool_pre_ping=True)
+            self.assertEqual(db._engine.pool.size(), 2)
+            index_names = [
+                index.name
+                for model in (db._ques, db._answer, db._ques_dep, db._session)
+                for index in model.__table__.indexes
+            ]
+            self.assertEqual(len(index_names), 5)
+            db.batch_insert([CacheData("question", "answer", np.random.rand(5))])
+
+            # drop the indexes to get the tables of a previous version
+            with db._engine.begin() as conn:
+                for name in index_names:
+                    conn.exec_driver_sql(f"DROP INDEX {name}")
+            db.close()
+
+            db = SQLStorage(db_type="sqlite", url=url)
+            inspector = sqlalchemy.inspect(db._engine)
+            migrated = [
+                index["name"]
+                for model in (db._ques, db._answer, db._ques_dep, db._session)
+                for index in inspector.get_indexes(model.__table__.name)
+            ]
+            self.assertEqual(sorted(migrated), sorted(index_names))
+            self.assertEqual(db.get_data_by_id(1).question, "question")
+            self.assertEqual(db.count(state=-1), 0)
+            self.assertEqual(db.count(is_all=True), 1)
+
+    def test_async_sqlite(self):
+        async def run(url):
+            db = AsyncCacheBase("sqlite", sql_url=url)
+            data = [
+                CacheData(
+                    "question_" + str(i),
+                    ["answer_" + str(i)] * i,
+                    np.random.rand(5),
+                    session_id="session",
+                )
+                for i in range(1, 10)
+            ]
+            ids = await db.batch_insert(data)
+            self.assertEqual(ids, list(range(1, 10)))
+            ret = await db.get_data_by_id(2)
+            self.assertEqual(ret.question, "question_2")
+            self.assertEqual(len(ret.answers), 2)
+            self.assertEqual(ret.session_id, ["session"])
+            self.assertEqual(len(await db.list_sessions(session_id="session")), 9)
+
+            await db.mark_deleted([1, 2, 3])
+            self.assertEqual(await db.get_ids(True), [1, 2, 3])
+            self.assertEqual(await db.count(), 6)
+            await db.clear_deleted_data()
+            self.assertEqual(await db.count(is_all=True), 6)
+            self.assertIsNone(await db.get_data_by_id(1))
+            await db.close()
+
+        async def run_data_manager(url, db_path):
+            data_manager = get_data_manager(
+                CacheBase("sqlite", sql_url="sqlite:///" + db_path),
+                VectorBase("faiss", dimension=5, index_path=str(Path(db_path).parent / "faiss.index")),
+                async_cache_base=AsyncCacheBase("sqlite", sql_url=url),
+            )
+            embedding = np.random.rand(5).astype("float32")
+            await data_manager.asave("question", "answer", embedding)
+            search_data = data_manager.search(embedding, top_k=1)[0]
+            cache_data = await data_manager.aget_scalar_data(search_data)
+            self.assertEqual(cache_data.question, "question")
+            self.assertEqual(cache_data.answers[0].answer, "answer")
+            # the sync storage reads what the async one wrote
+            self.assertEqual(data_manager.s.get_data_by_id(search_data[1]).question, "question")
+            await data_manager.aclose()
+
+        with TemporaryDirectory(dir="./") as root:
+            db_path = str(Path(root) / "sqlite6.db")
+            asyncio.run(run("sqlite+aiosqlite:///" + db_path))
+            db_path = str(Path(root) / "sqlite7.db")
+            asyncio.run(run_data_manager("sqlite+aiosqlite:///" + db_path, db_path))
+
+    def test_async_sqlite_fresh_writes(self):
+        async def run_fresh(url, write):
+            # the writes create the tables of a fresh database too
+            db = AsyncCacheBase("sqlite", sql_url=url)
+            await write(db)
+            self.assertEqual(await db.count(is_all=True), 0)
+            await db.close()
+
+        writes = [
+            lambda db: db.add_session(1, "session", "question"),
+            lambda db: db.delete_session([1]),
+            lambda db: db.mark_deleted([1]),
+            lambda db: db.clear_deleted_data(),
+        ]
+        with TemporaryDirectory(dir="./") as root:
+            for i, write in enumerate(writes):
+                asyncio.run(run_fresh("sqlite+aiosqlite:///" + str(Path(root) / f"fresh{i}.db"), write))
+
+    def test_async_sqlite_failed_flush(self):
+        async def run(url):
+            db = AsyncCacheBase("sqlite", sql_url=url, last_access_interval=0)
+            await db.batch_insert([CacheData("question", ["answer"], np.random.rand(5))])
+            update_last_access = db._stmts.update_last_access
+            db._stmts.update_last_access = sqlalchemy.text("UPDATE missing SET last_access = :b_last_access")
+            with self.assertLogs(level="ERROR"):
+                await db.get_data_by_id(1)
+                await asyncio.wait([db._flush_task])
+            # the rows of the failed write are buffered again
+            self.assertIn(1, db._last_access)
+            db._stmts.update_last_access = update_last_access
+            await db.close()
+            self.assertFalse(db._last_access)
+
+        with TemporaryDirectory(dir="./") as root:
+            asyncio.run(run("sqlite+aiosqlite:///" + str(Path(root) / "flush.db")))
@@ -1,4 +1,5 @@
-from unittest.mock import patch, Mock
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 from gptcache.utils import import_httpx
 
@@ -8,15 +9,50 @@ from gptcache.client import Client
 
 def test_client():
     client = Client()
-    with patch("httpx.AsyncClient.post") as mock_response:
+    with patch("httpx.Client.post") as mock_response:
         mock_response.return_value = Mock(status_code=200)
         status_code = client.put("Hi", "Hi back")
         assert status_code == 200
+        assert mock_response.call_args.kwargs["json"] == {"prompt": "Hi", "answer": "Hi back"}
 
-    with patch("httpx.AsyncClient.post") as mock_response:
+    with patch("httpx.Client.post") as mock_response:
         m = Mock()
         attrs = {"json.return_value": {"answer": "Hi back"}}
         m.configure_mock(**attrs)
         mock_response.return_value = m
         ans = client.get("Hi")
         assert ans == "Hi back"
+
+    # the connections are kept by the client
+    http_client = client.client
+    assert client.client is http_client
+    client.close()
+
+
+def test_client_batch():
+    with Client() as client, patch("httpx.Client.post") as mock_response:
+        mock_response.return_value = Mock(status_code=200)
+        assert client.put_batch(["Hi", "Hello"], ["Hi back", "Hello back"]) == 200
+        assert mock_response.call_args.args[0] == "/put_batch"
+
+        m = Mock()
+        m.configure_mock(**{"json.return_value": {"answers": ["Hi back", None]}})
+        mock_response.return_value = m
+        assert client.get_batch(["Hi", "Hey"]) == ["Hi back", None]
+
+
+def test_async_client():
+    async def run():
+        async with Client() as client:
+            with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_response:
+                mock_response.return_value = Mock(status_code=200)
+                assert await client.aput("Hi", "Hi back") == 200
+                assert await client.aput_batch(["Hi"], ["Hi back"]) == 200
+
+                m = Mock()
+                m.configure_mock(**{"json.return_value": {"answer": "Hi back", "answers": ["Hi back"]}})
+                mock_response.return_value = m
+                assert await client.aget("Hi") == "Hi back"
+                assert await client.aget_batch(["Hi"]) == ["Hi back"]
+
+    asyncio.run(run())
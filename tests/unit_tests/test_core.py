@@ -1,6 +1,10 @@
+import os
+import subprocess
+import sys
 import time
 
-from gptcache import cache, Config
+import gptcache
+from gptcache import cache, Cache, Config
 from gptcache.report import Report
 from gptcache.utils.cache_func import cache_all
 from gptcache.utils.time import time_cal
@@ -38,6 +42,14 @@ def test_time_cal():
     cache.config = None
 
 
+def test_time_cal_cache_obj():
+    logs = []
+    cache_obj = Cache()
+    cache_obj.config = Config(log_time_func=lambda fname, delta_time: logs.append(fname))
+    time_cal(lambda: None, func_name="cache_obj", cache_obj=cache_obj)()
+    assert logs == ["cache_obj"]
+
+
 def test_cache_all():
     assert cache_all()
 
@@ -56,3 +68,46 @@ def test_report():
     assert report.average_search_time() == 3
     assert report.op_search.count == 2
     assert report.hint_cache_count == 2
+
+    latency = report.latency("search")
+    assert latency["count"] == 2
+    assert latency["max"] == 4
+    assert abs(latency["p50"] - 2) < 0.05
+    assert report.latency_summary(window=True)["embedding"]["count"] == 2
+
+    report.miss_cache(Report.MISS_BELOW_THRESHOLD)
+    assert report.miss_cache_count[Report.MISS_BELOW_THRESHOLD] == 1
+    assert report.miss_cache_count[Report.MISS_CACHE_SKIP] == 0
+
+    report.reset()
+    assert report.op_search.count == 0
+    assert report.average_search_time() == 0
+    assert report.latency("search")["count"] == 0
+    assert report.hint_cache_count == 0
+    assert report.miss_cache_count[Report.MISS_BELOW_THRESHOLD] == 0
+
+
+def test_import_time():
+    # the modules of the default stack and the optional dependencies aren't imported with the package,
+    # nor by a cache with a custom stack
+    code = (
+        "from gptcache import cache; "
+        "cache.init(data_manager=object(), similarity_evaluation=object(), post_func=lambda messages: messages[0])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.dirname(gptcache.__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+    for module in (
+        "numpy",
+        "requests",
+        "cachetools",
+        "gptcache.manager",
+        "gptcache.similarity_evaluation.exact_match",
+        "gptcache.utils.dependency_control",
+    ):
+        assert module not in imported, module
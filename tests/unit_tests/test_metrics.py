@@ -0,0 +1,70 @@
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from gptcache import Cache
+from gptcache.adapter.api import get, put
+from gptcache.manager import CacheBase, VectorBase, get_data_manager
+from gptcache.metrics import CacheMetrics
+from gptcache.processor.pre import get_prompt
+from gptcache.report import Report
+
+
+def _samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            samples[key] = float(value)
+    return samples
+
+
+def test_render():
+    with TemporaryDirectory(dir="./") as root:
+        cache_obj = Cache()
+        cache_obj.init(pre_embedding_func=get_prompt, data_manager=get_data_manager(data_path=f"{root}/data_map.txt"))
+        put("foo", "bar", cache_obj=cache_obj)
+        assert get("foo", cache_obj=cache_obj) == "bar"
+        assert get("baz", cache_obj=cache_obj) is None
+
+        metrics = CacheMetrics(buckets=(0.5, 1.0))
+        metrics.register(cache_obj, "map")
+        text = metrics.render()
+        assert "# TYPE gptcache_stage_duration_seconds histogram" in text
+        samples = _samples(text)
+        assert samples['gptcache_hits_total{cache="map"}'] == 1
+        assert samples['gptcache_misses_total{cache="map",reason="no_candidates"}'] == 1
+        assert samples['gptcache_misses_total{cache="map",reason="cache_skip"}'] == 1
+        assert samples['gptcache_hit_ratio{cache="map"}'] == 0.5
+        assert samples['gptcache_scalar_store_size{cache="map",state="live"}'] == 1
+        assert samples['gptcache_llm_tokens_saved_total{cache="map"}'] == 1
+        assert samples['gptcache_stage_duration_seconds_bucket{cache="map",stage="search",le="0.5"}'] == 2
+        assert samples['gptcache_stage_duration_seconds_bucket{cache="map",stage="search",le="+Inf"}'] == 2
+        assert samples['gptcache_stage_latency_seconds_count{cache="map",stage="save"}'] == 1
+
+        metrics.unregister("map")
+        assert metrics.render() == "\n"
+
+
+def test_store_size():
+    with TemporaryDirectory(dir="./") as root:
+        data_manager = get_data_manager(
+            CacheBase("sqlite", sql_url=f"sqlite:///{root}/sqlite.db"),
+            VectorBase("faiss", dimension=2, index_path=f"{root}/faiss.index"),
+        )
+        data_manager.import_data(
+            ["foo", "baz"], ["bar", "qux"], [np.array([1.0, 0.0]), np.array([0.0, 1.0])], [None, None]
+        )
+        cache_obj = Cache()
+        cache_obj.data_manager = data_manager
+        cache_obj.report.miss_cache(Report.MISS_BELOW_THRESHOLD)
+
+        metrics = CacheMetrics()
+        metrics.register(cache_obj, "sqlite")
+        samples = _samples(metrics.render())
+        assert samples['gptcache_scalar_store_size{cache="sqlite",state="live"}'] == 2
+        assert samples['gptcache_scalar_store_size{cache="sqlite",state="deleted"}'] == 0
+        assert samples['gptcache_vector_store_size{cache="sqlite"}'] == 2
+        assert samples['gptcache_eviction_backlog{cache="sqlite"}'] == 0
+        assert samples['gptcache_hit_ratio{cache="sqlite"}'] == 0
+        data_manager.close()
@@ -0,0 +1,109 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from gptcache import Cache, Config
+from gptcache.adapter.api import get, put
+from gptcache.manager import manager_factory
+from gptcache.processor.pre import get_prompt
+from gptcache.profiler import Profiler
+from gptcache.utils.error import ParamError
+
+
+def _slow_embedding(data, **_):
+    time.sleep(0.05)
+    return data
+
+
+def _init_cache(config=None):
+    cache_obj = Cache()
+    cache_obj.init(
+        pre_embedding_func=get_prompt,
+        embedding_func=_slow_embedding,
+        data_manager=manager_factory(data_dir=str(random.random())),
+        config=config or Config(),
+    )
+    return cache_obj
+
+
+def test_profiler():
+    cache_obj = _init_cache()
+    put("foo", "bar", cache_obj=cache_obj)
+    assert cache_obj.profiler.stats() == {}
+
+    cache_obj.profiler.enable(sample_rate=1.0, trace_malloc=True)
+    for _ in range(3):
+        assert get("foo", cache_obj=cache_obj) == "bar"
+    cache_obj.profiler.disable()
+
+    stats = cache_obj.profiler.stats()
+    assert cache_obj.profiler.sampled_count == 3
+    assert stats["embedding"]["count"] == 3
+    assert stats["embedding"]["wall_time"] >= 0.15
+    assert stats["embedding"]["cpu_time"] < stats["embedding"]["wall_time"]
+    assert stats["get_data"]["count"] == 3
+
+    stacks = [line.rsplit(" ", 1) for line in cache_obj.profiler.dump_stacks().splitlines()]
+    assert all(int(count) > 0 for _, count in stacks)
+    embedding_stacks = [stack.split(";") for stack, _ in stacks if stack.startswith("embedding;")]
+    assert embedding_stacks
+    assert all(stack[1] == "gptcache.adapter.adapter.adapt" for stack in embedding_stacks)
+    assert any(stack[-1].endswith("_slow_embedding") for stack in embedding_stacks)
+
+    get("foo", cache_obj=cache_obj)
+    assert cache_obj.profiler.stats()["embedding"]["count"] == 3
+    cache_obj.profiler.reset()
+    assert cache_obj.profiler.stats() == {}
+    assert cache_obj.profiler.dump_stacks() == ""
+
+
+def test_sample_rate():
+    cache_obj = _init_cache(Config(profile_sample_rate=0.5))
+    assert cache_obj.profiler.enabled
+    random.seed(0)
+    for _ in range(10):
+        get("foo", cache_obj=cache_obj)
+    assert 0 < cache_obj.profiler.sampled_count < 10
+    assert cache_obj.profiler.stats()["embedding"]["count"] == cache_obj.profiler.sampled_count
+    cache_obj.profiler.disable()
+
+    with pytest.raises(ParamError):
+        Profiler().enable(sample_rate=2)
+
+
+def _busy(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+def test_async_requests():
+    profiler = Profiler(interval=0.001)
+    profiler.enable(sample_rate=1.0)
+    first_done = asyncio.Event()
+
+    async def first():
+        with profiler.request(), profiler.stage("first"):
+            await asyncio.sleep(0.01)
+        first_done.set()
+
+    async def second():
+        with profiler.request(), profiler.stage("second"):
+            await first_done.wait()
+            # the request is still sampled after the other one of the same thread exits
+            _busy(0.1)
+
+    async def run():
+        await asyncio.gather(first(), second())
+
+    asyncio.run(run())
+    profiler.disable()
+
+    stats = profiler.stats()
+    assert profiler.sampled_count == 2
+    assert stats["first"]["count"] == 1 and stats["second"]["count"] == 1
+    stacks = [line.rsplit(" ", 1)[0].split(";") for line in profiler.dump_stacks().splitlines()]
+    assert any(stack[0] == "second" and stack[-1].endswith("_busy") for stack in stacks)
+    assert all(stack[0] == "second" for stack in stacks if stack[-1].endswith("_busy"))
@@ -0,0 +1,62 @@
+import threading
+from tempfile import TemporaryDirectory
+
+from gptcache import Cache
+from gptcache.benchmark.mock import HashEmbedding
+from gptcache.manager import manager_factory
+from gptcache.similarity_evaluation import ExactMatchEvaluation
+from gptcache.warmup import ModelWarmup, warmup_text
+
+
+class _WarmupEmbedding(HashEmbedding):
+    def __init__(self):
+        super().__init__(8)
+        self.lengths = []
+
+    def to_embeddings(self, data, **kwargs):
+        self.lengths.append(len(data.split()))
+        return super().to_embeddings(data, **kwargs)
+
+    def warmup(self, lengths, iterations):
+        self._warmup_texts(lengths, iterations)
+
+
+def test_warmup():
+    assert len(warmup_text(20).split()) == 20
+    with TemporaryDirectory(dir="./") as root:
+        embedding = _WarmupEmbedding()
+        cache_obj = Cache()
+        release = threading.Event()
+
+        def load():
+            release.wait(10)
+            cache_obj.init(
+                embedding_func=embedding.to_embeddings,
+                data_manager=manager_factory("map", data_dir=root),
+                similarity_evaluation=ExactMatchEvaluation(),
+            )
+            return [cache_obj]
+
+        warmup = ModelWarmup(load, lengths=(4, 16), iterations=2).start()
+        assert not warmup.ready
+        assert warmup.status()["state"] == "loading"
+        release.set()
+        assert warmup.wait(10)
+
+        # the models of the cache are warmed up over every length
+        assert embedding.lengths == [4, 16, 4, 16]
+        status = warmup.status()
+        assert status["state"] == "ready"
+        assert status["models"] == ["_WarmupEmbedding", "ExactMatchEvaluation"]
+        assert status["load_seconds"] is not None and status["warmup_seconds"] is not None
+
+
+def test_warmup_failed():
+    def load():
+        raise FileNotFoundError("model.onnx")
+
+    warmup = ModelWarmup(load).start()
+    assert not warmup.wait(10)
+    status = warmup.status()
+    assert status["state"] == "failed"
+    assert status["error"] == "FileNotFoundError: model.onnx"
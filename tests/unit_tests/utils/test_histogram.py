@@ -0,0 +1,65 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from gptcache.utils.error import ParamError
+from gptcache.utils.histogram import LatencyHistogram
+
+
+def test_percentiles():
+    histogram = LatencyHistogram(relative_accuracy=0.01)
+    for i in range(1, 1001):
+        histogram.record(i / 1000)
+    histogram.record(0)
+
+    res = histogram.percentiles()
+    assert res["count"] == 1001
+    assert res["max"] == 1
+    for key, expect in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        assert abs(res[key] - expect) <= expect * 0.02, (key, res[key])
+    assert histogram.quantile(0) == 0
+    assert histogram.quantile(1) == 1
+
+    histogram.reset()
+    assert histogram.percentiles() == {
+        "count": 0, "average": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0
+    }
+
+
+def test_threads_and_merge():
+    histogram = LatencyHistogram()
+
+    def record():
+        for _ in range(1000):
+            histogram.record(0.01)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert histogram.count() == 4000
+
+    other = LatencyHistogram()
+    other.record(2)
+    histogram.merge(other)
+    assert histogram.count() == 4001
+    assert histogram.percentiles()["max"] == 2
+    assert histogram.count(window=True) == 4001
+
+    with pytest.raises(ParamError):
+        histogram.merge(LatencyHistogram(relative_accuracy=0.05))
+
+
+def test_window():
+    histogram = LatencyHistogram(window=60, window_slots=6)
+    with patch("gptcache.utils.histogram.time.monotonic", return_value=1000.0):
+        histogram.record(1)
+    with patch("gptcache.utils.histogram.time.monotonic", return_value=1030.0):
+        histogram.record(2)
+        assert histogram.count(window=True) == 2
+    with patch("gptcache.utils.histogram.time.monotonic", return_value=1065.0):
+        assert histogram.count(window=True) == 1
+        assert abs(histogram.quantile(0.5, window=True) - 2) < 0.02
+        assert histogram.count() == 2
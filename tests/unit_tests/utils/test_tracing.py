@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from gptcache import Cache, Config
+from gptcache.adapter.api import get, put
+from gptcache.manager import manager_factory
+from gptcache.processor.pre import get_prompt
+
+sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+from opentelemetry import trace  # pylint: disable=C0413
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # pylint: disable=C0413
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (  # pylint: disable=C0413
+    InMemorySpanExporter,
+)
+
+exporter = InMemorySpanExporter()
+provider = sdk_trace.TracerProvider()
+provider.add_span_processor(SimpleSpanProcessor(exporter))
+trace.set_tracer_provider(provider)
+
+
+def _init_cache(enable_tracing=True, next_cache=None):
+    cache_obj = Cache()
+    cache_obj.init(
+        pre_embedding_func=get_prompt,
+        data_manager=manager_factory(data_dir=str(random.random())),
+        config=Config(enable_tracing=enable_tracing),
+        next_cache=next_cache,
+    )
+    return cache_obj
+
+
+def test_adapt_spans():
+    cache_obj = _init_cache()
+    put("foo", "bar", cache_obj=cache_obj)
+    exporter.clear()
+    assert get("foo", cache_obj=cache_obj) == "bar"
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    for name in ["pre_process", "embedding", "search", "get_data", "evaluation", "post_process"]:
+        assert spans[f"gptcache.{name}"].parent.span_id == spans["gptcache.adapt"].context.span_id
+    root = spans["gptcache.adapt"]
+    assert root.attributes["gptcache.hit"] is True
+    assert root.attributes["gptcache.candidate_count"] == 1
+    assert root.attributes["gptcache.best_score"] == 1.0
+
+    exporter.clear()
+    assert get("baz", cache_obj=cache_obj) is None
+    root = [span for span in exporter.get_finished_spans() if span.name == "gptcache.adapt"][0]
+    assert root.attributes["gptcache.hit"] is False
+    assert root.attributes["gptcache.miss_reason"] == "no_candidates"
+
+    exporter.clear()
+    get("foo", cache_obj=_init_cache(enable_tracing=False))
+    assert not exporter.get_finished_spans()
+
+
+def test_next_cache_spans():
+    cache_obj = _init_cache(next_cache=_init_cache())
+    exporter.clear()
+    assert get("foo", cache_obj=cache_obj) is None
+
+    adapt_spans = [span for span in exporter.get_finished_spans() if span.name == "gptcache.adapt"]
+    assert len(adapt_spans) == 2
+    inner, outer = adapt_spans
+    assert inner.parent.span_id == outer.context.span_id
+    assert inner.context.trace_id == outer.context.trace_id